@@ -0,0 +1,408 @@
+"""
+Approval Bootstrap Module
+Parallel USDC allowance and CTF operator approval for many wallets: one multicall read, concurrent submission, one block watcher
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address, to_hex
+
+from circuit_breaker import get_circuit_breaker
+from rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Polygon Mainnet Addresses
+USDC_ADDRESS = '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'  # USDC.e (bridged)
+CTF_ADDRESS = '0x4D97DCd97eC945f40cF65F87097ACe5EA0476045'  # Conditional Token Framework
+CTF_EXCHANGE = '0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E'
+NEG_RISK_CTF_EXCHANGE = '0xC5d563A36AE78145C45a50134d48A1215220f80a'
+NEG_RISK_ADAPTER = '0xd91E80cF2E7be2e162c6513ceD06f1dD0dA35296'
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'  # Same address on every EVM chain
+
+AGGREGATE3 = function_signature_to_4byte_selector('aggregate3((address,bool,bytes)[])')
+GET_ETH_BALANCE = function_signature_to_4byte_selector('getEthBalance(address)')
+BALANCE_OF = function_signature_to_4byte_selector('balanceOf(address)')
+ALLOWANCE = function_signature_to_4byte_selector('allowance(address,address)')
+IS_APPROVED_FOR_ALL = function_signature_to_4byte_selector('isApprovedForAll(address,address)')
+APPROVE = function_signature_to_4byte_selector('approve(address,uint256)')
+SET_APPROVAL_FOR_ALL = function_signature_to_4byte_selector('setApprovalForAll(address,bool)')
+
+USDC_SPENDERS = [(CTF_EXCHANGE, 'USDC -> CTF Exchange')]
+CTF_OPERATORS = [
+    (CTF_EXCHANGE, 'CTF -> CTF Exchange'),
+    (NEG_RISK_CTF_EXCHANGE, 'CTF -> Neg Risk CTF Exchange'),
+    (NEG_RISK_ADAPTER, 'CTF -> Neg Risk Adapter'),
+]
+
+
+def approval_targets(usdc: bool = True, ctf: bool = True) -> List[Dict]:
+    """Approvals a trading wallet needs
+
+    Args:
+        usdc: Include the USDC allowance (buying)
+        ctf: Include the CTF operator approvals (selling outcome tokens)
+
+    Returns:
+        [{'kind': 'usdc' | 'ctf', 'token', 'spender', 'name'}]
+    """
+    targets = []
+    if usdc:
+        targets += [{'kind': 'usdc', 'token': USDC_ADDRESS, 'spender': s, 'name': n} for s, n in USDC_SPENDERS]
+    if ctf:
+        targets += [{'kind': 'ctf', 'token': CTF_ADDRESS, 'spender': s, 'name': n} for s, n in CTF_OPERATORS]
+    return targets
+
+
+def encode_state_call(addresses: List[str], targets: List[Dict]) -> str:
+    """Multicall3 aggregate3 calldata reading MATIC, USDC and every approval of every wallet
+
+    Calls per wallet, in order: getEthBalance, USDC balanceOf, then one
+    allowance / isApprovedForAll per target. Every call may fail on its own.
+    """
+    calls = []
+    for address in addresses:
+        owner = to_checksum_address(address)
+        calls.append((MULTICALL3_ADDRESS, True, GET_ETH_BALANCE + encode(['address'], [owner])))
+        calls.append((USDC_ADDRESS, True, BALANCE_OF + encode(['address'], [owner])))
+        for target in targets:
+            selector = ALLOWANCE if target['kind'] == 'usdc' else IS_APPROVED_FOR_ALL
+            calls.append((target['token'], True, selector + encode(['address', 'address'], [owner, target['spender']])))
+    return to_hex(AGGREGATE3 + encode(['(address,bool,bytes)[]'], [calls]))
+
+
+def decode_state_call(addresses: List[str], targets: List[Dict], result: str) -> Dict[str, Dict]:
+    """Decode an encode_state_call result
+
+    Returns:
+        address -> {'matic', 'usdc', 'approvals': {name: allowance (USDC base
+        units) or bool}}; failed calls are None
+    """
+    (results,) = decode(['(bool,bytes)[]'], bytes.fromhex(result[2:] if result.startswith('0x') else result))
+    per_wallet = 2 + len(targets)
+
+    state = {}
+    for i, address in enumerate(addresses):
+        values = []
+        for success, data in results[i * per_wallet:(i + 1) * per_wallet]:
+            values.append(int.from_bytes(data[:32], 'big') if success and len(data) >= 32 else None)
+
+        matic, usdc = values[0], values[1]
+        approvals = {}
+        for target, value in zip(targets, values[2:]):
+            approvals[target['name']] = value if target['kind'] == 'usdc' or value is None else bool(value)
+
+        state[address] = {
+            'matic': matic / 1e18 if matic is not None else None,
+            'usdc': usdc / 1e6 if usdc is not None else None,
+            'approvals': approvals,
+        }
+    return state
+
+
+def plan_approvals(state: Dict[str, Dict], targets: List[Dict], usdc_amount: float) -> Dict[str, List[Dict]]:
+    """Targets each wallet is still missing (unreadable approvals count as missing)
+
+    Args:
+        state: decode_state_call result
+        targets: approval_targets result
+        usdc_amount: Required USDC allowance per spender
+
+    Returns:
+        address -> missing targets, in target order
+    """
+    required = int(usdc_amount * 1e6)
+    missing = {}
+    for address, wallet_state in state.items():
+        todo = []
+        for target in targets:
+            value = wallet_state['approvals'].get(target['name'])
+            if value is None or (value < required if target['kind'] == 'usdc' else not value):
+                todo.append(target)
+        missing[address] = todo
+    return missing
+
+
+def build_approval_tx(target: Dict, usdc_amount: float, nonce: int, gas_price: int,
+                      gas_limit: int, chain_id: int) -> Dict:
+    """Unsigned legacy transaction for one approval"""
+    spender = to_checksum_address(target['spender'])
+    if target['kind'] == 'usdc':
+        data = APPROVE + encode(['address', 'uint256'], [spender, int(usdc_amount * 1e6)])
+    else:
+        data = SET_APPROVAL_FOR_ALL + encode(['address', 'bool'], [spender, True])
+    return {
+        'to': to_checksum_address(target['token']),
+        'value': 0,
+        'data': to_hex(data),
+        'nonce': nonce,
+        'gas': gas_limit,
+        'gasPrice': gas_price,
+        'chainId': chain_id,
+    }
+
+
+class ApprovalBootstrap:
+    """Brings many wallets to a tradeable approval state in a few round trips
+
+    1. One JSON-RPC batch reads everything: a Multicall3 eth_call with the
+       MATIC/USDC balances and all approvals of every wallet, the pending
+       nonce of every wallet and the gas price.
+    2. Missing approvals are built and signed locally, numbering each
+       wallet's transactions from its pending nonce (no per-tx RPC).
+    3. All raw transactions are submitted concurrently in JSON-RPC batches.
+    4. One block watcher polls eth_blockNumber and, on each new block, fetches
+       the receipts of every still-pending transaction in one batch.
+
+    Wallets without enough MATIC for their transactions are skipped.
+    """
+
+    def __init__(self, config: dict):
+        """Initialize bootstrap
+
+        Args:
+            config: Full bot configuration (rpc_url, approval_bootstrap section)
+        """
+        settings = config.get('approval_bootstrap', {})
+        self.rpc_url = config.get('rpc_url') or os.getenv('POLYGON_RPC_URL', 'https://polygon-rpc.com')
+        self.chain_id = settings.get('chain_id', 137)  # Polygon mainnet
+        self.gas_limit = settings.get('gas_limit', 100000)  # Standard gas limit for approve / setApprovalForAll
+        self.gas_price_multiplier = settings.get('gas_price_multiplier', 1.2)
+        self.max_batch_size = settings.get('max_batch_size', 50)  # requests per JSON-RPC batch
+        self.confirm_timeout = settings.get('confirm_timeout', 180)  # seconds
+        self.poll_interval = settings.get('poll_interval', 2)  # seconds between block checks
+        self.request_timeout = settings.get('request_timeout', 20)
+
+        self.rate_limiter = get_rate_limiter()
+        self.rpc_breaker = get_circuit_breaker('rpc')
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        """Open the pooled HTTP session"""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _rpc_batch(self, batch: List[Dict]) -> Dict[int, Dict]:
+        """POST a JSON-RPC batch through the limiter and breaker; returns id -> response"""
+
+        async def post() -> List[Dict]:
+            # Weighted by batch size; the limiter caps a request at the bucket's burst
+            await self.rate_limiter.acquire('rpc', tokens=max(1, len(batch) // 10))
+            async with self.session.post(self.rpc_url, json=batch) as response:
+                self.rate_limiter.record_response('rpc', response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        responses = await self.rpc_breaker.call(post)
+        if isinstance(responses, dict):
+            responses = [responses]
+        return {r.get('id'): r for r in responses if isinstance(r, dict)}
+
+    async def _rpc_chunked(self, batch: List[Dict]) -> Dict[int, Dict]:
+        """Split a large batch into max_batch_size requests posted concurrently"""
+        chunks = [batch[i:i + self.max_batch_size] for i in range(0, len(batch), self.max_batch_size)]
+        results = await asyncio.gather(*(self._rpc_batch(chunk) for chunk in chunks), return_exceptions=True)
+
+        merged = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                merged.update({r['id']: {'error': {'message': str(result) or type(result).__name__}} for r in chunk})
+            else:
+                merged.update(result)
+        return merged
+
+    async def read_state(self, wallets: List[Dict], targets: List[Dict]) -> Dict:
+        """Balances, approvals, pending nonces and gas price in one JSON-RPC batch
+
+        Returns:
+            {'wallets': decode_state_call result with 'nonce' added, 'gas_price': wei}
+        """
+        addresses = [wallet['address'] for wallet in wallets]
+        batch = [
+            {'jsonrpc': '2.0', 'id': 0, 'method': 'eth_call',
+             'params': [{'to': MULTICALL3_ADDRESS, 'data': encode_state_call(addresses, targets)}, 'latest']},
+            {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_gasPrice', 'params': []},
+        ]
+        batch += [{'jsonrpc': '2.0', 'id': 2 + i, 'method': 'eth_getTransactionCount', 'params': [address, 'pending']}
+                  for i, address in enumerate(addresses)]
+
+        # 2 + one nonce per wallet: chunked like submit/confirm (one chunk for small fleets)
+        responses = await self._rpc_chunked(batch)
+        for request_id in (0, 1):
+            if 'result' not in responses.get(request_id, {}):
+                raise RuntimeError(f"state read failed: {responses.get(request_id, {}).get('error', 'no response')}")
+
+        state = decode_state_call(addresses, targets, responses[0]['result'])
+        for i, address in enumerate(addresses):
+            result = responses.get(2 + i, {}).get('result')
+            state[address]['nonce'] = int(result, 16) if result else None
+        return {'wallets': state, 'gas_price': int(responses[1]['result'], 16)}
+
+    async def submit(self, transactions: List[Dict]) -> None:
+        """Submit signed transactions concurrently; sets 'status' / 'error' on each"""
+        batch = [{'jsonrpc': '2.0', 'id': i, 'method': 'eth_sendRawTransaction', 'params': [tx['raw']]}
+                 for i, tx in enumerate(transactions)]
+        responses = await self._rpc_chunked(batch)
+
+        for i, tx in enumerate(transactions):
+            response = responses.get(i, {})
+            error = (response.get('error') or {}).get('message') if 'result' not in response else None
+            if error and 'already known' not in error.lower():
+                tx['status'], tx['error'] = 'failed', error
+            else:
+                tx['status'] = 'pending'
+
+    async def confirm(self, transactions: List[Dict], on_update: Optional[Callable[[Dict], None]] = None) -> None:
+        """Watch new blocks until every pending transaction has a receipt or confirm_timeout passes"""
+        pending = {tx['tx_hash']: tx for tx in transactions if tx['status'] == 'pending'}
+        deadline = time.monotonic() + self.confirm_timeout
+        last_block = None
+
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                block = (await self._rpc_batch([{'jsonrpc': '2.0', 'id': 0, 'method': 'eth_blockNumber',
+                                                 'params': []}]))[0]['result']
+            except Exception as e:
+                logger.debug(f"Block poll failed: {e}")
+                continue
+            if block == last_block:
+                continue
+            last_block = block
+
+            hashes = list(pending)
+            responses = await self._rpc_chunked([
+                {'jsonrpc': '2.0', 'id': i, 'method': 'eth_getTransactionReceipt', 'params': [tx_hash]}
+                for i, tx_hash in enumerate(hashes)
+            ])
+            for i, tx_hash in enumerate(hashes):
+                receipt = responses.get(i, {}).get('result')
+                if not receipt:
+                    continue
+                tx = pending.pop(tx_hash)
+                tx['status'] = 'confirmed' if int(receipt.get('status', '0x0'), 16) == 1 else 'reverted'
+                tx['block'] = int(receipt['blockNumber'], 16)
+                tx['gas_used'] = int(receipt.get('gasUsed', '0x0'), 16)
+                if on_update:
+                    on_update(tx)
+
+    def _sign_all(self, wallets: List[Dict], missing: Dict[str, List[Dict]], nonces: Dict[str, int],
+                  usdc_amount: float, gas_price: int) -> List[Dict]:
+        """Build and sign every missing approval with consecutive per-wallet nonces"""
+        transactions = []
+        for wallet in wallets:
+            address = wallet['address']
+            nonce = nonces[address]
+            private_key = wallet['private_key']
+            if not private_key.startswith('0x'):
+                private_key = '0x' + private_key
+
+            for offset, target in enumerate(missing[address]):
+                tx = build_approval_tx(target, usdc_amount, nonce + offset, gas_price, self.gas_limit, self.chain_id)
+                signed = Account.sign_transaction(tx, private_key)
+                transactions.append({
+                    'address': address,
+                    'name': target['name'],
+                    'nonce': tx['nonce'],
+                    'tx_hash': to_hex(signed.hash),
+                    'raw': to_hex(signed.raw_transaction),
+                    'status': 'signed',
+                    'error': None,
+                })
+        return transactions
+
+    async def run(
+        self,
+        wallets: List[Dict],
+        usdc_amount: float = 10000,
+        usdc: bool = True,
+        ctf: bool = True,
+        dry_run: bool = False,
+        on_update: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """Read, plan, submit and confirm the approvals of all wallets
+
+        Args:
+            wallets: Wallets with address and private_key
+            usdc_amount: USDC allowance per spender
+            usdc: Bootstrap the USDC allowance
+            ctf: Bootstrap the CTF operator approvals
+            dry_run: Only read and plan
+            on_update: Optional callback per confirmed / reverted transaction
+
+        Returns:
+            {'wallets': {address: {'matic', 'usdc', 'approvals', 'missing',
+            'error', 'ok'}}, 'transactions': [...], 'gas_price', 'elapsed'}
+        """
+        started = time.perf_counter()
+        targets = approval_targets(usdc=usdc, ctf=ctf)
+        await self.start()
+        try:
+            state = await self.read_state(wallets, targets)
+            missing = plan_approvals(state['wallets'], targets, usdc_amount)
+
+            report = {'wallets': {}, 'transactions': [], 'gas_price': state['gas_price']}
+            gas_price = int(state['gas_price'] * self.gas_price_multiplier)
+            to_sign = []
+            for wallet in wallets:
+                address = wallet['address']
+                wallet_state = state['wallets'][address]
+                entry = {**wallet_state, 'missing': [t['name'] for t in missing[address]], 'error': None}
+                gas_needed = len(missing[address]) * self.gas_limit * gas_price / 1e18
+                if missing[address] and wallet_state['nonce'] is None:
+                    entry['error'] = 'could not read nonce'
+                elif missing[address] and (wallet_state['matic'] or 0) < gas_needed:
+                    entry['error'] = f"insufficient MATIC for gas ({wallet_state['matic'] or 0:.4f} < {gas_needed:.4f})"
+                elif missing[address]:
+                    to_sign.append(wallet)
+                report['wallets'][address] = entry
+
+            logger.info(
+                f"🔍 {len(wallets)} wallets read in one multicall: "
+                f"{sum(len(missing[w['address']]) for w in to_sign)} approvals to send on {len(to_sign)} wallets"
+            )
+
+            if to_sign and not dry_run:
+                nonces = {address: entry['nonce'] for address, entry in state['wallets'].items()}
+                transactions = await asyncio.to_thread(
+                    self._sign_all, to_sign, missing, nonces, usdc_amount, gas_price
+                )
+                await self.submit(transactions)
+                submitted = sum(1 for tx in transactions if tx['status'] == 'pending')
+                logger.info(f"📤 Submitted {submitted}/{len(transactions)} approval transactions")
+                await self.confirm(transactions, on_update)
+                for tx in transactions:
+                    tx.pop('raw', None)
+                report['transactions'] = transactions
+
+            for address, entry in report['wallets'].items():
+                wallet_txs = [tx for tx in report['transactions'] if tx['address'] == address]
+                if entry['error'] is None and any(tx['status'] != 'confirmed' for tx in wallet_txs):
+                    failed = [f"{tx['name']}: {tx['error'] or tx['status']}" for tx in wallet_txs
+                              if tx['status'] != 'confirmed']
+                    entry['error'] = '; '.join(failed)
+                entry['ok'] = entry['error'] is None and (not dry_run or not entry['missing'])
+
+        finally:
+            await self.close()
+
+        report['elapsed'] = time.perf_counter() - started
+        confirmed = sum(1 for tx in report['transactions'] if tx['status'] == 'confirmed')
+        logger.info(
+            f"📊 Approval bootstrap: {sum(1 for e in report['wallets'].values() if e['ok'])}/{len(wallets)} wallets "
+            f"ready, {confirmed}/{len(report['transactions'])} transactions confirmed in {report['elapsed']:.1f}s"
+        )
+        return report
@@ -0,0 +1,253 @@
+"""
+Cancel Engine Module
+Concurrent bulk cancellation of open orders across wallets, scoped by wallet, market or order ID, with verification
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from py_clob_client.client import ClobClient
+from py_clob_client.clob_types import OpenOrderParams
+from py_clob_client.constants import POLYGON
+
+from rate_limiter import get_rate_limiter
+from structured_logging import log_event
+
+logger = logging.getLogger(__name__)
+
+CLOB_HOST = "https://clob.polymarket.com"
+
+
+class CancelEngine:
+    """Cancels open orders of many wallets in seconds
+
+    Every wallet is handled concurrently with one CLOB call per scope instead
+    of one call per order:
+
+    - no scope: DELETE /cancel-all
+    - markets / asset IDs: DELETE /cancel-market-orders per market
+    - order IDs: DELETE /orders in batches of `max_batch_size`
+
+    Afterwards the open orders in scope are listed again; anything still open
+    (orders placed mid-cancel, partial failures) is batch-cancelled by ID, up
+    to `verify_attempts` rounds, and the remaining count is reported.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        get_client: Optional[Callable[[Dict], Awaitable[ClobClient]]] = None,
+        chain_id: int = POLYGON
+    ):
+        """Initialize cancel engine
+
+        Args:
+            config: `order_management.order_cancellation` section
+            get_client: Optional async wallet -> authenticated ClobClient
+                (e.g. OrderManager._get_signing_client, to share its cache)
+            chain_id: Chain ID for clients built by the engine itself
+        """
+        self.config = config
+        self.get_client = get_client or self._get_client
+        self.chain_id = chain_id
+
+        self.max_batch_size = self.config.get('max_batch_size', 100)  # order IDs per DELETE /orders
+        self.verify_attempts = self.config.get('verify_attempts', 3)
+        self.verify_delay = self.config.get('verify_delay', 1.0)  # seconds before re-listing
+
+        self.rate_limiter = get_rate_limiter()
+        self.clients: Dict[str, ClobClient] = {}  # address -> authenticated client (own cache)
+
+    async def _get_client(self, wallet: Dict) -> ClobClient:
+        """Cached authenticated client for a wallet (created off the event loop)"""
+        address = wallet['address']
+        client = self.clients.get(address)
+        if client is None:
+            private_key = wallet['private_key']
+            if private_key.startswith('0x'):
+                private_key = private_key[2:]
+
+            def build_client():
+                client = ClobClient(CLOB_HOST, key=private_key, chain_id=self.chain_id)
+                client.set_api_creds(client.create_or_derive_api_creds())
+                return client
+
+            client = await asyncio.to_thread(build_client)
+            self.clients[address] = client
+        return client
+
+    async def _call(self, endpoint: str, func: Callable, *args):
+        """Run a blocking CLOB call off the loop through the rate limiter
+
+        Deliberately not gated by the 'clob_order' circuit breaker: cancels are
+        how the bot gets flat (emergency stop, shutdown), which matters most
+        exactly when placements are failing and the breaker is open.
+        """
+        await self.rate_limiter.acquire(endpoint)
+        try:
+            return await asyncio.to_thread(func, *args)
+        except Exception as e:
+            self.rate_limiter.record_exception(endpoint, e)
+            raise
+
+    async def list_open_orders(
+        self,
+        wallets: List[Dict],
+        markets: Optional[List[str]] = None,
+        asset_ids: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """Open orders of all wallets, fetched concurrently
+
+        Args:
+            wallets: Wallets with address and private_key
+            markets: Only these condition IDs
+            asset_ids: Only these token IDs
+
+        Returns:
+            address -> open orders (exceptions are logged and the wallet omitted)
+        """
+
+        async def fetch(wallet: Dict) -> List[Dict]:
+            client = await self.get_client(wallet)
+            if not markets and not asset_ids:
+                return await self._call('clob_read', client.get_orders)
+            params = [OpenOrderParams(market=m) for m in markets or []] + \
+                     [OpenOrderParams(asset_id=a) for a in asset_ids or []]
+            pages = await asyncio.gather(*(self._call('clob_read', client.get_orders, p) for p in params))
+            seen, orders = set(), []
+            for order in (o for page in pages for o in page):
+                if order.get('id') not in seen:
+                    seen.add(order.get('id'))
+                    orders.append(order)
+            return orders
+
+        results = await asyncio.gather(*(fetch(w) for w in wallets), return_exceptions=True)
+
+        open_orders = {}
+        for wallet, result in zip(wallets, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Could not list open orders of {wallet['address'][:10]}...: {result}")
+            else:
+                open_orders[wallet['address']] = result
+        return open_orders
+
+    async def _cancel_ids(self, client: ClobClient, order_ids: List[str]) -> Dict:
+        """Batch-cancel order IDs; returns {'canceled': [...], 'not_canceled': {id: reason}}"""
+        batches = [order_ids[i:i + self.max_batch_size] for i in range(0, len(order_ids), self.max_batch_size)]
+        responses = await asyncio.gather(
+            *(self._call('clob_write', client.cancel_orders, batch) for batch in batches),
+            return_exceptions=True
+        )
+
+        result = {'canceled': [], 'not_canceled': {}}
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                result['not_canceled'].update({order_id: str(response) for order_id in batch})
+            else:
+                result['canceled'].extend((response or {}).get('canceled', []))
+                result['not_canceled'].update((response or {}).get('not_canceled', {}) or {})
+        return result
+
+    async def _cancel_wallet(
+        self,
+        wallet: Dict,
+        markets: Optional[List[str]],
+        asset_ids: Optional[List[str]],
+        order_ids: Optional[List[str]]
+    ) -> Dict:
+        """Cancel the scope of one wallet and verify nothing in scope is left open"""
+        report = {'cancelled': 0, 'not_cancelled': {}, 'remaining': None, 'error': None}
+        try:
+            client = await self.get_client(wallet)
+
+            if order_ids is not None:
+                responses = [await self._cancel_ids(client, order_ids)] if order_ids else []
+            elif markets or asset_ids:
+                responses = await asyncio.gather(
+                    *(self._call('clob_write', client.cancel_market_orders, m, '') for m in markets or []),
+                    *(self._call('clob_write', client.cancel_market_orders, '', a) for a in asset_ids or [])
+                )
+            else:
+                responses = [await self._call('clob_write', client.cancel_all)]
+
+            for response in responses:
+                report['cancelled'] += len((response or {}).get('canceled', []))
+                report['not_cancelled'].update((response or {}).get('not_canceled', {}) or {})
+
+            # Verify: re-list the scope and batch-cancel stragglers by ID
+            in_scope = set(order_ids) if order_ids is not None else None
+            for _ in range(self.verify_attempts):
+                await asyncio.sleep(self.verify_delay)
+                listed = await self.list_open_orders([wallet], markets, asset_ids)
+                if wallet['address'] not in listed:
+                    raise RuntimeError('could not list open orders')
+
+                remaining = [o.get('id') for o in listed[wallet['address']]]
+                if in_scope is not None:
+                    remaining = [oid for oid in remaining if oid in in_scope]
+                report['remaining'] = len(remaining)
+                if not remaining:
+                    break
+
+                response = await self._cancel_ids(client, remaining)
+                report['cancelled'] += len(response['canceled'])
+                report['not_cancelled'].update(response['not_canceled'])
+
+        except Exception as e:
+            report['error'] = str(e) or type(e).__name__
+            logger.error(f"❌ Cancel failed for {wallet['address'][:10]}...: {report['error']}")
+
+        return report
+
+    async def cancel(
+        self,
+        wallets: List[Dict],
+        markets: Optional[List[str]] = None,
+        asset_ids: Optional[List[str]] = None,
+        order_ids: Optional[Dict[str, List[str]]] = None
+    ) -> Dict:
+        """Cancel open orders of all wallets concurrently
+
+        Args:
+            wallets: Wallets to flatten (address, private_key)
+            markets: Only orders in these condition IDs
+            asset_ids: Only orders on these token IDs
+            order_ids: Only these orders, address -> order IDs (wallets
+                without an entry are skipped)
+
+        Returns:
+            {'wallets': {address: {'cancelled', 'not_cancelled', 'remaining',
+            'error'}}, 'cancelled', 'remaining', 'failed_wallets', 'elapsed'}
+        """
+        started = time.perf_counter()
+        if order_ids is not None:
+            wallets = [w for w in wallets if order_ids.get(w['address'])]
+
+        reports = await asyncio.gather(*(
+            self._cancel_wallet(
+                wallet, markets, asset_ids,
+                list(order_ids[wallet['address']]) if order_ids is not None else None
+            )
+            for wallet in wallets
+        ))
+
+        summary = {
+            'wallets': {wallet['address']: report for wallet, report in zip(wallets, reports)},
+            'cancelled': sum(r['cancelled'] for r in reports),
+            'remaining': sum(r['remaining'] or 0 for r in reports),
+            'failed_wallets': [w['address'] for w, r in zip(wallets, reports) if r['error'] or r['remaining'] is None],
+            'elapsed': time.perf_counter() - started,
+        }
+
+        level = logging.INFO if not summary['remaining'] and not summary['failed_wallets'] else logging.WARNING
+        log_event(
+            logger, level, 'orders_cancelled',
+            "🧹 Cancelled %(cancelled)d orders on %(wallets)d wallets in %(elapsed).2fs "
+            "(%(remaining)d still open, %(failed)d wallets failed)",
+            cancelled=summary['cancelled'], wallets=len(wallets), elapsed=summary['elapsed'],
+            remaining=summary['remaining'], failed=len(summary['failed_wallets']),
+            scope='orders' if order_ids is not None else 'markets' if markets or asset_ids else 'all'
+        )
+        return summary
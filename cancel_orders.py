@@ -1,119 +1,98 @@
 #!/usr/bin/env python3
-"""Cancel all open orders"""
+"""Cancel open orders on all wallets (or one wallet / some markets) concurrently
 
+Usage:
+    python cancel_orders.py                       # every open order of every wallet
+    python cancel_orders.py --list                # only show what is open
+    python cancel_orders.py --wallet 0xabc... --market 0xcondition... --yes
+"""
+
+import argparse
 import asyncio
+import logging
 import sys
-import os
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Add project root to path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from py_clob_client.client import ClobClient
 import yaml
-import logging
 
-logging.basicConfig(level=logging.INFO)
+from cancel_engine import CancelEngine
+from wallet_manager import WalletManager
+
 logger = logging.getLogger(__name__)
 
-async def cancel_all_orders():
-    """Cancel all open orders"""
-    try:
-        # Load environment variables
-        load_dotenv()
-        
-        # Load config
-        with open('config.yaml', 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        
-        # Get wallet private key from .env
-        priv_key = os.getenv('WALLET_1_PK')
-        if not priv_key:
-            logger.error("❌ WALLET_1_PK not found in .env")
-            return
-        
-        if not priv_key.startswith('0x'):
-            priv_key = '0x' + priv_key
-        
-        # Initialize CLOB client
-        host = "https://clob.polymarket.com"
-        chain_id = 137  # Polygon mainnet
-        
-        logger.info("🔧 Initializing CLOB client...")
-        client = ClobClient(host, key=priv_key, chain_id=chain_id)
-        
-        # Create API credentials
-        logger.info("🔑 Creating API credentials...")
-        client.set_api_creds(client.create_or_derive_api_creds())
-        
-        # Get wallet address
-        from eth_account import Account
-        account = Account.from_key(priv_key)
-        wallet_address = account.address
-        
-        logger.info(f"   Wallet: {wallet_address[:10]}...{wallet_address[-8:]}")
-        
-        # Get open orders
-        logger.info("\n📋 Fetching open orders...")
-        
-        open_orders = client.get_orders()
-        
-        if not open_orders:
-            logger.info("✅ No open orders to cancel")
-            return
-        
-        logger.info(f"   Found {len(open_orders)} open orders\n")
-        
-        for i, order in enumerate(open_orders, 1):
-            order_id = order.get('id', 'Unknown')
-            token_id = order.get('asset_id', 'Unknown')
-            size = order.get('original_size', 0)
-            price = order.get('price', 0)
-            
-            logger.info(f"{i}. Order ID: {order_id}")
-            logger.info(f"   Token: {token_id}")
-            logger.info(f"   Size: {size} shares")
-            logger.info(f"   Price: ${price}")
-            logger.info("")
-        
-        # Ask for confirmation
-        print("="*60)
-        confirm = input("Type 'YES' to cancel ALL orders: ").strip()
-        print("="*60)
-        
+
+async def cancel_all_orders(args) -> int:
+    """List and cancel open orders"""
+    with open(project_root / 'config.yaml', 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    wallets = WalletManager(config.get('wallet_management', {})).wallets
+    if args.wallet:
+        wallets = [w for w in wallets if w['address'].lower() == args.wallet.lower()]
+        if not wallets:
+            logger.error(f"❌ Wallet {args.wallet} is not configured")
+            return 1
+
+    engine = CancelEngine(
+        config.get('order_management', {}).get('order_cancellation', {}),
+        chain_id=config.get('clob', {}).get('chain_id', 137)
+    )
+
+    logger.info(f"📋 Fetching open orders of {len(wallets)} wallet(s)...")
+    open_orders = await engine.list_open_orders(wallets, args.market, args.asset)
+
+    total = 0
+    for address, orders in open_orders.items():
+        total += len(orders)
+        logger.info(f"   {address[:10]}...{address[-8:]}: {len(orders)} open order(s)")
+        for order in orders:
+            logger.info(f"      {order.get('id', 'Unknown')[:16]}... {order.get('side', '?'):<4} "
+                        f"{order.get('original_size', 0)} @ ${order.get('price', 0)}  market {order.get('market', '?')[:12]}...")
+
+    if args.list:
+        return 0
+    if not total and len(open_orders) == len(wallets):
+        logger.info("✅ No open orders to cancel")
+        return 0
+
+    if not args.yes:
+        print("=" * 60)
+        confirm = input(f"Type 'YES' to cancel {total} order(s): ").strip()
+        print("=" * 60)
         if confirm != 'YES':
-            logger.info("\n❌ Cancelled by user")
-            return
-        
-        # Cancel all orders
-        logger.info("\n🔥 Cancelling orders...")
-        
-        for order in open_orders:
-            order_id = order.get('id')
-            
-            try:
-                logger.info(f"   Cancelling order {order_id}...")
-                
-                # Cancel order
-                client.cancel(order_id)
-                
-                logger.info(f"   ✅ Order cancelled successfully!")
-                
-                # Wait a bit between cancellations
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"   ❌ Error cancelling order {order_id}: {e}")
-        
-        logger.info("\n✅ Finished cancelling orders!")
-        
-    except Exception as e:
-        logger.error(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+            logger.info("❌ Cancelled by user")
+            return 1
+
+    logger.info("🔥 Cancelling orders...")
+    summary = await engine.cancel(wallets, markets=args.market, asset_ids=args.asset)
+
+    for address, report in summary['wallets'].items():
+        status = f"error: {report['error']}" if report['error'] else f"{report['remaining']} still open"
+        logger.info(f"   {address[:10]}...: cancelled {report['cancelled']}, {status}")
+        for order_id, reason in report['not_cancelled'].items():
+            logger.warning(f"      ⚠️  {order_id[:16]}...: {reason}")
+
+    logger.info(f"✅ Cancelled {summary['cancelled']} order(s) in {summary['elapsed']:.2f}s, "
+                f"{summary['remaining']} still open")
+    return 0 if not summary['remaining'] and not summary['failed_wallets'] else 2
 
-if __name__ == "__main__":
-    asyncio.run(cancel_all_orders())
 
+def main():
+    parser = argparse.ArgumentParser(description='Cancel open orders across wallets')
+    parser.add_argument('--wallet', default=None, help='Only this wallet address')
+    parser.add_argument('--market', action='append', default=None, help='Only this condition ID (repeatable)')
+    parser.add_argument('--asset', action='append', default=None, help='Only this token ID (repeatable)')
+    parser.add_argument('--list', action='store_true', help='Only list open orders')
+    parser.add_argument('--yes', action='store_true', help='Do not ask for confirmation')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    return asyncio.run(cancel_all_orders(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Capital Allocator Module
+Greedy reward-per-dollar knapsack across candidate markets under per-wallet balance and portfolio risk limits
+"""
+
+import bisect
+import heapq
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CapitalAllocator:
+    """Allocates wallet capital to the markets with the best expected reward per dollar
+
+    Candidates are kept in a list sorted by efficiency (expected daily reward /
+    capital) that is updated in place as markets are added, changed or removed,
+    so a re-solve is a single linear greedy pass without re-sorting. The pass is
+    a fractional knapsack: each market gets up to its desired capital, bounded by
+
+    - `max_capital_per_market` and `max_total_exposure` (fractions of the summed
+      wallet balances) and `max_category_exposure` per category,
+    - the free balance of the wallet with the most room (one wallet per market,
+      since a market's inventory lives on a single wallet),
+
+    and is skipped if the bound falls below its minimum capital (the size needed
+    to qualify for rewards). Markets that already hold orders are reserved on
+    their wallet before new candidates are considered.
+    """
+
+    def __init__(self, config: dict):
+        """Initialize allocator
+
+        Args:
+            config: `risk_management` section of config.yaml
+        """
+        self.max_capital_per_market = config.get('max_capital_per_market', 0.05)  # fraction of capital
+        self.max_total_exposure = config.get('max_total_exposure', 0.8)  # fraction of capital
+        self.max_category_exposure = config.get('max_category_exposure', 0.3)  # fraction of capital
+        self.min_reward_per_dollar = config.get('min_reward_per_dollar', 0.0)  # daily reward / USDC
+        self.wallet_reserve = config.get('wallet_reserve', 0.0)  # USDC kept free on each wallet
+
+        self.candidates: Dict[str, Dict] = {}  # market_id -> candidate
+        self._order: List[tuple] = []  # (-efficiency, market_id), ascending = best first
+        self.wallets: Dict[str, float] = {}  # address -> USDC balance
+        self.holdings: Dict[str, Dict] = {}  # market_id -> {'wallet', 'capital'} already trading
+
+        self.allocation: Dict[str, Dict] = {}  # market_id -> {'capital', 'wallet', 'expected_reward'}
+        self._dirty = True
+        self._last_max_markets: Optional[int] = None
+
+        # Statistics
+        self.solves = 0
+
+    @property
+    def total_capital(self) -> float:
+        """Summed USDC balance of all wallets"""
+        return sum(self.wallets.values())
+
+    def upsert(
+        self,
+        market_id: str,
+        capital: float,
+        expected_reward: float,
+        min_capital: Optional[float] = None,
+        category: str = 'other'
+    ):
+        """Add or update a candidate market
+
+        Args:
+            market_id: Market ID
+            capital: Desired capital in USDC
+            expected_reward: Expected daily reward in USDC at the desired capital
+            min_capital: Smallest useful allocation (default: all-or-nothing)
+            category: Market category for the category exposure limit
+        """
+        if capital <= 0:
+            self.remove(market_id)
+            return
+
+        candidate = {
+            'capital': float(capital),
+            'min_capital': float(capital if min_capital is None else min(min_capital, capital)),
+            'expected_reward': float(expected_reward),
+            'category': category or 'other',
+            'efficiency': float(expected_reward) / float(capital),
+        }
+
+        current = self.candidates.get(market_id)
+        if current == candidate:
+            return
+
+        if current is not None:
+            self._unlink(market_id, current['efficiency'])
+        bisect.insort(self._order, (-candidate['efficiency'], market_id))
+        self.candidates[market_id] = candidate
+        self._dirty = True
+
+    def remove(self, market_id: str):
+        """Remove a candidate market (no-op if unknown)"""
+        current = self.candidates.pop(market_id, None)
+        if current is None:
+            return
+        self._unlink(market_id, current['efficiency'])
+        self._dirty = True
+
+    def _unlink(self, market_id: str, efficiency: float):
+        """Delete a candidate's entry from the sorted order"""
+        index = bisect.bisect_left(self._order, (-efficiency, market_id))
+        if index < len(self._order) and self._order[index][1] == market_id:
+            del self._order[index]
+
+    def sync(self, candidates: Iterable[Dict]):
+        """Make the candidate set exactly `candidates`
+
+        Unchanged candidates keep their place in the sorted order, so a scan that
+        returns mostly the same markets only touches the ones that changed.
+
+        Args:
+            candidates: Dicts with market_id, capital, expected_reward and
+                optional min_capital / category
+        """
+        seen = set()
+        for candidate in candidates:
+            market_id = candidate['market_id']
+            seen.add(market_id)
+            self.upsert(
+                market_id,
+                candidate['capital'],
+                candidate['expected_reward'],
+                min_capital=candidate.get('min_capital'),
+                category=candidate.get('category', 'other'),
+            )
+
+        for market_id in [m for m in self.candidates if m not in seen]:
+            self.remove(market_id)
+
+    def update_wallets(self, balances: Dict):
+        """Update wallet balances from WalletManager.check_wallet_balances() output"""
+        wallets = {
+            address: float(balance.get('usdc', 0))
+            for address, balance in balances.items()
+            if isinstance(balance, dict)
+        }
+        if wallets != self.wallets:
+            self.wallets = wallets
+            self._dirty = True
+
+    def set_holdings(self, holdings: Dict[str, Dict]):
+        """Markets already trading: {market_id: {'wallet': address, 'capital': USDC}}"""
+        if holdings != self.holdings:
+            self.holdings = {market_id: dict(holding) for market_id, holding in holdings.items()}
+            self._dirty = True
+
+    def solve(self, max_markets: Optional[int] = None) -> Dict[str, Dict]:
+        """Greedy allocation in efficiency order (cached until inputs change)
+
+        Args:
+            max_markets: Maximum markets trading at once, including holdings
+
+        Returns:
+            market_id -> {'capital', 'wallet', 'expected_reward'} in efficiency order
+        """
+        if not self._dirty and max_markets == self._last_max_markets:
+            return self.allocation
+
+        total = self.total_capital
+        free = {address: balance - self.wallet_reserve for address, balance in self.wallets.items()}
+
+        held_capital = 0.0
+        for holding in self.holdings.values():
+            capital = float(holding.get('capital', 0))
+            held_capital += capital
+            if holding.get('wallet') in free:
+                free[holding['wallet']] -= capital
+
+        budget = total * self.max_total_exposure - held_capital
+        per_market_cap = total * self.max_capital_per_market
+        category_cap = total * self.max_category_exposure
+        category_used: Dict[str, float] = {}
+        slots = float('inf') if max_markets is None else max_markets - len(self.holdings)
+
+        # Max-heap of wallets by free capital; the top wallet is the only one that can fit the most
+        heap = [(-room, address) for address, room in free.items() if room > 0]
+        heapq.heapify(heap)
+
+        allocation = {}
+        for neg_efficiency, market_id in self._order:
+            if slots <= 0 or budget <= 0 or not heap:
+                break
+            if -neg_efficiency < self.min_reward_per_dollar:
+                break
+            if market_id in self.holdings:
+                continue
+
+            candidate = self.candidates[market_id]
+            category = candidate['category']
+            room, address = -heap[0][0], heap[0][1]
+
+            amount = min(
+                candidate['capital'],
+                per_market_cap,
+                budget,
+                category_cap - category_used.get(category, 0.0),
+                room,
+            )
+            if amount < candidate['min_capital'] or amount <= 0:
+                continue
+
+            if room - amount > 0:
+                heapq.heapreplace(heap, (-(room - amount), address))
+            else:
+                heapq.heappop(heap)
+
+            budget -= amount
+            slots -= 1
+            category_used[category] = category_used.get(category, 0.0) + amount
+            allocation[market_id] = {
+                'capital': amount,
+                'wallet': address,
+                'expected_reward': candidate['expected_reward'] * amount / candidate['capital'],
+            }
+
+        self.allocation = allocation
+        self._dirty = False
+        self._last_max_markets = max_markets
+        self.solves += 1
+
+        logger.debug(
+            f"💰 Allocated ${sum(a['capital'] for a in allocation.values()):.2f} to {len(allocation)} "
+            f"of {len(self.candidates)} candidate markets"
+        )
+        return allocation
+
+    def get_stats(self) -> Dict:
+        """Get allocation statistics"""
+        return {
+            'candidates': len(self.candidates),
+            'allocated_markets': len(self.allocation),
+            'allocated_capital': sum(a['capital'] for a in self.allocation.values()),
+            'expected_daily_reward': sum(a['expected_reward'] for a in self.allocation.values()),
+            'held_markets': len(self.holdings),
+            'wallets': len(self.wallets),
+            'solves': self.solves,
+        }
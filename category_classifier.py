@@ -0,0 +1,296 @@
+"""
+Category Classifier Module
+Shared market category classifier - all keyword lists compiled into one regex, results memoised
+"""
+
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Question keyword rules used by MarketScannerV2, in order of SPECIFICITY (most specific first).
+# This prevents generic sports keywords from matching crypto/AI questions.
+# A trailing '*' marks a stem (prefix match) for word-boundary mode.
+QUESTION_RULES: List[Tuple[str, List[str]]] = [
+    ('crypto', [
+        'bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol', 'xrp', 'ripple',
+        'crypto', 'cryptocurrency', 'up or down', 'price', 'fdv', 'market cap',
+        'metamask', 'wallet', 'defi', 'token', 'coin', 'blockchain'
+    ]),
+    ('science', [
+        'ai', 'artificial intelligence', 'gemini', 'chatgpt', 'gpt', 'claude',
+        'openai', 'google ai', 'deepmind', 'machine learning', 'neural network',
+        'technology', 'research', 'study', 'discovery', 'space', 'nasa',
+        'climate', 'vaccine', 'humanit*', 'benchmark'
+    ]),
+    ('politics', [
+        # Elections & Government
+        'election', 'president', 'senate', 'congress', 'vote', 'poll',
+        'democrat', 'republican', 'party', 'government', 'policy', 'campaign',
+
+        # Politicians (US)
+        'trump', 'biden', 'harris', 'pelosi', 'nancy pelosi', 'obama', 'clinton',
+        'desantis', 'newsom', 'pence', 'mcconnell', 'schumer', 'aoc',
+
+        # Politicians (NYC/Local)
+        'mamdani', 'nyc', 'mayor', 'city council', 'rent', 'rents',
+
+        # International Politics & Conflicts
+        'russia', 'ukraine', 'putin', 'zelensky', 'war', 'conflict', 'military',
+        'israel', 'palestine', 'gaza', 'hamas', 'iran', 'yemen', 'strike', 'attack',
+        'china', 'taiwan', 'xi jinping', 'north korea', 'kim jong',
+
+        # Political Events
+        'impeachment', 'scandal', 'investigation', 'hearing', 'testimony',
+        'shutdown', 'budget', 'debt ceiling', 'supreme court', 'justice',
+        'cabinet', 'secretary', 'ambassador', 'diplomat'
+    ]),
+    ('entertainment', [
+        # Movies & TV
+        'movie', 'film', 'actor', 'actress', 'celebrity', 'tv show',
+        'series', 'netflix', 'disney', 'oscar', 'emmy', 'grammy',
+        'box office', 'streaming', 'hbo', 'amazon prime',
+
+        # Celebrities & Social Media
+        'tweet', 'tweets', 'twitter', 'instagram', 'tiktok', 'viral',
+        'influencer', 'streamer', 'youtube', 'podcast',
+
+        # Specific Celebrities (if not political)
+        'ackman', 'bill ackman', 'elon musk', 'kardashian', 'swift',
+        'beyonce', 'kanye', 'drake', 'rogan'
+    ]),
+    ('economics', [
+        'stock', 'economy', 'gdp', 'inflation', 'fed', 'interest rate',
+        'recession', 'unemployment', 'dow', 'nasdaq', 's&p', 'treasury'
+    ]),
+    # Sports last - has generic words like "game", "score"
+    ('sports', [
+        'nfl', 'nba', 'mlb', 'nhl', 'soccer', 'football', 'basketball', 'baseball',
+        'hockey', 'tennis', 'golf', 'ufc', 'boxing', 'f1', 'racing', 'olympics',
+        'world cup', 'super bowl', 'playoffs', 'championship', 'premier league',
+        'la liga', 'serie a', 'bundesliga', 'champions league',
+        'esports', 'counter-strike', 'cs2', 'dota', 'league of legends', 'valorant',
+        'mobile legends', 'mlbb', 'tournament', 'qualifier'
+    ]),
+]
+
+# Shorter question fallback used by WebRewardsScraper when tags are inconclusive
+SCRAPER_QUESTION_RULES: List[Tuple[str, List[str]]] = [
+    ('crypto', ['bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol', 'crypto', 'price']),
+    ('science', ['ai', 'artificial intelligence', 'chatgpt', 'openai', 'technology', 'space', 'nasa']),
+    ('politics', ['election', 'president', 'senate', 'congress', 'vote', 'democrat', 'republican']),
+    ('entertainment', ['movie', 'film', 'actor', 'actress', 'celebrity', 'tv show', 'netflix']),
+    ('economics', ['gdp', 'inflation', 'recession', 'stock market', 'dow jones', 's&p 500']),
+    ('sports', ['nfl', 'nba', 'mlb', 'nhl', 'soccer', 'football', 'basketball', 'super bowl']),
+]
+
+# CLOB tag rules (exact tag match, checked before the question)
+TAG_RULES: List[Tuple[str, List[str]]] = [
+    ('politics', ['politics', 'elections', 'usa election', 'potus']),
+    ('sports', ['sports', 'football', 'basketball', 'baseball', 'soccer', 'nfl', 'nba', 'mlb', 'premier league']),
+    ('crypto', ['crypto', 'cryptocurrency', 'bitcoin', 'ethereum']),
+    ('science', ['science', 'technology', 'ai', 'space']),
+    ('entertainment', ['entertainment', 'movies', 'tv', 'celebrities']),
+    ('economics', ['economics', 'economy', 'markets', 'finance']),
+]
+
+
+class CategoryClassifier:
+    """Classifies market questions with a single compiled multi-keyword regex
+
+    The legacy implementation ran one `keyword in question` check per keyword
+    per category. Here all keywords are compiled into a prefix-trie regex, so a
+    C-level scan finds the next keyword hit; the category with the best priority
+    among all (possibly overlapping) hits wins. This reproduces the substring
+    semantics of the old `any(...)` chain exactly.
+
+    With `word_boundary=True` keywords only match whole words ('eth' no longer
+    matches "whether", 'ai' no longer matches "said"); stems ending in '*'
+    still match as prefixes.
+    """
+
+    def __init__(
+        self,
+        rules: List[Tuple[str, List[str]]] = QUESTION_RULES,
+        tag_rules: Optional[List[Tuple[str, List[str]]]] = None,
+        word_boundary: bool = False,
+        cache_size: int = 10000,
+        default: str = 'other'
+    ):
+        """Initialize classifier
+
+        Args:
+            rules: (category, keywords) pairs, highest priority first
+            tag_rules: Optional (category, tags) pairs checked against exact tags first
+            word_boundary: Match whole words instead of substrings
+            cache_size: Max memoised results (LRU)
+            default: Category returned when nothing matches
+        """
+        self.word_boundary = word_boundary
+        self.default = default
+        self.cache_size = cache_size
+        self.categories = [category for category, _ in rules]
+        self.tag_categories = [category for category, _ in (tag_rules or [])]
+
+        self._compile(rules)
+        self._tag_lookup = self._build_tag_lookup(tag_rules or [])
+        self._cache: OrderedDict = OrderedDict()
+
+        # Statistics
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _compile(self, rules: List[Tuple[str, List[str]]]):
+        """Compile keywords into trie-factored regexes
+
+        `self._patterns[b]` matches every keyword whose category priority is below
+        `b` (so `self._patterns[len(rules)]` matches all of them). Each pattern is
+        a prefix trie, which makes the regex engine return the LONGEST keyword at
+        a position; `self._priority` then maps that keyword to the best priority
+        among all keywords that also match there (i.e. its keyword prefixes).
+        """
+        keywords: Dict[str, Tuple[int, bool]] = {}  # text -> (priority, stem)
+        for priority, (_, words) in enumerate(rules):
+            for word in words:
+                word = word.lower()
+                text = word.rstrip('*')
+                if text not in keywords:
+                    keywords[text] = (priority, word.endswith('*'))
+
+        self._priority = {}
+        for text, (priority, stem) in keywords.items():
+            best = priority
+            for end in range(1, len(text)):
+                prefix = keywords.get(text[:end])
+                if prefix is None:
+                    continue
+                # In word-boundary mode a shorter keyword only matches if it ends a word
+                if self.word_boundary and not prefix[1] and re.match(r'[a-z0-9]', text[end]):
+                    continue
+                best = min(best, prefix[0])
+            self._priority[text] = best
+
+        self._patterns = [None]
+        for limit in range(1, len(rules) + 1):
+            subset = {text: stem for text, (priority, stem) in keywords.items() if priority < limit}
+            self._patterns.append(re.compile(self._trie_regex(subset)))
+
+    def _trie_regex(self, keywords: Dict[str, bool]) -> str:
+        """Build a prefix-trie regex from {keyword: is_stem}"""
+        trie: Dict = {}
+        for text, stem in keywords.items():
+            node = trie
+            for char in text:
+                node = node.setdefault(char, {})
+            node[''] = stem
+
+        end_boundary = r'(?![a-z0-9])'
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if '' in node:
+                # Children first so the longest keyword wins, then end-of-keyword
+                branches.append('' if (node[''] or not self.word_boundary) else end_boundary)
+            if len(branches) == 1:
+                return branches[0]
+            return '(?:' + '|'.join(branches) + ')'
+
+        body = build(trie)
+        if self.word_boundary:
+            return r'(?<![a-z0-9])' + body
+        return body
+
+    @staticmethod
+    def _build_tag_lookup(tag_rules: List[Tuple[str, List[str]]]) -> Dict[str, int]:
+        """Map each tag to the priority of the first category declaring it"""
+        lookup = {}
+        for priority, (_, tags) in enumerate(tag_rules):
+            for tag in tags:
+                lookup.setdefault(tag.lower(), priority)
+        return lookup
+
+    def _match(self, text: str) -> str:
+        """Uncached classification of lowercased text
+
+        Every hit restricts the next search to strictly better categories, so at
+        most one search per category is needed; searches restart one character
+        after the previous hit start to also catch overlapping keywords
+        ('strike' inside 'counter-strike').
+        """
+        best = len(self.categories)
+        pos = 0
+        while best > 0:
+            match = self._patterns[best].search(text, pos)
+            if match is None:
+                break
+            best = min(best, self._priority[match.group()])
+            pos = match.start() + 1
+
+        return self.categories[best] if best < len(self.categories) else self.default
+
+    def _match_tags(self, tags: Iterable[str]) -> Optional[int]:
+        """Best tag-rule priority among tags (None if no tag matches)"""
+        best = None
+        for tag in tags:
+            priority = self._tag_lookup.get(tag.lower())
+            if priority is not None and (best is None or priority < best):
+                best = priority
+        return best
+
+    def classify(
+        self,
+        question: str,
+        condition_id: Optional[str] = None,
+        tags: Optional[List[str]] = None
+    ) -> str:
+        """Classify a market question
+
+        Args:
+            question: Market question text
+            condition_id: Market condition ID (memoisation key together with question hash)
+            tags: Optional CLOB tags, checked before the question when tag rules are set
+
+        Returns:
+            Category string
+        """
+        question = question or ''
+        tags = tuple(tags or ())
+        key = (
+            condition_id or '',
+            hashlib.blake2b(question.encode('utf-8'), digest_size=8).digest(),
+            tags
+        )
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        self.cache_misses += 1
+
+        tag_priority = self._match_tags(tags) if self._tag_lookup else None
+        if tag_priority is not None:
+            category = self.tag_categories[tag_priority]
+        else:
+            category = self._match(question.lower())
+
+        self._cache[key] = category
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return category
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            'cached': len(self._cache),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total if total else 0.0,
+        }
@@ -5,9 +5,11 @@ Tránh spam API calls khi có lỗi liên tục
 
 import asyncio
 import logging
+import time
+from collections import deque
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Dict, Hashable, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +30,12 @@ class CircuitBreaker:
     2. Khi failures >= threshold → OPEN
     3. OPEN: Reject tất cả requests trong timeout period
     4. Sau timeout → HALF_OPEN
-    5. HALF_OPEN: Cho phép 1 request thử
+    5. HALF_OPEN: Cho phép đúng 1 request thử tại một thời điểm (các caller khác bị reject)
        - Thành công → CLOSED
        - Thất bại → OPEN lại
+
+    Ngoài lỗi liên tiếp, circuit cũng mở khi tỉ lệ lỗi hoặc tỉ lệ call chậm trong
+    sliding window (N call gần nhất) vượt ngưỡng.
     """
     
     def __init__(
@@ -38,7 +43,16 @@ class CircuitBreaker:
         name: str,
         failure_threshold: int = 5,
         timeout_seconds: int = 60,
-        success_threshold: int = 2
+        success_threshold: int = 2,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.8,
+        call_timeout: Optional[float] = None,
+        cache_ttl: float = 0,
+        cache_max_entries: int = 1000,
+        is_failure: Optional[Callable[[Exception], bool]] = None
     ):
         """
         Initialize circuit breaker
@@ -48,11 +62,29 @@ class CircuitBreaker:
             failure_threshold: Số lỗi liên tiếp để mở circuit
             timeout_seconds: Thời gian chờ trước khi thử lại (OPEN → HALF_OPEN)
             success_threshold: Số lần thành công liên tiếp để đóng circuit (HALF_OPEN → CLOSED)
+            window_size: Số call gần nhất dùng để tính tỉ lệ lỗi / call chậm
+            minimum_calls: Số call tối thiểu trong window trước khi xét tỉ lệ
+            failure_rate_threshold: Tỉ lệ lỗi trong window để mở circuit
+            slow_call_threshold: Call lâu hơn (giây) được tính là chậm (None = tắt)
+            slow_call_rate_threshold: Tỉ lệ call chậm trong window để mở circuit
+            call_timeout: Timeout mỗi call (giây), timeout tính là lỗi (None = không giới hạn)
+            cache_ttl: Thời gian (giây) kết quả cũ được dùng làm fallback trong call_cached (0 = tắt)
+            cache_max_entries: Số kết quả tối đa giữ trong cache
+            is_failure: Phân loại exception (None = mọi exception là lỗi). Exception không
+                phải lỗi vẫn được raise nhưng tính như call thành công (server vẫn phản hồi)
         """
         self.name = name
         self.failure_threshold = failure_threshold
         self.timeout_seconds = timeout_seconds
         self.success_threshold = success_threshold
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.call_timeout = call_timeout
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.is_failure = is_failure
         
         # State
         self.state = CircuitState.CLOSED
@@ -60,12 +92,24 @@ class CircuitBreaker:
         self.success_count = 0
         self.last_failure_time: Optional[datetime] = None
         self.last_state_change: datetime = datetime.now()
+        self.opened_at: Optional[datetime] = None
+        self.open_reason: Optional[str] = None
+        self.window = deque(maxlen=window_size)  # (failed, slow) của các call gần nhất
+        self._probe_in_flight = False
+        
+        # Fallback cache: key -> (monotonic timestamp, result)
+        self.cache: Dict[Hashable, tuple] = {}
+        
+        # Callback(name, state) khi đổi trạng thái (vd: Telegram alert)
+        self.on_state_change: Optional[Callable[[str, str], None]] = None
         
         # Statistics
         self.total_calls = 0
         self.total_failures = 0
         self.total_successes = 0
         self.total_rejected = 0
+        self.total_slow = 0
+        self.total_fallbacks = 0
         
         logger.info(f"✅ Circuit Breaker '{name}' initialized (threshold={failure_threshold}, timeout={timeout_seconds}s)")
     
@@ -98,26 +142,92 @@ class CircuitBreaker:
                     f"Will retry in {self._time_until_retry():.0f}s"
                 )
         
+        # HALF_OPEN: chỉ 1 probe tại một thời điểm, caller khác fail fast
+        probe = False
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                self.total_rejected += 1
+                raise CircuitBreakerOpenError(
+                    f"Circuit breaker '{self.name}' is HALF_OPEN (probe in progress)"
+                )
+            self._probe_in_flight = True
+            probe = True
+        
         # Try to call function
+        start = time.monotonic()
         try:
-            result = await func(*args, **kwargs)
-            self._on_success()
-            return result
+            if self.call_timeout:
+                result = await asyncio.wait_for(func(*args, **kwargs), self.call_timeout)
+            else:
+                result = await func(*args, **kwargs)
             
         except Exception as e:
-            self._on_failure()
+            if self.is_failure is None or self.is_failure(e):
+                self._on_failure()
+            else:
+                self._on_success(time.monotonic() - start)
             raise e
+        
+        finally:
+            if probe:
+                self._probe_in_flight = False
+        
+        self._on_success(time.monotonic() - start)
+        return result
     
-    def _on_success(self):
+    async def call_cached(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """
+        Gọi function qua circuit breaker, fallback sang kết quả cache khi lỗi / circuit OPEN
+        
+        Args:
+            key: Cache key (vd: token_id, wallet address)
+            func: Async function cần gọi
+            *args, **kwargs: Arguments cho function
+        
+        Returns:
+            Kết quả mới, hoặc kết quả cache (không quá cache_ttl giây) nếu call thất bại
+        
+        Raises:
+            CircuitBreakerOpenError / Exception: Nếu không có cache còn hạn
+        """
+        try:
+            result = await self.call(func, *args, **kwargs)
+        except Exception:
+            entry = self.cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.cache_ttl:
+                self.total_fallbacks += 1
+                logger.debug(f"♻️  Circuit breaker '{self.name}' serving cached result for {key}")
+                return entry[1]
+            raise
+        
+        if self.cache_ttl > 0:
+            self.cache.pop(key, None)
+            self.cache[key] = (time.monotonic(), result)
+            if len(self.cache) > self.cache_max_entries:
+                self.cache.pop(next(iter(self.cache)))
+        
+        return result
+    
+    def _on_success(self, duration: float = 0.0):
         """Xử lý khi call thành công"""
         self.total_successes += 1
         self.failure_count = 0
         
+        slow = self.slow_call_threshold is not None and duration >= self.slow_call_threshold
+        if slow:
+            self.total_slow += 1
+        self.window.append((False, slow))
+        
         if self.state == CircuitState.HALF_OPEN:
             self.success_count += 1
             
             if self.success_count >= self.success_threshold:
                 self._transition_to_closed()
+        
+        elif self.state == CircuitState.CLOSED:
+            reason = self._window_trip_reason()
+            if reason:
+                self._transition_to_open(reason)
     
     def _on_failure(self):
         """Xử lý khi call thất bại"""
@@ -125,40 +235,65 @@ class CircuitBreaker:
         self.failure_count += 1
         self.success_count = 0
         self.last_failure_time = datetime.now()
+        self.window.append((True, False))
         
         if self.state == CircuitState.HALF_OPEN:
             # Fail ngay trong HALF_OPEN → quay lại OPEN
-            self._transition_to_open()
+            self._transition_to_open("half-open probe failed")
             
         elif self.state == CircuitState.CLOSED:
             if self.failure_count >= self.failure_threshold:
-                self._transition_to_open()
+                self._transition_to_open(f"failures: {self.failure_count}/{self.failure_threshold}")
+            else:
+                reason = self._window_trip_reason()
+                if reason:
+                    self._transition_to_open(reason)
+    
+    def _window_trip_reason(self) -> Optional[str]:
+        """Kiểm tra tỉ lệ lỗi / call chậm trong sliding window"""
+        calls = len(self.window)
+        if calls < self.minimum_calls:
+            return None
+        
+        failure_rate = sum(1 for failed, _ in self.window if failed) / calls
+        if failure_rate >= self.failure_rate_threshold:
+            return f"failure rate {failure_rate:.0%} over last {calls} calls"
+        
+        slow_rate = sum(1 for _, slow in self.window if slow) / calls
+        if self.slow_call_threshold is not None and slow_rate >= self.slow_call_rate_threshold:
+            return f"slow call rate {slow_rate:.0%} (>{self.slow_call_threshold}s) over last {calls} calls"
+        
+        return None
     
     def _should_attempt_reset(self) -> bool:
         """Kiểm tra xem đã đến lúc thử reset chưa"""
-        if self.last_failure_time is None:
-            return False
+        if self.opened_at is None:
+            return True
         
-        time_since_failure = (datetime.now() - self.last_failure_time).total_seconds()
-        return time_since_failure >= self.timeout_seconds
+        time_since_open = (datetime.now() - self.opened_at).total_seconds()
+        return time_since_open >= self.timeout_seconds
     
     def _time_until_retry(self) -> float:
         """Tính thời gian còn lại cho đến khi retry"""
-        if self.last_failure_time is None:
+        if self.opened_at is None:
             return 0
         
-        time_since_failure = (datetime.now() - self.last_failure_time).total_seconds()
-        return max(0, self.timeout_seconds - time_since_failure)
+        time_since_open = (datetime.now() - self.opened_at).total_seconds()
+        return max(0, self.timeout_seconds - time_since_open)
     
-    def _transition_to_open(self):
+    def _transition_to_open(self, reason: str = ""):
         """Chuyển sang trạng thái OPEN"""
+        now = datetime.now()
+        self.opened_at = now
+        
         if self.state != CircuitState.OPEN:
-            logger.warning(
-                f"🔴 Circuit breaker '{self.name}' OPENED "
-                f"(failures: {self.failure_count}/{self.failure_threshold})"
-            )
+            logger.warning(f"🔴 Circuit breaker '{self.name}' OPENED ({reason})")
+            was_closed = self.state == CircuitState.CLOSED
             self.state = CircuitState.OPEN
-            self.last_state_change = datetime.now()
+            self.open_reason = reason
+            self.last_state_change = now
+            if was_closed:
+                self._notify_state_change()
     
     def _transition_to_half_open(self):
         """Chuyển sang trạng thái HALF_OPEN"""
@@ -176,7 +311,19 @@ class CircuitBreaker:
         self.state = CircuitState.CLOSED
         self.failure_count = 0
         self.success_count = 0
+        self.open_reason = None
+        self.window.clear()
         self.last_state_change = datetime.now()
+        self._notify_state_change()
+    
+    def _notify_state_change(self):
+        """Gọi callback on_state_change (lỗi trong callback không ảnh hưởng call)"""
+        if self.on_state_change is None:
+            return
+        try:
+            self.on_state_change(self.name, self.state.value)
+        except Exception as e:
+            logger.debug(f"Circuit breaker state callback failed: {e}")
     
     def reset(self):
         """Manually reset circuit breaker"""
@@ -185,10 +332,15 @@ class CircuitBreaker:
         self.failure_count = 0
         self.success_count = 0
         self.last_failure_time = None
+        self.opened_at = None
+        self.open_reason = None
+        self.window.clear()
+        self._probe_in_flight = False
     
     def get_stats(self) -> dict:
         """Lấy statistics"""
         uptime = (datetime.now() - self.last_state_change).total_seconds()
+        calls = len(self.window)
         
         return {
             'name': self.name,
@@ -199,6 +351,11 @@ class CircuitBreaker:
             'total_successes': self.total_successes,
             'total_failures': self.total_failures,
             'total_rejected': self.total_rejected,
+            'total_slow': self.total_slow,
+            'total_fallbacks': self.total_fallbacks,
+            'window_failure_rate': sum(1 for failed, _ in self.window if failed) / calls if calls else 0,
+            'window_slow_rate': sum(1 for _, slow in self.window if slow) / calls if calls else 0,
+            'open_reason': self.open_reason,
             'success_rate': self.total_successes / self.total_calls if self.total_calls > 0 else 0,
             'time_in_current_state': uptime,
             'time_until_retry': self._time_until_retry() if self.state == CircuitState.OPEN else 0,
@@ -210,6 +367,142 @@ class CircuitBreakerOpenError(Exception):
     pass
 
 
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status trong exception của client (py_clob_client, requests, aiohttp)"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+    return status if isinstance(status, int) else None
+
+
+def is_server_failure(error: Exception) -> bool:
+    """
+    Chỉ lỗi phía server mới tính là failure: 5xx, timeout, lỗi kết nối
+    
+    Lỗi 4xx (not enough balance / allowance, order không hợp lệ, 429) là lỗi của
+    một wallet / order cụ thể; breaker dùng chung mọi wallet nên không được để
+    một wallet hết tiền chặn order của các wallet khác.
+    """
+    status = error_status(error)
+    if status is not None:
+        return status >= 500
+    return True
+
+
+# Cấu hình mặc định cho từng endpoint
+DEFAULT_BREAKERS = {
+    'clob_book': {'timeout_seconds': 30, 'slow_call_threshold': 3.0, 'call_timeout': 10, 'cache_ttl': 10},
+    # Không đặt call_timeout cho order post: order có thể vẫn được gửi sau khi timeout → trùng lệnh khi retry
+    # Dùng chung mọi wallet: chỉ đếm 5xx / timeout, bỏ qua 4xx của từng wallet
+    'clob_order': {'timeout_seconds': 30, 'slow_call_threshold': 5.0, 'is_failure': is_server_failure},
+    'clob_read': {'timeout_seconds': 30, 'slow_call_threshold': 5.0, 'call_timeout': 15, 'cache_ttl': 30},
+    'gamma_api': {'timeout_seconds': 60, 'slow_call_threshold': 5.0, 'call_timeout': 15, 'cache_ttl': 120},
+    'rewards_api': {'timeout_seconds': 120, 'slow_call_threshold': 5.0, 'call_timeout': 15, 'cache_ttl': 600},
+    'data_api': {'timeout_seconds': 60, 'slow_call_threshold': 5.0, 'call_timeout': 15, 'cache_ttl': 60},
+    'rpc': {'timeout_seconds': 30, 'slow_call_threshold': 5.0, 'call_timeout': 20, 'cache_ttl': 60},
+    'playwright_scraper': {'failure_threshold': 3, 'timeout_seconds': 120, 'success_threshold': 2},
+}
+
+
+class CircuitBreakerRegistry:
+    """
+    Registry circuit breaker theo endpoint
+    
+    Mỗi module lấy breaker qua tên endpoint nên các caller dùng chung một
+    trạng thái (vd: mọi order book fetch dùng 'clob_book').
+    """
+    
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        Args:
+            config: Override theo endpoint, vd: {'clob_book': {'cache_ttl': 5}}
+        """
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.config: Dict[str, Dict] = {}
+        self.on_state_change: Optional[Callable[[str, str], None]] = None
+        self.configure(config or {})
+    
+    def configure(self, config: Dict):
+        """Áp dụng override config, giữ nguyên trạng thái các breaker đã tạo"""
+        for name, override in config.items():
+            if isinstance(override, dict):
+                self.config.setdefault(name, {}).update(override)
+                if name in self.breakers:
+                    for key, value in override.items():
+                        if hasattr(self.breakers[name], key):
+                            setattr(self.breakers[name], key, value)
+    
+    def get(self, name: str) -> CircuitBreaker:
+        """Lấy (hoặc tạo) breaker cho endpoint"""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            settings = dict(DEFAULT_BREAKERS.get(name, {}))
+            settings.update(self.config.get(name, {}))
+            breaker = CircuitBreaker(name=name, **settings)
+            breaker.on_state_change = self._state_changed
+            self.breakers[name] = breaker
+        return breaker
+    
+    def _state_changed(self, name: str, state: str):
+        """Chuyển tiếp state change tới callback của registry"""
+        if self.on_state_change:
+            self.on_state_change(name, state)
+    
+    def get_stats(self) -> Dict:
+        """Statistics của tất cả breaker"""
+        return {name: breaker.get_stats() for name, breaker in self.breakers.items()}
+    
+    def get_open(self) -> list:
+        """Tên các breaker đang OPEN / HALF_OPEN"""
+        return [name for name, breaker in self.breakers.items() if breaker.state != CircuitState.CLOSED]
+    
+    def get_state(self) -> Dict:
+        """Trạng thái các breaker đang OPEN (cho StateStore snapshot)"""
+        return {
+            name: {
+                'opened_at': breaker.opened_at.isoformat(),
+                'open_reason': breaker.open_reason,
+            }
+            for name, breaker in self.breakers.items()
+            if breaker.state == CircuitState.OPEN and breaker.opened_at is not None
+        }
+    
+    def restore_state(self, state: Dict):
+        """Khôi phục breaker OPEN từ snapshot nếu chưa hết timeout"""
+        for name, saved in state.items():
+            opened_at = datetime.fromisoformat(saved['opened_at'])
+            breaker = self.get(name)
+            if (datetime.now() - opened_at).total_seconds() >= breaker.timeout_seconds:
+                continue
+            breaker.state = CircuitState.OPEN
+            breaker.opened_at = opened_at
+            breaker.open_reason = saved.get('open_reason')
+            breaker.last_state_change = opened_at
+            logger.info(f"🔴 Circuit breaker '{name}' restored OPEN ({breaker.open_reason})")
+
+
+_registry: Optional[CircuitBreakerRegistry] = None
+
+
+def get_circuit_breaker_registry() -> CircuitBreakerRegistry:
+    """Registry dùng chung toàn process"""
+    global _registry
+    if _registry is None:
+        _registry = CircuitBreakerRegistry()
+    return _registry
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Lấy breaker dùng chung cho endpoint"""
+    return get_circuit_breaker_registry().get(name)
+
+
+def configure_circuit_breakers(config: Optional[Dict]):
+    """Áp dụng section `circuit_breakers` trong config"""
+    get_circuit_breaker_registry().configure(config or {})
+
+
 # Decorator để dễ dàng sử dụng circuit breaker
 def with_circuit_breaker(breaker: CircuitBreaker):
     """
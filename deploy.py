@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Deployment Script for Polymarket Trading Bot
-Handles production deployment with monitoring and auto-restart
+Handles production deployment with health-probe supervision and auto-restart
 """
 
 import os
@@ -10,23 +10,125 @@ import subprocess
 import time
 import signal
 import logging
+import random
+from collections import deque
 from datetime import datetime
+from typing import Dict, List, Optional
 import psutil
+import requests
 import yaml
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def backoff_delay(attempt: int, base: float, cap: float, jitter: float = 0.2) -> float:
+    """Exponential restart delay: base * 2^attempt, capped, with +/- jitter
+
+    Args:
+        attempt: Consecutive restarts without a stable run (0 = first)
+        base: Delay of the first restart (seconds)
+        cap: Maximum delay (seconds)
+        jitter: Random fraction added or removed
+
+    Returns:
+        Delay in seconds
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return max(0.0, delay * (1 + random.uniform(-jitter, jitter)))
+
+
+def evaluate_health(snapshot: Optional[Dict], settings: Dict, now: Optional[float] = None) -> List[str]:
+    """Reasons the bot is degraded according to its health snapshot
+
+    Args:
+        snapshot: JSON body of GET /health (None if the probe failed)
+        settings: `supervisor` config section (thresholds)
+        now: Current wall clock (default: time.time())
+
+    Returns:
+        Human-readable reasons; empty when healthy
+    """
+    if snapshot is None:
+        return ['health endpoint unreachable']
+    if snapshot.get('phase') == 'stopping':
+        return []
+
+    now = now or time.time()
+    reasons = []
+
+    loop = snapshot.get('loop') or {}
+    max_lag = settings.get('max_loop_lag_ms', 1000)
+    if loop.get('samples') and loop.get('p99_ms', 0) > max_lag:
+        reasons.append(f"event loop lag p99 {loop['p99_ms']:.0f}ms > {max_lag}ms")
+
+    websocket = snapshot.get('websocket') or {}
+    max_ws_age = settings.get('max_ws_age', 120)
+    if websocket.get('subscribed_tokens'):
+        if not websocket.get('connected'):
+            reasons.append('websocket disconnected')
+        elif websocket.get('last_update_age') is None or websocket['last_update_age'] > max_ws_age:
+            reasons.append(f"websocket stale (no book update for > {max_ws_age}s)")
+
+    # Orders are waiting but nothing was placed for too long
+    orders = snapshot.get('orders') or {}
+    max_placement_age = settings.get('max_placement_age', 1800)
+    if max_placement_age and orders.get('pending'):
+        since = orders.get('last_placed_at') or snapshot.get('started_at') or now
+        if now - since > max_placement_age:
+            reasons.append(
+                f"no successful placement for {now - since:.0f}s ({orders['pending']} orders pending)"
+            )
+
+    return reasons
+
+
 class BotDeployer:
-    """Production deployment manager"""
+    """Production deployment manager
+
+    Supervises the bot through its in-process health endpoint: the bot is
+    restarted when it crashes and when its health (event-loop lag, websocket
+    freshness, placements) stays degraded for `unhealthy_probes` consecutive
+    probes. Restarts back off exponentially, hand active orders over to the
+    next process (SIGUSR1 -> final state snapshot, no cancel) and measure the
+    time from launch to the first placed order against `first_order_target`.
+    """
     
     def __init__(self, config_file='config.yaml'):
         self.config_file = config_file
         self.process = None
         self.restart_count = 0
-        self.max_restarts = 10
         self.monitoring = True
+
+        self.settings = self._load_supervisor_config()
+        self.max_restarts = self.settings.get('max_restarts', 10)  # within restart_window
+        self.restart_window = self.settings.get('restart_window', 3600)
+        self.probe_interval = self.settings.get('probe_interval', 10)
+        self.probe_timeout = self.settings.get('probe_timeout', 5)
+        self.startup_grace = self.settings.get('startup_grace', 120)
+        self.unhealthy_threshold = self.settings.get('unhealthy_probes', 3)
+        self.stable_after = self.settings.get('stable_after', 600)
+        self.stop_timeout = self.settings.get('stop_timeout', 60)
+        self.first_order_target = self.settings.get('first_order_target', 90)
+        self.health_url = (f"http://{self.settings.get('health_host', '127.0.0.1')}:"
+                           f"{self.settings.get('health_port', 8787)}/health")
+
+        self.launched_at = 0.0
+        self.launch_kind = 'initial'
+        self.backoff_attempt = 0
+        self.unhealthy_probes = 0
+        self.restart_times = deque()  # wall clock of recent restarts (window limit)
+        self.boot_time: Optional[float] = None  # launch -> health endpoint up
+        self.first_order_times: List[Dict] = []  # launch -> first placed order
+
+    def _load_supervisor_config(self) -> Dict:
+        """`supervisor` section of the bot config (empty if unreadable)"""
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                return (yaml.safe_load(f) or {}).get('supervisor', {}) or {}
+        except Exception as e:
+            logger.warning(f"Could not read supervisor config from {self.config_file}: {e}")
+            return {}
         
     def deploy(self):
         """Deploy bot with monitoring"""
@@ -49,25 +151,140 @@ class BotDeployer:
         # Start bot with monitoring
         self.start_bot()
         
-        # Monitor loop
+        # Supervisor loop
         while self.monitoring:
             if self.process and self.process.poll() is not None:
-                # Process died
-                logger.warning(f"Bot process died with code {self.process.returncode}")
-                
-                if self.restart_count < self.max_restarts:
-                    logger.info(f"Restarting bot (attempt {self.restart_count + 1}/{self.max_restarts})")
-                    time.sleep(10)  # Wait before restart
-                    self.start_bot()
-                    self.restart_count += 1
-                else:
-                    logger.error("Max restarts reached. Manual intervention required.")
-                    self.monitoring = False
+                # Process died: nothing to hand over, the next process restores the last snapshot + journal
+                self.restart_bot(f"process died with code {self.process.returncode}", handover=False)
+            else:
+                self.supervise()
             
             # Check system resources
             self.check_system_health()
             
-            time.sleep(30)  # Check every 30 seconds
+            time.sleep(self.probe_interval)
+
+    def probe_health(self) -> Optional[Dict]:
+        """GET the bot's health snapshot (None on timeout / connection error)"""
+        try:
+            response = requests.get(self.health_url, timeout=self.probe_timeout)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.debug(f"Health probe failed: {e}")
+            return None
+
+    def supervise(self):
+        """Probe the running bot once and restart it if it stays degraded"""
+        now = time.time()
+        snapshot = self.probe_health()
+        if snapshot is not None:
+            self._track_startup(snapshot, now)
+
+        in_grace = now - self.launched_at < self.startup_grace
+        reasons = evaluate_health(snapshot, self.settings, now)
+        if not reasons or (in_grace and snapshot is None):
+            self.unhealthy_probes = 0
+            if self.backoff_attempt and now - self.launched_at > self.stable_after:
+                logger.info(f"✅ Bot stable for {self.stable_after}s - restart backoff reset")
+                self.backoff_attempt = 0
+            return
+
+        self.unhealthy_probes += 1
+        logger.warning(f"⚠️  Bot degraded ({self.unhealthy_probes}/{self.unhealthy_threshold}): {'; '.join(reasons)}")
+        if self.unhealthy_probes >= self.unhealthy_threshold and not in_grace:
+            self.restart_bot(f"degraded health: {'; '.join(reasons)}", handover=True)
+
+    def _track_startup(self, snapshot: Dict, now: float):
+        """Measure launch -> health endpoint and launch -> first order"""
+        if self.boot_time is None:
+            self.boot_time = now - self.launched_at
+            logger.info(f"🩺 Health endpoint up {self.boot_time:.1f}s after launch "
+                        f"({'warm' if snapshot.get('warm_start') else 'cold'} start)")
+
+        first_placed_at = (snapshot.get('orders') or {}).get('first_placed_at')
+        measured = self.first_order_times and self.first_order_times[-1]['launched_at'] == self.launched_at
+        if first_placed_at and not measured:
+            elapsed = first_placed_at - self.launched_at
+            self.first_order_times.append({
+                'launched_at': self.launched_at,
+                'kind': self.launch_kind,
+                'warm_start': bool(snapshot.get('warm_start')),
+                'boot': self.boot_time,
+                'first_order': elapsed,
+            })
+            within = elapsed <= self.first_order_target
+            (logger.info if within else logger.warning)(
+                f"{'✅' if within else '⚠️ '} {self.launch_kind.capitalize()} launch -> first order in {elapsed:.1f}s "
+                f"(target {self.first_order_target}s, boot {self.boot_time:.1f}s)"
+            )
+            self.report_first_order_times()
+
+    def report_first_order_times(self):
+        """Summary of launch -> first order times against the target"""
+        restarts = [t['first_order'] for t in self.first_order_times if t['kind'] == 'restart']
+        if not restarts:
+            return
+        ordered = sorted(restarts)
+        missed = sum(1 for t in restarts if t > self.first_order_target)
+        logger.info(
+            f"📊 Restart -> first order: {len(restarts)} restarts, p50 {ordered[len(ordered) // 2]:.1f}s, "
+            f"max {ordered[-1]:.1f}s, {missed} over the {self.first_order_target}s target"
+        )
+
+    def restart_bot(self, reason: str, handover: bool):
+        """Stop (if needed) and relaunch the bot after an exponential backoff
+
+        Args:
+            reason: Why the bot is restarted (logged)
+            handover: Ask the bot to keep its orders for the next process
+        """
+        now = time.time()
+        while self.restart_times and now - self.restart_times[0] > self.restart_window:
+            self.restart_times.popleft()
+        if len(self.restart_times) >= self.max_restarts:
+            logger.error(f"Max restarts ({self.max_restarts} in {self.restart_window}s) reached. "
+                         "Manual intervention required.")
+            self.stop_bot(handover=False)
+            self.monitoring = False
+            return
+
+        logger.warning(f"🔄 Restarting bot: {reason}")
+        self.stop_bot(handover=handover)
+
+        delay = backoff_delay(self.backoff_attempt, self.settings.get('backoff_base', 5),
+                              self.settings.get('backoff_max', 300))
+        logger.info(f"Restarting in {delay:.1f}s (attempt {len(self.restart_times) + 1}/{self.max_restarts})")
+        time.sleep(delay)
+
+        self.restart_times.append(time.time())
+        self.restart_count += 1
+        self.backoff_attempt += 1
+        self.launch_kind = 'restart'
+        self.start_bot()
+
+    def stop_bot(self, handover: bool = False):
+        """Signal the bot, wait up to stop_timeout, then kill it
+
+        Args:
+            handover: SIGUSR1 (keep orders, final snapshot) instead of SIGTERM
+        """
+        if not self.process or self.process.poll() is not None:
+            return
+
+        if handover and hasattr(signal, 'SIGUSR1'):
+            logger.info("Stopping bot process (handing over orders)...")
+            self.process.send_signal(signal.SIGUSR1)
+        else:
+            logger.info("Stopping bot process...")
+            self.process.terminate()
+
+        try:
+            self.process.wait(timeout=self.stop_timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning("Force killing bot process")
+            self.process.kill()
+            self.process.wait()
     
     def pre_deployment_checks(self):
         """Run pre-deployment checks"""
@@ -134,22 +351,14 @@ class BotDeployer:
                 '--config', self.config_file
             ]
             
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
+            # Output is inherited (journal / terminal): an undrained pipe would block the bot
+            self.launched_at = time.time()
+            self.boot_time = None
+            self.unhealthy_probes = 0
+            self.process = subprocess.Popen(cmd)
             
             logger.info(f"Bot started with PID: {self.process.pid}")
             
-            # Log initial output
-            for _ in range(10):
-                if self.process.stdout:
-                    line = self.process.stdout.readline()
-                    if line:
-                        logger.info(f"Bot output: {line.strip()}")
-            
         except Exception as e:
             logger.error(f"Failed to start bot: {e}")
     
@@ -185,14 +394,8 @@ class BotDeployer:
         logger.info("Shutdown signal received")
         self.monitoring = False
         
-        if self.process:
-            logger.info("Stopping bot process...")
-            self.process.terminate()
-            time.sleep(5)
-            
-            if self.process.poll() is None:
-                logger.warning("Force killing bot process")
-                self.process.kill()
+        self.stop_bot(handover=False)
+        self.report_first_order_times()
         
         logger.info("Deployment manager shutdown complete")
         sys.exit(0)
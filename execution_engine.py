@@ -0,0 +1,347 @@
+"""
+Execution Engine Module
+Places pending orders concurrently with one worker per wallet
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WalletWorker:
+    """Places orders for a single wallet with its own queue and rate budget"""
+
+    def __init__(self, wallet: Dict, order_manager, wallet_manager, config: dict):
+        """Initialize wallet worker
+
+        Args:
+            wallet: Wallet dict from WalletManager
+            order_manager: OrderManager instance (owns per-wallet signing clients)
+            wallet_manager: WalletManager instance (usage stats, optional human delay)
+            config: Execution configuration
+        """
+        self.wallet = wallet
+        self.address = wallet['address']
+        self.order_manager = order_manager
+        self.wallet_manager = wallet_manager
+
+        self.orders_per_minute = config.get('orders_per_minute_per_wallet', 30)
+        self.max_queue_size = config.get('max_queue_per_wallet', 20)
+        self.human_delay = config.get('human_delay', False)
+
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.placement_times = deque()  # Sliding 60s window for rate budget
+        self.task: Optional[asyncio.Task] = None
+
+        # Capacity tracking (resting capital is derived from OrderManager.active_orders)
+        self.balance: Optional[float] = None  # USDC, None = unknown
+        self.pending_capital = 0.0  # Orders queued or being placed on this wallet
+        self.in_flight = 0
+
+        # Statistics
+        self.placed = 0
+        self.failed = 0
+
+    @property
+    def markets(self) -> set:
+        """Market IDs with resting orders on this wallet"""
+        return {
+            market_id for market_id, order in self.order_manager.active_orders.items()
+            if order.get('wallet_address') == self.address
+        }
+
+    @property
+    def committed_capital(self) -> float:
+        """USDC in resting orders of this wallet plus orders queued for it"""
+        resting = sum(
+            order_capital(order) for order in self.order_manager.active_orders.values()
+            if order.get('wallet_address') == self.address
+        )
+        return resting + self.pending_capital
+
+    @property
+    def free_capital(self) -> float:
+        """USDC not yet committed to resting orders (inf if balance unknown)"""
+        if self.balance is None:
+            return float('inf')
+        return self.balance - self.committed_capital
+
+    @property
+    def load(self) -> int:
+        """Orders queued or being placed"""
+        return self.queue.qsize() + self.in_flight
+
+    def has_room(self, capital: float) -> bool:
+        """Check if the wallet can take an order of `capital` USDC"""
+        return self.load < self.max_queue_size and self.free_capital >= capital
+
+    async def run(self, on_failure, on_done):
+        """Worker loop
+
+        Args:
+            on_failure: Callback(order) for orders that failed to place
+            on_done: Callback(order) once an order left the queue (placed or not)
+        """
+        while True:
+            order = await self.queue.get()
+            self.in_flight += 1
+            try:
+                await self._wait_for_budget()
+
+                if self.human_delay:
+                    await self.wallet_manager._apply_human_delay()
+
+                result = await self.order_manager.place_order(order, self.wallet)
+                self.placement_times.append(time.monotonic())
+
+                if result:
+                    self.placed += 1
+                    order['wallet_address'] = self.address
+                    self.wallet['usage_count'] += 1
+                    self.wallet['last_used'] = time.time()
+                    self.wallet_manager.update_wallet_stats(self.address, {
+                        'orders': len(result),
+                        'volume': order_capital(order)
+                    })
+                    logger.info(f"✅ [{self.address[:10]}] Order placed for {order['market_id']}: {result}")
+                else:
+                    self.failed += 1
+                    logger.warning(f"⚠️  [{self.address[:10]}] Failed to place order for {order['market_id']}")
+                    on_failure(order)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"❌ [{self.address[:10]}] Error placing order {order.get('market_id')}: {e}", exc_info=True)
+                on_failure(order)
+            finally:
+                self.pending_capital = max(0.0, self.pending_capital - order_capital(order))
+                self.in_flight -= 1
+                self.queue.task_done()
+                on_done(order)
+
+    async def _wait_for_budget(self):
+        """Block until the wallet's per-minute placement budget has room"""
+        while True:
+            now = time.monotonic()
+            while self.placement_times and now - self.placement_times[0] >= 60:
+                self.placement_times.popleft()
+
+            if len(self.placement_times) < self.orders_per_minute:
+                return
+
+            await asyncio.sleep(60 - (now - self.placement_times[0]))
+
+    def get_stats(self) -> Dict:
+        """Get worker statistics"""
+        return {
+            'address': self.address,
+            'queued': self.queue.qsize(),
+            'in_flight': self.in_flight,
+            'placed': self.placed,
+            'failed': self.failed,
+            'balance': self.balance,
+            'committed_capital': self.committed_capital,
+            'markets': len(self.markets),
+        }
+
+
+def order_capital(order: Dict) -> float:
+    """USDC required for both sides of a prepared order"""
+    capital = 0.0
+    for side in ('yes_order', 'no_order'):
+        params = order.get(side, {})
+        capital += float(params.get('price', 0)) * float(params.get('size', 0))
+    return capital
+
+
+class ExecutionEngine:
+    """Dispatches pending orders to per-wallet workers by capacity and inventory
+
+    Throughput scales with the number of wallets: each worker places its own
+    orders concurrently instead of one serialized loop using one wallet per pass.
+    """
+
+    def __init__(self, order_manager, wallet_manager, config: dict):
+        """Initialize execution engine
+
+        Args:
+            order_manager: OrderManager instance
+            wallet_manager: WalletManager instance
+            config: Execution configuration
+        """
+        self.order_manager = order_manager
+        self.wallet_manager = wallet_manager
+        self.config = config
+
+        self.balance_refresh_interval = config.get('balance_refresh_interval', 300)  # seconds
+
+        self.workers: Dict[str, WalletWorker] = {
+            wallet['address']: WalletWorker(wallet, order_manager, wallet_manager, config)
+            for wallet in wallet_manager.wallets
+        }
+        self.dispatched: Dict[str, str] = {}  # market_id -> wallet address, orders queued or being placed
+        self._queued = Counter()  # market_id -> orders queued or being placed
+        self.balance_listeners: List[Callable[[Dict], None]] = []  # Called with each balance refresh
+        self._tasks: List[asyncio.Task] = []
+
+        logger.info(f"✅ Execution Engine initialized ({len(self.workers)} wallet workers)")
+
+    async def start(self):
+        """Start one worker task per wallet plus balance refresh (idempotent)"""
+        if self._tasks:
+            return
+
+        for worker in self.workers.values():
+            self._tasks.append(asyncio.create_task(worker.run(self._on_failure, self._on_done)))
+
+        self._tasks.append(asyncio.create_task(self._balance_refresh_loop()))
+        logger.info(f"🚀 Execution Engine started with {len(self.workers)} workers")
+
+    async def close(self):
+        """Stop all workers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def dispatch(self, order: Dict) -> Optional[str]:
+        """Assign an order to a wallet worker
+
+        Markets that already have resting orders stay on the same wallet (inventory
+        affinity); new markets go to the wallet the capital allocator chose for them
+        if it has room, else to the wallet with the most free capital and the
+        shortest queue.
+
+        Returns:
+            Wallet address the order was queued on, or None if no wallet has capacity
+        """
+        capital = order_capital(order)
+        worker = self._select_worker(order['market_id'], capital, order.get('allocated_wallet'))
+
+        if worker is None:
+            logger.debug(f"⏳ No wallet capacity for {order['market_id']} (${capital:.2f})")
+            return None
+
+        order['status'] = 'dispatched'
+        worker.pending_capital += capital
+        self.dispatched[order['market_id']] = worker.address
+        self._queued[order['market_id']] += 1
+        worker.queue.put_nowait(order)
+        return worker.address
+
+    @property
+    def market_wallet(self) -> Dict[str, str]:
+        """market_id -> wallet address holding its inventory or queued orders"""
+        holders = {
+            market_id: order['wallet_address']
+            for market_id, order in self.order_manager.active_orders.items()
+            if order.get('wallet_address') in self.workers
+        }
+        return {**self.dispatched, **holders}
+
+    def _select_worker(self, market_id: str, capital: float,
+                       preferred: Optional[str] = None) -> Optional[WalletWorker]:
+        """Pick a worker for a market by inventory affinity, allocation, then capacity"""
+        order = self.order_manager.active_orders.get(market_id)
+        address = (order or {}).get('wallet_address') or self.dispatched.get(market_id)
+        if address in self.workers:
+            worker = self.workers[address]
+            return worker if worker.has_room(capital) else None
+
+        if preferred in self.workers and self.workers[preferred].has_room(capital):
+            return self.workers[preferred]
+
+        candidates = [w for w in self.workers.values() if w.has_room(capital)]
+        if not candidates:
+            return None
+
+        return min(candidates, key=lambda w: (w.load, -w.free_capital))
+
+    def _on_failure(self, order: Dict):
+        """Return a failed order to the pending queue for retry"""
+        order['status'] = 'pending'
+        self.order_manager.pending_orders.append(order)
+
+    def _on_done(self, order: Dict):
+        """Drop the dispatch affinity once no order of the market is queued any more"""
+        market_id = order['market_id']
+        self._queued[market_id] -= 1
+        if self._queued[market_id] <= 0:
+            del self._queued[market_id]
+            self.dispatched.pop(market_id, None)
+
+    def release_market(self, market_id: str):
+        """Forget a market's dispatch affinity after its orders were cancelled
+
+        Committed capital needs no bookkeeping: it follows OrderManager.active_orders.
+        """
+        self.dispatched.pop(market_id, None)
+
+    def restore_from_active_orders(self) -> int:
+        """Report wallet assignment of restored active orders
+
+        Wallet affinity and committed capital are derived from
+        OrderManager.active_orders, so restored markets keep trading on the
+        wallet that holds their resting orders without any rebuild.
+
+        Returns:
+            Number of restored markets held by a known wallet
+        """
+        restored = sum(
+            1 for order in self.order_manager.active_orders.values() if order.get('wallet_address') in self.workers
+        )
+        if restored:
+            logger.info(f"♻️  Restored wallet assignment for {restored} markets")
+        return restored
+
+    def get_holdings(self) -> Dict[str, Dict]:
+        """Capital held by markets with resting orders: {market_id: {'wallet', 'capital'}}"""
+        holdings = {}
+        for market_id, address in self.market_wallet.items():
+            order = self.order_manager.active_orders.get(market_id)
+            if order:
+                holdings[market_id] = {'wallet': address, 'capital': order_capital(order)}
+        return holdings
+
+    def update_balances(self, balances: Dict):
+        """Update worker balances from WalletManager.check_wallet_balances() output"""
+        for address, balance in balances.items():
+            if address in self.workers and 'usdc' in balance:
+                self.workers[address].balance = balance['usdc']
+
+        for listener in self.balance_listeners:
+            try:
+                listener(balances)
+            except Exception as e:
+                logger.warning(f"⚠️  Balance listener failed: {e}")
+
+    async def _balance_refresh_loop(self):
+        """Periodically refresh wallet USDC balances for capacity decisions"""
+        while True:
+            try:
+                balances = await self.wallet_manager.check_wallet_balances()
+                self.update_balances(balances)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️  Failed to refresh wallet balances: {e}")
+
+            await asyncio.sleep(self.balance_refresh_interval)
+
+    def get_stats(self) -> Dict:
+        """Get execution engine statistics"""
+        workers = [w.get_stats() for w in self.workers.values()]
+        return {
+            'workers': len(workers),
+            'queued': sum(w['queued'] for w in workers),
+            'in_flight': sum(w['in_flight'] for w in workers),
+            'placed': sum(w['placed'] for w in workers),
+            'failed': sum(w['failed'] for w in workers),
+            'per_wallet': workers,
+        }
@@ -8,6 +8,8 @@ import asyncio
 import logging
 from typing import List, Dict, Optional
 
+from rate_limiter import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +18,7 @@ class GammaAPIClient:
     
     def __init__(self):
         self.base_url = "https://gamma-api.polymarket.com/markets"
+        self.rate_limiter = get_rate_limiter()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
@@ -53,7 +56,9 @@ class GammaAPIClient:
                     logger.info(f"📄 Fetching page {page} (offset: {offset})...")
                     
                     try:
+                        await self.rate_limiter.acquire('gamma')
                         async with session.get(self.base_url, params=params, headers=self.headers, timeout=30) as response:
+                            self.rate_limiter.record_response('gamma', response.status, response.headers.get('Retry-After'))
                             if response.status != 200:
                                 logger.error(f"❌ Failed to fetch page: HTTP {response.status}")
                                 break
@@ -207,8 +212,10 @@ class GammaAPIClient:
         try:
             url = f"https://gamma-api.polymarket.com/markets/{condition_id}"
             
+            await self.rate_limiter.acquire('gamma')
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, headers=self.headers, timeout=10) as response:
+                    self.rate_limiter.record_response('gamma', response.status, response.headers.get('Retry-After'))
                     if response.status == 200:
                         market_data = await response.json()
                         return self._parse_market(market_data)
@@ -0,0 +1,71 @@
+"""
+Health Server Module
+Serves an in-process health snapshot (event-loop lag, last placement, WebSocket freshness) for the supervisor
+"""
+
+import json
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class HealthServer:
+    """Minimal HTTP endpoint on localhost: GET /health -> JSON snapshot
+
+    The handler runs on the bot's own event loop, so a blocked loop shows up
+    as a probe timeout on the supervisor side, not only as lag in the body.
+    """
+
+    def __init__(self, config: dict, snapshot: Callable[[], Dict]):
+        """Initialize health server
+
+        Args:
+            config: `supervisor` config section (health_host, health_port)
+            snapshot: Callable returning the current health snapshot
+        """
+        self.enabled = config.get('health_enabled', True)
+        self.host = config.get('health_host', '127.0.0.1')
+        self.port = config.get('health_port', 8787)
+        self.snapshot = snapshot
+
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self):
+        """Start listening (idempotent; a busy port is logged, not raised)"""
+        if not self.enabled or self._runner is not None:
+            return
+
+        app = web.Application()
+        app.router.add_get('/health', self._handle_health)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as e:
+            logger.error(f"❌ Health endpoint could not bind {self.host}:{self.port}: {e}")
+            await runner.cleanup()
+            return
+
+        self._runner = runner
+        logger.info(f"🩺 Health endpoint on http://{self.host}:{self.port}/health")
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        """Serialize the current snapshot"""
+        self.requests += 1
+        try:
+            body = self.snapshot()
+        except Exception as e:
+            logger.error(f"Health snapshot failed: {e}")
+            return web.json_response({'error': str(e), 'time': time.time()}, status=500)
+        return web.Response(text=json.dumps(body, default=str), content_type='application/json')
+
+    async def close(self):
+        """Stop listening"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
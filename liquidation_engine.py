@@ -0,0 +1,515 @@
+"""
+Liquidation Engine Module
+Depth-aware bulk selling of positions: book-walking limit slices, parallel batches per wallet, live fill tracking
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import aiohttp
+from py_clob_client.client import ClobClient
+from py_clob_client.clob_types import BookParams, OrderArgs, OrderType, PostOrdersArgs
+from py_clob_client.constants import POLYGON
+from py_clob_client.order_builder.constants import SELL
+
+from circuit_breaker import get_circuit_breaker
+from orderbook_codec import BookSide
+from rate_limiter import get_rate_limiter
+from structured_logging import log_event
+
+logger = logging.getLogger(__name__)
+
+CLOB_HOST = "https://clob.polymarket.com"
+DATA_API_POSITIONS_URL = "https://data-api.polymarket.com/positions"
+SIZE_DECIMALS = 2  # CLOB order size precision
+DONE_STATUSES = {'MATCHED', 'CANCELED', 'CANCELLED', 'INVALID'}
+
+
+def round_size(size: float) -> float:
+    """Round a share amount down to the CLOB size precision"""
+    factor = 10 ** SIZE_DECIMALS
+    return math.floor(size * factor + 1e-9) / factor
+
+
+def plan_slices(
+    bid_prices: Sequence[float],
+    bid_sizes: Sequence[float],
+    shares: float,
+    floor_price: float,
+    max_slices: int = 5,
+    min_size: float = 5.0,
+    rest_residual: bool = True
+) -> List[Dict]:
+    """Split a sell into limit slices that walk down the bid ladder
+
+    Each slice is priced at the bid level where its shares are absorbed, so a
+    SELL limit at that price fills against that level and the better ones the
+    earlier slices left. Levels below `floor_price` are never hit; slices
+    smaller than `min_size` are merged into the next level, and slices beyond
+    `max_slices` are merged into the last one (at the lowest price reached).
+    Shares the visible depth above the floor cannot absorb are placed as one
+    resting slice at the floor price when `rest_residual` is set.
+
+    Args:
+        bid_prices: Bid level prices (any order)
+        bid_sizes: Bid level sizes
+        shares: Shares to sell
+        floor_price: Lowest acceptable price
+        max_slices: Maximum slices hitting the book
+        min_size: Minimum order size
+        rest_residual: Rest unabsorbed shares at the floor price
+
+    Returns:
+        Slices [{'price', 'size', 'resting'}], best price first
+    """
+    levels = sorted(zip(bid_prices, bid_sizes), key=lambda level: -level[0])
+    slices: List[Dict] = []
+    remaining = shares
+    pending = 0.0
+    lowest = None
+
+    for price, size in levels:
+        if remaining <= 0 or price < floor_price:
+            break
+        if size <= 0:
+            continue
+        take = min(size, remaining)
+        pending += take
+        remaining -= take
+        lowest = price
+        if pending >= min_size:
+            slices.append({'price': price, 'size': pending, 'resting': False})
+            pending = 0.0
+
+    if len(slices) > max_slices:
+        tail = slices[max_slices - 1:]
+        slices = slices[:max_slices - 1] + [
+            {'price': tail[-1]['price'], 'size': sum(s['size'] for s in tail), 'resting': False}
+        ]
+
+    if pending > 0:
+        if slices:
+            # Too small for its own order: join the last slice at the lowest price reached
+            slices[-1] = {'price': lowest, 'size': slices[-1]['size'] + pending, 'resting': False}
+        else:
+            remaining += pending
+
+    remaining = round_size(remaining)
+    if remaining > 0 and rest_residual:
+        if slices and (remaining < min_size or slices[-1]['price'] == floor_price):
+            # Too small for its own order (or same price): the last slice rests the rest
+            slices[-1]['size'] += remaining
+            slices[-1]['resting'] = True
+        else:
+            slices.append({'price': floor_price, 'size': remaining, 'resting': True})
+
+    for s in slices:
+        s['size'] = round_size(s['size'])
+    return [s for s in slices if s['size'] > 0]
+
+
+class LiquidationEngine:
+    """Sells many positions across wallets with depth-aware limit prices
+
+    For every position the live book (WebSocket cache when fresh, otherwise one
+    batched REST /books request for all tokens) is walked with plan_slices, so a
+    position larger than the top level is sold in several limit orders instead
+    of one order priced off a single mid. The floor is the best bid (or the
+    position's curPrice when the book is empty) less `max_slippage`.
+
+    Orders of each wallet are signed and posted in batches of up to
+    `max_batch_size`, wallets in parallel, through the shared rate limiter and
+    CLOB circuit breaker. With `wait_for_fills` the posted orders are polled
+    until filled, cancelled or `fill_timeout`, and every fill is reported to
+    the `on_update` callback and logged as a 'liquidation_fill' event.
+    """
+
+    def __init__(self, config: dict, orderbook_ws=None, on_update: Optional[Callable[[Dict], None]] = None):
+        """Initialize liquidation engine
+
+        Args:
+            config: Full bot configuration (uses the `liquidation` section)
+            orderbook_ws: Optional OrderBookWebSocket for live books
+            on_update: Optional callback receiving progress events
+                ({'type': 'planned' | 'posted' | 'failed' | 'fill' | 'done', ...})
+        """
+        self.config = config.get('liquidation', {})
+        self.orderbook_ws = orderbook_ws
+        self.on_update = on_update
+
+        self.max_slippage = self.config.get('max_slippage', 0.05)  # fraction below best bid
+        self.max_slices = self.config.get('max_slices', 5)
+        self.min_order_size = self.config.get('min_order_size', 5)
+        self.max_batch_size = self.config.get('max_batch_size', 15)  # CLOB batch order limit
+        self.default_tick_size = self.config.get('tick_size', 0.01)
+        self.rest_residual = self.config.get('rest_residual', True)
+        self.max_book_age = self.config.get('max_book_age', 10)  # seconds
+        self.fill_poll_interval = self.config.get('fill_poll_interval', 2)
+        self.fill_timeout = self.config.get('fill_timeout', 120)
+        self.request_timeout = self.config.get('request_timeout', 10)
+        self.page_size = self.config.get('positions_page_size', 500)
+
+        self.rate_limiter = get_rate_limiter()
+        self.order_breaker = get_circuit_breaker('clob_order')
+        self.book_breaker = get_circuit_breaker('clob_book')
+        self.data_api_breaker = get_circuit_breaker('data_api')
+
+        self.signing_clients: Dict[str, ClobClient] = {}  # address -> authenticated client
+        self._read_client: Optional[ClobClient] = None
+
+        # Statistics
+        self.stats = {'orders_posted': 0, 'orders_failed': 0, 'shares_filled': 0.0, 'proceeds': 0.0}
+
+    def _emit(self, event: Dict):
+        """Report progress to the callback"""
+        if self.on_update is not None:
+            try:
+                self.on_update(event)
+            except Exception as e:
+                logger.debug(f"Liquidation update callback failed: {e}")
+
+    async def get_signing_client(self, wallet: Dict) -> ClobClient:
+        """Cached authenticated client for a wallet (created once, off the event loop)"""
+        address = wallet['address']
+        client = self.signing_clients.get(address)
+        if client is not None:
+            return client
+
+        private_key = wallet.get('private_key')
+        if not private_key:
+            raise ValueError(f"No private key for wallet {address[:10]}...")
+        if private_key.startswith('0x'):
+            private_key = private_key[2:]
+
+        def build_client():
+            # signature_type=0 (default) for EOA wallets
+            client = ClobClient(CLOB_HOST, key=private_key, chain_id=POLYGON)
+            client.set_api_creds(client.create_or_derive_api_creds())
+            return client
+
+        logger.info(f"🔧 Creating signing client for {address[:10]}...")
+        client = await asyncio.to_thread(build_client)
+        self.signing_clients[address] = client
+        return client
+
+    async def fetch_positions(self, wallets: List[Dict]) -> List[Dict]:
+        """Data API positions of all wallets, tagged with '_wallet'"""
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+
+            async def fetch_wallet(address: str) -> List[Dict]:
+                positions, offset = [], 0
+
+                async def fetch_page(params: Dict) -> List[Dict]:
+                    await self.rate_limiter.acquire('data_api')
+                    async with session.get(DATA_API_POSITIONS_URL, params=params) as response:
+                        self.rate_limiter.record_response('data_api', response.status,
+                                                          response.headers.get('Retry-After'))
+                        response.raise_for_status()
+                        return await response.json()
+
+                while True:
+                    params = {'user': address, 'sizeThreshold': 0.01, 'limit': self.page_size, 'offset': offset}
+                    page = await self.data_api_breaker.call_cached((address, offset), fetch_page, params)
+                    if not page:
+                        break
+                    for position in page:
+                        position['_wallet'] = address
+                    positions.extend(page)
+                    if len(page) < self.page_size:
+                        break
+                    offset += self.page_size
+                return positions
+
+            results = await asyncio.gather(*(fetch_wallet(w['address']) for w in wallets), return_exceptions=True)
+
+        positions = []
+        for wallet, result in zip(wallets, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Failed to fetch positions for {wallet['address'][:10]}...: {result}")
+                continue
+            positions.extend(result)
+        return positions
+
+    def cached_book(self, token_id: str) -> Optional[Dict]:
+        """Bids and tick size from the WebSocket cache (None if missing or stale)"""
+        book = self.orderbook_ws.get_orderbook(token_id, max_age=self.max_book_age) if self.orderbook_ws else None
+        if book is None:
+            return None
+        bids = book.get('bids')
+        return {
+            'bids': bids if isinstance(bids, BookSide) else BookSide(list(bids or [])),
+            'tick_size': float(book.get('tick_size') or self.default_tick_size),
+        }
+
+    async def _get_books(self, token_ids: List[str]) -> Dict[str, Dict]:
+        """Bids and tick size per token: fresh WebSocket books, one REST batch for the rest"""
+        books = {}
+        missing = []
+        for token_id in token_ids:
+            book = self.cached_book(token_id)
+            if book is not None:
+                books[token_id] = book
+            else:
+                missing.append(token_id)
+
+        if missing:
+            if self._read_client is None:
+                self._read_client = ClobClient(CLOB_HOST)
+
+            async def fetch_books():
+                await self.rate_limiter.acquire('clob_read')
+                return await asyncio.to_thread(
+                    self._read_client.get_order_books, [BookParams(token_id=t) for t in missing]
+                )
+
+            try:
+                summaries = await self.book_breaker.call_cached(('liquidation_books', tuple(missing)), fetch_books)
+            except Exception as e:
+                self.rate_limiter.record_exception('clob_read', e)
+                logger.warning(f"⚠️  Could not fetch {len(missing)} order book(s): {e}")
+                summaries = []
+
+            for summary in summaries or []:
+                books[summary.asset_id] = {
+                    'bids': BookSide(list(summary.bids or [])),
+                    'tick_size': float(summary.tick_size or self.default_tick_size),
+                }
+
+        return books
+
+    def plan(
+        self,
+        position: Dict,
+        book: Optional[Dict],
+        max_slippage: Optional[float] = None,
+        rest_residual: Optional[bool] = None
+    ) -> Dict:
+        """Plan the sell of one position
+
+        Args:
+            position: Data API position (asset, size, curPrice, title, _wallet)
+            book: {'bids': BookSide, 'tick_size'} or None
+            max_slippage: Override of the configured max slippage
+            rest_residual: Override of the configured rest_residual
+
+        Returns:
+            {'token_id', 'wallet', 'title', 'shares', 'best_bid', 'floor_price',
+             'slices', 'expected_proceeds'}
+        """
+        slippage = self.max_slippage if max_slippage is None else max_slippage
+        rest_residual = self.rest_residual if rest_residual is None else rest_residual
+        shares = round_size(float(position.get('size', 0) or 0))
+        bids = book['bids'] if book else BookSide()
+        tick = book['tick_size'] if book else self.default_tick_size
+
+        prices, sizes = bids.prices, bids.sizes
+        best_bid = max(prices) if len(prices) else None
+        reference = best_bid if best_bid is not None else float(position.get('curPrice', 0) or 0)
+
+        # Floor rounded up to the tick so we never sell below max slippage
+        floor_price = math.ceil(reference * (1 - slippage) / tick - 1e-9) * tick
+        floor_price = round(max(tick, floor_price), 6)
+
+        slices = []
+        if shares > 0 and reference > 0:
+            slices = plan_slices(prices, sizes, shares, floor_price, self.max_slices,
+                                 self.min_order_size, rest_residual)
+
+        return {
+            'token_id': position.get('asset'),
+            'wallet': position.get('_wallet'),
+            'title': position.get('title', 'Unknown'),
+            'shares': shares,
+            'best_bid': best_bid,
+            'floor_price': floor_price,
+            'slices': slices,
+            'expected_proceeds': sum(s['price'] * s['size'] for s in slices if not s['resting']),
+        }
+
+    async def liquidate(
+        self,
+        positions: List[Dict],
+        wallets: List[Dict],
+        dry_run: bool = False,
+        max_slippage: Optional[float] = None,
+        wait_for_fills: bool = True,
+        rest_residual: Optional[bool] = None
+    ) -> List[Dict]:
+        """Sell positions across wallets
+
+        Args:
+            positions: Data API positions tagged with '_wallet'
+            wallets: Wallets with address and private_key
+            dry_run: Only plan, do not post orders
+            max_slippage: Override of the configured max slippage
+            wait_for_fills: Poll posted orders until filled / timeout
+            rest_residual: Override of the configured rest_residual (callers that do
+                not wait for fills should not leave untracked resting orders). Without
+                resting residual and fill tracking the slices are posted FAK, so what
+                the book no longer absorbs when they arrive is cancelled, not rested
+
+        Returns:
+            One report per position: the plan plus 'orders' (order_id, price,
+            size, filled, status), 'filled', 'proceeds' and 'errors'
+        """
+        positions = [p for p in positions if p.get('asset') and float(p.get('size', 0) or 0) > 0]
+        books = await self._get_books(list({p['asset'] for p in positions}))
+
+        reports = []
+        for position in positions:
+            report = self.plan(position, books.get(position['asset']), max_slippage, rest_residual)
+            report.update({'orders': [], 'filled': 0.0, 'proceeds': 0.0, 'errors': []})
+            if not report['slices']:
+                report['errors'].append('no executable price')
+            reports.append(report)
+            self._emit({'type': 'planned', 'report': report})
+
+        if dry_run:
+            return reports
+
+        wallets_by_address = {w['address']: w for w in wallets}
+        by_wallet: Dict[str, List[Dict]] = {}
+        for report in reports:
+            if report['slices']:
+                by_wallet.setdefault(report['wallet'], []).append(report)
+
+        rests = self.rest_residual if rest_residual is None else rest_residual
+        order_type = getattr(OrderType, self.config.get('order_type', 'GTC'))
+        if not rests and not wait_for_fills:
+            order_type = OrderType.FAK
+
+        await asyncio.gather(*(
+            self._post_wallet(wallets_by_address.get(address), wallet_reports, order_type)
+            for address, wallet_reports in by_wallet.items()
+        ))
+
+        if wait_for_fills:
+            await self._track_fills(reports)
+
+        for report in reports:
+            self._emit({'type': 'done', 'report': report})
+        return reports
+
+    async def _post_wallet(self, wallet: Optional[Dict], reports: List[Dict], order_type: str):
+        """Sign and post all slices of one wallet in batches"""
+        if wallet is None:
+            for report in reports:
+                report['errors'].append('wallet not configured')
+            return
+
+        try:
+            client = await self.get_signing_client(wallet)
+        except Exception as e:
+            logger.error(f"❌ Failed to create signing client for {wallet['address'][:10]}...: {e}")
+            for report in reports:
+                report['errors'].append(f'signing client: {e}')
+            return
+
+        slices = [(report, s) for report in reports for s in report['slices']]
+
+        for start in range(0, len(slices), self.max_batch_size):
+            batch = slices[start:start + self.max_batch_size]
+
+            def sign_and_post():
+                signed = [
+                    PostOrdersArgs(
+                        order=client.create_order(OrderArgs(
+                            token_id=report['token_id'], price=s['price'], size=s['size'], side=SELL
+                        )),
+                        orderType=order_type
+                    )
+                    for report, s in batch
+                ]
+                return client.post_orders(signed)
+
+            async def post():
+                await self.rate_limiter.acquire('clob_write')
+                return await asyncio.to_thread(sign_and_post)
+
+            try:
+                responses = await self.order_breaker.call(post)
+            except Exception as e:
+                self.rate_limiter.record_exception('clob_write', e)
+                logger.error(f"❌ Failed to post {len(batch)} SELL order(s) for {wallet['address'][:10]}...: {e}")
+                responses = [{'errorMsg': str(e)}] * len(batch)
+
+            for (report, s), resp in zip(batch, list(responses or []) + [None] * len(batch)):
+                self._record_post(report, s, resp)
+
+    def _record_post(self, report: Dict, slice_: Dict, resp: Optional[Dict]):
+        """Record the response to one posted slice"""
+        if resp and resp.get('success') and resp.get('orderID'):
+            order = {'order_id': resp['orderID'], 'price': slice_['price'], 'size': slice_['size'],
+                     'filled': 0.0, 'status': str(resp.get('status') or 'live').upper(),
+                     'resting': slice_['resting']}
+            report['orders'].append(order)
+            self.stats['orders_posted'] += 1
+            self._emit({'type': 'posted', 'report': report, 'order': order})
+        else:
+            error = (resp.get('errorMsg') or resp.get('error') or 'Unknown error') if resp else 'No response'
+            report['errors'].append(error)
+            self.stats['orders_failed'] += 1
+            logger.error(f"❌ SELL {slice_['size']:.2f} @ ${slice_['price']:.3f} failed for "
+                         f"{report['title'][:40]}: {error}")
+            self._emit({'type': 'failed', 'report': report, 'error': error})
+
+    async def _track_fills(self, reports: List[Dict]):
+        """Poll posted orders until filled, cancelled or fill_timeout"""
+        pending = [(report, order) for report in reports for order in report['orders']]
+        deadline = time.monotonic() + self.fill_timeout
+
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(self.fill_poll_interval)
+            results = await asyncio.gather(
+                *(self._get_order(report['wallet'], order['order_id']) for report, order in pending),
+                return_exceptions=True
+            )
+
+            still_pending = []
+            for (report, order), result in zip(pending, results):
+                if isinstance(result, Exception) or not result:
+                    still_pending.append((report, order))
+                    continue
+
+                matched = float(result.get('size_matched', 0) or 0)
+                if matched > order['filled']:
+                    self._record_fill(report, order, matched - order['filled'])
+                order['status'] = str(result.get('status', order['status'])).upper()
+
+                if order['status'] not in DONE_STATUSES and order['filled'] < order['size'] - 1e-9:
+                    still_pending.append((report, order))
+            pending = still_pending
+
+        if pending:
+            logger.info(f"⏳ {len(pending)} liquidation order(s) still open after {self.fill_timeout}s")
+
+    async def _get_order(self, address: str, order_id: str) -> Optional[Dict]:
+        """Current state of one order"""
+        client = self.signing_clients.get(address)
+        if client is None:
+            return None
+        await self.rate_limiter.acquire('clob_read')
+        return await asyncio.to_thread(client.get_order, order_id)
+
+    def _record_fill(self, report: Dict, order: Dict, shares: float):
+        """Account a new fill on an order"""
+        order['filled'] += shares
+        report['filled'] += shares
+        report['proceeds'] += shares * order['price']
+        self.stats['shares_filled'] += shares
+        self.stats['proceeds'] += shares * order['price']
+
+        log_event(logger, logging.INFO, 'liquidation_fill',
+                  "💸 Sold %(shares).2f %(title)s @ $%(price).3f (%(filled).2f/%(total).2f)",
+                  token_id=report['token_id'], wallet=report['wallet'], title=report['title'][:40],
+                  order_id=order['order_id'], shares=shares, price=order['price'],
+                  filled=report['filled'], total=report['shares'])
+        self._emit({'type': 'fill', 'report': report, 'order': order, 'shares': shares})
+
+    def get_stats(self) -> Dict:
+        """Get liquidation statistics"""
+        return dict(self.stats)
@@ -0,0 +1,389 @@
+"""
+Log Analytics Module
+Indexed, memory-mapped queries over the bot's JSON-lines logs (see structured_logging)
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import mmap
+import os
+import time
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+INDEX_DIR = '.logindex'
+_TS_PREFIX = b'{"ts": "'
+_EVENT_KEY = b'"event": '
+
+
+def parse_since(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parse a time bound: relative ('30m', '24h', '7d') or ISO timestamp
+
+    Args:
+        value: Time bound string (None = unbounded)
+        now: Reference time for relative bounds (default: current time)
+
+    Returns:
+        Epoch seconds or None
+    """
+    if not value:
+        return None
+
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    if value[-1] in units and value[:-1].replace('.', '', 1).isdigit():
+        return (now if now is not None else time.time()) - float(value[:-1]) * units[value[-1]]
+
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class _TimestampParser:
+    """ISO timestamp -> epoch seconds, caching the per-second prefix"""
+
+    def __init__(self):
+        self._seconds: Dict[bytes, float] = {}
+
+    def __call__(self, raw: bytes) -> float:
+        # Formatter output: 2026-01-01T12:00:00.123+00:00
+        if len(raw) == 29 and raw.endswith(b'+00:00'):
+            prefix = raw[:19]
+            base = self._seconds.get(prefix)
+            if base is None:
+                base = datetime.fromisoformat(prefix.decode() + '+00:00').timestamp()
+                if len(self._seconds) > 100000:
+                    self._seconds.clear()
+                self._seconds[prefix] = base
+            return base + int(raw[20:23]) / 1000
+        return datetime.fromisoformat(raw.decode()).timestamp()
+
+
+def scan_line(line: bytes, parse_ts) -> Tuple[Optional[float], Optional[str]]:
+    """Extract (timestamp, event) from a JSON log line without decoding it
+
+    Relies on the key order written by JsonLineFormatter (ts first, event
+    before msg); other lines fall back to a full decode.
+    """
+    try:
+        if line.startswith(_TS_PREFIX):
+            ts_end = line.index(b'"', 8)
+            ts = parse_ts(line[8:ts_end])
+
+            key = line.find(_EVENT_KEY, ts_end)
+            if key < 0 or line[key + 9:key + 10] != b'"':
+                return ts, None
+            start = key + 10
+            return ts, line[start:line.index(b'"', start)].decode()
+
+        entry = _loads(line)
+        ts = entry.get('ts')
+        return (parse_since(ts) if ts else None), entry.get('event')
+    except (ValueError, UnicodeDecodeError):
+        return None, None
+
+
+class LogSegment:
+    """One log file with a sidecar block index
+
+    The index splits the file into ~`block_bytes` blocks and stores each
+    block's byte range, timestamp range and event counts. It lives in
+    `<log dir>/.logindex/` under a hash of the file's first bytes, so it
+    follows the file through rotation renames; appended data is indexed
+    incrementally on the next open.
+    """
+
+    def __init__(self, path: str, block_bytes: int = 1 << 20, use_index: bool = True):
+        """Open a log file and load or extend its index
+
+        Args:
+            path: Log file path
+            block_bytes: Target index block size
+            use_index: Persist the index to a sidecar file
+        """
+        self.path = path
+        self.block_bytes = block_bytes
+        self.use_index = use_index
+        self.size = os.path.getsize(path)
+        self.blocks: List[list] = []  # [offset, end, ts_min, ts_max, {event: count}]
+
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.index_path = self._index_path() if use_index else None
+
+        self._load_index()
+
+    def _index_path(self) -> Optional[str]:
+        """Sidecar path keyed by the file's first bytes"""
+        if not self._mm:
+            return None
+        head = self._mm[:4096]
+        key = hashlib.sha1(head[:head.find(b'\n') + 1 or len(head)]).hexdigest()[:20]
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), INDEX_DIR, f'{key}.json')
+
+    def _load_index(self):
+        """Load the sidecar index and index anything appended since"""
+        indexed = 0
+        if self.index_path and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get('version') == INDEX_VERSION and saved['indexed_size'] <= self.size:
+                    self.blocks = saved['blocks']
+                    # The last block may have been open (short); re-index it
+                    if self.blocks and self.blocks[-1][1] - self.blocks[-1][0] < self.block_bytes:
+                        self.blocks.pop()
+                    indexed = self.blocks[-1][1] if self.blocks else 0
+            except (OSError, ValueError, KeyError, IndexError):
+                self.blocks = []
+
+        if indexed < self.size:
+            self._index_from(indexed)
+            self._save_index()
+
+    def _index_from(self, offset: int):
+        """Build blocks for complete lines from offset to end of file"""
+        mm = self._mm
+        if mm is None:
+            return
+
+        parse_ts = _TimestampParser()
+        block = None
+        pos = offset
+
+        while pos < self.size:
+            newline = mm.find(b'\n', pos)
+            if newline < 0:
+                break  # Partial last line: left for the next open
+            ts, event = scan_line(mm[pos:newline], parse_ts)
+
+            if block is None:
+                block = [pos, pos, None, None, {}]
+            if ts is not None:
+                block[2] = ts if block[2] is None else min(block[2], ts)
+                block[3] = ts if block[3] is None else max(block[3], ts)
+            if event:
+                block[4][event] = block[4].get(event, 0) + 1
+
+            pos = newline + 1
+            block[1] = pos
+            if pos - block[0] >= self.block_bytes:
+                self.blocks.append(block)
+                block = None
+
+        if block is not None:
+            self.blocks.append(block)
+
+    def _save_index(self):
+        """Write the sidecar index atomically"""
+        if not self.index_path or not self.blocks:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp = f'{self.index_path}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'path': os.path.basename(self.path),
+                           'indexed_size': self.blocks[-1][1], 'blocks': self.blocks}, f)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            logger.debug(f"Could not write log index for {self.path}: {e}")
+
+    @property
+    def ts_range(self) -> Tuple[Optional[float], Optional[float]]:
+        """(first, last) timestamp in the file"""
+        starts = [b[2] for b in self.blocks if b[2] is not None]
+        ends = [b[3] for b in self.blocks if b[3] is not None]
+        return (min(starts) if starts else None, max(ends) if ends else None)
+
+    def candidate_blocks(self, events: Optional[Sequence[str]], since: Optional[float],
+                         until: Optional[float]) -> Iterator[list]:
+        """Blocks that may hold matching records"""
+        for block in self.blocks:
+            if since is not None and block[3] is not None and block[3] < since:
+                continue
+            if until is not None and block[2] is not None and block[2] > until:
+                continue
+            if events and not any(block[4].get(event) for event in events):
+                continue
+            yield block
+
+    def iter_records(self, events: Optional[Sequence[str]] = None, since: Optional[float] = None,
+                     until: Optional[float] = None) -> Iterator[Dict]:
+        """Decode matching records in file order
+
+        Args:
+            events: Event names to keep (None = all records)
+            since: Lower time bound (epoch seconds)
+            until: Upper time bound (epoch seconds)
+
+        Yields:
+            Record dicts with '_ts' set to epoch seconds
+        """
+        mm = self._mm
+        if mm is None:
+            return
+
+        needles = [_EVENT_KEY + b'"' + event.encode() + b'"' for event in events] if events else None
+        parse_ts = _TimestampParser()
+
+        for block in self.candidate_blocks(events, since, until):
+            inside = (since is None or (block[2] is not None and block[2] >= since)) and \
+                     (until is None or (block[3] is not None and block[3] <= until))
+            pos, end = block[0], block[1]
+
+            while pos < end:
+                newline = mm.find(b'\n', pos, end)
+                if newline < 0:
+                    newline = end
+                line = mm[pos:newline]
+                pos = newline + 1
+
+                if needles and not any(needle in line for needle in needles):
+                    continue
+
+                if inside:
+                    ts = None
+                else:
+                    ts, _ = scan_line(line, parse_ts)
+                    if ts is None or (since is not None and ts < since) or (until is not None and ts > until):
+                        continue
+
+                try:
+                    record = _loads(line)
+                except ValueError:
+                    continue
+                if needles and record.get('event') not in events:
+                    continue
+                if ts is None and record.get('ts'):
+                    ts = parse_ts(record['ts'].encode())
+                record['_ts'] = ts
+                yield record
+
+    def close(self):
+        """Release the memory map"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+
+def discover_logs(log_file: str) -> List[str]:
+    """Current log file plus its rotated siblings, oldest first"""
+    paths = [p for p in glob.glob(f'{glob.escape(log_file)}.*')
+             if not p.endswith(('.tmp', '.json')) and os.path.isfile(p)]
+    paths.sort(key=lambda p: os.path.getmtime(p))
+    if os.path.isfile(log_file):
+        paths.append(log_file)
+    return paths
+
+
+class LogQuery:
+    """Streaming aggregations across a set of indexed log files
+
+    Aggregations only read structured event records, which SamplingFilter
+    never drops, so counts and percentiles are exact even for modules whose
+    free-form lines are sampled.
+    """
+
+    def __init__(self, paths: Sequence[str], since: Optional[float] = None, until: Optional[float] = None,
+                 block_bytes: int = 1 << 20, use_index: bool = True):
+        """Open log files
+
+        Args:
+            paths: Log files (see discover_logs)
+            since: Lower time bound (epoch seconds)
+            until: Upper time bound (epoch seconds)
+            block_bytes: Index block size
+            use_index: Persist sidecar indexes
+        """
+        self.since = since
+        self.until = until
+        self.segments = [LogSegment(path, block_bytes, use_index) for path in paths]
+
+    def records(self, *events: str) -> Iterator[Dict]:
+        """Matching records across all files, oldest file first"""
+        for segment in self.segments:
+            first, last = segment.ts_range
+            if self.since is not None and last is not None and last < self.since:
+                continue
+            if self.until is not None and first is not None and first > self.until:
+                continue
+            yield from segment.iter_records(events or None, self.since, self.until)
+
+    def event_counts(self) -> Counter:
+        """Records per event name (from the index; blocks straddling the window are scanned)"""
+        counts = Counter()
+        for segment in self.segments:
+            for block in segment.candidate_blocks(None, self.since, self.until):
+                inside = (self.since is None or (block[2] is not None and block[2] >= self.since)) and \
+                         (self.until is None or (block[3] is not None and block[3] <= self.until))
+                counts.update(block[4] if inside else self._scan_block_events(segment, block))
+        return counts
+
+    def _scan_block_events(self, segment: LogSegment, block: list) -> Counter:
+        """Event counts of a boundary block within the time window"""
+        counts = Counter()
+        parse_ts = _TimestampParser()
+        mm, pos, end = segment._mm, block[0], block[1]
+        while pos < end:
+            newline = mm.find(b'\n', pos, end)
+            if newline < 0:
+                newline = end
+            ts, event = scan_line(mm[pos:newline], parse_ts)
+            pos = newline + 1
+            if event and ts is not None and (self.since is None or ts >= self.since) and \
+                    (self.until is None or ts <= self.until):
+                counts[event] += 1
+        return counts
+
+    def count_by(self, event: str, field: str) -> Counter:
+        """Count records of `event` by a field value (e.g. placements per market_id)"""
+        counts = Counter()
+        for record in self.records(event):
+            counts[str(record.get('fields', {}).get(field))] += 1
+        return counts
+
+    def sum_counts(self, event: str, field: str) -> Counter:
+        """Sum dict-valued fields of `event` (e.g. filter_summary rejected reasons)"""
+        counts = Counter()
+        for record in self.records(event):
+            value = record.get('fields', {}).get(field)
+            if isinstance(value, dict):
+                counts.update({k: v for k, v in value.items() if isinstance(v, (int, float))})
+        return counts
+
+    def percentiles(self, event: str, field: str, percents: Sequence[float] = (50, 90, 99)) -> Dict:
+        """Percentiles of a numeric field (nearest-rank), plus count and max"""
+        values = array('d')
+        for record in self.records(event):
+            value = record.get('fields', {}).get(field)
+            if isinstance(value, (int, float)):
+                values.append(value)
+
+        if not values:
+            return {'count': 0}
+
+        ordered = sorted(values)
+        result = {'count': len(ordered), 'max': ordered[-1]}
+        for p in percents:
+            rank = max(1, min(len(ordered), int(-(-p * len(ordered) // 100))))
+            result[f'p{p:g}'] = ordered[rank - 1]
+        return result
+
+    def close(self):
+        """Release all memory maps"""
+        for segment in self.segments:
+            segment.close()
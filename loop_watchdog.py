@@ -0,0 +1,248 @@
+"""
+Event Loop Watchdog Module
+Continuously measures event-loop scheduling lag and captures the stack of callbacks that stall the loop
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopWatchdog:
+    """Detects event-loop stalls caused by synchronous calls inside coroutines
+
+    A heartbeat coroutine wakes up every `interval` seconds and records how late it
+    was scheduled (loop lag). A daemon thread watches the heartbeat; when it has
+    not beaten for longer than `stall_threshold`, the thread grabs the loop
+    thread's current stack so the blocking call (py_clob_client, Web3,
+    requests.get, ...) can be attributed to the module that made it.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        stall_threshold: float = 0.25,
+        history_size: int = 1000,
+        project_root: Optional[str] = None
+    ):
+        """Initialize watchdog
+
+        Args:
+            interval: Heartbeat interval in seconds
+            stall_threshold: Lag (seconds) above which a stall is recorded
+            history_size: Number of lag samples / stall events kept
+            project_root: Directory used to attribute stalls to our own modules
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.project_root = os.path.abspath(project_root or os.path.dirname(os.path.abspath(__file__)))
+
+        self.lag_samples = deque(maxlen=history_size)  # seconds
+        self.stalls = deque(maxlen=history_size)
+        self.offenders: Dict[str, Dict] = {}
+
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._pending_capture: Optional[Dict] = None
+
+    async def start(self):
+        """Start heartbeat task and monitor thread (idempotent)"""
+        if self._task and not self._task.done():
+            return
+
+        self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name='loop-watchdog', daemon=True)
+        self._thread.start()
+
+        logger.info(
+            f"🐕 Loop watchdog started (interval={self.interval * 1000:.0f}ms, "
+            f"stall threshold={self.stall_threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self):
+        """Stop heartbeat task and monitor thread"""
+        self.running = False
+
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._thread:
+            self._thread.join(timeout=self.interval * 5)
+            self._thread = None
+
+    async def _heartbeat(self):
+        """Measure scheduling lag and close out stalls captured by the monitor thread"""
+        while self.running:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - scheduled - self.interval)
+
+            with self._lock:
+                self._last_beat = now
+                capture = self._pending_capture
+                self._pending_capture = None
+
+            self.lag_samples.append(lag)
+
+            if lag >= self.stall_threshold:
+                self._record_stall(lag, capture)
+
+    def _monitor(self):
+        """Monitor thread - capture loop stack while the heartbeat is overdue"""
+        while self.running:
+            time.sleep(self.interval)
+
+            with self._lock:
+                overdue = time.monotonic() - self._last_beat - self.interval
+                if overdue < self.stall_threshold or self._pending_capture is not None:
+                    continue
+
+            capture = self._capture_loop_stack()
+
+            with self._lock:
+                if self._pending_capture is None:
+                    self._pending_capture = capture
+
+    def _capture_loop_stack(self) -> Dict:
+        """Capture the event loop thread's current stack and running task"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame) if frame is not None else []
+
+        task_name = None
+        try:
+            task = asyncio.current_task(self._loop)
+            if task is not None:
+                coro = task.get_coro()
+                task_name = getattr(coro, '__qualname__', None) or task.get_name()
+        except Exception:
+            pass
+
+        module, location = self._attribute(stack)
+
+        return {
+            'module': module,
+            'location': location,
+            'task': task_name,
+            'stack': ''.join(traceback.format_list(stack[-15:])),
+        }
+
+    def _attribute(self, stack: List[traceback.FrameSummary]):
+        """Find the innermost project frame responsible for the stall
+
+        Args:
+            stack: Extracted stack, outermost first
+
+        Returns:
+            (module name, "file:line in func" of the blocking call)
+        """
+        own_file = os.path.abspath(__file__)
+        blocking_call = f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}" if stack else 'unknown'
+
+        for frame in reversed(stack):
+            filename = os.path.abspath(frame.filename)
+            if filename == own_file or not filename.startswith(self.project_root):
+                continue
+            if 'site-packages' in filename:
+                continue
+
+            relative = os.path.relpath(filename, self.project_root)
+            module = os.path.splitext(relative)[0].replace(os.sep, '.')
+            return module, f"{relative}:{frame.lineno} in {frame.name} -> {blocking_call}"
+
+        return 'unknown', blocking_call
+
+    def _record_stall(self, duration: float, capture: Optional[Dict]):
+        """Record stall event and update per-module offender stats
+
+        Args:
+            duration: Stall duration in seconds
+            capture: Stack capture from monitor thread (None if stall was too short to catch)
+        """
+        capture = capture or {'module': 'unknown', 'location': 'unknown', 'task': None, 'stack': ''}
+        duration_ms = duration * 1000
+
+        event = {
+            'timestamp': time.time(),
+            'duration_ms': duration_ms,
+            **capture
+        }
+        self.stalls.append(event)
+
+        stats = self.offenders.setdefault(capture['module'], {
+            'module': capture['module'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'last_location': None,
+            'last_task': None,
+        })
+        stats['count'] += 1
+        stats['total_ms'] += duration_ms
+        stats['max_ms'] = max(stats['max_ms'], duration_ms)
+        stats['last_location'] = capture['location']
+        stats['last_task'] = capture['task']
+
+        logger.warning(
+            f"🐢 Event loop stalled {duration_ms:.0f}ms in {capture['module']} "
+            f"({capture['location']}, task={capture['task']})"
+        )
+        if capture['stack']:
+            logger.debug(f"Stall stack:\n{capture['stack']}")
+
+    def get_lag_stats(self) -> Dict:
+        """Get event-loop lag percentiles in milliseconds"""
+        if not self.lag_samples:
+            return {'samples': 0, 'current_ms': 0, 'p50_ms': 0, 'p99_ms': 0, 'max_ms': 0}
+
+        ordered = sorted(self.lag_samples)
+        count = len(ordered)
+        return {
+            'samples': count,
+            'current_ms': self.lag_samples[-1] * 1000,
+            'p50_ms': ordered[count // 2] * 1000,
+            'p99_ms': ordered[min(count - 1, int(count * 0.99))] * 1000,
+            'max_ms': ordered[-1] * 1000,
+        }
+
+    def get_recent_stalls(self, seconds: float) -> List[Dict]:
+        """Get stall events newer than `seconds`"""
+        cutoff = time.time() - seconds
+        return [s for s in self.stalls if s['timestamp'] >= cutoff]
+
+    def get_top_offenders(self, limit: int = 5) -> List[Dict]:
+        """Get modules ranked by total stall time"""
+        ranked = sorted(self.offenders.values(), key=lambda s: s['total_ms'], reverse=True)
+        return ranked[:limit]
+
+    def get_stats(self) -> Dict:
+        """Get watchdog statistics"""
+        return {
+            'lag': self.get_lag_stats(),
+            'total_stalls': sum(s['count'] for s in self.offenders.values()),
+            'top_offenders': self.get_top_offenders(),
+        }
@@ -45,11 +45,20 @@ from ml_predictor import MLPredictor
 from optimizer import DailyOptimizer
 from usdc_approver import USDCApprover
 from reward_manager import RewardManager
+from reward_tracker import RewardTracker
 from monitoring_system import MonitoringSystem
 from telegram_notifier import TelegramNotifier
 from profit_taking_manager import ProfitTakingManager
 from orderbook_websocket import OrderBookWebSocket
+from orderbook_subscriptions import OrderBookSubscriptionManager
 from order_repositioner import OrderRepositioner
+from execution_engine import ExecutionEngine
+from rate_limiter import configure_rate_limits
+from circuit_breaker import configure_circuit_breakers, get_circuit_breaker_registry
+from state_store import StateStore
+from metrics_store import MetricsStore
+from health_server import HealthServer
+from structured_logging import setup_logging
 
 
 class PolymarketBot:
@@ -58,7 +67,17 @@ class PolymarketBot:
     def __init__(self, config_path: str = 'config.yaml'):
         """Initialize bot with configuration"""
         self.config = self._load_config(config_path)
+
+        # Move logging off the event loop: queue handler + background JSON-lines writer
+        self.log_pipeline = setup_logging(self.config.get('logging', {}))
+
+        configure_rate_limits(self.config.get('rate_limits'))
+        configure_circuit_breakers(self.config.get('circuit_breakers'))
         self.running = False
+        self.warm_start = False
+        self.started_at = time.time()
+        self.phase = 'initializing'  # initializing -> starting -> running -> stopping
+        self._tasks = None
         self.modules = {}
         self.performance_stats = {
             'daily_pnl': 0,
@@ -158,27 +177,49 @@ class PolymarketBot:
         try:
             # Initialize Telegram Notifier FIRST
             self.modules['telegram'] = TelegramNotifier(self.config)
+            get_circuit_breaker_registry().on_state_change = self._on_circuit_breaker_state_change
             logger.info("✅ Telegram Notifier initialized")
 
             # Initialize WebSocket for real-time orderbook updates
             orderbook_config = self.config.get('orderbook_websocket', {})
             ws_url = orderbook_config.get('url', 'wss://ws-subscriptions-clob.polymarket.com/ws/market')
-            self.modules['orderbook_ws'] = OrderBookWebSocket(ws_url)
+            self.modules['orderbook_ws'] = OrderBookWebSocket(
+                ws_url,
+                max_age=orderbook_config.get('max_age', 5),
+                config=orderbook_config
+            )
+            self.modules['book_subs'] = OrderBookSubscriptionManager(
+                self.modules['orderbook_ws'],
+                orderbook_config,
+                clob_host=self.config['order_management'].get('clob', {}).get('host', 'https://clob.polymarket.com')
+            )
             logger.info("✅ OrderBook WebSocket initialized")
 
             self.modules['scanner'] = MarketScanner(self.config['market_scanner'])
-            self.modules['selector'] = MarketSelectorAI(self.config)
+            self.modules['risk_mgr'] = RiskManager(self.config['risk_management'])
+            self.modules['selector'] = MarketSelectorAI(self.config, risk_manager=self.modules['risk_mgr'])
 
             # Pass telegram notifier AND WebSocket to OrderManager
             self.modules['order_mgr'] = OrderManager(
                 self.config['order_management'],
                 telegram_notifier=self.modules['telegram'],
-                orderbook_ws=self.modules['orderbook_ws']
+                orderbook_ws=self.modules['orderbook_ws'],
+                book_subscriptions=self.modules['book_subs']
             )
 
             self.modules['monitor'] = PositionMonitor(self.config['monitoring'])
-            self.modules['risk_mgr'] = RiskManager(self.config['risk_management'])
             self.modules['wallet_mgr'] = WalletManager(self.config['wallet_management'])
+            # Signing keys for cancelling tracked orders (e.g. after a warm restart)
+            self.modules['order_mgr'].wallet_manager = self.modules['wallet_mgr']
+
+            # One execution worker per wallet (concurrent order placement)
+            self.modules['execution'] = ExecutionEngine(
+                self.modules['order_mgr'],
+                self.modules['wallet_mgr'],
+                self.config.get('execution', {})
+            )
+            # Wallet balances drive capital allocation
+            self.modules['execution'].balance_listeners.append(self.modules['risk_mgr'].update_wallet_balances)
 
             # Initialize ML Predictor with alerts config
             ml_config = self.config.get('ml_prediction', {})
@@ -210,12 +251,36 @@ class PolymarketBot:
             else:
                 logger.info("⏭️  Reward Manager disabled in config")
 
+            # Rolled-up performance time series for the optimizer and reports
+            metrics_config = self.config.get('metrics_store', {})
+            if metrics_config.get('enabled', True):
+                self.modules['metrics_store'] = MetricsStore(metrics_config)
+                for name in ('optimizer', 'monitoring', 'selector'):
+                    self.modules[name].metrics_store = self.modules['metrics_store']
+                logger.info("✅ Metrics Store enabled")
+
+            # Per-market reward attribution feeding the selector and optimizer
+            tracking_config = self.config.get('reward_tracking', {})
+            if tracking_config.get('enabled', True):
+                self.modules['reward_tracker'] = RewardTracker(
+                    tracking_config,
+                    order_manager=self.modules['order_mgr'],
+                    get_client=self.modules['order_mgr']._get_signing_client
+                )
+                self.modules['selector'].reward_tracker = self.modules['reward_tracker']
+                self.modules['optimizer'].reward_tracker = self.modules['reward_tracker']
+                self.modules['reward_tracker'].snapshot_listeners.append(self.modules['optimizer'].record_reward_snapshot)
+                logger.info("✅ Reward Tracker enabled")
+
             # Initialize profit taking manager if enabled
             profit_config = self.config.get('profit_taking', {})
             if profit_config.get('enabled', True):
                 self.modules['profit_mgr'] = ProfitTakingManager(
                     self.config,
-                    telegram_notifier=self.modules['telegram']
+                    telegram_notifier=self.modules['telegram'],
+                    orderbook_ws=self.modules['orderbook_ws'],
+                    wallet_manager=self.modules['wallet_mgr'],
+                    book_subscriptions=self.modules['book_subs']
                 )
                 logger.info("✅ Profit Taking Manager enabled")
             else:
@@ -227,31 +292,77 @@ class PolymarketBot:
                 self.modules['repositioner'] = OrderRepositioner(
                     self.modules['order_mgr'],
                     self.modules['orderbook_ws'],
-                    reposition_config
+                    reposition_config,
+                    book_subscriptions=self.modules['book_subs']
                 )
                 logger.info("✅ Order Repositioner enabled")
             else:
                 logger.info("⏭️  Order Repositioner disabled in config")
 
+            # Persist runtime state for warm restarts (restored before any loop runs)
+            self._initialize_state_store()
+
+            # In-process health endpoint probed by the deploy.py supervisor
+            self.modules['health'] = HealthServer(self.config.get('supervisor', {}), self.get_health_snapshot)
+
             logger.info("All modules initialized successfully")
         except Exception as e:
             logger.error(f"Module initialization failed: {e}")
             raise
     
+    def _initialize_state_store(self):
+        """Register module state with the StateStore and restore the last snapshot"""
+        state_store = StateStore(self.config.get('state', {}))
+        if not state_store.enabled:
+            return
+
+        order_mgr = self.modules['order_mgr']
+        state_store.register('order_mgr', order_mgr, replay=order_mgr.get_journal_handlers())
+        state_store.register('selector', self.modules['selector'])
+        state_store.register('monitor', self.modules['monitor'])
+        state_store.register('optimizer', self.modules['optimizer'])
+        state_store.register('circuit_breakers', get_circuit_breaker_registry())
+        for name in ('profit_mgr', 'repositioner'):
+            if name in self.modules:
+                state_store.register(name, self.modules[name])
+
+        self.warm_start = state_store.load()
+        order_mgr.state_store = state_store
+        self.modules['state_store'] = state_store
+
+    async def _warm_restart(self):
+        """Reconcile restored orders with the CLOB so trading resumes without a full scan"""
+        if not self.warm_start:
+            return
+
+        await self.modules['order_mgr'].reconcile_open_orders(self.modules['wallet_mgr'].wallets)
+        self.modules['execution'].restore_from_active_orders()
+        logger.info(f"♻️  Warm restart: {len(self.modules['order_mgr'].active_orders)} markets resumed")
+
     async def start(self):
         """Start the trading bot"""
         self.running = True
+        self.phase = 'starting'
         logger.info("🚀 Starting Polymarket Trading Bot...")
 
+        # Health endpoint first so the supervisor can follow startup
+        await self.modules['health'].start()
+
         # Send startup alert
         await self._send_startup_alert()
 
         # Check USDC approval before starting
         await self._check_usdc_approval()
 
+        # Resume from persisted state (if a recent snapshot was loaded)
+        await self._warm_restart()
+
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._shutdown_handler)
         signal.signal(signal.SIGTERM, self._shutdown_handler)
+        if hasattr(signal, 'SIGUSR1'):
+            # Supervisor restart: keep orders open and hand them over through the state snapshot
+            signal.signal(signal.SIGUSR1, self._handover_handler)
 
         # Start all async tasks
         tasks = [
@@ -263,13 +374,22 @@ class PolymarketBot:
             self._daily_optimization_loop(),
             self._monitoring_loop(),  # Add monitoring loop
             self._hourly_report_loop(),  # Add hourly report loop
-            self._orderbook_websocket_loop()  # Add WebSocket loop
+            self._orderbook_websocket_loop(),  # Add WebSocket loop
+            self.modules['book_subs'].run()  # Idle unsubscription + REST resnapshot of stale books
         ]
 
         # Add reward management loop if enabled
         if 'reward_mgr' in self.modules:
             tasks.append(self._reward_management_loop())
 
+        # Add metrics flush / retention loop if enabled
+        if 'metrics_store' in self.modules:
+            tasks.append(self.modules['metrics_store'].run())
+
+        # Add reward attribution loop if enabled
+        if 'reward_tracker' in self.modules:
+            tasks.append(self.modules['reward_tracker'].run(self.modules['wallet_mgr'].wallets))
+
         # Add profit taking loop if enabled
         if 'profit_mgr' in self.modules:
             tasks.append(self._profit_taking_loop())
@@ -278,8 +398,16 @@ class PolymarketBot:
         if 'repositioner' in self.modules:
             tasks.append(self._order_repositioning_loop())
 
+        # Add periodic state snapshots if enabled
+        if 'state_store' in self.modules:
+            tasks.append(self.modules['state_store'].run())
+
+        self.phase = 'running'
+        self._tasks = asyncio.gather(*tasks)
         try:
-            await asyncio.gather(*tasks)
+            await self._tasks
+        except asyncio.CancelledError:
+            pass  # Loops stopped by shutdown()
         except Exception as e:
             logger.error(f"Bot error: {e}")
             await self.shutdown()
@@ -345,7 +473,8 @@ class PolymarketBot:
                 # Record scan metrics
                 monitoring.record_market_scan(len(markets))
 
-                # Filter and score markets
+                # Filter and score markets (capital already held by trading markets is reserved)
+                self.modules['risk_mgr'].allocator.set_holdings(self.modules['execution'].get_holdings())
                 selected_markets = await selector.select_markets(markets)
 
                 # Send notification AFTER filtering (only show qualifying markets)
@@ -385,17 +514,17 @@ class PolymarketBot:
                 await asyncio.sleep(10)
     
     async def _order_management_loop(self):
-        """Manage order placement and updates"""
+        """Filter pending orders and dispatch them to per-wallet execution workers"""
         order_mgr = self.modules['order_mgr']
-        wallet_mgr = self.modules['wallet_mgr']
+        execution = self.modules['execution']
 
         logger.info("📦 Starting order management loop")
 
+        # Start one worker per wallet
+        await execution.start()
+
         while self.running:
             try:
-                # Get active wallet
-                wallet = await wallet_mgr.get_next_wallet()
-
                 # Check pending orders
                 pending_orders = await order_mgr.get_pending_orders()
 
@@ -412,15 +541,14 @@ class PolymarketBot:
                         logger.debug(f"ML prediction for {order['market_id']}: fill_probability={fill_probability:.2%}")
 
                         if fill_probability < self.config['ml_prediction']['fill_risk_threshold']:
-                            # Place order
-                            logger.info(f"📤 Placing order for market {order['market_id']}")
-                            result = await order_mgr.place_order(order, wallet)
+                            # Dispatch to a wallet worker (placement happens concurrently)
+                            wallet_address = execution.dispatch(order)
 
-                            if result:
-                                logger.info(f"✅ Order placed successfully: {result}")
+                            if wallet_address:
+                                logger.info(f"📤 Dispatched order for market {order['market_id']} to wallet {wallet_address[:10]}...")
                                 processed_orders.append(order)
                             else:
-                                logger.warning(f"⚠️  Failed to place order for {order['market_id']}")
+                                logger.debug(f"⏳ No wallet capacity for {order['market_id']}, keeping in queue")
                         else:
                             logger.info(f"⏭️  Skipping high-risk order {order['market_id']} (fill_probability={fill_probability:.2%})")
                             processed_orders.append(order)
@@ -459,6 +587,7 @@ class PolymarketBot:
                     
                     if should_cancel:
                         await order_mgr.cancel_order(position['order_id'])
+                        self.modules['execution'].release_market(position['market_id'])
                         logger.info(f"Cancelled order {position['order_id']} due to market conditions")
                         self.performance_stats['cancelled_orders'] += 1
                 
@@ -655,6 +784,9 @@ class PolymarketBot:
 
         logger.info("🏥 Starting health monitoring loop")
 
+        # Start background system metrics sampler
+        await monitoring.start()
+
         while self.running:
             try:
                 # Check health status
@@ -710,6 +842,16 @@ class PolymarketBot:
                 logger.error(f"Hourly report error: {e}")
                 await asyncio.sleep(3600)  # Retry in 1 hour
 
+    def _on_circuit_breaker_state_change(self, name: str, state: str):
+        """Forward circuit breaker OPEN/CLOSED transitions to Telegram"""
+        telegram = self.modules.get('telegram')
+        if not telegram:
+            return
+        try:
+            asyncio.get_running_loop().create_task(telegram.notify_circuit_breaker(name, state.upper()))
+        except RuntimeError:
+            pass  # No running loop (breaker used from sync context)
+
     async def _jittered_sleep(self, base_seconds: float):
         """Sleep with random jitter to appear more human-like"""
         jitter = random.uniform(-0.2, 0.2) * base_seconds
@@ -753,21 +895,80 @@ class PolymarketBot:
         except Exception as e:
             logger.error(f"Failed to send performance report: {e}")
     
+    def get_health_snapshot(self) -> Dict:
+        """Health snapshot served to the supervisor (see health_server.py)"""
+        now = time.time()
+        snapshot = {
+            'pid': os.getpid(),
+            'time': now,
+            'phase': self.phase,
+            'started_at': self.started_at,
+            'uptime': now - self.started_at,
+            'warm_start': self.warm_start,
+        }
+
+        if 'monitoring' in self.modules:
+            watchdog = self.modules['monitoring'].watchdog
+            snapshot['loop'] = {
+                **watchdog.get_lag_stats(),
+                'stalls_60s': len(watchdog.get_recent_stalls(60)),
+            }
+
+        if 'order_mgr' in self.modules:
+            order_mgr = self.modules['order_mgr']
+            snapshot['orders'] = {
+                'first_placed_at': order_mgr.first_placement_time,
+                'last_placed_at': order_mgr.last_placement_time,
+                'active_markets': len(order_mgr.active_orders),
+                'pending': len(order_mgr.pending_orders),
+            }
+
+        if 'orderbook_ws' in self.modules:
+            snapshot['websocket'] = self.modules['orderbook_ws'].get_freshness()
+
+        return snapshot
+
     def _shutdown_handler(self, signum, frame):
         """Handle shutdown signals"""
         logger.info("Shutdown signal received")
         asyncio.create_task(self.shutdown())
-    
-    async def shutdown(self):
-        """Graceful shutdown"""
+
+    def _handover_handler(self, signum, frame):
+        """Handle supervisor restart signal (warm handover)"""
+        logger.info("Handover signal received")
+        asyncio.create_task(self.shutdown(handover=True))
+
+    async def shutdown(self, handover: bool = False):
+        """Graceful shutdown
+
+        Args:
+            handover: Leave open orders in place for the next process, which
+                restores them from the final state snapshot (supervisor restart)
+        """
         logger.info("Shutting down bot...")
         self.running = False
-
-        # Cancel all open orders
-        try:
-            await self.modules['order_mgr'].cancel_all_orders()
-        except:
-            pass
+        self.phase = 'stopping'
+
+        if handover and 'state_store' not in self.modules:
+            logger.warning("⚠️  State persistence disabled - cancelling orders instead of handing them over")
+            handover = False
+
+        # Cancel open orders on all wallets concurrently (verified by re-listing)
+        cancel_config = self.config.get('order_management', {}).get('order_cancellation', {})
+        scope = 'none' if handover else cancel_config.get('on_shutdown', 'all')
+        if handover:
+            logger.info(f"🤝 Handing over {len(self.modules['order_mgr'].active_orders)} active markets")
+        if scope != 'none' and 'order_mgr' in self.modules:
+            wallets = self.modules['wallet_mgr'].wallets if scope == 'all' and 'wallet_mgr' in self.modules else None
+            try:
+                await asyncio.wait_for(
+                    self.modules['order_mgr'].cancel_all_orders(wallets=wallets),
+                    timeout=cancel_config.get('shutdown_timeout', 30)
+                )
+            except asyncio.TimeoutError:
+                logger.error("❌ Timed out cancelling open orders on shutdown")
+            except Exception as e:
+                logger.error(f"❌ Failed to cancel open orders on shutdown: {e}")
 
         # Log final reward statistics if reward manager is active
         if 'reward_mgr' in self.modules:
@@ -779,17 +980,33 @@ class PolymarketBot:
             except:
                 pass
 
-        # Close all connections
-        for module in self.modules.values():
-            if hasattr(module, 'close'):
+        # Close all connections (Telegram last so it can flush queued notifications)
+        for name, module in self.modules.items():
+            if name != 'telegram' and hasattr(module, 'close'):
                 await module.close()
 
+        if 'telegram' in self.modules:
+            await self.modules['telegram'].close()
+
         logger.info("Bot shutdown complete")
 
+        # Flush queued log records last
+        self.log_pipeline.stop()
+
+        # Stop the long-running loops so the process exits
+        if self._tasks is not None:
+            self._tasks.cancel()
+
 
 async def main():
     """Main entry point"""
-    bot = PolymarketBot('config.yaml')
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Polymarket Trading Bot')
+    parser.add_argument('--config', default='config.yaml', help='Config file path')
+    args = parser.parse_args()
+
+    bot = PolymarketBot(args.config)
     await bot.start()
 
 
@@ -11,7 +11,10 @@ import logging
 from typing import List, Dict, Optional
 import json
 import time
-from circuit_breaker import CircuitBreaker, CircuitBreakerOpenError
+from circuit_breaker import CircuitBreakerOpenError, get_circuit_breaker
+from rate_limiter import get_rate_limiter
+from structured_logging import log_event
+from category_classifier import CategoryClassifier
 from playwright_rewards_scraper import PlaywrightRewardsScraper
 from py_clob_client.client import ClobClient
 from py_clob_client.exceptions import PolyApiException
@@ -34,12 +37,17 @@ class MarketScannerV2:
             self.min_reward = config.get('min_reward', 10)  # Default 10 (match config.yaml)
             self.max_competition = config.get('max_competition_bars', 3)  # Default 3 (match config.yaml)
             self.target_categories = config.get('target_categories', [])
+            category_word_boundary = config.get('category_word_boundary', False)
         else:
             # Nested config (for backward compatibility)
             scanner_config = config.get('market_scanner', {})
             self.min_reward = scanner_config.get('min_reward', 10)  # Default 10
             self.max_competition = scanner_config.get('max_competition_bars', 3)  # Default 3
             self.target_categories = scanner_config.get('target_categories', [])
+            category_word_boundary = scanner_config.get('category_word_boundary', False)
+
+        # Compiled keyword classifier shared with WebRewardsScraper (memoised per market)
+        self.category_classifier = CategoryClassifier(word_boundary=category_word_boundary)
 
         # Log the actual values being used
         logger.info(f"📊 Market Scanner initialized with:")
@@ -53,6 +61,7 @@ class MarketScannerV2:
         self.browser = None
         self.context = None
         self._clob_warning_shown = False  # Track if we've shown CLOB warning
+        self.rate_limiter = get_rate_limiter()  # Shared API rate budgets
 
         # Initialize CLOB client for orderbook verification
         clob_config = config.get('clob', {})
@@ -69,19 +78,8 @@ class MarketScannerV2:
         # Initialize Playwright Rewards Scraper (primary source - scrapes /rewards page!)
         self.playwright_scraper = PlaywrightRewardsScraper()
 
-        # Initialize circuit breakers
-        self.playwright_breaker = CircuitBreaker(
-            name="playwright_scraper",
-            failure_threshold=3,
-            timeout_seconds=60,
-            success_threshold=2
-        )
-        self.playwright_breaker = CircuitBreaker(
-            name="playwright_scraper",
-            failure_threshold=3,
-            timeout_seconds=120,
-            success_threshold=2
-        )
+        # Circuit breaker from the shared registry (threshold=3, timeout=120s, see circuit_breaker.DEFAULT_BREAKERS)
+        self.playwright_breaker = get_circuit_breaker('playwright_scraper')
         
     async def initialize(self):
         """Initialize Playwright browser"""
@@ -165,6 +163,8 @@ class MarketScannerV2:
                         if i % 10 == 0:
                             logger.info(f"   Progress: {i}/{top_count} markets verified...")
 
+                        # Pace CLOB reads through the shared rate limiter
+                        await self.rate_limiter.acquire('clob_read')
                         has_orderbook = await self._verify_orderbook_exists(market)
                         if has_orderbook:
                             verified_markets.append(market)
@@ -172,9 +172,6 @@ class MarketScannerV2:
                             no_orderbook_count += 1
                             logger.debug(f"❌ Rejected (no orderbook): {market['question'][:50]}")
 
-                        # Add small delay to avoid rate limiting (100ms between requests)
-                        await asyncio.sleep(0.1)
-
                     except Exception as e:
                         error_count += 1
                         logger.warning(f"⚠️  Error verifying market {i}/{top_count}: {market.get('question', 'unknown')[:50]} - {e}")
@@ -211,7 +208,9 @@ class MarketScannerV2:
                 '_limit': 100  # Fixed: was 'limit', should be '_limit'
             }
 
+            await self.rate_limiter.acquire('gamma')
             async with session.get(self.api_url, params=params, timeout=10) as response:
+                self.rate_limiter.record_response('gamma', response.status, response.headers.get('Retry-After'))
                 if response.status == 200:
                     data = await response.json()
 
@@ -424,13 +423,13 @@ class MarketScannerV2:
             # Check reward threshold
             if market['reward'] < self.min_reward:
                 rejected_reasons['low_reward'] += 1
-                logger.debug(f"❌ Rejected (low reward): {market['question'][:50]} - Reward: ${market['reward']:.0f} < ${self.min_reward}")
+                logger.debug("❌ Rejected (low reward): %.50s - Reward: $%.0f < $%s", market['question'], market['reward'], self.min_reward)
                 continue
 
             # Check competition level
             if market['competition_bars'] > self.max_competition:
                 rejected_reasons['high_competition'] += 1
-                logger.debug(f"❌ Rejected (high competition): {market['question'][:50]} - Competition: {market['competition_bars']} > {self.max_competition}")
+                logger.debug("❌ Rejected (high competition): %.50s - Competition: %s > %s", market['question'], market['competition_bars'], self.max_competition)
                 continue
 
             # Check category filter (if configured AND category field exists)
@@ -439,14 +438,14 @@ class MarketScannerV2:
                 # Only apply category filter if category field exists
                 if market_category is not None and market_category not in self.target_categories:
                     rejected_reasons['wrong_category'] += 1
-                    logger.debug(f"❌ Rejected (wrong category): {market['question'][:50]} - Category: '{market_category}' not in {self.target_categories}")
+                    logger.debug("❌ Rejected (wrong category): %.50s - Category: '%s' not in %s", market['question'], market_category, self.target_categories)
                     continue
 
             # ✅ NEW FILTER 1: Check if market has clob_token_ids
             clob_token_ids = market.get('clob_token_ids', [])
             if not clob_token_ids or len(clob_token_ids) == 0:
                 rejected_reasons['no_clob_tokens'] += 1
-                logger.debug(f"❌ Rejected (no clob_token_ids): {market['question'][:50]} - ID: {market.get('id')}")
+                logger.debug("❌ Rejected (no clob_token_ids): %.50s - ID: %s", market['question'], market.get('id'))
                 continue
 
             # ✅ NEW FILTER 1.4: Reject categorical event outcomes
@@ -458,7 +457,7 @@ class MarketScannerV2:
                 if 'categorical_outcome' not in rejected_reasons:
                     rejected_reasons['categorical_outcome'] = 0
                 rejected_reasons['categorical_outcome'] += 1
-                logger.debug(f"❌ Rejected (categorical event outcome): {market['question'][:50]} - event_slug != market_slug")
+                logger.debug("❌ Rejected (categorical event outcome): %.50s - event_slug != market_slug", market['question'])
                 continue
 
             # ✅ NEW FILTER 1.5: Only accept BINARY markets (exactly 2 tokens)
@@ -468,16 +467,16 @@ class MarketScannerV2:
                     rejected_reasons['categorical_market'] = 0
                 rejected_reasons['categorical_market'] += 1
                 if len(clob_token_ids) > 2:
-                    logger.debug(f"❌ Rejected (categorical market): {market['question'][:50]} - {len(clob_token_ids)} tokens (not binary YES/NO)")
+                    logger.debug("❌ Rejected (categorical market): %.50s - %d tokens (not binary YES/NO)", market['question'], len(clob_token_ids))
                 else:
-                    logger.debug(f"❌ Rejected (invalid market): {market['question'][:50]} - only {len(clob_token_ids)} token(s)")
+                    logger.debug("❌ Rejected (invalid market): %.50s - only %d token(s)", market['question'], len(clob_token_ids))
                 continue
 
             # ✅ NEW FILTER 2: Check if market has volume > 0
             volume = market.get('volume', 0) or market.get('volume_24hr', 0)
             if volume <= 0:
                 rejected_reasons['no_volume'] += 1
-                logger.debug(f"❌ Rejected (no volume): {market['question'][:50]} - Volume: {volume}")
+                logger.debug("❌ Rejected (no volume): %.50s - Volume: %s", market['question'], volume)
                 continue
 
             # Add score for ranking
@@ -485,17 +484,28 @@ class MarketScannerV2:
 
             filtered.append(market)
 
-            # Log detailed acceptance info with reward verification
-            logger.info(f"✅ ACCEPTED: {market['question'][:60]}")
-            logger.info(f"   - Category: {market.get('category', 'unknown')}")
-            logger.info(f"   - Estimated Reward: ${market['reward']:.0f} (based on volume=${market.get('volume', 0):.0f})")
-            logger.info(f"   - Rewards Config: minSize={market.get('rewards_min_size', 0)}, maxSpread={market.get('rewards_max_spread', 0)}")
-            logger.info(f"   - Competition: {market['competition_bars']} bars, Score: {market['score']:.2f}")
-            logger.info(f"   - Source: {market.get('source', 'unknown')}")
+            # Log acceptance with reward config as one structured event
+            log_event(
+                logger, logging.INFO, 'market_accepted',
+                "✅ ACCEPTED: %(question).60s (reward $%(reward).0f, %(competition_bars)s bars, score %(score).2f)",
+                market_id=market.get('id'),
+                question=market['question'],
+                category=market.get('category', 'unknown'),
+                reward=market['reward'],
+                volume=market.get('volume', 0),
+                rewards_min_size=market.get('rewards_min_size', 0),
+                rewards_max_spread=market.get('rewards_max_spread', 0),
+                competition_bars=market['competition_bars'],
+                score=market['score'],
+                source=market.get('source', 'unknown'),
+            )
 
         # Log summary
         if len(markets) > 0:
-            logger.info(f"📊 Filter results: {len(filtered)}/{len(markets)} markets passed")
+            log_event(
+                logger, logging.INFO, 'filter_summary', "📊 Filter results: %(passed)d/%(total)d markets passed",
+                passed=len(filtered), total=len(markets), rejected={k: v for k, v in rejected_reasons.items() if v}
+            )
             if rejected_reasons['low_reward'] > 0:
                 logger.info(f"   - {rejected_reasons['low_reward']} rejected: reward < ${self.min_reward}")
             if rejected_reasons['high_competition'] > 0:
@@ -659,96 +669,15 @@ class MarketScannerV2:
         - economics: Economy, markets
         - science: Technology, research
         - other: Everything else
+
+        Keyword lists live in category_classifier.QUESTION_RULES; results are
+        memoised by condition ID + question hash across scans.
         """
-        question_lower = question.lower()
-
-        # Crypto keywords (check FIRST - most specific)
-        crypto_keywords = [
-            'bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol', 'xrp', 'ripple',
-            'crypto', 'cryptocurrency', 'up or down', 'price', 'fdv', 'market cap',
-            'metamask', 'wallet', 'defi', 'token', 'coin', 'blockchain'
-        ]
-
-        # Science/Tech keywords (check SECOND - specific)
-        science_keywords = [
-            'ai', 'artificial intelligence', 'gemini', 'chatgpt', 'gpt', 'claude',
-            'openai', 'google ai', 'deepmind', 'machine learning', 'neural network',
-            'technology', 'research', 'study', 'discovery', 'space', 'nasa',
-            'climate', 'vaccine', 'humanit', 'benchmark'
-        ]
-
-        # Politics keywords (check THIRD - specific)
-        politics_keywords = [
-            # Elections & Government
-            'election', 'president', 'senate', 'congress', 'vote', 'poll',
-            'democrat', 'republican', 'party', 'government', 'policy', 'campaign',
-
-            # Politicians (US)
-            'trump', 'biden', 'harris', 'pelosi', 'nancy pelosi', 'obama', 'clinton',
-            'desantis', 'newsom', 'pence', 'mcconnell', 'schumer', 'aoc',
-
-            # Politicians (NYC/Local)
-            'mamdani', 'nyc', 'mayor', 'city council', 'rent', 'rents',
-
-            # International Politics & Conflicts
-            'russia', 'ukraine', 'putin', 'zelensky', 'war', 'conflict', 'military',
-            'israel', 'palestine', 'gaza', 'hamas', 'iran', 'yemen', 'strike', 'attack',
-            'china', 'taiwan', 'xi jinping', 'north korea', 'kim jong',
-
-            # Political Events
-            'impeachment', 'scandal', 'investigation', 'hearing', 'testimony',
-            'shutdown', 'budget', 'debt ceiling', 'supreme court', 'justice',
-            'cabinet', 'secretary', 'ambassador', 'diplomat'
-        ]
-
-        # Entertainment keywords (check FOURTH - specific)
-        entertainment_keywords = [
-            # Movies & TV
-            'movie', 'film', 'actor', 'actress', 'celebrity', 'tv show',
-            'series', 'netflix', 'disney', 'oscar', 'emmy', 'grammy',
-            'box office', 'streaming', 'hbo', 'amazon prime',
-
-            # Celebrities & Social Media
-            'tweet', 'tweets', 'twitter', 'instagram', 'tiktok', 'viral',
-            'influencer', 'streamer', 'youtube', 'podcast',
-
-            # Specific Celebrities (if not political)
-            'ackman', 'bill ackman', 'elon musk', 'kardashian', 'swift',
-            'beyonce', 'kanye', 'drake', 'rogan'
-        ]
-
-        # Economics keywords (check FIFTH - can overlap with crypto)
-        economics_keywords = [
-            'stock', 'economy', 'gdp', 'inflation', 'fed', 'interest rate',
-            'recession', 'unemployment', 'dow', 'nasdaq', 's&p', 'treasury'
-        ]
-
-        # Sports keywords (check LAST - has generic words like "game", "score")
-        sports_keywords = [
-            'nfl', 'nba', 'mlb', 'nhl', 'soccer', 'football', 'basketball', 'baseball',
-            'hockey', 'tennis', 'golf', 'ufc', 'boxing', 'f1', 'racing', 'olympics',
-            'world cup', 'super bowl', 'playoffs', 'championship', 'premier league',
-            'la liga', 'serie a', 'bundesliga', 'champions league',
-            'esports', 'counter-strike', 'cs2', 'dota', 'league of legends', 'valorant',
-            'mobile legends', 'mlbb', 'tournament', 'qualifier'
-        ]
-
-        # Check each category in order of SPECIFICITY (most specific first)
-        # This prevents generic sports keywords from matching crypto/AI questions
-        if any(keyword in question_lower for keyword in crypto_keywords):
-            return 'crypto'
-        elif any(keyword in question_lower for keyword in science_keywords):
-            return 'science'
-        elif any(keyword in question_lower for keyword in politics_keywords):
-            return 'politics'
-        elif any(keyword in question_lower for keyword in entertainment_keywords):
-            return 'entertainment'
-        elif any(keyword in question_lower for keyword in economics_keywords):
-            return 'economics'
-        elif any(keyword in question_lower for keyword in sports_keywords):
-            return 'sports'
-        else:
-            return 'other'
+        condition_id = None
+        if event:
+            condition_id = event.get('condition_id') or event.get('conditionId') or event.get('id')
+
+        return self.category_classifier.classify(question, condition_id=condition_id)
 
 
 # Backward compatibility - alias to new scanner
@@ -5,10 +5,11 @@ Intelligent market selection using scoring algorithms
 
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
 import asyncio
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +17,12 @@ logger = logging.getLogger(__name__)
 class MarketSelectorAI:
     """AI-powered market selection and scoring"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, risk_manager=None):
         self.config = config
-        self.historical_data = []
+        self.risk_manager = risk_manager  # Capital allocation when wallet balances are known
+        self.reward_tracker = None  # Measured reward per dollar-hour (RewardTracker, set by main)
+        self.metrics_store = None  # Long-term per-market P&L (MetricsStore, set by main)
+        self.historical_data = deque(maxlen=1000)  # Recent performance updates (long-term history lives in MetricsStore)
         self.volume_baselines = {}
         self.market_performance = {}
         self.selection_threshold = 0.5  # Minimum score to select (lowered from 0.7 to accept more markets)
@@ -55,6 +59,9 @@ class MarketSelectorAI:
         try:
             # Base score components
             reward_score = self._score_reward(market['reward'])
+            observed_score = self._score_observed_reward(market)
+            if observed_score is not None:
+                reward_score = 0.5 * reward_score + 0.5 * observed_score  # What we actually earned here
             competition_score = self._score_competition(market['competition_bars'])
             volume_spike_score = await self._score_volume_spike(market)
             liquidity_score = self._score_liquidity(market.get('liquidity', 0))
@@ -107,6 +114,24 @@ class MarketSelectorAI:
         else:
             return 0.3
     
+    def _score_observed_reward(self, market: Dict) -> Optional[float]:
+        """Score measured reward per dollar-hour against the portfolio average
+
+        Attaches `observed_reward_per_dollar_hour` to the market for capital
+        allocation. Returns None until the market has enough measured exposure.
+        """
+        if not self.reward_tracker:
+            return None
+
+        market_id = market.get('market_id') or market.get('condition_id') or market.get('id')
+        stats = self.reward_tracker.get_reward_rates().get(market_id)
+        baseline = self.reward_tracker.get_portfolio_rate()
+        if not stats or not stats['confident'] or not baseline:
+            return None
+
+        market['observed_reward_per_dollar_hour'] = stats['reward_per_dollar_hour']
+        return min(0.5 * stats['reward_per_dollar_hour'] / baseline, 1.0)  # Portfolio average scores 0.5
+
     def _score_competition(self, bars: int) -> float:
         """Score based on competition level (inverse)"""
         competition_scores = {
@@ -251,6 +276,9 @@ class MarketSelectorAI:
         market_selection_config = self.config.get('market_selection', {})
         max_total = market_selection_config.get('max_concurrent_markets', 10)
 
+        if self.risk_manager and self.risk_manager.allocator.wallets:
+            return self._allocate_portfolio(markets, max_total)
+
         for market in markets:
             # Check total limit (IMPORTANT: respects max_concurrent_markets)
             if len(selected) >= max_total:
@@ -270,6 +298,41 @@ class MarketSelectorAI:
 
         return selected
     
+    def _allocate_portfolio(self, markets: List[Dict], max_total: int) -> List[Dict]:
+        """Select markets by reward per dollar under wallet and exposure limits
+
+        Correlated markets are dropped from the allocator one at a time and the
+        allocation is re-solved, so the freed capital goes to the next best market.
+        """
+        by_id = {
+            (m.get('market_id') or m.get('condition_id') or m.get('id', 'unknown')): m
+            for m in markets
+        }
+        allocation = self.risk_manager.allocate_markets(markets, max_total)
+
+        while True:
+            selected = []
+            correlated = None
+            for market_id in allocation:
+                market = by_id[market_id]
+                if self._is_correlated(market, selected):
+                    correlated = market_id
+                    break
+                selected.append(market)
+
+            if correlated is None:
+                break
+
+            self.risk_manager.allocator.remove(correlated)
+            allocation = self.risk_manager.allocator.solve(max_total)
+
+        for market in selected:
+            market_id = market.get('market_id') or market.get('condition_id') or market.get('id', 'unknown')
+            market['allocated_capital'] = allocation[market_id]['capital']
+            market['allocated_wallet'] = allocation[market_id]['wallet']
+
+        return selected
+
     def _is_correlated(self, market: Dict, selected: List[Dict]) -> bool:
         """Check if market is correlated with already selected markets"""
         for selected_market in selected:
@@ -311,6 +374,8 @@ class MarketSelectorAI:
             'timestamp': datetime.utcnow(),
             'performance': performance
         })
+        if self.metrics_store and 'pnl' in performance:
+            self.metrics_store.record('market_pnl', performance['pnl'], market_id)
     
     def get_selection_stats(self) -> Dict:
         """Get statistics about market selection"""
@@ -321,6 +386,14 @@ class MarketSelectorAI:
             'volume_baselines': len(self.volume_baselines)
         }
     
+    def get_state(self) -> Dict:
+        """Runtime state for StateStore snapshots"""
+        return {'volume_baselines': self.volume_baselines}
+
+    def restore_state(self, state: Dict):
+        """Restore runtime state from a StateStore snapshot"""
+        self.volume_baselines = state.get('volume_baselines', {})
+
     def _get_category_stats(self) -> Dict:
         """Get category-wise statistics"""
         stats = {}
@@ -0,0 +1,269 @@
+"""
+Metrics Store Module
+Embedded SQLite time series with automatic 1m/1h/1d rollups and per-resolution retention
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MINUTE, HOUR, DAY = 60, 3600, 86400
+RESOLUTIONS = (DAY, HOUR, MINUTE)  # Coarsest first
+RAW = 0  # Cover ranges read from raw points
+
+
+class MetricsStore:
+    """Time-series store for performance metrics
+
+    Each point is (timestamp, metric, key, value); `key` splits a metric by
+    e.g. category or error type ('' when unused). Points are buffered and
+    written in one transaction per flush: the raw row plus an upsert into the
+    1-minute, 1-hour and 1-day rollup of its key (count, sum, min, max).
+
+    `aggregate()` covers an interval with the coarsest aligned buckets (whole
+    days, then whole hours, then whole minutes at the edges), so a daily P&L
+    reads one row per key; only the sub-minute remainders at the two edges are
+    read from raw points, so the result is exact for any [start, end). Minute
+    and raw rows expire after a few days, hours and days are kept longer;
+    edges older than those retentions are missing, which shrinks such
+    intervals to the whole buckets still kept.
+
+    All calls run on the event loop thread; a flush is one short transaction.
+    """
+
+    def __init__(self, config: dict):
+        """Initialize store
+
+        Args:
+            config: `metrics_store` section of config.yaml
+        """
+        self.enabled = config.get('enabled', True)
+        self.path = config.get('path', 'data/metrics.db')
+        self.flush_interval = config.get('flush_interval', 10)  # seconds
+        self.max_buffer = config.get('max_buffer', 500)  # points before an early flush
+        self.retention = {
+            'raw': config.get('raw_retention_days', 2) * DAY,
+            MINUTE: config.get('minute_retention_days', 3) * DAY,
+            HOUR: config.get('hour_retention_days', 90) * DAY,
+            DAY: config.get('day_retention_days', 730) * DAY,
+        }
+
+        self.buffer: List[Tuple[float, str, str, float]] = []
+        self.last_prune = 0.0
+        self.points_written = 0
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS points (
+                ts REAL NOT NULL, metric TEXT NOT NULL, key TEXT NOT NULL, value REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS points_metric_ts ON points (metric, ts);
+            CREATE TABLE IF NOT EXISTS rollups (
+                resolution INTEGER NOT NULL, metric TEXT NOT NULL, key TEXT NOT NULL, bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL, sum REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL,
+                PRIMARY KEY (resolution, metric, key, bucket)
+            ) WITHOUT ROWID;
+        """)
+
+    def record(self, metric: str, value: float = 1.0, key: str = '', timestamp: Optional[float] = None):
+        """Buffer one point (written on the next flush)"""
+        if not self.enabled:
+            return
+        self.buffer.append((timestamp or time.time(), metric, str(key), float(value)))
+        if len(self.buffer) >= self.max_buffer:
+            self.flush()
+
+    def flush(self):
+        """Write buffered points and their rollups in one transaction"""
+        if not self.buffer:
+            return
+        points, self.buffer = self.buffer, []
+
+        rollups: Dict[Tuple[int, str, str, int], List[float]] = {}
+        for ts, metric, key, value in points:
+            for resolution in RESOLUTIONS:
+                slot_key = (resolution, metric, key, int(ts // resolution) * resolution)
+                slot = rollups.get(slot_key)
+                if slot is None:
+                    rollups[slot_key] = [1, value, value, value]
+                else:
+                    slot[0] += 1
+                    slot[1] += value
+                    slot[2] = min(slot[2], value)
+                    slot[3] = max(slot[3], value)
+
+        with self.db:
+            self.db.executemany('INSERT INTO points VALUES (?, ?, ?, ?)', points)
+            self.db.executemany(
+                """INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (resolution, metric, key, bucket) DO UPDATE SET
+                       count = count + excluded.count, sum = sum + excluded.sum,
+                       min = MIN(min, excluded.min), max = MAX(max, excluded.max)""",
+                [(*slot_key, *slot) for slot_key, slot in rollups.items()]
+            )
+        self.points_written += len(points)
+
+    @staticmethod
+    def _cover(start: float, end: float, resolutions=RESOLUTIONS) -> List[Tuple[int, float, float]]:
+        """(resolution, first_bucket, end_bucket) ranges covering exactly [start, end)
+
+        Whole buckets only; what is left at the edges below a minute comes back
+        as (RAW, start, end) ranges of raw point timestamps.
+        """
+        resolution, finer = resolutions[0], resolutions[1:]
+
+        def edge(lo, hi):
+            return MetricsStore._cover(lo, hi, finer) if finer else [(RAW, lo, hi)]
+
+        lo, hi = math.ceil(start / resolution) * resolution, int(end // resolution) * resolution
+        if lo >= hi:
+            return edge(start, end)
+        ranges = [(resolution, lo, hi)]
+        if start < lo:
+            ranges += edge(start, lo)
+        if hi < end:
+            ranges += edge(hi, end)
+        return ranges
+
+    def aggregate(self, metric: str, start: float, end: Optional[float] = None,
+                  key: Optional[str] = None, group_by_key: bool = False) -> Dict:
+        """Count, sum, min, max and mean of a metric over [start, end)
+
+        Args:
+            metric: Metric name
+            start: Interval start (epoch seconds)
+            end: Interval end (default now)
+            key: Only this key (default all keys)
+            group_by_key: Return {key: aggregate} instead of one aggregate
+
+        Returns:
+            {'count', 'sum', 'min', 'max', 'mean'} (or a dict of them per key)
+        """
+        self.flush()
+        end = end or time.time()
+        ranges = self._cover(start, end)
+        buckets = [r for r in ranges if r[0] != RAW]
+        edges = [r[1:] for r in ranges if r[0] == RAW]
+        key_filter = ' AND key = ?' if key is not None else ''
+        key_params = [str(key)] if key is not None else []
+
+        rows = []
+        if buckets:
+            where = ' OR '.join('(resolution = ? AND bucket >= ? AND bucket < ?)' for _ in buckets)
+            rows += self.db.execute(
+                f"""SELECT key, SUM(count), SUM(sum), MIN(min), MAX(max) FROM rollups
+                    WHERE metric = ? AND ({where}){key_filter} GROUP BY key""",
+                [metric, *(v for r in buckets for v in r), *key_params]
+            ).fetchall()
+        if edges:
+            where = ' OR '.join('(ts >= ? AND ts < ?)' for _ in edges)
+            rows += self.db.execute(
+                f"""SELECT key, COUNT(*), SUM(value), MIN(value), MAX(value) FROM points
+                    WHERE metric = ? AND ({where}){key_filter} GROUP BY key""",
+                [metric, *(v for r in edges for v in r), *key_params]
+            ).fetchall()
+        per_key: Dict[str, List] = {}  # Bucket and edge rows of a key merged
+        for row_key, count, total, low, high in rows:
+            if not count:
+                continue
+            merged = per_key.get(row_key)
+            if merged is None:
+                per_key[row_key] = [count, total, low, high]
+            else:
+                merged[0] += count
+                merged[1] += total
+                merged[2] = min(merged[2], low)
+                merged[3] = max(merged[3], high)
+
+        def summary(count, total, low, high):
+            return {'count': count or 0, 'sum': total or 0.0, 'min': low, 'max': high,
+                    'mean': total / count if count else 0.0}
+
+        if group_by_key:
+            return {row_key: summary(*merged) for row_key, merged in per_key.items()}
+        merged = list(per_key.values())
+        return summary(
+            sum(m[0] for m in merged), sum(m[1] for m in merged),
+            min((m[2] for m in merged), default=None), max((m[3] for m in merged), default=None)
+        )
+
+    def series(self, metric: str, resolution: int, start: float, end: Optional[float] = None,
+               key: Optional[str] = None) -> Dict[int, Dict]:
+        """Per-bucket aggregates of one resolution (MINUTE, HOUR or DAY)
+
+        Returns:
+            bucket start (epoch seconds) -> {'count', 'sum', 'min', 'max', 'mean'}
+        """
+        self.flush()
+        params = [resolution, metric, int(start // resolution) * resolution, end or time.time()]
+        key_filter = ''
+        if key is not None:
+            key_filter = ' AND key = ?'
+            params.append(str(key))
+
+        rows = self.db.execute(
+            f"""SELECT bucket, SUM(count), SUM(sum), MIN(min), MAX(max) FROM rollups
+                WHERE resolution = ? AND metric = ? AND bucket >= ? AND bucket < ?{key_filter}
+                GROUP BY bucket ORDER BY bucket""",
+            params
+        ).fetchall()
+        return {
+            bucket: {'count': count, 'sum': total, 'min': low, 'max': high, 'mean': total / count if count else 0.0}
+            for bucket, count, total, low, high in rows
+        }
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Apply retention to raw points and each rollup resolution; returns rows removed"""
+        now = now or time.time()
+        self.flush()
+        with self.db:
+            removed = self.db.execute('DELETE FROM points WHERE ts < ?', (now - self.retention['raw'],)).rowcount
+            for resolution in RESOLUTIONS:
+                removed += self.db.execute(
+                    'DELETE FROM rollups WHERE resolution = ? AND bucket < ?',
+                    (resolution, now - self.retention[resolution])
+                ).rowcount
+        self.last_prune = now
+        return removed
+
+    async def run(self):
+        """Flush every flush_interval and prune hourly"""
+        if not self.enabled:
+            return
+
+        logger.info(f"🗄️  Metrics store started ({self.path}, flush every {self.flush_interval}s)")
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+                if time.time() - self.last_prune > HOUR:
+                    removed = self.prune()
+                    if removed:
+                        logger.info(f"🧹 Pruned {removed} expired metric rows")
+            except sqlite3.Error as e:
+                logger.error(f"Metrics store error: {e}")
+
+    async def close(self):
+        """Flush and close the database"""
+        try:
+            self.flush()
+        finally:
+            self.db.close()
+
+    def get_stats(self) -> Dict:
+        """Get store statistics"""
+        return {
+            'points_written': self.points_written,
+            'buffered': len(self.buffer),
+            'rollup_rows': self.db.execute('SELECT COUNT(*) FROM rollups').fetchone()[0],
+        }
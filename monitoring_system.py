@@ -5,11 +5,14 @@ Theo dõi health, performance, và gửi alerts khi có vấn đề
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from collections import deque
-import psutil
-import os
+
+from system_metrics_sampler import SystemMetricsSampler
+from loop_watchdog import LoopWatchdog
+from circuit_breaker import get_circuit_breaker_registry
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +40,7 @@ class MonitoringSystem:
             'errors': deque(maxlen=100),
             'api_response_times': deque(maxlen=100),
         }
+        self.metrics_store = None  # Rolled-up history for reports (MetricsStore, set by main)
         
         # Health status
         self.health_status = {
@@ -48,6 +52,10 @@ class MonitoringSystem:
             'system_cpu_percent': 0,
             'system_memory_percent': 0,
             'bot_memory_mb': 0,
+            'open_fds': 0,
+            'asyncio_tasks': 0,
+            'loop_lag_ms': 0,
+            'gc_pause_max_ms': 0,
         }
         
         # Alert thresholds
@@ -58,8 +66,27 @@ class MonitoringSystem:
             'max_memory_percent': 80,
             'max_api_response_time': 10.0,  # seconds
             'min_scan_interval': 60,  # seconds - alert if no scan in 60s
+            'max_loop_lag_ms': 500,  # event loop blocked > 0.5s
+            'critical_stall_ms': 2000,  # alert Telegram nếu loop bị block > 2s
         }
         
+        # Background system metrics sampler (non-blocking, thay cho cpu_percent(interval=1))
+        monitoring_config = config.get('monitoring', {})
+        self.sampler = SystemMetricsSampler(
+            interval=monitoring_config.get('sampler_interval', 5),
+            history_size=monitoring_config.get('sampler_history', 720)
+        )
+        
+        # Event loop watchdog - phát hiện sync calls block event loop
+        self.watchdog = LoopWatchdog(
+            interval=monitoring_config.get('watchdog_interval', 0.1),
+            stall_threshold=monitoring_config.get('stall_threshold_ms', 250) / 1000
+        )
+        self.thresholds['critical_stall_ms'] = monitoring_config.get(
+            'critical_stall_ms', self.thresholds['critical_stall_ms']
+        )
+        self.last_stall_check = datetime.now()
+        
         # Alert cooldowns (để tránh spam)
         self.last_alerts = {}
         self.alert_cooldown = 300  # 5 minutes
@@ -81,6 +108,8 @@ class MonitoringSystem:
         })
         
         self.health_status['last_market_scan'] = now
+        if self.metrics_store:
+            self.metrics_store.record('markets_scanned', markets_found)
         
         # Reset hoặc tăng consecutive zero markets
         if markets_found == 0:
@@ -98,6 +127,8 @@ class MonitoringSystem:
         })
         
         self.health_status['last_order_placed'] = now
+        if self.metrics_store:
+            self.metrics_store.record('orders_placed')
     
     def record_order_filled(self, order_id: str, profit: float):
         """Ghi nhận order được fill"""
@@ -108,6 +139,8 @@ class MonitoringSystem:
             'order_id': order_id,
             'profit': profit
         })
+        if self.metrics_store:
+            self.metrics_store.record('orders_filled', profit)
     
     def record_error(self, error_type: str, error_message: str):
         """Ghi nhận lỗi"""
@@ -120,6 +153,8 @@ class MonitoringSystem:
         })
         
         self.health_status['consecutive_errors'] += 1
+        if self.metrics_store:
+            self.metrics_store.record('errors', key=error_type)
     
     def record_api_call(self, response_time: float, success: bool):
         """Ghi nhận API call"""
@@ -130,21 +165,34 @@ class MonitoringSystem:
             'response_time': response_time,
             'success': success
         })
+        if self.metrics_store:
+            self.metrics_store.record('api_response_time', response_time, 'ok' if success else 'failed')
         
         if success:
             self.health_status['last_successful_api_call'] = now
             self.health_status['consecutive_errors'] = 0
     
+    async def start(self):
+        """Start background system metrics sampler và loop watchdog"""
+        await self.sampler.start()
+        await self.watchdog.start()
+    
+    async def close(self):
+        """Stop background system metrics sampler và loop watchdog"""
+        await self.watchdog.stop()
+        await self.sampler.stop()
+    
     def update_system_metrics(self):
-        """Cập nhật system metrics (CPU, RAM)"""
+        """Cập nhật system metrics từ sample mới nhất (không block event loop)"""
         try:
-            # System-wide metrics
-            self.health_status['system_cpu_percent'] = psutil.cpu_percent(interval=1)
-            self.health_status['system_memory_percent'] = psutil.virtual_memory().percent
+            sample = self.sampler.latest
+            if sample is None:
+                # Sampler chưa chạy - lấy sample ngay (non-blocking)
+                sample = self.sampler.sample()
             
-            # Bot process metrics
-            process = psutil.Process(os.getpid())
-            self.health_status['bot_memory_mb'] = process.memory_info().rss / 1024 / 1024
+            for key in ('system_cpu_percent', 'system_memory_percent', 'bot_memory_mb',
+                        'open_fds', 'asyncio_tasks', 'loop_lag_ms', 'gc_pause_max_ms'):
+                self.health_status[key] = sample[key]
             
         except Exception as e:
             logger.debug(f"Failed to update system metrics: {e}")
@@ -216,6 +264,34 @@ class MonitoringSystem:
                     'message': f"⚠️ API chậm: {avg_response_time:.1f}s trung bình"
                 })
         
+        # Check 7: Event loop lag
+        if self.health_status['loop_lag_ms'] > self.thresholds['max_loop_lag_ms']:
+            issues.append({
+                'severity': 'warning',
+                'type': 'loop_lag',
+                'message': f"⚠️ Event loop lag: {self.health_status['loop_lag_ms']:.0f}ms"
+            })
+        
+        # Check 8: Event loop stalls since last check (watchdog)
+        stalls = self.watchdog.get_recent_stalls((now - self.last_stall_check).total_seconds())
+        self.last_stall_check = now
+        if stalls:
+            worst = max(stalls, key=lambda s: s['duration_ms'])
+            offenders = ", ".join(
+                f"{o['module']} ({o['count']}x, {o['total_ms']:.0f}ms)"
+                for o in self.watchdog.get_top_offenders(3)
+            )
+            severity = 'critical' if worst['duration_ms'] >= self.thresholds['critical_stall_ms'] else 'warning'
+            issues.append({
+                'severity': severity,
+                'type': 'loop_stall',
+                'message': (
+                    f"{'🔴' if severity == 'critical' else '⚠️'} Event loop bị block {len(stalls)} lần, "
+                    f"lâu nhất {worst['duration_ms']:.0f}ms tại {worst['location']}\n"
+                    f"   Top offenders: {offenders}"
+                )
+            })
+        
         # Send alerts for critical issues
         for issue in issues:
             if issue['severity'] == 'critical':
@@ -224,7 +300,8 @@ class MonitoringSystem:
         return {
             'healthy': len([i for i in issues if i['severity'] == 'critical']) == 0,
             'issues': issues,
-            'metrics': self.health_status
+            'metrics': self.health_status,
+            'watchdog': self.watchdog.get_stats()
         }
     
     async def _send_alert_with_cooldown(self, alert_type: str, message: str):
@@ -256,35 +333,48 @@ class MonitoringSystem:
         Returns:
             Dict với statistics
         """
-        now = datetime.now()
-        cutoff = now - timedelta(minutes=time_window_minutes)
-        
-        # Filter metrics trong time window
-        recent_scans = [m for m in self.metrics['markets_scanned'] if m['timestamp'] > cutoff]
-        recent_found = [m for m in self.metrics['markets_found'] if m['timestamp'] > cutoff]
-        recent_orders = [m for m in self.metrics['orders_placed'] if m['timestamp'] > cutoff]
-        recent_fills = [m for m in self.metrics['orders_filled'] if m['timestamp'] > cutoff]
-        recent_errors = [m for m in self.metrics['errors'] if m['timestamp'] > cutoff]
+        if self.metrics_store:
+            # Pre-aggregated buckets + raw points ở hai mép: đúng cửa sổ, không bị giới hạn bởi 100 mẫu cuối
+            start = time.time() - time_window_minutes * 60
+            scans = self.metrics_store.aggregate('markets_scanned', start)
+            fills = self.metrics_store.aggregate('orders_filled', start)
+            total_scans, total_markets_found = scans['count'], int(scans['sum'])
+            total_orders_placed = self.metrics_store.aggregate('orders_placed', start)['count']
+            total_orders_filled, total_profit = fills['count'], fills['sum']
+            total_errors = self.metrics_store.aggregate('errors', start)['count']
+        else:
+            now = datetime.now()
+            cutoff = now - timedelta(minutes=time_window_minutes)
+            
+            # Filter metrics trong time window
+            recent_scans = [m for m in self.metrics['markets_scanned'] if m['timestamp'] > cutoff]
+            recent_found = [m for m in self.metrics['markets_found'] if m['timestamp'] > cutoff]
+            recent_fills = [m for m in self.metrics['orders_filled'] if m['timestamp'] > cutoff]
+            
+            total_scans = len(recent_scans)
+            total_markets_found = sum(m['count'] for m in recent_found)
+            total_orders_placed = len([m for m in self.metrics['orders_placed'] if m['timestamp'] > cutoff])
+            total_orders_filled = len(recent_fills)
+            total_profit = sum(m['profit'] for m in recent_fills)
+            total_errors = len([m for m in self.metrics['errors'] if m['timestamp'] > cutoff])
         
         # Calculate stats
-        total_markets_found = sum(m['count'] for m in recent_found)
-        total_scans = len(recent_scans)
         avg_markets_per_scan = total_markets_found / total_scans if total_scans > 0 else 0
-        
-        total_profit = sum(m['profit'] for m in recent_fills)
-        fill_rate = len(recent_fills) / len(recent_orders) if len(recent_orders) > 0 else 0
+        fill_rate = total_orders_filled / total_orders_placed if total_orders_placed > 0 else 0
         
         return {
             'time_window_minutes': time_window_minutes,
             'total_scans': total_scans,
             'total_markets_found': total_markets_found,
             'avg_markets_per_scan': avg_markets_per_scan,
-            'total_orders_placed': len(recent_orders),
-            'total_orders_filled': len(recent_fills),
+            'total_orders_placed': total_orders_placed,
+            'total_orders_filled': total_orders_filled,
             'fill_rate': fill_rate,
             'total_profit': total_profit,
-            'total_errors': len(recent_errors),
-            'error_rate': len(recent_errors) / total_scans if total_scans > 0 else 0,
+            'total_errors': total_errors,
+            'error_rate': total_errors / total_scans if total_scans > 0 else 0,
+            'system': self.sampler.get_summary(seconds=time_window_minutes * 60),
+            'circuit_breakers': get_circuit_breaker_registry().get_stats(),
         }
     
     async def send_hourly_report(self):
@@ -0,0 +1,227 @@
+"""
+Online Optimizer Module
+Incrementally maintained performance aggregates and a discounted UCB bandit over strategy parameters
+"""
+
+import logging
+import math
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DecayedAggregates:
+    """Exponentially decayed sums per (dimension, key)
+
+    Each key stores its sums and the time they were last decayed. Adding a
+    record or reading a key decays the stored sums to `now` first, so both are
+    O(1) and old records fade out with `half_life` without ever rescanning the
+    history.
+    """
+
+    FIELDS = ('orders', 'filled', 'pnl', 'earnings', 'dollar_hours')
+
+    def __init__(self, half_life: float = 86400):
+        """Initialize aggregates
+
+        Args:
+            half_life: Seconds after which a record counts half
+        """
+        self.decay_rate = math.log(2) / half_life
+        self.values: Dict[tuple, List[float]] = {}  # (dimension, key) -> [updated_at, *FIELDS]
+
+    def _decayed(self, slot: List[float], now: float) -> List[float]:
+        """Decay a slot's sums to `now` in place"""
+        elapsed = now - slot[0]
+        if elapsed > 0:
+            factor = math.exp(-self.decay_rate * elapsed)
+            for i in range(1, len(slot)):
+                slot[i] *= factor
+            slot[0] = now
+        return slot
+
+    def add(self, dimension: str, key, now: float, **amounts: float):
+        """Add one record's amounts (FIELDS) to a key"""
+        slot = self.values.get((dimension, key))
+        if slot is None:
+            slot = self.values[(dimension, key)] = [now] + [0.0] * len(self.FIELDS)
+        self._decayed(slot, now)
+        for i, field in enumerate(self.FIELDS, start=1):
+            slot[i] += amounts.get(field, 0.0)
+
+    def get(self, dimension: str, key, now: float) -> Dict[str, float]:
+        """Decayed sums of one key with fill rate and reward per dollar-hour"""
+        slot = self.values.get((dimension, key))
+        sums = dict(zip(self.FIELDS, self._decayed(slot, now)[1:])) if slot else dict.fromkeys(self.FIELDS, 0.0)
+        sums['fill_rate'] = sums['filled'] / sums['orders'] if sums['orders'] else 0.0
+        sums['reward_per_dollar_hour'] = (
+            (sums['earnings'] + sums['pnl']) / sums['dollar_hours'] if sums['dollar_hours'] else None
+        )
+        return sums
+
+    def rate(self, dimension: str, key, now: float, *fields: str) -> float:
+        """Per-second rate of the summed fields
+
+        A constant rate r decays to a steady sum of r / decay_rate, so the
+        decayed sum times decay_rate estimates the recent rate.
+        """
+        sums = self.get(dimension, key, now)
+        return sum(sums[field] for field in fields) * self.decay_rate
+
+    def breakdown(self, dimension: str, now: float) -> Dict:
+        """All keys of one dimension"""
+        return {key: self.get(dim, key, now) for dim, key in list(self.values) if dim == dimension}
+
+    def prune(self, now: float, min_weight: float = 1e-3):
+        """Forget keys whose every sum has decayed below min_weight"""
+        for slot_key in list(self.values):
+            slot = self._decayed(self.values[slot_key], now)
+            if all(abs(v) < min_weight for v in slot[1:]):
+                del self.values[slot_key]
+
+
+class DiscountedUCB:
+    """Discounted UCB1 bandit over a discrete set of parameter values
+
+    Every update first discounts all arms' counts and reward sums by `discount`,
+    so the estimate tracks a drifting optimum (effective memory of about
+    1 / (1 - discount) pulls). Untried arms are pulled first; after that the arm
+    with the best mean plus an exploration bonus is chosen. Rewards should be
+    normalized to roughly 1 (e.g. relative to a portfolio baseline) so the
+    `exploration` weight is meaningful.
+    """
+
+    def __init__(self, arms: List[float], discount: float = 0.95, exploration: float = 0.5):
+        """Initialize bandit
+
+        Args:
+            arms: Candidate parameter values
+            discount: Per-update discount of past pulls (1 = stationary UCB1)
+            exploration: Weight of the confidence bonus
+        """
+        self.arms = list(arms)
+        self.discount = discount
+        self.exploration = exploration
+        self.counts = [0.0] * len(self.arms)
+        self.sums = [0.0] * len(self.arms)
+        self.current: Optional[int] = None
+
+    def select(self, pending: Iterable[int] = ()) -> int:
+        """Index of the arm to play next
+
+        Args:
+            pending: Arms played but not yet rewarded; they are not pulled again
+                as untried while other arms are
+        """
+        pending = set(pending)
+        untried = [i for i, count in enumerate(self.counts) if count == 0]
+        fresh = [i for i in untried if i not in pending]
+        played = [i for i, count in enumerate(self.counts) if count > 0]
+        if fresh or not played:
+            self.current = (fresh or untried)[0]
+            return self.current
+
+        total = sum(self.counts)
+        scores = {
+            i: self.sums[i] / self.counts[i] + self.exploration * math.sqrt(2 * math.log(max(total, 1.0)) / self.counts[i])
+            for i in played
+        }
+        self.current = max(scores, key=scores.__getitem__)
+        return self.current
+
+    def update(self, arm: int, reward: float):
+        """Record the reward observed while `arm` was played"""
+        self.counts = [count * self.discount for count in self.counts]
+        self.sums = [value * self.discount for value in self.sums]
+        self.counts[arm] += 1
+        self.sums[arm] += reward
+
+    def best(self) -> Optional[float]:
+        """Arm value with the best mean so far"""
+        played = [i for i, count in enumerate(self.counts) if count > 0]
+        if not played:
+            return None
+        return self.arms[max(played, key=lambda i: self.sums[i] / self.counts[i])]
+
+    def get_state(self) -> Dict:
+        """Runtime state for StateStore snapshots"""
+        return {'arms': self.arms, 'counts': self.counts, 'sums': self.sums, 'current': self.current}
+
+    def restore_state(self, state: Dict):
+        """Restore counts if the arm set is unchanged"""
+        if state.get('arms') == self.arms:
+            self.counts = state['counts']
+            self.sums = state['sums']
+            self.current = state.get('current')
+
+
+class ArmWindows:
+    """Play windows of bandit arms with lagged earnings attribution
+
+    Each arm plays for a window [start, end]. Exposure and P&L belong to the
+    window they happen in, but rewards are reported `credit_lag` seconds after
+    the exposure that earned them, so earnings reported at time t are credited
+    to the window that was playing at t - credit_lag. A closed window is only
+    settled (ready to score) once its last earnings have been reported.
+    """
+
+    def __init__(self, play_seconds: float = 3 * 3600, credit_lag: float = 3600):
+        """Initialize windows
+
+        Args:
+            play_seconds: Minimum time an arm plays before it is scored
+            credit_lag: Delay between exposure and the report of its earnings
+        """
+        self.play_seconds = play_seconds
+        self.credit_lag = credit_lag
+        self.windows: List[Dict] = []  # Oldest first, the last one may still be open
+
+    @property
+    def current(self) -> Optional[Dict]:
+        """The window still playing, if any"""
+        return self.windows[-1] if self.windows and self.windows[-1]['end'] is None else None
+
+    def _window_at(self, timestamp: float) -> Optional[Dict]:
+        for window in reversed(self.windows):
+            if window['start'] < timestamp and (window['end'] is None or timestamp <= window['end']):
+                return window
+        return None
+
+    def open(self, arm: int, now: float):
+        """Start playing an arm"""
+        self.windows.append({'arm': arm, 'start': now, 'end': None, 'earnings': 0.0, 'pnl': 0.0, 'dollar_hours': 0.0})
+
+    def add(self, timestamp: float, earnings: float = 0.0, pnl: float = 0.0, dollar_hours: float = 0.0, **_):
+        """Attribute one observation to the windows that earned it"""
+        window = self._window_at(timestamp)
+        if window:
+            window['pnl'] += pnl
+            window['dollar_hours'] += dollar_hours
+        window = self._window_at(timestamp - self.credit_lag)
+        if window:
+            window['earnings'] += earnings
+
+    def due(self, now: float, min_dollar_hours: float = 0.0) -> bool:
+        """Whether the open window has played long enough to be closed"""
+        window = self.current
+        return window is None or (
+            now - window['start'] >= self.play_seconds and window['dollar_hours'] >= min_dollar_hours
+        )
+
+    def close(self, now: float):
+        """End the open window"""
+        if self.current:
+            self.current['end'] = now
+
+    def settle(self, now: float) -> List[Dict]:
+        """Remove and return the closed windows whose earnings are all reported"""
+        def reported(window):
+            return window['end'] is not None and now >= window['end'] + self.credit_lag
+
+        settled = [w for w in self.windows if reported(w)]
+        self.windows = [w for w in self.windows if not reported(w)]
+        return settled
+
+    def pending_arms(self) -> List[int]:
+        """Arms of closed windows still waiting for their earnings"""
+        return [w['arm'] for w in self.windows if w['end'] is not None]
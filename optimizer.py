@@ -7,10 +7,15 @@ import logging
 import json
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 import asyncio
 
+from metrics_store import HOUR
+from online_optimizer import ArmWindows, DecayedAggregates, DiscountedUCB
+from structured_logging import log_event
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,10 +24,29 @@ class DailyOptimizer:
     
     def __init__(self, config: dict):
         self.config = config
-        self.performance_history = []
+        self.performance_history = deque()  # Time-ordered, trimmed from the left
         self.market_statistics = {}
         self.strategy_parameters = config.copy()
         self.optimization_history = []
+        self.reward_tracker = None  # Per-market reward attribution (RewardTracker, set by main)
+        self.metrics_store = None  # Rolled-up performance time series (MetricsStore, set by main)
+
+        # Online optimization: decayed aggregates updated per record, order size tuned by a bandit
+        online_config = config.get('daily_optimization', {}).get('online', {})
+        self.online_enabled = online_config.get('enabled', True)
+        self.aggregates = DecayedAggregates(online_config.get('half_life_hours', 24) * 3600)
+        self.size_bandit = DiscountedUCB(
+            online_config.get('size_multipliers', [0.6, 0.8, 1.0, 1.25, 1.5]),
+            discount=online_config.get('discount', 0.95),
+            exploration=online_config.get('exploration', 0.5)
+        )
+        self.min_arm_dollar_hours = online_config.get('min_dollar_hours', 20)  # Exposure before an arm is scored
+        self.arm_windows = ArmWindows(
+            play_seconds=online_config.get('arm_hours', 3) * 3600,
+            credit_lag=online_config.get('credit_lag_hours', 1) * 3600
+        )
+        order_config = self.strategy_parameters.get('order_management', {})
+        self.base_sizes = (order_config.get('size_min'), order_config.get('size_max'))
     
     async def optimize_daily_strategy(self):
         """Run daily optimization routine"""
@@ -31,6 +55,7 @@ class DailyOptimizer:
             
             # Analyze yesterday's performance
             performance = await self._analyze_performance()
+            performance['reward_attribution'] = self._analyze_reward_attribution()
             
             # Calculate optimization targets
             optimizations = self._calculate_optimizations(performance)
@@ -62,6 +87,9 @@ class DailyOptimizer:
             # Get yesterday's data
             yesterday = datetime.utcnow() - timedelta(days=1)
             
+            if self.metrics_store:
+                return self._analyze_performance_from_store(yesterday)
+            
             # Filter performance history
             yesterday_data = [
                 p for p in self.performance_history
@@ -105,6 +133,56 @@ class DailyOptimizer:
             logger.error(f"Performance analysis error: {e}")
             return self._default_performance()
     
+    def _analyze_performance_from_store(self, day: datetime) -> Dict:
+        """Analyze one UTC day from the metrics store's daily and hourly rollups"""
+        store = self.metrics_store
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()
+        end = start + 86400
+
+        orders = store.aggregate('order', start, end, group_by_key=True)  # value 1 = filled
+        if not orders:
+            logger.warning("No data available for yesterday")
+            return self._default_performance()
+
+        pnl = store.aggregate('pnl', start, end, group_by_key=True)
+        total_orders = sum(stats['count'] for stats in orders.values())
+        filled_orders = sum(stats['sum'] for stats in orders.values())
+        wins = store.aggregate('win', start, end)['sum']
+
+        market_breakdown = {
+            category: {
+                'count': stats['count'],
+                'filled': stats['sum'],
+                'pnl': pnl.get(category, {}).get('sum', 0),
+                'fill_rate': stats['mean']
+            }
+            for category, stats in orders.items()
+        }
+
+        hourly_pnl = store.series('pnl', HOUR, start, end)
+        hourly_performance = {
+            datetime.fromtimestamp(bucket, timezone.utc).hour: {
+                'orders': stats['count'],
+                'fills': stats['sum'],
+                'pnl': hourly_pnl.get(bucket, {}).get('sum', 0)
+            }
+            for bucket, stats in store.series('order', HOUR, start, end).items()
+        }
+
+        spread, size = store.aggregate('spread', start, end), store.aggregate('size', start, end)
+        return {
+            'date': day.isoformat(),
+            'total_orders': total_orders,
+            'filled_orders': filled_orders,
+            'fill_rate': filled_orders / total_orders,
+            'total_pnl': sum(stats['sum'] for stats in pnl.values()),
+            'win_rate': wins / filled_orders if filled_orders > 0 else 0,
+            'market_breakdown': market_breakdown,
+            'hourly_performance': hourly_performance,
+            'avg_spread': spread['mean'] if spread['count'] else 0.01,
+            'avg_size': size['mean'] if size['count'] else 250
+        }
+    
     def _default_performance(self) -> Dict:
         """Return default performance metrics"""
         return {
@@ -170,6 +248,37 @@ class DailyOptimizer:
         
         return hourly
     
+    def _analyze_reward_attribution(self) -> Dict:
+        """Analyze measured reward per dollar-hour over the last day
+
+        Markets are bucketed by the average distance of our orders from mid,
+        which shows how much reward tighter quoting actually buys.
+        """
+        if not self.reward_tracker:
+            return {}
+
+        markets = self.reward_tracker.get_reward_rates(window_hours=24)
+        by_spread = {}
+        for stats in markets.values():
+            if stats['avg_spread'] is None:
+                continue
+            bucket = f"{min(int(stats['avg_spread'] * 100), 5)}c"  # Whole cents from mid, 5c+ pooled
+            entry = by_spread.setdefault(bucket, {'earnings': 0.0, 'dollar_hours': 0.0})
+            entry['earnings'] += stats['earnings']
+            entry['dollar_hours'] += stats['dollar_hours']
+        for entry in by_spread.values():
+            entry['reward_per_dollar_hour'] = entry['earnings'] / entry['dollar_hours'] if entry['dollar_hours'] else 0
+
+        return {
+            'total_earnings': sum(stats['earnings'] for stats in markets.values()),
+            'portfolio_rate': self.reward_tracker.get_portfolio_rate(),
+            'markets': {
+                market_id: {key: stats[key] for key in ('earnings', 'dollar_hours', 'avg_spread', 'reward_per_dollar_hour')}
+                for market_id, stats in markets.items() if stats['confident']
+            },
+            'by_spread': dict(sorted(by_spread.items())),
+        }
+
     def _calculate_optimizations(self, performance: Dict) -> Dict:
         """Calculate strategy optimizations based on performance"""
         optimizations = {}
@@ -184,8 +293,10 @@ class DailyOptimizer:
         else:
             optimizations['spread_adjustment'] = 0
         
-        # Size optimization
-        if performance['win_rate'] > 0.6:  # Good win rate
+        # Size optimization (the online size bandit owns order size when enabled)
+        if self.online_enabled:
+            optimizations['size_multiplier'] = 1.0
+        elif performance['win_rate'] > 0.6:  # Good win rate
             # Increase position sizes
             optimizations['size_multiplier'] = 1.1
         elif performance['win_rate'] < 0.4:  # Poor win rate
@@ -209,6 +320,14 @@ class DailyOptimizer:
             optimizations['preferred_categories'] = [best_category]
             optimizations['avoid_categories'] = [worst_category] if market_scores[worst_category] < 0 else []
         
+        # Reward optimization: markets earning well above / below the portfolio rate
+        rewards = performance.get('reward_attribution') or {}
+        baseline = rewards.get('portfolio_rate')
+        if baseline:
+            ranked = sorted(rewards['markets'].items(), key=lambda item: item[1]['reward_per_dollar_hour'], reverse=True)
+            optimizations['reward_leaders'] = [m for m, stats in ranked if stats['reward_per_dollar_hour'] >= 1.5 * baseline]
+            optimizations['reward_laggards'] = [m for m, stats in ranked if stats['reward_per_dollar_hour'] <= 0.5 * baseline]
+        
         # Time-based optimization
         best_hours = []
         worst_hours = []
@@ -268,6 +387,11 @@ class DailyOptimizer:
             if 'avoid_categories' in optimizations:
                 self.strategy_parameters['market_blacklist'] = optimizations['avoid_categories']
             
+            # Update reward-based market preferences
+            if 'reward_leaders' in optimizations:
+                self.strategy_parameters['reward_leaders'] = optimizations['reward_leaders']
+                self.strategy_parameters['reward_laggards'] = optimizations['reward_laggards']
+            
             # Update trading hours
             if 'best_trading_hours' in optimizations:
                 self.strategy_parameters['active_hours'] = optimizations['best_trading_hours']
@@ -291,8 +415,10 @@ class DailyOptimizer:
                 'fill_rate': f"{performance['fill_rate']:.1%}",
                 'win_rate': f"{performance['win_rate']:.1%}",
                 'total_pnl': f"${performance['total_pnl']:.2f}",
-                'orders': performance['total_orders']
+                'orders': performance['total_orders'],
+                'reward_earnings': f"${(performance.get('reward_attribution') or {}).get('total_earnings', 0):.2f}"
             },
+            'reward_by_spread': (performance.get('reward_attribution') or {}).get('by_spread', {}),
             'optimizations_applied': optimizations,
             'new_parameters': {
                 'spread_range': f"{self.strategy_parameters['order_management']['spread_min']:.3f} - {self.strategy_parameters['order_management']['spread_max']:.3f}",
@@ -308,6 +434,10 @@ class DailyOptimizer:
         try:
             today = datetime.utcnow().date()
             
+            if self.metrics_store:
+                midnight = datetime(today.year, today.month, today.day, tzinfo=timezone.utc).timestamp()
+                return self.metrics_store.aggregate('pnl', midnight)['sum']
+            
             today_data = [
                 p for p in self.performance_history
                 if datetime.fromisoformat(p['timestamp']).date() == today
@@ -320,16 +450,136 @@ class DailyOptimizer:
             return 0.0
     
     def add_performance_record(self, record: Dict):
-        """Add performance record"""
-        record['timestamp'] = datetime.utcnow().isoformat()
-        self.performance_history.append(record)
-        
-        # Keep last 30 days
-        cutoff = datetime.utcnow() - timedelta(days=30)
-        self.performance_history = [
-            p for p in self.performance_history
-            if datetime.fromisoformat(p['timestamp']) > cutoff
-        ]
+        """Add performance record
+
+        Updates the online aggregates in O(1); the history itself is only kept
+        for the daily report.
+        """
+        now = datetime.utcnow()
+        record['timestamp'] = now.isoformat()
+        timestamp = now.replace(tzinfo=timezone.utc).timestamp()
+        category = record.get('category', 'unknown')
+
+        if self.metrics_store:
+            # Rolled up by the store; the daily analysis reads its buckets
+            self.metrics_store.record('order', 1.0 if record.get('filled') else 0.0, category, timestamp)
+            self.metrics_store.record('pnl', record.get('pnl', 0), category, timestamp)
+            self.metrics_store.record('win', 1.0 if record.get('pnl', 0) > 0 else 0.0, category, timestamp)
+            self.metrics_store.record('spread', record.get('spread', 0.01), category, timestamp)
+            self.metrics_store.record('size', record.get('size', 250), category, timestamp)
+        else:
+            self.performance_history.append(record)
+            
+            # Keep last 30 days
+            cutoff = now - timedelta(days=30)
+            while self.performance_history and datetime.fromisoformat(self.performance_history[0]['timestamp']) <= cutoff:
+                self.performance_history.popleft()
+
+        self._accumulate(
+            timestamp, category, record.get('market_id'),
+            orders=1.0, filled=1.0 if record.get('filled') else 0.0, pnl=record.get('pnl', 0)
+        )
+
+    def record_reward_snapshot(self, timestamp: float, rows: Dict[Tuple[str, str], Tuple]):
+        """RewardTracker listener: fold per-market earnings into the aggregates and re-tune
+
+        Args:
+            timestamp: Snapshot time (epoch seconds)
+            rows: (market_id, wallet) -> (earnings, dollar_hours, order_hours, spread_dollar_hours)
+        """
+        categories = self.reward_tracker.market_categories if self.reward_tracker else {}
+        for (market_id, _wallet), (earnings, dollar_hours, _order_hours, _spread_dh) in rows.items():
+            category = categories.get(market_id, 'unknown')
+            self._accumulate(timestamp, category, market_id, earnings=earnings, dollar_hours=dollar_hours)
+            if self.metrics_store:
+                self.metrics_store.record('reward_earnings', earnings, category, timestamp)
+                self.metrics_store.record('reward_dollar_hours', dollar_hours, category, timestamp)
+        self.retune(timestamp)
+
+    def _accumulate(self, timestamp: float, category: str, market_id: Optional[str], **amounts: float):
+        """Add one observation to every aggregate dimension and the arm window that earned it"""
+        self.aggregates.add('portfolio', 'all', timestamp, **amounts)
+        self.aggregates.add('category', category, timestamp, **amounts)
+        self.aggregates.add('hour', datetime.fromtimestamp(timestamp, timezone.utc).hour, timestamp, **amounts)
+        if market_id:
+            self.aggregates.add('market', market_id, timestamp, **amounts)
+
+        self.arm_windows.add(timestamp, **amounts)
+
+    def retune(self, now: Optional[float] = None) -> Optional[float]:
+        """Score the size multipliers whose earnings are in and pick the next one
+
+        An arm plays for at least arm_hours and until it has min_dollar_hours of
+        exposure. Its reward is the total earnings + P&L of its window per hour
+        played (not per dollar-hour, which would favour the smallest size),
+        relative to the decayed portfolio rate. Rewards are reported
+        credit_lag_hours after the exposure that earned them, so a closed
+        window is only scored once its earnings are in.
+
+        Returns:
+            The size multiplier now in effect (None if online tuning is off)
+        """
+        if not self.online_enabled or self.base_sizes[0] is None:
+            return None
+
+        now = now or datetime.now(timezone.utc).timestamp()
+        bandit, windows = self.size_bandit, self.arm_windows
+        due = bandit.current is None or windows.current is None or windows.due(now, self.min_arm_dollar_hours)
+        if due:
+            windows.close(now)
+
+        baseline = self.aggregates.rate('portfolio', 'all', now, 'earnings', 'pnl') * 3600
+        for window in windows.settle(now):
+            hours = (window['end'] - window['start']) / 3600
+            rate = (window['earnings'] + window['pnl']) / hours if hours > 0 else 0.0
+            bandit.update(window['arm'], rate / abs(baseline) if baseline else 0.0)
+
+        if not due:
+            return bandit.arms[bandit.current]
+
+        previous = bandit.current
+        arm = bandit.select(pending=windows.pending_arms())
+        windows.open(arm, now)
+        multiplier = bandit.arms[arm]
+        self._apply_size_multiplier(multiplier)
+        self.aggregates.prune(now)
+
+        if bandit.current != previous:
+            log_event(
+                logger, logging.INFO, 'size_retuned',
+                "🎰 Order size multiplier %(multiplier).2f (size %(size_min)s-%(size_max)s, best so far %(best)s)",
+                multiplier=multiplier, best=bandit.best(),
+                size_min=self.strategy_parameters['order_management']['size_min'],
+                size_max=self.strategy_parameters['order_management']['size_max']
+            )
+        return multiplier
+
+    def _apply_size_multiplier(self, multiplier: float):
+        """Scale the configured size range (shared with OrderManager's config)"""
+        base_min, base_max = self.base_sizes
+        order_config = self.strategy_parameters['order_management']
+        order_config['size_min'] = max(1, int(base_min * multiplier))
+        order_config['size_max'] = max(order_config['size_min'], int(base_max * multiplier))
+
+    def get_online_breakdown(self, dimension: str) -> Dict:
+        """Decayed aggregates of one dimension ('portfolio', 'category', 'hour' or 'market')"""
+        return self.aggregates.breakdown(dimension, datetime.now(timezone.utc).timestamp())
+
+    def get_state(self) -> Dict:
+        """Runtime state for StateStore snapshots"""
+        return {
+            'size_bandit': self.size_bandit.get_state(),
+            'arm_windows': self.arm_windows.windows,
+            'aggregates': [[dimension, key, *slot] for (dimension, key), slot in self.aggregates.values.items()],
+        }
+
+    def restore_state(self, state: Dict):
+        """Restore runtime state from a StateStore snapshot"""
+        self.size_bandit.restore_state(state.get('size_bandit', {}))
+        self.arm_windows.windows = state.get('arm_windows', [])
+        self.aggregates.values = {(entry[0], entry[1]): entry[2:] for entry in state.get('aggregates', [])}
+        if self.online_enabled and self.base_sizes[0] is not None and self.size_bandit.current is not None:
+            self._apply_size_multiplier(self.size_bandit.arms[self.size_bandit.current])
     
     def get_strategy_parameters(self) -> Dict:
         """Get current strategy parameters"""
@@ -340,6 +590,8 @@ class DailyOptimizer:
         return {
             'total_optimizations': len(self.optimization_history),
             'performance_records': len(self.performance_history),
+            'size_multiplier': self.size_bandit.arms[self.size_bandit.current] if self.size_bandit.current is not None else None,
+            'best_size_multiplier': self.size_bandit.best(),
             'current_parameters': self.strategy_parameters,
             'last_optimization': self.optimization_history[-1] if self.optimization_history else None
         }
\ No newline at end of file
@@ -13,26 +13,50 @@ import time
 import random
 from py_clob_client.client import ClobClient
 
+from cancel_engine import CancelEngine
+from circuit_breaker import CircuitBreakerOpenError, get_circuit_breaker
+from orderbook_codec import BookSide
+from rate_limiter import get_rate_limiter
+from reward_quote_solver import RewardQuoteSolver
+from structured_logging import log_event
+
 logger = logging.getLogger(__name__)
 
 
 class OrderManager:
     """Manages order lifecycle on Polymarket CLOB"""
 
-    def __init__(self, config: dict, telegram_notifier=None, orderbook_ws=None):
+    def __init__(self, config: dict, telegram_notifier=None, orderbook_ws=None, book_subscriptions=None):
         self.config = config
         self.pending_orders = []
         self.active_orders = {}
         self.filled_orders = []
         self.clob_client = None
+        self.signing_clients = {}  # wallet address -> authenticated ClobClient
+        self.rate_limiter = get_rate_limiter()  # Shared CLOB read/write budgets
+        self.book_breaker = get_circuit_breaker('clob_book')
+        self.order_breaker = get_circuit_breaker('clob_order')
         self.telegram = telegram_notifier  # Telegram notifier
         self.orderbook_ws = orderbook_ws  # WebSocket for real-time orderbook
+        self.book_subscriptions = book_subscriptions  # Shared, ref-counted orderbook subscriptions
+        self.state_store = None  # StateStore for order event journal (set by main)
+        self.wallet_manager = None  # WalletManager: signing keys of wallets holding tracked orders (set by main)
+        self.first_placement_time = None  # wall clock of the first successful placement (health endpoint)
+        self.last_placement_time = None
 
         # Read CLOB settings from config
         clob_config = self.config.get('clob', {})
         self.clob_host = clob_config.get('host', 'https://clob.polymarket.com')
         self.chain_id = clob_config.get('chain_id', 137)
 
+        # Reward-optimal quotes for liquidity rewards markets (heuristics are the fallback)
+        self.quote_solver = RewardQuoteSolver(self.config.get('reward_quote_solver', {}))
+
+        # Bulk cancels share the cached signing clients
+        self.cancel_engine = CancelEngine(
+            self.config.get('order_cancellation', {}), get_client=self._get_signing_client, chain_id=self.chain_id
+        )
+
         self._initialize_clob()
     
     def _initialize_clob(self):
@@ -59,14 +83,15 @@ class OrderManager:
             # This is simpler and more direct than calculating from one orderbook
             token_ids = market.get('clob_token_ids', [])
 
-            logger.info(f"🔍 Market {market_id} has {len(token_ids)} tokens: {token_ids}")
+            logger.debug("🔍 Market %s has %d tokens: %s", market_id, len(token_ids), token_ids)
 
             # CRITICAL CHECK 1: Reject categorical event outcomes
             # If event_slug != market_slug, this is an outcome of a categorical event
             market_slug = market.get('market_slug', '')
             event_slug = market.get('event_slug', '')
             if event_slug and market_slug and event_slug != market_slug:
-                logger.warning(f"❌ REJECTED - CATEGORICAL EVENT OUTCOME detected!")
+                log_event(logger, logging.WARNING, 'market_rejected', "❌ REJECTED - CATEGORICAL EVENT OUTCOME detected!",
+                          market_id=market_id, reason='categorical_outcome')
                 logger.warning(f"   Event slug: {event_slug}")
                 logger.warning(f"   Market slug: {market_slug}")
                 logger.warning(f"   This is one outcome of a categorical event, not a standalone binary market")
@@ -78,17 +103,21 @@ class OrderManager:
             # Categorical markets have >2 tokens and are not suitable for our YES/NO strategy
             if len(token_ids) != 2:
                 if len(token_ids) < 2:
-                    logger.warning(f"❌ REJECTED - Invalid market: only {len(token_ids)} token(s)")
+                    log_event(logger, logging.WARNING, 'market_rejected',
+                              "❌ REJECTED - Invalid market: only %(tokens)d token(s)",
+                              market_id=market_id, reason='missing_tokens', tokens=len(token_ids))
                     logger.warning(f"   Binary markets must have exactly 2 tokens (YES + NO)")
                 else:
-                    logger.warning(f"❌ REJECTED - CATEGORICAL MARKET detected: {len(token_ids)} tokens")
+                    log_event(logger, logging.WARNING, 'market_rejected',
+                              "❌ REJECTED - CATEGORICAL MARKET detected: %(tokens)d tokens",
+                              market_id=market_id, reason='categorical_market', tokens=len(token_ids))
                     logger.warning(f"   This is NOT a binary YES/NO market!")
                     logger.warning(f"   Categorical markets have multiple outcomes, not suitable for our strategy")
                     logger.warning(f"   Example: 'Elon tweets 0-19' vs '20-39' vs '40-59' etc.")
                 logger.warning(f"   Market: {market.get('question', 'Unknown')[:80]}")
                 return None
 
-            logger.info(f"✅ Binary market confirmed: 2 tokens (YES/NO)")
+            logger.debug("✅ Binary market confirmed: 2 tokens (YES/NO)")
 
             # AUTO-SELECT CORRECT TOKEN: Try BOTH tokens and pick the one with narrower spread
             # Polymarket token convention may vary - we can't assume token[0] = YES or NO
@@ -97,35 +126,36 @@ class OrderManager:
             token_id_0 = token_ids[0]
             token_id_1 = token_ids[1]
 
-            logger.info(f"🧪 Testing token[0]: {token_id_0}")
             market_data_0 = await self._fetch_market_data(market_id, token_id_0)
-
-            logger.info(f"🧪 Testing token[1]: {token_id_1}")
             market_data_1 = await self._fetch_market_data(market_id, token_id_1)
 
             if not market_data_0 or not market_data_1:
-                logger.warning(f"❌ Could not fetch orderbook for both tokens")
+                log_event(logger, logging.WARNING, 'market_rejected', "❌ Could not fetch orderbook for both tokens",
+                          market_id=market_id, reason='no_orderbook')
                 return None
 
             # Compare spreads - pick the token with NARROWER spread
             spread_0 = market_data_0.get('current_spread', 1.0)
             spread_1 = market_data_1.get('current_spread', 1.0)
 
-            logger.info(f"📊 Token[0] spread: ${spread_0:.4f} ({spread_0*100:.2f}¢)")
-            logger.info(f"📊 Token[1] spread: ${spread_1:.4f} ({spread_1*100:.2f}¢)")
-
             if spread_0 < spread_1:
                 yes_token_id = token_id_0
                 no_token_id = token_id_1
                 yes_market_data = market_data_0
                 no_market_data = market_data_1
-                logger.info(f"✅ Using token[0] as YES (narrower spread)")
             else:
                 yes_token_id = token_id_1
                 no_token_id = token_id_0
                 yes_market_data = market_data_1
                 no_market_data = market_data_0
-                logger.info(f"✅ Using token[1] as YES (narrower spread)")
+
+            log_event(
+                logger, logging.INFO, 'yes_token_selected',
+                "📊 Market %(market_id)s token spreads %(spread_0).4f / %(spread_1).4f, "
+                "using token[%(yes_index)d] as YES (narrower spread)",
+                market_id=market_id, spread_0=spread_0, spread_1=spread_1,
+                yes_index=0 if yes_token_id == token_id_0 else 1
+            )
 
             # VALIDATION: Verify this is a TRUE binary market (YES + NO ≈ $1.00)
             # Binary market validation - Check if YES + NO bids sum to ~$1.00
@@ -153,7 +183,8 @@ class OrderManager:
                 # Only validate binary market for non-rewards markets
                 # In true binary market: YES bid + NO bid should be in range [0.3, 1.7]
                 if bid_sum < 0.3 or bid_sum > 1.7:
-                    logger.warning(f"❌ REJECTED - Invalid binary market detected!")
+                    log_event(logger, logging.WARNING, 'market_rejected', "❌ REJECTED - Invalid binary market detected!",
+                              market_id=market_id, reason='invalid_binary', bid_sum=bid_sum)
                     logger.warning(f"   YES best bid: ${yes_best_bid:.4f} ({yes_best_bid*100:.2f}¢)")
                     logger.warning(f"   NO best bid: ${no_best_bid:.4f} ({no_best_bid*100:.2f}¢)")
                     logger.warning(f"   Sum: ${bid_sum:.4f} (expected ~$1.00 for binary markets)")
@@ -161,15 +192,13 @@ class OrderManager:
                     logger.warning(f"   Likely a categorical market with 2 unrelated outcomes")
                     return None
 
-                logger.info(f"✅ Binary market validation passed:")
-                logger.info(f"   YES best bid: ${yes_best_bid:.4f} + NO best bid: ${no_best_bid:.4f} = ${bid_sum:.4f}")
-                logger.info(f"   Sum is within valid range [0.3, 1.7] for binary markets")
-            else:
-                # Skip validation for liquidity rewards markets
-                logger.info(f"✅ Skipping binary validation for LIQUIDITY REWARDS market:")
-                logger.info(f"   YES best bid: ${yes_best_bid:.4f}, NO best bid: ${no_best_bid:.4f}")
-                logger.info(f"   Sum: ${bid_sum:.4f} (low bid sum is NORMAL for illiquid markets with rewards)")
-                logger.info(f"   This market has liquidity rewards - illiquidity is expected and desired!")
+            # Skipped for liquidity rewards markets: a low bid sum is NORMAL there
+            log_event(
+                logger, logging.INFO, 'binary_validation',
+                "✅ Binary check %(result)s: YES bid $%(yes_best_bid).4f + NO bid $%(no_best_bid).4f = $%(bid_sum).4f",
+                market_id=market_id, yes_best_bid=yes_best_bid, no_best_bid=no_best_bid, bid_sum=bid_sum,
+                result='skipped (liquidity rewards)' if has_liquidity_rewards else 'passed'
+            )
 
             # Get max spread from market rewards config (if available)
             # For liquidity rewards markets: Use rewards_max_spread (usually 1-3%)
@@ -179,35 +208,63 @@ class OrderManager:
             if has_liquidity_rewards:
                 # Use strict spread from rewards config (1-3%)
                 max_spread_pct = market.get('rewardsMaxSpread', 3.0)
-                logger.info(f"💎 LIQUIDITY REWARDS market detected!")
-                logger.info(f"   Using rewards_max_spread: {max_spread_pct}%")
+                logger.debug("💎 Liquidity rewards market, using rewards_max_spread: %s%%", max_spread_pct)
             else:
                 # Use relaxed spread for position #3 strategy (8%)
                 max_spread_pct = 8.0
 
             max_spread_decimal = max_spread_pct / 100  # Convert to decimal (e.g., 0.03 or 0.08)
 
-            # Calculate order prices
-            # For liquidity rewards markets: Use MID PRICE strategy (create new liquidity)
-            # For regular markets: Use POSITION #3 strategy (follow orderbook)
-            yes_price, no_price, position_info = self._calculate_position_based_prices(
-                yes_market_data,
-                no_market_data,
-                max_spread_decimal,
-                use_mid_price_strategy=has_liquidity_rewards  # NEW parameter
-            )
+            # For liquidity rewards markets: solve for reward-optimal prices and size first
+            reward_params = None
+            solution = None
+            if has_liquidity_rewards and self.quote_solver.enabled:
+                reward_params = {
+                    'max_spread': max_spread_decimal,
+                    'min_size': float(market.get('rewardsMinSize', 0)),
+                    'daily_rate': self._reward_daily_rate(market),
+                }
+                solution = self.quote_solver.solve_one(self.build_quote_input(
+                    reward_params, yes_market_data['order_book'], no_market_data['order_book']
+                ))
+
+            if solution:
+                yes_price, no_price = solution['yes_price'], solution['no_price']
+                yes_size = no_size = solution['size']
+                position_info = {'strategy': 'reward_solver', **solution}
+            else:
+                # Calculate order prices
+                # For liquidity rewards markets: Use MID PRICE strategy (create new liquidity)
+                # For regular markets: Use POSITION #3 strategy (follow orderbook)
+                yes_price, no_price, position_info = self._calculate_position_based_prices(
+                    yes_market_data,
+                    no_market_data,
+                    max_spread_decimal,
+                    use_mid_price_strategy=has_liquidity_rewards  # NEW parameter
+                )
+
+                if yes_price is None or no_price is None:
+                    log_event(logger, logging.WARNING, 'market_rejected',
+                              "Could not calculate valid prices for market %(market_id)s",
+                              market_id=market_id, reason='no_valid_prices')
+                    return None
 
-            if yes_price is None or no_price is None:
-                logger.warning(f"Could not calculate valid prices for market {market_id}")
-                return None
+                # Calculate order sizes with jitter
+                yes_size, no_size = self._calculate_order_sizes()
 
-            # Calculate order sizes with jitter
-            yes_size, no_size = self._calculate_order_sizes()
+            # Stay within the capital the allocator assigned to this market
+            allocated_capital = market.get('allocated_capital')
+            if allocated_capital:
+                size_cap = int(allocated_capital / (yes_price + no_price))
+                if size_cap < max(yes_size, no_size):
+                    logger.info("   - Size capped at %d shares by allocated capital $%.2f", size_cap, allocated_capital)
+                    yes_size, no_size = min(yes_size, size_cap), min(no_size, size_cap)
 
             # Prepare both sides
             order = {
                 'market_id': market_id,
                 'market_title': market.get('question', market.get('title', 'Unknown')),
+                'category': market.get('category', 'other'),
                 'token_ids': market.get('clob_token_ids', []),  # Store token IDs for order placement
                 'yes_order': {
                     'side': 'buy',
@@ -226,25 +283,38 @@ class OrderManager:
                     'time_in_force': 'GTC'
                 },
                 'position_info': position_info,  # Store position details for logging
+                'reward_params': reward_params,  # Inputs for re-solving quotes on book updates
+                'allocated_wallet': market.get('allocated_wallet'),  # Wallet chosen by the capital allocator
                 'created_at': time.time(),
                 'status': 'pending'
             }
 
-            logger.info(f"✅ Prepared order for market {market_id}")
-            logger.info(f"   - YES bid: ${yes_price:.4f} ({yes_price*100:.2f}¢)")
-            logger.info(f"   - NO bid: ${no_price:.4f} ({no_price*100:.2f}¢)")
-
-            # Log strategy-specific details
-            if position_info.get('strategy') == 'tight_bid':
-                # Tight bid strategy: log distance from midpoint
-                logger.info(f"   - YES distance from mid: {position_info['yes_distance']*100:.2f}¢")
-                logger.info(f"   - NO distance from mid: {position_info['no_distance']*100:.2f}¢")
-                logger.info(f"   - Strategy: TIGHT BID (maximize liquidity rewards)")
-            else:
-                # Position #3 strategy: log spread and offset
-                logger.info(f"   - Position: #{position_info.get('target_position', 3)}")
-                logger.info(f"   - Spread: {position_info.get('spread', 0):.2%} (max: {max_spread_decimal:.2%})")
-                logger.info(f"   - Offset from position #2: ${position_info.get('offset', 0):.4f} ({position_info.get('offset', 0)*100:.2f}¢)")
+            # One structured event per order; strategy details go in its fields
+            strategy = position_info.get('strategy', 'position')
+            details = {
+                'reward_solver': "size %(size)s, reward share %(reward_share).1f%%, fill risk $%(fill_risk).2f",
+                'tight_bid': "YES %(yes_distance_cents).2f¢ / NO %(no_distance_cents).2f¢ from mid",
+            }.get(strategy, "position #%(target_position)s, spread %(spread_pct).2f%% (max %(max_spread_pct).2f%%)")
+            log_event(
+                logger, logging.INFO, 'order_prepared',
+                "✅ Prepared order for market %(market_id)s: YES $%(yes_price).4f, NO $%(no_price).4f "
+                "[%(strategy)s: " + details + "]",
+                market_id=market_id,
+                yes_price=yes_price,
+                no_price=no_price,
+                yes_size=yes_size,
+                no_size=no_size,
+                size=yes_size,
+                strategy=strategy,
+                reward_share=position_info.get('reward_share', 0) * 100,
+                expected_reward=position_info.get('expected_reward'),
+                fill_risk=position_info.get('fill_risk', 0),
+                yes_distance_cents=position_info.get('yes_distance', 0) * 100,
+                no_distance_cents=position_info.get('no_distance', 0) * 100,
+                target_position=position_info.get('target_position', 3),
+                spread_pct=position_info.get('spread', 0) * 100,
+                max_spread_pct=max_spread_decimal * 100,
+            )
 
             return order
 
@@ -293,26 +363,21 @@ class OrderManager:
             best_ask = get_order_value(asks[0], 'price') if asks else 1
             mid_price = (best_bid + best_ask) / 2
 
-            # 🔍 DEBUG: Log orderbook data
-            logger.info(f"📊 Orderbook for market {market_id}:")
-            logger.info(f"   Best Bid: ${best_bid:.4f} ({best_bid*100:.2f}¢)")
-            logger.info(f"   Best Ask: ${best_ask:.4f} ({best_ask*100:.2f}¢)")
-            logger.info(f"   Mid Price: ${mid_price:.4f} ({mid_price*100:.2f}¢)")
-            logger.info(f"   Spread: ${(best_ask - best_bid):.4f} ({(best_ask - best_bid)*100:.2f}¢)")
-            logger.info(f"   Spread %: {((best_ask - best_bid) / best_bid * 100):.2f}%")
-
-            # Log top 3 bids and asks
-            logger.info(f"   Top 3 Bids:")
-            for i, bid in enumerate(bids[:3], 1):
-                price = get_order_value(bid, 'price')
-                size = get_order_value(bid, 'size')
-                logger.info(f"      {i}. ${price:.4f} ({price*100:.2f}¢) x {size:.0f}")
-
-            logger.info(f"   Top 3 Asks:")
-            for i, ask in enumerate(asks[:3], 1):
-                price = get_order_value(ask, 'price')
-                size = get_order_value(ask, 'size')
-                logger.info(f"      {i}. ${price:.4f} ({price*100:.2f}¢) x {size:.0f}")
+            # Top-of-book snapshot (top 3 levels per side as [price, size])
+            if logger.isEnabledFor(logging.DEBUG):
+                log_event(
+                    logger, logging.DEBUG, 'orderbook_snapshot',
+                    "📊 Orderbook for market %(market_id)s: bid $%(best_bid).4f / ask $%(best_ask).4f, "
+                    "mid $%(mid_price).4f, spread $%(spread).4f",
+                    market_id=market_id,
+                    token_id=token_id,
+                    best_bid=best_bid,
+                    best_ask=best_ask,
+                    mid_price=mid_price,
+                    spread=best_ask - best_bid,
+                    bids=[[get_order_value(b, 'price'), get_order_value(b, 'size')] for b in bids[:3]],
+                    asks=[[get_order_value(a, 'price'), get_order_value(a, 'size')] for a in asks[:3]],
+                )
 
             # Calculate spread and depth
             current_spread = best_ask - best_bid
@@ -358,28 +423,44 @@ class OrderManager:
                     # py-clob-client expects similar format, so return as-is
                     return cached_book
                 else:
-                    # Not in cache yet - subscribe and use fallback for now
+                    # Not cached or stale - subscribe and use fallback for now
                     logger.debug(f"📡 Subscribing to {lookup_id} for future updates")
-                    await self.orderbook_ws.subscribe(lookup_id)
+                    if self.book_subscriptions:
+                        await self.book_subscriptions.lease(lookup_id)
+                    else:
+                        await self.orderbook_ws.subscribe(lookup_id)
 
             # ✅ FALLBACK: Use REST API if WebSocket not available or not cached yet
             logger.debug(f"⏳ Falling back to REST API for {lookup_id}")
 
-            if self.clob_client:
-                # Use py-clob-client with token_id
-                book = self.clob_client.get_order_book(lookup_id)
-                return book
-            else:
+            async def fetch_book():
+                await self.rate_limiter.acquire('clob_read')
+
+                if self.clob_client:
+                    # Use py-clob-client with token_id
+                    try:
+                        return await asyncio.to_thread(self.clob_client.get_order_book, lookup_id)
+                    except Exception as e:
+                        self.rate_limiter.record_exception('clob_read', e)
+                        raise
+
                 # Fallback to direct API call
                 url = f"{self.clob_host}/book?token_id={lookup_id}"
 
                 async with aiohttp.ClientSession() as session:
                     async with session.get(url) as response:
-                        if response.status == 200:
-                            return await response.json()
+                        self.rate_limiter.record_response('clob_read', response.status, response.headers.get('Retry-After'))
+                        if response.status == 404:
+                            return None
+                        response.raise_for_status()
+                        return await response.json()
 
-            return None
+            # Breaker fails fast when CLOB is down and serves a recent book if one is cached
+            return await self.book_breaker.call_cached(lookup_id, fetch_book)
 
+        except CircuitBreakerOpenError as e:
+            logger.debug(f"Order book fetch skipped for {lookup_id}: {e}")
+            return None
         except Exception as e:
             logger.error(f"Error getting order book: {e}")
             return None
@@ -434,7 +515,7 @@ class OrderManager:
             # Example: YES mid 77.5¢, best ask 78¢
             # → Bot bid: 77.4¢ (close to mid, won't fill)
             if use_mid_price_strategy:
-                logger.info(f"📊 Using TIGHT BID STRATEGY (maximize liquidity rewards)")
+                logger.debug("📊 Using TIGHT BID STRATEGY (maximize liquidity rewards)")
 
                 # Helper functions to extract bids and asks
                 def get_bids(order_book):
@@ -506,9 +587,8 @@ class OrderManager:
                 min_yes_bid = 1.0 - no_best_ask + 0.002  # Add 0.2¢ safety margin
                 max_yes_bid = yes_best_ask - 0.002       # Subtract 0.2¢ safety margin
 
-                logger.info(f"🎯 Binary market constraints:")
-                logger.info(f"   YES bid must be in range: ${min_yes_bid:.4f} < P < ${max_yes_bid:.4f}")
-                logger.info(f"   (Ensures YES bid < ask AND NO bid = 1-P < NO ask)")
+                # Ensures YES bid < ask AND NO bid = 1-P < NO ask
+                logger.debug("🎯 YES bid must be in range: $%.4f < P < $%.4f", min_yes_bid, max_yes_bid)
 
                 if min_yes_bid >= max_yes_bid:
                     logger.warning(f"❌ No valid bid range for binary market:")
@@ -555,11 +635,11 @@ class OrderManager:
 
                 # Log if we had to adjust from target
                 if abs(yes_bid - yes_bid_target) > 0.001:
-                    logger.info(f"✅ Adjusted YES bid from ${yes_bid_target:.4f} to ${yes_bid:.4f} to satisfy constraints")
+                    logger.debug("✅ Adjusted YES bid from $%.4f to $%.4f to satisfy constraints", yes_bid_target, yes_bid)
 
                 # Verify sum is exactly $1.00
                 bid_sum = yes_bid + no_bid
-                logger.info(f"✅ Binary market check: YES ${yes_bid:.4f} + NO ${no_bid:.4f} = ${bid_sum:.4f}")
+                logger.debug("✅ Binary market check: YES $%.4f + NO $%.4f = $%.4f", yes_bid, no_bid, bid_sum)
 
                 # ✅ CHECK DEEP ORDERBOOK: Ensure our bids aren't too close to ANY ask in top 10
                 # IMPORTANT: Must maintain YES + NO = $1.00 constraint for binary markets
@@ -626,28 +706,26 @@ class OrderManager:
                         logger.warning(f"   REJECTING market - orderbook too risky")
                         return None, None, {}
 
-                    logger.info(f"✅ Adjusted bids: YES ${yes_bid:.4f}, NO ${no_bid:.4f} (sum = ${yes_bid + no_bid:.4f})")
-                    logger.info(f"   Maintained 5¢ buffer and YES + NO = $1.00 constraint")
+                    logger.info(
+                        "✅ Adjusted bids for 5¢ ask buffer: YES $%.4f, NO $%.4f (sum = $%.4f)",
+                        yes_bid, no_bid, yes_bid + no_bid
+                    )
 
                 # Calculate distances from midpoint (for rewards estimation)
                 yes_distance_from_mid = abs(yes_bid - yes_mid)
                 no_distance_from_mid = abs(no_bid - no_mid)
 
                 # Log strategy details
-                logger.info(f"💰 Calculated prices (LIQUIDITY FARMING - POSITION 2-3 STRATEGY):")
-                logger.info(f"   YES Market:")
-                logger.info(f"      Best Bid: ${yes_best_bid:.4f} ({yes_best_bid*100:.2f}¢)")
-                logger.info(f"      Our Bid:  ${yes_bid:.4f} ({yes_bid*100:.2f}¢) [+{(yes_bid - yes_best_bid)*100:.2f}¢ above best]")
-                logger.info(f"      Midpoint: ${yes_mid:.4f} ({yes_mid*100:.2f}¢) [Distance: {yes_distance_from_mid*100:.2f}¢]")
-                logger.info(f"      Best Ask: ${yes_best_ask:.4f} ({yes_best_ask*100:.2f}¢)")
-                logger.info(f"      Spread: {yes_spread_pct:.1f}%")
-                logger.info(f"   NO Market:")
-                logger.info(f"      Best Bid: ${no_best_bid:.4f} ({no_best_bid*100:.2f}¢)")
-                logger.info(f"      Our Bid:  ${no_bid:.4f} ({no_bid*100:.2f}¢) [+{(no_bid - no_best_bid)*100:.2f}¢ above best]")
-                logger.info(f"      Midpoint: ${no_mid:.4f} ({no_mid*100:.2f}¢) [Distance: {no_distance_from_mid*100:.2f}¢]")
-                logger.info(f"      Best Ask: ${no_best_ask:.4f} ({no_best_ask*100:.2f}¢)")
-                logger.info(f"   ✅ YES + NO = ${yes_bid + no_bid:.4f} (binary market constraint)")
-                logger.info(f"   Strategy: Position 2-3 (best bid + 1-2¢) to avoid fills while earning rewards")
+                log_event(
+                    logger, logging.DEBUG, 'prices_calculated',
+                    "💰 Tight bid prices: YES $%(yes_bid).4f (mid $%(yes_mid).4f, ask $%(yes_best_ask).4f), "
+                    "NO $%(no_bid).4f (mid $%(no_mid).4f, ask $%(no_best_ask).4f)",
+                    strategy='tight_bid',
+                    yes_bid=yes_bid, yes_best_bid=yes_best_bid, yes_mid=yes_mid, yes_best_ask=yes_best_ask,
+                    yes_spread_pct=yes_spread_pct, yes_distance=yes_distance_from_mid,
+                    no_bid=no_bid, no_best_bid=no_best_bid, no_mid=no_mid, no_best_ask=no_best_ask,
+                    no_distance=no_distance_from_mid,
+                )
 
                 # Return prices (yes_bid for YES, no_bid for NO)
                 return yes_bid, no_bid, {
@@ -659,7 +737,7 @@ class OrderManager:
                 }
 
             # ✅ STRATEGY B: POSITION #3 STRATEGY (for regular markets)
-            logger.info(f"📊 Using POSITION #3 STRATEGY (follow orderbook)")
+            logger.debug("📊 Using POSITION #3 STRATEGY (follow orderbook)")
 
             # Helper function to extract bids from orderbook
             def get_bids(order_book):
@@ -683,7 +761,7 @@ class OrderManager:
 
             # ⚠️ CRITICAL CHECK: Need at least 2 bids on each side
             # We take bid price from position #2, so we need at least 2 bids
-            logger.debug(f"📊 Orderbook depth: YES {len(yes_bids)} bids, NO {len(no_bids)} bids")
+            logger.debug("📊 Orderbook depth: YES %d bids, NO %d bids", len(yes_bids), len(no_bids))
 
             if len(yes_bids) < 2 or len(no_bids) < 2:
                 logger.warning(f"❌ Order book too thin! YES bids: {len(yes_bids)}, NO bids: {len(no_bids)}")
@@ -735,17 +813,17 @@ class OrderManager:
             spread_percent = spread_dollars / mid_price if mid_price > 0 else 0
 
             # 🔍 DEBUG: Log calculated prices and spreads
-            logger.info(f"💰 Calculated prices (POSITION #3 STRATEGY - DIRECT FROM ORDERBOOKS):")
-            logger.info(f"   YES Position #1 (Best Bid): ${yes_best_bid:.4f} ({yes_best_bid*100:.2f}¢)")
-            logger.info(f"   YES Position #2 (Bid): ${yes_second_bid:.4f} ({yes_second_bid*100:.2f}¢)")
-            logger.info(f"   NO Position #1 (Best Bid): ${no_best_bid:.4f} ({no_best_bid*100:.2f}¢)")
-            logger.info(f"   NO Position #2 (Bid): ${no_second_bid:.4f} ({no_second_bid*100:.2f}¢)")
-            logger.info(f"   Offset: ${offset:.4f} ({offset*100:.2f}¢)")
-            logger.info(f"   Our YES bid (Position #3): ${yes_price:.4f} ({yes_price*100:.2f}¢)")
-            logger.info(f"   Our NO bid (Position #3): ${no_price:.4f} ({no_price*100:.2f}¢)")
-            logger.info(f"   Our YES ask (from NO): ${our_yes_ask_equivalent:.4f} ({our_yes_ask_equivalent*100:.2f}¢)")
-            logger.info(f"   Spread: ${spread_dollars:.4f} ({spread_dollars*100:.2f}¢) = {spread_percent:.2%}")
-            logger.info(f"   Max allowed spread: {max_spread:.2%}")
+            log_event(
+                logger, logging.DEBUG, 'prices_calculated',
+                "💰 Position #3 prices: YES $%(yes_price).4f, NO $%(no_price).4f, "
+                "spread $%(spread_dollars).4f (%(spread_pct).2f%% of mid, max %(max_spread_pct).2f%%)",
+                strategy='position',
+                yes_best_bid=yes_best_bid, yes_second_bid=yes_second_bid,
+                no_best_bid=no_best_bid, no_second_bid=no_second_bid,
+                offset=offset, yes_price=yes_price, no_price=no_price,
+                yes_ask_equivalent=our_yes_ask_equivalent, spread_dollars=spread_dollars,
+                spread_pct=spread_percent * 100, max_spread_pct=max_spread * 100,
+            )
 
             # Check if spread exceeds max allowed
             if spread_percent > max_spread:
@@ -778,6 +856,75 @@ class OrderManager:
             traceback.print_exc()
             return None, None, {}
     
+    @staticmethod
+    def _reward_daily_rate(market: Dict) -> Optional[float]:
+        """Daily reward pool of a market (None if the scanner did not report one)"""
+        for key in ('rewardsDailyRate', 'rewards_daily_rate'):
+            if market.get(key) is not None:
+                return float(market[key])
+        return None
+
+    def build_quote_input(
+        self,
+        reward_params: Dict,
+        yes_order_book,
+        no_order_book,
+        own_order: Optional[Dict] = None
+    ) -> Dict:
+        """Build RewardQuoteSolver input from YES/NO order books
+
+        Args:
+            reward_params: {'max_spread', 'min_size', 'daily_rate'} of the market
+            yes_order_book: YES book (WebSocket dict or REST OrderBookSummary)
+            no_order_book: NO book
+            own_order: Our resting order in this market (active_orders entry); its
+                bids are removed from the ladders so we do not compete with ourselves
+
+        Returns:
+            Solver market dict
+        """
+        def sides(order_book, own: Optional[Dict]):
+            if hasattr(order_book, 'bids'):
+                bids, asks = order_book.bids or [], order_book.asks or []
+                tick_size = getattr(order_book, 'tick_size', None)
+            else:
+                bids, asks = order_book.get('bids', []), order_book.get('asks', [])
+                tick_size = order_book.get('tick_size')
+            bids = bids if isinstance(bids, BookSide) else BookSide(list(bids))
+            asks = asks if isinstance(asks, BookSide) else BookSide(list(asks))
+
+            if own and own.get('price') and own.get('size'):
+                levels = []
+                for price, size in zip(bids.prices, bids.sizes):
+                    if abs(price - own['price']) < 1e-9:
+                        size -= own['size']
+                    if size > 1e-9:
+                        levels.append([price, size])
+                bids = BookSide(levels)
+
+            best_bid = max(bids.prices) if len(bids) else 0.0
+            best_ask = min(asks.prices) if len(asks) else 1.0
+            return bids, best_bid, best_ask, float(tick_size) if tick_size else None
+
+        own_order = own_order or {}
+        yes_bids, yes_best_bid, yes_best_ask, yes_tick = sides(yes_order_book, own_order.get('yes_order'))
+        no_bids, no_best_bid, no_best_ask, no_tick = sides(no_order_book, own_order.get('no_order'))
+
+        return {
+            'yes_bids': yes_bids,
+            'no_bids': no_bids,
+            'yes_mid': (yes_best_bid + yes_best_ask) / 2,
+            'no_mid': (no_best_bid + no_best_ask) / 2,
+            'yes_best_ask': yes_best_ask,
+            'no_best_ask': no_best_ask,
+            'yes_tick_size': yes_tick,
+            'no_tick_size': no_tick,
+            'max_spread': reward_params['max_spread'],
+            'min_size': max(reward_params['min_size'], self.config['size_min']),
+            'max_size': self.config['size_max'],
+            'daily_rate': reward_params.get('daily_rate'),
+        }
+
     def _calculate_order_sizes(self) -> Tuple[int, int]:
         """Calculate order sizes with jitter"""
         base_size = (self.config['size_min'] + self.config['size_max']) / 2
@@ -798,6 +945,7 @@ class OrderManager:
     
     async def place_order(self, order: Dict, wallet: Dict) -> Optional[Dict]:
         """Place order on CLOB"""
+        started = time.perf_counter()
         try:
             if not self.clob_client:
                 logger.error("CLOB client not initialized")
@@ -823,9 +971,6 @@ class OrderManager:
             if yes_order_id:
                 placed_orders['yes'] = yes_order_id
 
-            # Add small delay to appear human
-            await asyncio.sleep(random.uniform(0.5, 1.5))
-
             # Place NO side
             no_order_id = await self._place_single_order(
                 order['no_order'],
@@ -840,11 +985,26 @@ class OrderManager:
                 order['status'] = 'active'
                 order['order_ids'] = placed_orders
                 order['placed_at'] = time.time()
+                order['wallet_address'] = wallet['address']
+                self.last_placement_time = order['placed_at']
+                if self.first_placement_time is None:
+                    self.first_placement_time = order['placed_at']
 
                 # Add to active orders
                 self.active_orders[order['market_id']] = order
-
-                logger.info(f"Placed orders for market {order['market_id']}: {placed_orders}")
+                self._journal('order_active', {'market_id': order['market_id'], 'order': order})
+                await self._sync_book_subscriptions()
+
+                log_event(
+                    logger, logging.INFO, 'order_placed',
+                    "Placed orders for market %(market_id)s: %(order_ids)s",
+                    market_id=order['market_id'],
+                    wallet=wallet['address'],
+                    order_ids=placed_orders,
+                    sides=len(placed_orders),
+                    latency_ms=round((time.perf_counter() - started) * 1000, 1),
+                    strategy=order.get('position_info', {}).get('strategy'),
+                )
 
                 # Send Telegram notification
                 if self.telegram:
@@ -886,41 +1046,102 @@ class OrderManager:
                 side=side_constant
             )
 
-            # Create a new ClobClient instance with the wallet's private key
-            # (The global clob_client is read-only, we need a signing client per wallet)
-            signing_client = ClobClient(
-                host=self.clob_host,
-                key=wallet['private_key'],  # Add private key for signing
-                chain_id=self.chain_id  # From config
-            )
-
-            # Set API credentials (required for L2 auth to post orders)
-            logger.debug("Setting API credentials...")
-            signing_client.set_api_creds(signing_client.create_or_derive_api_creds())
-
-            # Create and sign order
-            logger.debug("Signing order...")
-            signed_order = signing_client.create_order(order_args)
-            logger.debug(f"Order signed: {type(signed_order)}")
-
-            # Submit order
-            logger.debug("Submitting order to CLOB...")
-            response = signing_client.post_order(signed_order)
+            # Reuse the wallet's signing client (the global clob_client is read-only)
+            signing_client = await self._get_signing_client(wallet)
+
+            # Create, sign and submit order off the event loop (py_clob_client is blocking)
+            def sign_and_post():
+                signed_order = signing_client.create_order(order_args)
+                logger.debug(f"Order signed: {type(signed_order)}")
+                return signing_client.post_order(signed_order)
+
+            logger.debug("Signing and submitting order to CLOB...")
+            async def post():
+                await self.rate_limiter.acquire('clob_write')
+                try:
+                    return await asyncio.to_thread(sign_and_post)
+                except Exception as e:
+                    self.rate_limiter.record_exception('clob_write', e)
+                    raise
+
+            response = await self.order_breaker.call(post)
+            self.rate_limiter.record_response('clob_write', 200)
             logger.debug(f"CLOB response: {response}")
 
             if response and 'orderID' in response:
-                logger.info(f"Order placed successfully: {response['orderID']}")
+                logger.debug("Order placed successfully: %s", response['orderID'])
                 return response['orderID']
 
-            logger.warning(f"Order placement failed: no orderID in response: {response}")
+            log_event(
+                logger, logging.WARNING, 'order_failed',
+                "Order placement failed: no orderID in response: %(response)s",
+                token_id=market_id, reason='no_order_id', response=str(response)
+            )
             return None
 
+        except CircuitBreakerOpenError as e:
+            log_event(
+                logger, logging.WARNING, 'order_failed', "⏸️  Order not placed: %(error)s",
+                token_id=market_id, reason='circuit_open', error=str(e)
+            )
+            return None
         except Exception as e:
             # Enhanced error logging with full traceback
-            logger.error(f"Error placing single order: {type(e).__name__}: {str(e)}")
-            logger.error(f"Full traceback: {traceback.format_exc()}")
+            log_event(
+                logger, logging.ERROR, 'order_failed',
+                "Error placing single order: %(error_type)s: %(error)s\nFull traceback: %(traceback)s",
+                token_id=market_id, reason=type(e).__name__, error=str(e), error_type=type(e).__name__,
+                traceback=traceback.format_exc()
+            )
             return None
     
+    async def _get_signing_client(self, wallet: Dict) -> ClobClient:
+        """Get cached signing client for a wallet (API creds derived once per wallet)"""
+        address = wallet['address']
+        client = self.signing_clients.get(address)
+        if client is not None:
+            return client
+
+        def build_client():
+            client = ClobClient(
+                host=self.clob_host,
+                key=wallet['private_key'],  # Add private key for signing
+                chain_id=self.chain_id  # From config
+            )
+            # Set API credentials (required for L2 auth to post orders)
+            client.set_api_creds(client.create_or_derive_api_creds())
+            return client
+
+        logger.debug(f"Creating signing client for {address[:10]}...")
+        client = await asyncio.to_thread(build_client)
+        self.signing_clients[address] = client
+        return client
+
+    def _forget_order_id(self, order_id: str) -> Optional[Dict]:
+        """Drop a cancelled or filled order ID from active orders
+
+        The market is removed once none of its sides is resting, so capital
+        derived from active_orders (ExecutionEngine) is released with it.
+
+        Returns:
+            The market's order dict, or None if the ID was not tracked
+        """
+        for market_id, order in list(self.active_orders.items()):
+            order_ids = order.get('order_ids', {})
+            sides = [side for side, oid in order_ids.items() if oid == order_id]
+            if not sides:
+                continue
+
+            for side in sides:
+                del order_ids[side]
+            if not order_ids:
+                del self.active_orders[market_id]
+                self._journal('order_removed', {'market_id': market_id})
+            else:
+                self._journal('order_active', {'market_id': market_id, 'order': order})
+            return order
+        return None
+
     async def cancel_order(self, order_id: str, reason: str = "Unknown") -> bool:
         """Cancel an order"""
         try:
@@ -928,22 +1149,22 @@ class OrderManager:
                 return False
 
             # Cancel via CLOB API
-            response = self.clob_client.cancel_order(order_id)
+            await self.rate_limiter.acquire('clob_write')
+            try:
+                response = self.clob_client.cancel_order(order_id)
+            except Exception as e:
+                self.rate_limiter.record_exception('clob_write', e)
+                raise
 
             if response and response.get('success'):
                 logger.info(f"Cancelled order {order_id} - Reason: {reason}")
+                self._journal('order_cancelled', {'order_id': order_id, 'reason': reason})
+                order = self._forget_order_id(order_id)
 
                 # Send Telegram notification
                 if self.telegram:
                     try:
-                        # Find market name from active orders
-                        market_name = "Unknown"
-                        for market_id, order in self.active_orders.items():
-                            if order.get('order_ids', {}).get('yes') == order_id or \
-                               order.get('order_ids', {}).get('no') == order_id:
-                                market_name = order.get('market_title', 'Unknown')
-                                break
-
+                        market_name = order.get('market_title', 'Unknown') if order else "Unknown"
                         await self.telegram.notify_order_cancelled(order_id, market_name, reason)
                     except Exception as e:
                         logger.debug(f"Failed to send cancel notification: {e}")
@@ -956,22 +1177,72 @@ class OrderManager:
             logger.error(f"Error cancelling order {order_id}: {e}")
             return False
     
-    async def cancel_all_orders(self) -> int:
-        """Cancel all active orders"""
-        cancelled_count = 0
-        
+    async def cancel_all_orders(self, wallets: Optional[List[Dict]] = None) -> int:
+        """Cancel open orders concurrently across wallets (see CancelEngine)
+
+        Args:
+            wallets: Flatten every open order of these wallets (cancel-all).
+                Default: only the orders tracked in active_orders, batch-cancelled
+                per wallet with the cached signing clients
+
+        Returns:
+            Number of orders cancelled
+        """
+        tracked: Dict[str, List[str]] = {}
+        for order in self.active_orders.values():
+            address = order.get('wallet_address')
+            if address:
+                tracked.setdefault(address, []).extend(order.get('order_ids', {}).values())
+
+        if wallets is not None:
+            summary = await self.cancel_engine.cancel(wallets)
+        else:
+            tracked_wallets, order_ids = self._tracked_cancel_scope(tracked)
+            summary = await self.cancel_engine.cancel(tracked_wallets, order_ids=order_ids)
+
+        # Forget orders of wallets that are verified clean
+        clean = {
+            address for address, report in summary['wallets'].items()
+            if not report['error'] and report['remaining'] == 0
+        }
         for market_id, order in list(self.active_orders.items()):
-            if 'order_ids' in order:
-                for side, order_id in order['order_ids'].items():
-                    if await self.cancel_order(order_id):
-                        cancelled_count += 1
-                
-                # Remove from active orders
+            if order.get('wallet_address') in clean or (wallets is not None and not order.get('wallet_address')):
                 del self.active_orders[market_id]
-        
-        logger.info(f"Cancelled {cancelled_count} orders")
-        return cancelled_count
+                self._journal('order_removed', {'market_id': market_id})
+
+        await self._sync_book_subscriptions()
+        if summary['remaining'] or summary['failed_wallets']:
+            logger.warning(
+                f"⚠️  {summary['remaining']} order(s) still open, "
+                f"{len(summary['failed_wallets'])} wallet(s) failed to cancel"
+            )
+        return summary['cancelled']
     
+    def _tracked_cancel_scope(self, tracked: Dict[str, List[str]]) -> Tuple[List[Dict], Dict[str, List[str]]]:
+        """Full wallet dicts (with private keys) for tracked order IDs
+
+        Signing clients are not cached after a warm restart, so the cancel
+        needs the wallet's private key, looked up in the wallet manager.
+
+        Args:
+            tracked: wallet address -> tracked order IDs
+
+        Returns:
+            (wallets, order_ids keyed by the wallets' addresses)
+        """
+        known = {w['address'].lower(): w for w in getattr(self.wallet_manager, 'wallets', None) or []}
+        wallets, order_ids = [], {}
+        for address, ids in tracked.items():
+            wallet = known.get(address.lower())
+            if wallet is None:
+                if address not in self.signing_clients:
+                    logger.warning(f"⚠️  No signing key for {address[:10]}..., cannot cancel its {len(ids)} tracked order(s)")
+                    continue
+                wallet = {'address': address}  # Cached client, no key needed
+            wallets.append(wallet)
+            order_ids[wallet['address']] = ids
+        return wallets, order_ids
+
     async def update_order_price(self, order_id: str, new_price: float, wallet: Dict) -> bool:
         """Update order price (cancel and replace)"""
         try:
@@ -1025,12 +1296,13 @@ class OrderManager:
     async def check_order_fills(self) -> List[Dict]:
         """Check for filled orders"""
         fills = []
+        filled_ids = []
         
-        for market_id, order in self.active_orders.items():
+        for market_id, order in list(self.active_orders.items()):
             if 'order_ids' not in order:
                 continue
             
-            for side, order_id in order['order_ids'].items():
+            for side, order_id in list(order['order_ids'].items()):
                 order_status = await self._get_order_details(order_id)
                 
                 if order_status and order_status.get('status') == 'filled':
@@ -1046,6 +1318,8 @@ class OrderManager:
 
                     # Move to filled orders
                     self.filled_orders.append(order_status)
+                    self._journal('order_filled', fill_data)
+                    filled_ids.append(order_id)
 
                     # Send Telegram notification (IMPORTANT!)
                     if self.telegram:
@@ -1059,8 +1333,97 @@ class OrderManager:
                         except Exception as e:
                             logger.debug(f"Failed to send fill notification: {e}")
         
+        for order_id in filled_ids:
+            self._forget_order_id(order_id)
+        
         return fills
     
+    async def _sync_book_subscriptions(self):
+        """Hold orderbook subscriptions for exactly the tokens of active orders"""
+        if self.book_subscriptions:
+            tokens = [t for order in self.active_orders.values() for t in order.get('token_ids', [])[:2]]
+            await self.book_subscriptions.sync('order_mgr', tokens)
+
+    def _journal(self, event_type: str, data: Dict):
+        """Append order event to the state journal (if persistence is enabled)"""
+        if self.state_store:
+            self.state_store.journal(event_type, data)
+
+    def get_state(self) -> Dict:
+        """Runtime state for StateStore snapshots"""
+        return {
+            'active_orders': self.active_orders,
+            'pending_orders': self.pending_orders,
+        }
+
+    def restore_state(self, state: Dict):
+        """Restore runtime state from a StateStore snapshot"""
+        self.active_orders = state.get('active_orders', {})
+        self.pending_orders = state.get('pending_orders', [])
+        logger.info(f"♻️  Restored {len(self.active_orders)} active and {len(self.pending_orders)} pending orders")
+
+    def get_journal_handlers(self) -> Dict:
+        """Journal replay handlers for StateStore"""
+        def order_active(data: Dict):
+            self.active_orders[data['market_id']] = data['order']
+
+        def order_removed(data: Dict):
+            self.active_orders.pop(data['market_id'], None)
+
+        return {'order_active': order_active, 'order_removed': order_removed}
+
+    async def reconcile_open_orders(self, wallets: List[Dict]) -> Dict:
+        """Reconcile restored active orders with the CLOB's open orders
+
+        Order IDs no longer open on the exchange (filled or cancelled while the bot
+        was down) are dropped; markets with no open side left are removed.
+
+        Args:
+            wallets: Wallets whose open orders to fetch
+
+        Returns:
+            Dict with kept/removed/orphan counts (empty if reconciliation was skipped)
+        """
+        if not self.active_orders:
+            return {}
+
+        async def fetch_open_ids(wallet: Dict) -> set:
+            client = await self._get_signing_client(wallet)
+            await self.rate_limiter.acquire('clob_read')
+            orders = await asyncio.to_thread(client.get_orders)
+            return {o.get('id') for o in orders}
+
+        results = await asyncio.gather(*(fetch_open_ids(w) for w in wallets), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            # Partial view of the exchange - keep restored orders, fill checks will catch up
+            logger.warning(f"⚠️  Skipping order reconciliation ({len(errors)} wallet(s) failed): {errors[0]}")
+            return {}
+
+        open_ids = set().union(*results) if results else set()
+        removed = 0
+
+        for market_id, order in list(self.active_orders.items()):
+            order_ids = order.get('order_ids', {})
+            still_open = {side: oid for side, oid in order_ids.items() if oid in open_ids}
+
+            if not still_open:
+                del self.active_orders[market_id]
+                self._journal('order_removed', {'market_id': market_id})
+                removed += 1
+            elif len(still_open) < len(order_ids):
+                order['order_ids'] = still_open
+
+        known_ids = {oid for order in self.active_orders.values() for oid in order.get('order_ids', {}).values()}
+        orphans = open_ids - known_ids
+
+        logger.info(
+            f"🔄 Reconciled orders with CLOB: {len(self.active_orders)} kept, {removed} removed"
+            + (f", {len(orphans)} open order(s) not tracked by the bot" if orphans else "")
+        )
+        await self._sync_book_subscriptions()
+        return {'kept': len(self.active_orders), 'removed': removed, 'orphans': len(orphans)}
+
     def get_order_stats(self) -> Dict:
         """Get order statistics"""
         return {
@@ -8,22 +8,26 @@ import logging
 from typing import Dict, Optional
 import time
 
+from orderbook_codec import level_prices
+
 logger = logging.getLogger(__name__)
 
 
 class OrderRepositioner:
     """Monitors orderbook changes and repositions orders to maintain target position"""
 
-    def __init__(self, order_manager, orderbook_ws, config: dict):
+    def __init__(self, order_manager, orderbook_ws, config: dict, book_subscriptions=None):
         """Initialize order repositioner
 
         Args:
             order_manager: OrderManager instance
             orderbook_ws: OrderBookWebSocket instance
             config: Configuration dict
+            book_subscriptions: Optional OrderBookSubscriptionManager
         """
         self.order_manager = order_manager
         self.orderbook_ws = orderbook_ws
+        self.book_subscriptions = book_subscriptions
         self.config = config
 
         # Track order positions
@@ -34,6 +38,7 @@ class OrderRepositioner:
         self.min_reposition_gap = config.get('min_reposition_gap', 0.002)  # $0.002 = 0.2 cents
         self.max_repositions_per_hour = config.get('max_repositions_per_hour', 10)
         self.reposition_cooldown = config.get('reposition_cooldown', 60)  # seconds
+        self.max_book_age = config.get('max_book_age', 5)  # Never reposition against older books
 
         # Statistics
         self.repositions_count = 0
@@ -48,8 +53,18 @@ class OrderRepositioner:
                 # Check all active orders
                 active_orders = self.order_manager.active_orders
 
-                for market_id, order in active_orders.items():
-                    await self._check_and_reposition_order(market_id, order)
+                if self.book_subscriptions:
+                    tokens = [t for order in active_orders.values() for t in order.get('token_ids', [])[:2]]
+                    await self.book_subscriptions.sync('repositioner', tokens)
+
+                # Reward-solver orders are re-solved together in one batch
+                solved = self._solve_reward_quotes(active_orders)
+
+                for market_id, order in list(active_orders.items()):
+                    if market_id in solved:
+                        await self._check_solver_quote(market_id, order, *solved[market_id])
+                    else:
+                        await self._check_and_reposition_order(market_id, order)
 
                 # Wait before next check
                 await asyncio.sleep(self.check_interval)
@@ -81,11 +96,11 @@ class OrderRepositioner:
             no_token_id = token_ids[1]
 
             # Get real-time orderbooks from WebSocket
-            yes_orderbook = self.orderbook_ws.get_orderbook(yes_token_id)
-            no_orderbook = self.orderbook_ws.get_orderbook(no_token_id)
+            yes_orderbook = self.orderbook_ws.get_orderbook(yes_token_id, max_age=self.max_book_age)
+            no_orderbook = self.orderbook_ws.get_orderbook(no_token_id, max_age=self.max_book_age)
 
             if not yes_orderbook or not no_orderbook:
-                logger.debug(f"⏳ Orderbooks not available yet for {market_id}")
+                logger.debug(f"⏳ Fresh orderbooks not available for {market_id}")
                 return
 
             # Get our current order prices
@@ -108,6 +123,88 @@ class OrderRepositioner:
         except Exception as e:
             logger.error(f"Error checking order {market_id}: {e}")
 
+    def _solve_reward_quotes(self, active_orders: Dict) -> Dict:
+        """Re-solve reward-optimal quotes for all solver-placed orders in one batch
+
+        Args:
+            active_orders: OrderManager active orders
+
+        Returns:
+            market_id -> (solution or None, yes_orderbook, no_orderbook) for solver
+            orders with fresh books
+        """
+        solver = getattr(self.order_manager, 'quote_solver', None)
+        if not solver or not solver.enabled:
+            return {}
+
+        market_ids, inputs, books = [], [], []
+        for market_id, order in active_orders.items():
+            reward_params = order.get('reward_params')
+            token_ids = order.get('token_ids', [])
+            if not reward_params or len(token_ids) < 2:
+                continue
+            if order.get('position_info', {}).get('strategy') != 'reward_solver':
+                continue
+
+            yes_orderbook = self.orderbook_ws.get_orderbook(token_ids[0], max_age=self.max_book_age)
+            no_orderbook = self.orderbook_ws.get_orderbook(token_ids[1], max_age=self.max_book_age)
+            if not yes_orderbook or not no_orderbook:
+                continue
+
+            market_ids.append(market_id)
+            # Our own resting bids are in the ladder; re-solving against them would price us out of our own queue
+            inputs.append(self.order_manager.build_quote_input(reward_params, yes_orderbook, no_orderbook, own_order=order))
+            books.append((yes_orderbook, no_orderbook))
+
+        if not inputs:
+            return {}
+
+        solutions = solver.solve(inputs)
+        return {
+            market_id: (solution, yes_orderbook, no_orderbook)
+            for market_id, solution, (yes_orderbook, no_orderbook) in zip(market_ids, solutions, books)
+        }
+
+    async def _check_solver_quote(
+        self,
+        market_id: str,
+        order: Dict,
+        solution: Optional[Dict],
+        yes_orderbook: Dict,
+        no_orderbook: Dict
+    ):
+        """Move a solver-placed order when the re-solved quote has drifted
+
+        Args:
+            market_id: Market ID
+            order: Order details
+            solution: Fresh RewardQuoteSolver result (None if no valid quote)
+            yes_orderbook: YES token orderbook
+            no_orderbook: NO token orderbook
+        """
+        if not solution:
+            logger.debug(f"⏳ No reward-solver quote for {market_id}, keeping current orders")
+            return
+
+        if time.time() - self.last_reposition_time.get(market_id, 0) < self.reposition_cooldown:
+            return
+
+        our_yes_price = order.get('yes_order', {}).get('price')
+        our_no_price = order.get('no_order', {}).get('price')
+        if not our_yes_price or not our_no_price:
+            return
+
+        yes_gap = abs(solution['yes_price'] - our_yes_price)
+        no_gap = abs(solution['no_price'] - our_no_price)
+        if max(yes_gap, no_gap) <= self.min_reposition_gap:
+            return
+
+        logger.info(
+            f"🔄 Repositioning order for {market_id}: reward solver moved quote "
+            f"(YES {our_yes_price:.3f}→{solution['yes_price']:.3f}, NO {our_no_price:.3f}→{solution['no_price']:.3f})"
+        )
+        await self._reposition_order(market_id, order, yes_orderbook, no_orderbook, target=solution)
+
     def _check_if_needs_reposition(
         self,
         yes_orderbook: Dict,
@@ -185,9 +282,7 @@ class OrderRepositioner:
         Returns:
             Position (0-indexed, 0 = best bid)
         """
-        for i, bid in enumerate(bids):
-            bid_price = bid.get('price', 0)
-
+        for i, bid_price in enumerate(level_prices(bids)):
             # Check if this is our order (within 0.0001 tolerance)
             if abs(bid_price - our_price) < 0.0001:
                 return i
@@ -200,7 +295,8 @@ class OrderRepositioner:
         market_id: str,
         order: Dict,
         yes_orderbook: Dict,
-        no_orderbook: Dict
+        no_orderbook: Dict,
+        target: Optional[Dict] = None
     ):
         """Reposition order to target position
 
@@ -209,27 +305,33 @@ class OrderRepositioner:
             order: Current order details
             yes_orderbook: YES token orderbook
             no_orderbook: NO token orderbook
+            target: Optional RewardQuoteSolver quote ('yes_price', 'no_price', 'size')
+                used instead of the position #2-3 heuristic
         """
         try:
-            # Get bids
-            yes_bids = yes_orderbook.get('bids', [])
-            no_bids = no_orderbook.get('bids', [])
+            if target:
+                new_yes_price = target['yes_price']
+                new_no_price = target['no_price']
+            else:
+                # Get bids
+                yes_bids = yes_orderbook.get('bids', [])
+                no_bids = no_orderbook.get('bids', [])
 
-            if len(yes_bids) < 3 or len(no_bids) < 3:
-                logger.warning(f"⚠️  Not enough bids to reposition {market_id}")
-                return
+                if len(yes_bids) < 3 or len(no_bids) < 3:
+                    logger.warning(f"⚠️  Not enough bids to reposition {market_id}")
+                    return
 
-            # Calculate new prices at position #2 (0-indexed: position 1)
-            # Add small offset to ensure we're at position #2-3, not #1
-            yes_second_bid = yes_bids[1]['price']
-            no_second_bid = no_bids[1]['price']
+                # Calculate new prices at position #2 (0-indexed: position 1)
+                # Add small offset to ensure we're at position #2-3, not #1
+                yes_second_bid = yes_bids[1]['price']
+                no_second_bid = no_bids[1]['price']
 
-            # Small random offset to avoid exact match with existing orders
-            import random
-            offset = random.uniform(0.0005, 0.0010)  # 0.05-0.10 cents
+                # Small random offset to avoid exact match with existing orders
+                import random
+                offset = random.uniform(0.0005, 0.0010)  # 0.05-0.10 cents
 
-            new_yes_price = yes_second_bid - offset
-            new_no_price = no_second_bid - offset
+                new_yes_price = yes_second_bid - offset
+                new_no_price = no_second_bid - offset
 
             # Validate prices
             if new_yes_price < 0.001 or new_yes_price > 0.999:
@@ -249,21 +351,23 @@ class OrderRepositioner:
                 logger.warning(f"⚠️  Missing order IDs for {market_id}")
                 return
 
-            # Cancel existing orders
+            # Cancel existing orders (OrderManager paces cancels through the shared rate limiter)
             logger.info(f"🗑️  Cancelling existing orders for {market_id}")
             await self.order_manager.cancel_order(yes_order_id, reason="Repositioning")
-            await asyncio.sleep(0.5)
             await self.order_manager.cancel_order(no_order_id, reason="Repositioning")
-            await asyncio.sleep(0.5)
 
             # Create new orders at updated prices
-            logger.info(f"📤 Placing new orders at position #2-3")
+            logger.info(f"📤 Placing new orders at {'reward-optimal quote' if target else 'position #2-3'}")
             logger.info(f"   YES: ${new_yes_price:.4f} ({new_yes_price*100:.2f}¢)")
             logger.info(f"   NO: ${new_no_price:.4f} ({new_no_price*100:.2f}¢)")
 
             # Update order details
             order['yes_order']['price'] = new_yes_price
             order['no_order']['price'] = new_no_price
+            if target:
+                order['yes_order']['size'] = target['size']
+                order['no_order']['size'] = target['size']
+                order['position_info'] = {'strategy': 'reward_solver', **target}
 
             # Get wallet for placing new orders
             from wallet_manager import WalletManager
@@ -283,6 +387,14 @@ class OrderRepositioner:
         except Exception as e:
             logger.error(f"Error repositioning order {market_id}: {e}")
 
+    def get_state(self) -> Dict:
+        """Runtime state for StateStore snapshots"""
+        return {'last_reposition_time': self.last_reposition_time}
+
+    def restore_state(self, state: Dict):
+        """Restore runtime state from a StateStore snapshot"""
+        self.last_reposition_time = state.get('last_reposition_time', {})
+
     def get_stats(self) -> Dict:
         """Get repositioning statistics
 
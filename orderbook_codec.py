@@ -0,0 +1,228 @@
+"""
+OrderBook Codec Module
+Fast WebSocket message decoding (orjson when installed) with lazily decoded, array-backed book levels
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+from array import array
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+try:
+    import orjson
+    loads = orjson.loads
+    FAST_JSON = True
+except ImportError:
+    loads = json.loads
+    FAST_JSON = False
+
+logger = logging.getLogger(__name__)
+
+
+class BookSide(Sequence):
+    """One side of an order book, decoded on first use
+
+    Holds the raw level list from the message ([price, size] pairs,
+    {'price': '0.48', 'size': '100'} dicts with string values, or
+    OrderSummary objects from the REST client) and only
+    converts it to two `array('d')` columns when a consumer reads it. Numeric
+    consumers use `prices` / `sizes` directly; legacy code indexing, slicing or
+    iterating the side gets `{'price': float, 'size': float}` dicts built per
+    access.
+    """
+
+    __slots__ = ('_raw', '_prices', '_sizes')
+
+    def __init__(self, raw_levels: Optional[list] = None):
+        self._raw = raw_levels or []
+        self._prices: Optional[array] = None
+        self._sizes: Optional[array] = None
+
+    def _decode(self):
+        """Convert raw levels to float columns (skipping malformed levels)"""
+        prices = array('d')
+        sizes = array('d')
+        for level in self._raw:
+            try:
+                if isinstance(level, dict):
+                    price, size = float(level.get('price', 0)), float(level.get('size', 0))
+                elif hasattr(level, 'price'):
+                    # py_clob_client OrderSummary (REST fallback)
+                    price, size = float(level.price), float(level.size)
+                else:
+                    price, size = float(level[0]), float(level[1])
+            except (TypeError, ValueError, IndexError):
+                continue
+            prices.append(price)
+            sizes.append(size)
+
+        self._prices, self._sizes = prices, sizes
+        self._raw = None
+
+    @property
+    def prices(self) -> array:
+        """Level prices as a float array"""
+        if self._prices is None:
+            self._decode()
+        return self._prices
+
+    @property
+    def sizes(self) -> array:
+        """Level sizes as a float array"""
+        if self._sizes is None:
+            self._decode()
+        return self._sizes
+
+    @property
+    def decoded(self) -> bool:
+        """Whether levels have been converted yet"""
+        return self._prices is not None
+
+    def __len__(self) -> int:
+        if self._prices is None:
+            return len(self._raw)
+        return len(self._prices)
+
+    def __getitem__(self, index):
+        prices, sizes = self.prices, self.sizes
+        if isinstance(index, slice):
+            return [{'price': p, 'size': s} for p, s in zip(prices[index], sizes[index])]
+        return {'price': prices[index], 'size': sizes[index]}
+
+    def __iter__(self) -> Iterator[Dict]:
+        for price, size in zip(self.prices, self.sizes):
+            yield {'price': price, 'size': size}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BookSide):
+            return self.prices == other.prices and self.sizes == other.sizes
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BookSide({len(self)} levels)"
+
+
+def level_prices(levels) -> Sequence[float]:
+    """Prices of a book side without materialising level dicts when possible"""
+    if isinstance(levels, BookSide):
+        return levels.prices
+    return [float(level['price']) for level in levels]
+
+
+def decode_message(raw) -> List[Dict]:
+    """Decode a WebSocket frame into a list of events
+
+    Args:
+        raw: Message text or bytes
+
+    Returns:
+        List of event dicts (initial book dumps arrive as a list already)
+    """
+    data = loads(raw)
+    if isinstance(data, list):
+        return data
+    return [data]
+
+
+class ParserThread:
+    """Decodes WebSocket frames on a dedicated thread
+
+    Shards push raw frames with `submit()` (a `queue.SimpleQueue`, which is
+    lock-free from the caller's side); the thread decodes them and appends the
+    events to a deque that the event loop drains. The loop is woken with one
+    `call_soon_threadsafe` per burst rather than per message.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, on_events: Callable):
+        """Initialize parser thread
+
+        Args:
+            loop: Event loop that consumes decoded events
+            on_events: Coroutine function called on the loop with each decoded event list
+        """
+        self.loop = loop
+        self.on_events = on_events
+
+        self._inbox: queue.SimpleQueue = queue.SimpleQueue()
+        self._outbox: deque = deque()
+        self._ready = asyncio.Event()
+        self._wake_pending = False
+        self._thread: Optional[threading.Thread] = None
+        self._consumer: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.decoded = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the decoder thread and the loop-side consumer"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='orderbook-parser', daemon=True)
+        self._thread.start()
+        self._consumer = self.loop.create_task(self._drain())
+
+    def submit(self, raw):
+        """Queue a raw frame for decoding (called on the loop)"""
+        self._inbox.put(raw)
+
+    def _run(self):
+        """Thread body: decode frames until a None sentinel arrives"""
+        while True:
+            raw = self._inbox.get()
+            if raw is None:
+                break
+
+            try:
+                events = decode_message(raw)
+            except ValueError as e:
+                self.errors += 1
+                logger.error(f"Failed to parse WebSocket message: {e}")
+                continue
+
+            self._outbox.append(events)
+            self.decoded += 1
+
+            if not self._wake_pending:
+                self._wake_pending = True
+                try:
+                    self.loop.call_soon_threadsafe(self._ready.set)
+                except RuntimeError:
+                    break  # Loop closed
+
+    async def _drain(self):
+        """Loop side: hand decoded events to the consumer in arrival order"""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            self._wake_pending = False
+
+            while self._outbox:
+                await self.on_events(self._outbox.popleft())
+
+    async def stop(self):
+        """Stop the thread and consumer"""
+        if self._thread is not None:
+            self._inbox.put(None)
+            await asyncio.to_thread(self._thread.join, 5)
+            self._thread = None
+
+        if self._consumer is not None:
+            self._consumer.cancel()
+            await asyncio.gather(self._consumer, return_exceptions=True)
+            self._consumer = None
+
+    def get_stats(self) -> Dict:
+        """Get parser statistics"""
+        return {
+            'queued': self._inbox.qsize(),
+            'ready': len(self._outbox),
+            'decoded': self.decoded,
+            'errors': self.errors,
+        }
@@ -0,0 +1,216 @@
+"""
+OrderBook Subscriptions Module
+Reference-counted order book subscriptions with idle unsubscription and REST resnapshots of stale books
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+import aiohttp
+
+from circuit_breaker import CircuitBreakerOpenError, get_circuit_breaker
+from rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class OrderBookSubscriptionManager:
+    """Shares OrderBookWebSocket subscriptions between modules
+
+    Each module (owner) declares the tokens it needs; a token stays subscribed
+    while at least one owner holds it or a short lookup lease is active, and is
+    unsubscribed after `idle_unsubscribe_after` seconds without either. Books
+    that have not been updated for `resnapshot_after` seconds (quiet market,
+    dropped subscription, socket down) are refreshed over REST in batches so
+    readers holding a max-age contract get fresh data instead of nothing.
+    """
+
+    def __init__(self, orderbook_ws, config: dict, clob_host: str = 'https://clob.polymarket.com'):
+        """Initialize subscription manager
+
+        Args:
+            orderbook_ws: OrderBookWebSocket instance
+            config: `orderbook_websocket` section of config.yaml
+            clob_host: CLOB REST host for resnapshots
+        """
+        self.orderbook_ws = orderbook_ws
+        self.clob_host = clob_host
+        self.resnapshot_after = config.get('resnapshot_after', 15)  # seconds without update
+        self.resnapshot_batch_size = config.get('resnapshot_batch_size', 20)
+        self.idle_unsubscribe_after = config.get('idle_unsubscribe_after', 60)  # seconds
+        self.lease_ttl = config.get('lease_ttl', 120)  # seconds for one-off lookups
+        self.maintenance_interval = config.get('maintenance_interval', 5)  # seconds
+        self.request_timeout = config.get('request_timeout', 10)
+
+        self.owners: Dict[str, Set[str]] = {}  # token_id -> owners holding it
+        self.leases: Dict[str, float] = {}  # token_id -> lease expiry
+        self.idle_since: Dict[str, float] = {}  # token_id -> time it lost its last holder
+
+        self.rate_limiter = get_rate_limiter()
+        self.book_breaker = get_circuit_breaker('clob_book')
+
+        # Statistics
+        self.resnapshots = 0
+        self.resnapshot_failures = 0
+        self.idle_unsubscribes = 0
+
+    def _is_needed(self, token_id: str, now: float) -> bool:
+        """Token is held by an owner or an unexpired lease"""
+        return bool(self.owners.get(token_id)) or self.leases.get(token_id, 0) > now
+
+    async def acquire(self, owner: str, token_ids: Iterable[str]):
+        """Add a reference from owner to each token (subscribing if needed)
+
+        Args:
+            owner: Module name (e.g. 'order_mgr')
+            token_ids: Tokens the owner needs books for
+        """
+        for token_id in token_ids:
+            if not token_id:
+                continue
+            self.owners.setdefault(token_id, set()).add(owner)
+            self.idle_since.pop(token_id, None)
+            await self.orderbook_ws.subscribe(token_id)
+
+    def release(self, owner: str, token_ids: Iterable[str]):
+        """Drop owner's reference; tokens with no holders become idle
+
+        Args:
+            owner: Module name
+            token_ids: Tokens the owner no longer needs
+        """
+        now = time.time()
+        for token_id in token_ids:
+            holders = self.owners.get(token_id)
+            if not holders:
+                continue
+            holders.discard(owner)
+            if not holders:
+                del self.owners[token_id]
+                if not self._is_needed(token_id, now):
+                    self.idle_since[token_id] = now
+
+    async def sync(self, owner: str, token_ids: Iterable[str]):
+        """Set owner's references to exactly token_ids
+
+        Args:
+            owner: Module name
+            token_ids: Complete set of tokens the owner currently needs
+        """
+        wanted = {t for t in token_ids if t}
+        held = {t for t, holders in self.owners.items() if owner in holders}
+        self.release(owner, held - wanted)
+        await self.acquire(owner, wanted - held)
+
+    async def lease(self, token_id: str, ttl: Optional[float] = None):
+        """Hold a token for a limited time (one-off book lookups)
+
+        Args:
+            token_id: Token ID
+            ttl: Lease duration in seconds (default lease_ttl)
+        """
+        if not token_id:
+            return
+        self.leases[token_id] = time.time() + (ttl if ttl is not None else self.lease_ttl)
+        self.idle_since.pop(token_id, None)
+        await self.orderbook_ws.subscribe(token_id)
+
+    def refcount(self, token_id: str) -> int:
+        """Number of owners holding a token"""
+        return len(self.owners.get(token_id, ()))
+
+    def needed_tokens(self) -> List[str]:
+        """Tokens currently held by an owner or lease"""
+        now = time.time()
+        return [t for t in set(self.owners) | set(self.leases) if self._is_needed(t, now)]
+
+    async def maintain(self):
+        """One maintenance pass: expire leases, unsubscribe idle tokens, resnapshot stale books"""
+        now = time.time()
+
+        for token_id, expiry in list(self.leases.items()):
+            if expiry <= now:
+                del self.leases[token_id]
+                if not self.owners.get(token_id):
+                    self.idle_since.setdefault(token_id, expiry)
+
+        await self._unsubscribe_idle(now)
+        await self._resnapshot_stale(now)
+
+    async def _unsubscribe_idle(self, now: float):
+        """Unsubscribe tokens that have been idle longer than the grace period"""
+        for token_id, since in list(self.idle_since.items()):
+            if self._is_needed(token_id, now):
+                del self.idle_since[token_id]
+            elif now - since >= self.idle_unsubscribe_after:
+                del self.idle_since[token_id]
+                await self.orderbook_ws.unsubscribe(token_id)
+                self.idle_unsubscribes += 1
+
+    async def _resnapshot_stale(self, now: float):
+        """Fetch stale or missing books over REST in batches"""
+        stale = []
+        for token_id in self.needed_tokens():
+            age = self.orderbook_ws.get_book_age(token_id)
+            if age is None or age > self.resnapshot_after:
+                stale.append(token_id)
+
+        if not stale:
+            return
+
+        logger.debug(f"🔄 Resnapshotting {len(stale)} stale orderbooks over REST")
+
+        for i in range(0, len(stale), self.resnapshot_batch_size):
+            batch = stale[i:i + self.resnapshot_batch_size]
+            try:
+                books = await self.book_breaker.call(self._fetch_books, batch)
+            except CircuitBreakerOpenError as e:
+                logger.debug(f"Orderbook resnapshot skipped: {e}")
+                return
+            except Exception as e:
+                self.resnapshot_failures += 1
+                logger.warning(f"⚠️  Orderbook resnapshot failed for {len(batch)} tokens: {e}")
+                continue
+
+            for book in books or []:
+                await self.orderbook_ws.apply_book_snapshot(book)
+                self.resnapshots += 1
+
+    async def _fetch_books(self, token_ids: List[str]) -> List[Dict]:
+        """POST /books for a batch of tokens"""
+        await self.rate_limiter.acquire('clob_read')
+
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(
+                f"{self.clob_host}/books",
+                json=[{'token_id': token_id} for token_id in token_ids]
+            ) as response:
+                self.rate_limiter.record_response('clob_read', response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                return await response.json()
+
+    async def run(self):
+        """Periodic maintenance loop"""
+        while True:
+            try:
+                await self.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Orderbook subscription maintenance error: {e}")
+
+            await asyncio.sleep(self.maintenance_interval)
+
+    def get_stats(self) -> Dict:
+        """Get subscription statistics"""
+        return {
+            'held_tokens': len(self.owners),
+            'leased_tokens': len(self.leases),
+            'idle_tokens': len(self.idle_since),
+            'resnapshots': self.resnapshots,
+            'resnapshot_failures': self.resnapshot_failures,
+            'idle_unsubscribes': self.idle_unsubscribes,
+        }
@@ -4,104 +4,314 @@ Real-time order book updates via WebSocket for accurate order placement
 """
 
 import asyncio
+import random
 import websockets
 import json
 import logging
-from typing import Dict, Optional, Callable
+from typing import Dict, List, Optional, Callable, Set
 import time
 from collections import defaultdict
 
+from orderbook_codec import BookSide, ParserThread, decode_message
+
 logger = logging.getLogger(__name__)
 
 
-class OrderBookWebSocket:
-    """Manages WebSocket connection to Polymarket CLOB for real-time orderbook updates"""
+class OrderBookShard:
+    """One WebSocket connection carrying a subset of the subscribed tokens
 
-    def __init__(self, ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/market"):
-        """Initialize WebSocket connection manager
+    Tokens are subscribed in bulk asset-list messages: the first message on a
+    connection is the market-channel handshake with the current asset list,
+    later changes are sent as subscribe/unsubscribe operations. A shard only
+    connects while it has tokens and reconnects on its own with jittered
+    exponential backoff, so one dropped socket never blacks out the others.
+    """
+
+    def __init__(self, shard_id: int, ws_url: str, on_message: Callable, config: Dict):
+        """Initialize shard
 
         Args:
-            ws_url: WebSocket URL for Polymarket orderbook subscriptions
+            shard_id: Shard index (for logging)
+            ws_url: WebSocket URL
+            on_message: Async callback receiving every raw message
+            config: `orderbook_websocket` section of config.yaml
         """
+        self.shard_id = shard_id
         self.ws_url = ws_url
+        self._on_message = on_message
+
+        self.reconnect_delay = config.get('reconnect_delay', 5)  # seconds, backoff base
+        self.max_reconnect_delay = config.get('max_reconnect_delay', 60)  # seconds
+        self.ping_interval = config.get('ping_interval', 20)
+        self.ping_timeout = config.get('ping_timeout', 10)
+        self.subscribe_batch_size = config.get('subscribe_batch_size', 100)  # assets per message
+
+        self.tokens: Set[str] = set()  # Tokens assigned to this shard
+        self.sent: Set[str] = set()  # Tokens subscribed on the current connection
         self.ws_connection = None
-        self.orderbook_cache = {}  # Cache orderbooks by token_id
-        self.subscribed_tokens = set()  # Track subscribed token IDs
-        self.callbacks = defaultdict(list)  # Callbacks for orderbook updates
         self.running = False
-        self.reconnect_delay = 5  # seconds
-        self.last_update_time = {}  # Track last update time per token
+        self._handshake_sent = False
+        self._sync_scheduled = False
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Statistics
+        self.connects = 0
+        self.messages = 0
+
+    @property
+    def pending(self) -> Set[str]:
+        """Tokens assigned but not yet subscribed on a live connection"""
+        return self.tokens - self.sent
+
+    def add(self, token_id: str):
+        """Assign a token (sent with the next bulk message)"""
+        self.tokens.add(token_id)
+        self._changed()
+
+    def remove(self, token_id: str):
+        """Unassign a token (unsubscribed with the next bulk message)"""
+        self.tokens.discard(token_id)
+        self._changed()
+
+    def _changed(self):
+        """Coalesce assignment changes made in the same loop iteration into one sync"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        if self.ws_connection is None or self._sync_scheduled:
+            return
 
-    async def connect(self):
-        """Connect to WebSocket and start listening"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._sync_scheduled = True
+        loop.create_task(self._deferred_sync())
+
+    async def _deferred_sync(self):
+        """Run after the current callers yield, so bursts of add() become one message"""
+        self._sync_scheduled = False
+        await self.sync_subscriptions()
+
+    def _chunks(self, tokens: Set[str]) -> List[List[str]]:
+        """Split tokens into subscribe_batch_size lists"""
+        ordered = sorted(tokens)
+        return [ordered[i:i + self.subscribe_batch_size] for i in range(0, len(ordered), self.subscribe_batch_size)]
+
+    async def sync_subscriptions(self):
+        """Send bulk messages for the difference between assigned and subscribed tokens"""
+        if self.ws_connection is None:
+            return
+
+        try:
+            for chunk in self._chunks(self.tokens - self.sent):
+                if self._handshake_sent:
+                    message = {"assets_ids": chunk, "operation": "subscribe"}
+                else:
+                    message = {"assets_ids": chunk, "type": "market"}
+                    self._handshake_sent = True
+                self.sent.update(chunk)
+                await self.ws_connection.send(json.dumps(message))
+
+            for chunk in self._chunks(self.sent - self.tokens):
+                self.sent.difference_update(chunk)
+                await self.ws_connection.send(json.dumps({"assets_ids": chunk, "operation": "unsubscribe"}))
+
+        except Exception as e:
+            # Connection is going down; everything is resent on reconnect
+            logger.warning(f"⚠️  [shard {self.shard_id}] Failed to send subscriptions: {e}")
+
+    async def run(self):
+        """Connect while tokens are assigned; reconnect with jittered exponential backoff"""
         self.running = True
+        self._wakeup = asyncio.Event()
+        attempt = 0
 
         while self.running:
-            try:
-                logger.info(f"🔌 Connecting to WebSocket: {self.ws_url}")
+            if not self.tokens:
+                # Idle shard - no socket until a token is assigned
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
 
+            try:
                 async with websockets.connect(
                     self.ws_url,
-                    ping_interval=20,
-                    ping_timeout=10
+                    ping_interval=self.ping_interval,
+                    ping_timeout=self.ping_timeout
                 ) as websocket:
                     self.ws_connection = websocket
-                    logger.info("✅ WebSocket connected successfully")
-
-                    # Resubscribe to all tokens after reconnection
-                    await self._resubscribe_all()
-
-                    # Listen for messages
-                    await self._listen()
+                    self.sent = set()
+                    self._handshake_sent = False
+                    self.connects += 1
+                    attempt = 0
+                    logger.info(f"✅ [shard {self.shard_id}] WebSocket connected ({len(self.tokens)} tokens)")
+
+                    try:
+                        await self.sync_subscriptions()
+                        async for message in websocket:
+                            self.messages += 1
+                            await self._on_message(message)
+                    finally:
+                        self.ws_connection = None
+                        self.sent = set()
 
             except websockets.exceptions.ConnectionClosed:
-                logger.warning(f"⚠️  WebSocket connection closed, reconnecting in {self.reconnect_delay}s...")
-                await asyncio.sleep(self.reconnect_delay)
+                logger.warning(f"⚠️  [shard {self.shard_id}] WebSocket connection closed")
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"❌ WebSocket error: {e}")
-                await asyncio.sleep(self.reconnect_delay)
+                logger.error(f"❌ [shard {self.shard_id}] WebSocket error: {e}")
 
-    async def _listen(self):
-        """Listen for WebSocket messages"""
-        try:
-            async for message in self.ws_connection:
-                await self._process_message(message)
-        except Exception as e:
-            logger.error(f"Error listening to WebSocket: {e}")
-            raise
+            if not self.running:
+                break
+
+            # Full jitter so shards dropped together do not reconnect in lockstep
+            delay = random.uniform(0, min(self.max_reconnect_delay, self.reconnect_delay * 2 ** attempt))
+            attempt += 1
+            logger.info(f"🔌 [shard {self.shard_id}] Reconnecting in {delay:.1f}s...")
+            await asyncio.sleep(delay)
 
-    async def _process_message(self, message: str):
+    async def close(self):
+        """Stop the shard and close its connection"""
+        self.running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self.ws_connection is not None:
+            await self.ws_connection.close()
+
+    def get_stats(self) -> Dict:
+        """Get shard statistics"""
+        return {
+            'shard': self.shard_id,
+            'connected': self.ws_connection is not None,
+            'tokens': len(self.tokens),
+            'pending': len(self.pending),
+            'connects': self.connects,
+            'messages': self.messages,
+        }
+
+
+class OrderBookWebSocket:
+    """Manages WebSocket connections to Polymarket CLOB for real-time orderbook updates
+
+    Tokens are spread over up to `num_shards` connections (least-loaded shard
+    first); every shard feeds the same shared book store.
+    """
+
+    def __init__(
+        self,
+        ws_url: str = "wss://ws-subscriptions-clob.polymarket.com/ws/market",
+        max_age: float = 5.0,
+        config: Optional[Dict] = None
+    ):
+        """Initialize WebSocket connection manager
+
+        Args:
+            ws_url: WebSocket URL for Polymarket orderbook subscriptions
+            max_age: Default freshness contract for get_orderbook (seconds)
+            config: `orderbook_websocket` section of config.yaml (sharding, reconnect, ping)
+        """
+        config = config or {}
+        self.ws_url = ws_url
+        self.max_age = max_age
+        self.orderbook_cache = {}  # Cache orderbooks by token_id
+        self.subscribed_tokens = set()  # Track subscribed token IDs (across all shards)
+        self.callbacks = defaultdict(list)  # Callbacks for orderbook updates
+        self.running = False
+        self.last_update_time = {}  # Track last update time per token
+
+        num_shards = max(1, config.get('num_shards', 4))
+        self.shards = [OrderBookShard(i, ws_url, self._on_raw_message, config) for i in range(num_shards)]
+        self.token_shard: Dict[str, OrderBookShard] = {}  # token_id -> shard carrying it
+
+        # Optionally decode frames on a dedicated thread (very high message rates)
+        self.parse_in_thread = config.get('parse_in_thread', False)
+        self.parser: Optional[ParserThread] = None
+
+        # Statistics
+        self.stale_reads = 0
+
+    @property
+    def pending_subscriptions(self) -> Set[str]:
+        """Subscribed tokens not yet sent on a live connection"""
+        return set().union(*(shard.pending for shard in self.shards))
+
+    async def connect(self):
+        """Run all shards (each connects, listens and reconnects independently)"""
+        self.running = True
+        logger.info(f"🔌 Connecting to WebSocket: {self.ws_url} ({len(self.shards)} shards)")
+
+        if self.parse_in_thread and self.parser is None:
+            self.parser = ParserThread(asyncio.get_running_loop(), self._process_events)
+            self.parser.start()
+
+        try:
+            await asyncio.gather(*(shard.run() for shard in self.shards))
+        finally:
+            self.running = False
+
+    async def _on_raw_message(self, message):
+        """Route a raw frame from a shard to the parser thread or decode it inline"""
+        if self.parser is not None:
+            self.parser.submit(message)
+        else:
+            await self._process_message(message)
+
+    async def _process_message(self, message):
         """Process incoming WebSocket message
 
         Args:
-            message: Raw WebSocket message (JSON string)
+            message: Raw WebSocket message (JSON text or bytes)
         """
         try:
-            data = json.loads(message)
+            events = decode_message(message)
+        except ValueError as e:
+            logger.error(f"Failed to parse WebSocket message: {e}")
+            return
+
+        await self._process_events(events)
+
+    async def _process_events(self, events: List[Dict]):
+        """Dispatch decoded events in order
 
-            # Log raw message for debugging
+        Args:
+            events: Decoded events (initial book dumps arrive as a list)
+        """
+        for event in events:
+            try:
+                await self._process_event(event)
+            except Exception as e:
+                logger.error(f"Error processing WebSocket message: {e}")
+
+    async def _process_event(self, data: Dict):
+        """Dispatch a single WebSocket event
+
+        Args:
+            data: Decoded event
+        """
+        # Log raw message for debugging (formatting a whole book is expensive)
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(f"📨 WebSocket message: {data}")
 
-            # Handle different message types
-            msg_type = data.get('type') or data.get('event_type')
-
-            if msg_type == 'book':
-                # Orderbook update
-                await self._handle_orderbook_update(data)
-            elif msg_type == 'last_trade_price':
-                # Trade update (can be used to infer orderbook changes)
-                logger.debug(f"💱 Trade update: {data}")
-            elif msg_type == 'error':
-                logger.error(f"❌ WebSocket error message: {data}")
-            elif msg_type == 'subscribed':
-                logger.info(f"✅ Subscribed to market: {data.get('market', 'unknown')}")
-            else:
-                logger.debug(f"🔍 Unknown message type: {msg_type}")
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse WebSocket message: {e}")
-        except Exception as e:
-            logger.error(f"Error processing WebSocket message: {e}")
+        # Handle different message types
+        msg_type = data.get('type') or data.get('event_type')
+
+        if msg_type == 'book':
+            # Orderbook update
+            await self._handle_orderbook_update(data)
+        elif msg_type == 'tick_size_change':
+            self._handle_tick_size_change(data)
+        elif msg_type == 'last_trade_price':
+            # Trade update (can be used to infer orderbook changes)
+            logger.debug(f"💱 Trade update: {data}")
+        elif msg_type == 'error':
+            logger.error(f"❌ WebSocket error message: {data}")
+        elif msg_type == 'subscribed':
+            logger.info(f"✅ Subscribed to market: {data.get('market', 'unknown')}")
+        else:
+            logger.debug(f"🔍 Unknown message type: {msg_type}")
 
     async def _handle_orderbook_update(self, data: Dict):
         """Handle orderbook update message
@@ -117,31 +327,26 @@ class OrderBookWebSocket:
                 logger.warning(f"⚠️  Orderbook update missing token_id: {data}")
                 return
 
-            # Extract bids and asks
-            bids = data.get('bids', [])
-            asks = data.get('asks', [])
+            if token_id not in self.subscribed_tokens:
+                # Late update for a token we already unsubscribed from
+                return
 
-            # Update cache
+            # Levels stay undecoded until a consumer reads them (most books are never read)
+            previous = self.orderbook_cache.get(token_id) or {}
             orderbook = {
-                'bids': self._parse_orders(bids),
-                'asks': self._parse_orders(asks),
+                'bids': BookSide(data.get('bids')),
+                'asks': BookSide(data.get('asks')),
                 'timestamp': data.get('timestamp', time.time() * 1000),
-                'market': token_id
+                'market': token_id,
+                'tick_size': data.get('tick_size') or previous.get('tick_size'),
             }
 
             self.orderbook_cache[token_id] = orderbook
             self.last_update_time[token_id] = time.time()
 
-            logger.debug(f"📊 Updated orderbook for {token_id}:")
-            logger.debug(f"   Bids: {len(orderbook['bids'])}, Asks: {len(orderbook['asks'])}")
-
-            if orderbook['bids']:
-                best_bid = orderbook['bids'][0]
-                logger.debug(f"   Best Bid: ${best_bid['price']:.4f} x {best_bid['size']:.0f}")
-
-            if orderbook['asks']:
-                best_ask = orderbook['asks'][0]
-                logger.debug(f"   Best Ask: ${best_ask['price']:.4f} x {best_ask['size']:.0f}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"📊 Updated orderbook for {token_id}:")
+                logger.debug(f"   Bids: {len(orderbook['bids'])}, Asks: {len(orderbook['asks'])}")
 
             # Call registered callbacks
             await self._trigger_callbacks(token_id, orderbook)
@@ -149,62 +354,34 @@ class OrderBookWebSocket:
         except Exception as e:
             logger.error(f"Error handling orderbook update: {e}")
 
-    def _parse_orders(self, orders: list) -> list:
-        """Parse order list from WebSocket format to standard format
-
-        Args:
-            orders: List of orders from WebSocket (could be [price, size] or {price, size})
-
-        Returns:
-            List of orders in standard format [{price, size}, ...]
-        """
-        parsed = []
-
-        for order in orders:
-            if isinstance(order, list) and len(order) >= 2:
-                # Format: [price, size]
-                parsed.append({
-                    'price': float(order[0]),
-                    'size': float(order[1])
-                })
-            elif isinstance(order, dict):
-                # Format: {price: ..., size: ...}
-                parsed.append({
-                    'price': float(order.get('price', 0)),
-                    'size': float(order.get('size', 0))
-                })
-
-        return parsed
-
-    async def subscribe(self, token_id: str):
+    async def subscribe(self, token_id: str) -> bool:
         """Subscribe to orderbook updates for a token
 
+        The token is assigned to the least-loaded shard; subscriptions made in the
+        same loop iteration go out as one bulk message, and subscriptions made
+        while the shard is disconnected are sent on (re)connect.
+
         Args:
             token_id: Token ID to subscribe to
+
+        Returns:
+            True if the subscription is (or will immediately be) live, False if queued
         """
         if token_id in self.subscribed_tokens:
             logger.debug(f"Already subscribed to {token_id}")
-            return
-
-        if not self.ws_connection:
-            logger.warning("WebSocket not connected, cannot subscribe")
-            return
-
-        try:
-            # Subscribe message format for Polymarket
-            subscribe_msg = {
-                "type": "subscribe",
-                "channel": "book",
-                "market": token_id
-            }
+            return True
 
-            await self.ws_connection.send(json.dumps(subscribe_msg))
-            self.subscribed_tokens.add(token_id)
+        shard = min(self.shards, key=lambda s: (len(s.tokens), s.shard_id))
+        self.token_shard[token_id] = shard
+        self.subscribed_tokens.add(token_id)
+        shard.add(token_id)
 
-            logger.info(f"📡 Subscribed to orderbook for token: {token_id}")
+        if shard.ws_connection is None:
+            logger.debug(f"⏳ Shard {shard.shard_id} not connected, queued subscription for {token_id}")
+            return False
 
-        except Exception as e:
-            logger.error(f"Failed to subscribe to {token_id}: {e}")
+        logger.debug(f"📡 Subscribing to orderbook for token {token_id} (shard {shard.shard_id})")
+        return True
 
     async def unsubscribe(self, token_id: str):
         """Unsubscribe from orderbook updates
@@ -215,66 +392,58 @@ class OrderBookWebSocket:
         if token_id not in self.subscribed_tokens:
             return
 
-        if not self.ws_connection:
-            return
-
-        try:
-            unsubscribe_msg = {
-                "type": "unsubscribe",
-                "channel": "book",
-                "market": token_id
-            }
-
-            await self.ws_connection.send(json.dumps(unsubscribe_msg))
-            self.subscribed_tokens.remove(token_id)
-
-            # Remove from cache
-            if token_id in self.orderbook_cache:
-                del self.orderbook_cache[token_id]
+        self.subscribed_tokens.discard(token_id)
+        self.orderbook_cache.pop(token_id, None)
+        self.last_update_time.pop(token_id, None)
 
-            logger.info(f"📴 Unsubscribed from orderbook for token: {token_id}")
+        shard = self.token_shard.pop(token_id, None)
+        if shard is not None:
+            shard.remove(token_id)
 
-        except Exception as e:
-            logger.error(f"Failed to unsubscribe from {token_id}: {e}")
-
-    async def _resubscribe_all(self):
-        """Resubscribe to all tokens after reconnection"""
-        if not self.subscribed_tokens:
-            return
-
-        logger.info(f"🔄 Resubscribing to {len(self.subscribed_tokens)} tokens...")
-
-        for token_id in list(self.subscribed_tokens):
-            try:
-                subscribe_msg = {
-                    "type": "subscribe",
-                    "channel": "book",
-                    "market": token_id
-                }
-                await self.ws_connection.send(json.dumps(subscribe_msg))
-                logger.debug(f"   ✅ Resubscribed to {token_id}")
-            except Exception as e:
-                logger.error(f"   ❌ Failed to resubscribe to {token_id}: {e}")
+        logger.debug(f"📴 Unsubscribed from orderbook for token: {token_id}")
 
-    def get_orderbook(self, token_id: str) -> Optional[Dict]:
-        """Get cached orderbook for a token
+    def get_orderbook(self, token_id: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Get cached orderbook for a token if it is fresh enough
 
         Args:
             token_id: Token ID
+            max_age: Maximum acceptable age in seconds (default self.max_age,
+                float('inf') accepts any cached book)
 
         Returns:
-            Orderbook data or None if not available
+            Orderbook data, or None if not cached or older than max_age
         """
         orderbook = self.orderbook_cache.get(token_id)
+        if orderbook is None:
+            return None
 
-        if orderbook:
-            # Check if data is stale (older than 5 seconds)
-            age = time.time() - self.last_update_time.get(token_id, 0)
-            if age > 5:
-                logger.warning(f"⚠️  Orderbook for {token_id} is stale ({age:.1f}s old)")
+        age = self.get_book_age(token_id)
+        if age > (self.max_age if max_age is None else max_age):
+            self.stale_reads += 1
+            logger.debug(f"⏳ Orderbook for {token_id} is stale ({age:.1f}s old)")
+            return None
 
         return orderbook
 
+    def get_book_age(self, token_id: str) -> Optional[float]:
+        """Seconds since the last update for a token (None if never received)"""
+        last_update = self.last_update_time.get(token_id)
+        if last_update is None:
+            return None
+        return time.time() - last_update
+
+    def _handle_tick_size_change(self, data: Dict):
+        """Update the tick size of a cached book (market moved near 0 or 1)"""
+        token_id = data.get('asset_id') or data.get('token_id')
+        orderbook = self.orderbook_cache.get(token_id)
+        if orderbook is not None and data.get('new_tick_size'):
+            orderbook['tick_size'] = data['new_tick_size']
+            logger.debug(f"📏 Tick size of {token_id} changed to {data['new_tick_size']}")
+
+    async def apply_book_snapshot(self, data: Dict):
+        """Apply a full book fetched over REST (same shape as a WebSocket 'book' message)"""
+        await self._handle_orderbook_update(data)
+
     def register_callback(self, token_id: str, callback: Callable):
         """Register a callback for orderbook updates
 
@@ -299,16 +468,39 @@ class OrderBookWebSocket:
                 logger.error(f"Error in callback for {token_id}: {e}")
 
     def is_connected(self) -> bool:
-        """Check if WebSocket is connected"""
-        return self.ws_connection is not None and self.ws_connection.open
+        """Check if every shard carrying tokens is connected"""
+        active = [shard for shard in self.shards if shard.tokens]
+        return bool(active) and all(shard.ws_connection is not None for shard in active)
+
+    def get_freshness(self) -> Dict:
+        """Feed freshness for health probes
+
+        Returns:
+            connected, subscribed token count, seconds since the newest update
+            on any subscribed token and since the stalest one (None if no
+            update was received yet)
+        """
+        now = time.time()
+        updates = [self.last_update_time[t] for t in self.subscribed_tokens if t in self.last_update_time]
+        return {
+            'connected': self.is_connected(),
+            'subscribed_tokens': len(self.subscribed_tokens),
+            'last_update_age': now - max(updates) if updates else None,
+            'oldest_book_age': now - min(updates) if updates else None,
+        }
 
     async def close(self):
-        """Close WebSocket connection"""
+        """Close all WebSocket connections"""
         self.running = False
 
-        if self.ws_connection:
-            await self.ws_connection.close()
-            logger.info("🔌 WebSocket connection closed")
+        for shard in self.shards:
+            await shard.close()
+
+        if self.parser is not None:
+            await self.parser.stop()
+            self.parser = None
+
+        logger.info("🔌 WebSocket connections closed")
 
     def get_stats(self) -> Dict:
         """Get WebSocket statistics
@@ -319,6 +511,10 @@ class OrderBookWebSocket:
         return {
             'connected': self.is_connected(),
             'subscribed_tokens': len(self.subscribed_tokens),
+            'pending_subscriptions': len(self.pending_subscriptions),
+            'stale_reads': self.stale_reads,
+            'shards': [shard.get_stats() for shard in self.shards],
+            'parser': self.parser.get_stats() if self.parser else None,
             'cached_orderbooks': len(self.orderbook_cache),
             'registered_callbacks': sum(len(cbs) for cbs in self.callbacks.values())
         }
@@ -10,6 +10,8 @@ import logging
 from typing import List, Dict, Optional
 import urllib.parse
 
+from rate_limiter import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,6 +19,7 @@ class PolymarketRewardsAPI:
     """Fetch rewards markets using official Polymarket API"""
     
     def __init__(self):
+        self.rate_limiter = get_rate_limiter()
         self.base_url = "https://polymarket.com/api/rewards/markets"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -64,7 +67,9 @@ class PolymarketRewardsAPI:
                     logger.info(f"📄 Fetching page {page} (cursor: {next_cursor[:20]}...)...")
                     
                     try:
+                        await self.rate_limiter.acquire('rewards')
                         async with session.get(self.base_url, params=params, headers=self.headers, timeout=30) as response:
+                            self.rate_limiter.record_response('rewards', response.status, response.headers.get('Retry-After'))
                             if response.status != 200:
                                 logger.error(f"❌ Failed to fetch page: HTTP {response.status}")
                                 break
@@ -304,6 +304,14 @@ class PositionMonitor:
             'ws_connected': self.ws_connection is not None
         }
     
+    def get_state(self) -> Dict:
+        """Runtime state for StateStore snapshots"""
+        return {'price_history': self.price_history}
+
+    def restore_state(self, state: Dict):
+        """Restore runtime state from a StateStore snapshot"""
+        self.price_history = state.get('price_history', {})
+
     async def close(self):
         """Close WebSocket connection"""
         if self.ws_connection:
@@ -4,29 +4,43 @@ Automatically close profitable positions to lock in gains
 """
 
 import asyncio
+import aiohttp
 import logging
 import time
-import requests
-from typing import Dict, List, Optional
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import OrderArgs, OrderType
 from py_clob_client.constants import POLYGON
-from py_clob_client.order_builder.constants import BUY, SELL
 import os
 from dotenv import load_dotenv
 
+from circuit_breaker import get_circuit_breaker
+from liquidation_engine import LiquidationEngine, round_size
+from orderbook_codec import level_prices
+from rate_limiter import get_rate_limiter
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+DATA_API_POSITIONS_URL = "https://data-api.polymarket.com/positions"
+
+
+def position_key(wallet_address: Optional[str], token_id: Optional[str]) -> str:
+    """Key of one wallet's position in a token (the same token can be held by several wallets)"""
+    return f"{(wallet_address or '').lower()}:{token_id}"
+
 
 class ProfitTakingManager:
     """Monitor filled positions and automatically close profitable ones"""
     
-    def __init__(self, config: dict, telegram_notifier=None):
+    def __init__(self, config: dict, telegram_notifier=None, orderbook_ws=None, wallet_manager=None, book_subscriptions=None):
         self.config = config.get('profit_taking', {})
         self.telegram = telegram_notifier
+        self.orderbook_ws = orderbook_ws  # Live mid prices instead of stale curPrice
+        self.wallet_manager = wallet_manager  # Check positions of all configured wallets
+        self.book_subscriptions = book_subscriptions  # Shared, ref-counted orderbook subscriptions
         
         # Configuration
         self.enabled = self.config.get('enabled', True)
@@ -37,12 +51,20 @@ class ProfitTakingManager:
         self.never_close_losing = self.config.get('never_close_losing_positions', True)
         self.min_hold_time = self.config.get('min_hold_time', 300)  # 5 minutes
         self.alert_on_close = self.config.get('alert_on_profit_close', True)
+        self.page_size = self.config.get('positions_page_size', 500)
+        self.request_timeout = self.config.get('request_timeout', 10)
+        self.max_price_age = self.config.get('max_price_age', 30)  # seconds
+        self.max_slippage = self.config.get('max_slippage', 0.02)  # Below best bid, see LiquidationEngine
+        self.partial_retry_after = self.config.get('partial_retry_after', 60)  # Re-evaluate a partly closed position after (s)
         
         # Initialize CLOB client
         self.client = self._initialize_client()
         
         # Tracking
-        self.closed_positions = {}
+        self.closed_positions = {}  # position_key(wallet, token_id) -> close record ('retry_at' set while partly closed)
+        self.liquidator = LiquidationEngine(config, orderbook_ws=orderbook_ws)  # Signing clients reused across sells
+        self.rate_limiter = get_rate_limiter()
+        self.data_api_breaker = get_circuit_breaker('data_api')
         self.last_check_time = 0
         
         logger.info("✅ Profit Taking Manager initialized")
@@ -88,26 +110,21 @@ class ProfitTakingManager:
             return None
     
     async def check_and_close_positions(self):
-        """Main loop: Check positions and close profitable ones"""
+        """Main loop: Check positions of all wallets and close profitable ones"""
         if not self.enabled:
             logger.info("Profit taking disabled in config")
             return
         
-        if not self.client:
-            logger.error("CLOB client not initialized, cannot close positions")
-            return
-        
         try:
-            # Get wallet address
-            wallet_address = os.getenv('WALLET_ADDRESS')
-            if not wallet_address:
-                logger.error("WALLET_ADDRESS not found in .env")
+            wallets = self._get_wallets()
+            if not wallets:
+                logger.error("No wallets configured (WALLET_X_PK / WALLET_ADDRESS), cannot check positions")
                 return
             
-            logger.info(f"🔍 Checking positions for wallet: {wallet_address[:10]}...{wallet_address[-8:]}")
+            logger.info(f"🔍 Checking positions for {len(wallets)} wallet(s)")
             
-            # Fetch positions from Polymarket Data API
-            positions = await self._fetch_positions(wallet_address)
+            # Fetch positions for all wallets concurrently
+            positions = await self._fetch_all_positions(wallets)
             
             if not positions:
                 logger.info("✅ No active positions to check")
@@ -115,190 +132,312 @@ class ProfitTakingManager:
             
             logger.info(f"📊 Found {len(positions)} active positions")
             
-            # Check each position
-            for position in positions:
-                await self._process_position(position)
+            # Subscribe position tokens so next check can use live mid prices
+            await self._subscribe_position_tokens(positions)
+            
+            # Evaluate all positions in one pass
+            evaluations = self._evaluate_positions(positions)
+            
+            to_close = []
+            for evaluation in evaluations:
+                self._log_evaluation(evaluation)
+                if evaluation['action'] == 'close':
+                    to_close.append(evaluation)
+            
+            if to_close:
+                await self._close_positions(to_close, wallets)
             
             self.last_check_time = time.time()
             
         except Exception as e:
             logger.error(f"❌ Error checking positions: {e}")
     
-    async def _fetch_positions(self, wallet_address: str) -> List[Dict]:
-        """Fetch positions from Polymarket Data API"""
-        try:
-            data_api_url = "https://data-api.polymarket.com/positions"
+    def _get_wallets(self) -> List[Dict]:
+        """Get wallets to check (all wallets from WalletManager, or WALLET_ADDRESS fallback)"""
+        if self.wallet_manager and self.wallet_manager.wallets:
+            return [
+                {'address': w['address'], 'private_key': w['private_key']}
+                for w in self.wallet_manager.wallets
+            ]
+        
+        wallet_address = os.getenv('WALLET_ADDRESS')
+        private_key = os.getenv('WALLET_1_PK') or os.getenv('PRIVATE_KEY')
+        if not wallet_address:
+            logger.error("WALLET_ADDRESS not found in .env")
+            return []
+        
+        return [{'address': wallet_address, 'private_key': private_key}]
+    
+    async def _fetch_all_positions(self, wallets: List[Dict]) -> List[Dict]:
+        """Fetch positions for all wallets concurrently
+
+        Each returned position is tagged with '_wallet' (owner address).
+        """
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(self._fetch_positions(w['address'], session) for w in wallets),
+                return_exceptions=True
+            )
+        
+        positions = []
+        for wallet, result in zip(wallets, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Failed to fetch positions for {wallet['address'][:10]}...: {result}")
+                continue
+            positions.extend(result)
+        
+        return positions
+    
+    async def _fetch_positions(self, wallet_address: str, session: aiohttp.ClientSession) -> List[Dict]:
+        """Fetch all positions of one wallet from Polymarket Data API (paginated)"""
+        positions = []
+        offset = 0
+        
+        async def fetch_page(params: Dict) -> List[Dict]:
+            await self.rate_limiter.acquire('data_api')
+            async with session.get(DATA_API_POSITIONS_URL, params=params) as response:
+                self.rate_limiter.record_response('data_api', response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                return await response.json()
+        
+        while True:
             params = {
                 "user": wallet_address,
                 "sizeThreshold": 0.01,
-                "limit": 500
+                "limit": self.page_size,
+                "offset": offset
             }
             
-            response = requests.get(data_api_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            # Fails fast while the Data API is down, serving the last page seen if recent
+            page = await self.data_api_breaker.call_cached((wallet_address, offset), fetch_page, params)
             
-            # Filter out positions we've already closed
-            active_positions = []
-            for pos in data:
-                token_id = pos.get('asset_id')
-                if token_id not in self.closed_positions:
-                    active_positions.append(pos)
+            if not page:
+                break
             
-            return active_positions
+            for pos in page:
+                # Filter out positions we've already closed (a partly closed one comes back after retry_at)
+                closed = self.closed_positions.get(position_key(wallet_address, pos.get('asset')))
+                if closed and (closed.get('retry_at') is None or time.time() < closed['retry_at']):
+                    continue
+                pos['_wallet'] = wallet_address
+                positions.append(pos)
             
-        except Exception as e:
-            logger.error(f"❌ Failed to fetch positions: {e}")
-            return []
+            if len(page) < self.page_size:
+                break
+            offset += self.page_size
+        
+        logger.debug(f"Fetched {len(positions)} positions for {wallet_address[:10]}...")
+        return positions
     
-    async def _process_position(self, position: Dict):
-        """Process a single position and decide if it should be closed"""
-        try:
-            # Debug: Log raw position data
-            logger.debug(f"Raw position data: {position}")
+    async def _subscribe_position_tokens(self, positions: List[Dict]):
+        """Subscribe position tokens to WebSocket orderbook updates"""
+        if not self.orderbook_ws:
+            return
+        
+        if self.book_subscriptions:
+            # Positions that were closed or redeemed release their books
+            await self.book_subscriptions.sync('profit_taking', [pos.get('asset') for pos in positions])
+            return
+        
+        for pos in positions:
+            token_id = pos.get('asset')
+            if token_id and token_id not in self.orderbook_ws.subscribed_tokens:
+                await self.orderbook_ws.subscribe(token_id)
+    
+    def _get_mid_price(self, token_id: str) -> Optional[float]:
+        """Get live mid price from WebSocket orderbook (None if missing or stale)"""
+        if not self.orderbook_ws or not token_id:
+            return None
+        
+        orderbook = self.orderbook_ws.get_orderbook(token_id, max_age=self.max_price_age)
+        if not orderbook or not orderbook.get('bids') or not orderbook.get('asks'):
+            return None
+        
+        best_bid = max(level_prices(orderbook['bids']))
+        best_ask = min(level_prices(orderbook['asks']))
+        return (best_bid + best_ask) / 2
+    
+    def _expected_sale(self, position: Dict) -> Tuple[float, float]:
+        """Shares the close would actually sell and their average price
 
-            market = position.get('title', 'Unknown')  # Changed from 'market' to 'title'
-            token_id = position.get('asset')  # Changed from 'asset_id' to 'asset'
-            shares = float(position.get('size', 0))
-            avg_price = float(position.get('avgPrice', 0))  # Changed from 'average_entry_price' to 'avgPrice'
-            current_price = float(position.get('curPrice', 0))  # Changed from 'current_price' to 'curPrice'
+        Plans the sell the way _close_positions executes it (bid ladder down to
+        best bid x (1 - max_slippage), no resting residual). Without a live book
+        the close fetches one, so the whole position is assumed sold at the
+        floor below curPrice.
+        """
+        book = self.liquidator.cached_book(position.get('asset'))
+        plan = self.liquidator.plan(position, book, self.max_slippage, rest_residual=False)
+        if book is None:
+            return plan['shares'], plan['floor_price']
+        sold = sum(s['size'] for s in plan['slices'])
+        return sold, plan['expected_proceeds'] / sold if sold > 0 else plan['floor_price']
+    
+    def _evaluate_positions(self, positions: List[Dict]) -> List[Dict]:
+        """Evaluate P&L of all positions in one vectorised pass
 
-            # Debug: Log extracted values
-            logger.debug(f"Extracted - shares: {shares}, avg_price: {avg_price}, current_price: {current_price}")
+        The mark price is the WebSocket mid when fresh, otherwise the Data API
+        curPrice; profitability is judged on what the close can realize: the
+        shares the book absorbs above the slippage floor at their expected
+        fill price, not the whole position at the mark.
 
-            if shares <= 0 or avg_price <= 0 or current_price <= 0:
-                logger.warning(f"⚠️  Skipping position {market[:30]} - invalid data (shares={shares}, avg={avg_price}, current={current_price})")
-                return
-            
-            # Calculate P&L
-            total_cost = shares * avg_price
-            current_value = shares * current_price
-            pnl = current_value - total_cost
-            pnl_pct = (pnl / total_cost * 100) if total_cost > 0 else 0
-            
-            logger.info(f"\n📈 Position: {market[:50]}")
-            logger.info(f"   Shares: {shares:.2f} @ ${avg_price:.4f}")
-            logger.info(f"   Current: ${current_price:.4f}")
-            logger.info(f"   P&L: ${pnl:.2f} ({pnl_pct:+.2f}%)")
-            
-            # Check if losing position
-            if pnl_pct < 0:
-                if self.never_close_losing:
-                    logger.info(f"   ⏸️  Losing position - NOT closing (manual decision required)")
-                    return
-            
-            # Check profit thresholds
-            should_close = False
-            close_reason = ""
-            
-            if pnl_pct >= self.max_profit_pct:
-                should_close = True
-                close_reason = f"max_profit_reached ({pnl_pct:.2f}% >= {self.max_profit_pct}%)"
-            elif pnl_pct >= self.target_profit_pct:
-                should_close = True
-                close_reason = f"target_profit_reached ({pnl_pct:.2f}% >= {self.target_profit_pct}%)"
-            elif pnl_pct >= self.min_profit_pct:
-                logger.info(f"   💰 Profitable ({pnl_pct:.2f}%), waiting for target ({self.target_profit_pct}%)")
-                return
+        Returns:
+            List of evaluations (same order as positions) with action 'close', 'hold' or 'skip'
+        """
+        shares = np.array([float(p.get('size', 0) or 0) for p in positions])
+        avg_price = np.array([float(p.get('avgPrice', 0) or 0) for p in positions])
+        cur_price = np.array([float(p.get('curPrice', 0) or 0) for p in positions])
+        mid_price = np.array([
+            mid if (mid := self._get_mid_price(p.get('asset'))) is not None else np.nan
+            for p in positions
+        ])
+        
+        use_mid = ~np.isnan(mid_price)
+        price = np.where(use_mid, mid_price, cur_price)
+        
+        valid = (shares > 0) & (avg_price > 0) & (price > 0)
+        sale = np.array([
+            self._expected_sale(p) if valid[i] else (0.0, 0.0) for i, p in enumerate(positions)
+        ]).reshape(-1, 2)
+        sell_shares, fill_price = sale[:, 0], sale[:, 1]
+        cost = sell_shares * avg_price
+        pnl = sell_shares * fill_price - cost
+        pnl_pct = np.divide(pnl * 100, cost, out=np.zeros_like(pnl), where=cost > 0)
+        
+        close_max = valid & (pnl_pct >= self.max_profit_pct)
+        close_target = valid & ~close_max & (pnl_pct >= self.target_profit_pct)
+        # Losing positions never reach the profit thresholds, so they are always held
+        
+        evaluations = []
+        for i, position in enumerate(positions):
+            if not valid[i]:
+                action, reason = 'skip', 'invalid data'
+            elif close_max[i]:
+                action = 'close'
+                reason = f"max_profit_reached ({pnl_pct[i]:.2f}% >= {self.max_profit_pct}%)"
+            elif close_target[i]:
+                action = 'close'
+                reason = f"target_profit_reached ({pnl_pct[i]:.2f}% >= {self.target_profit_pct}%)"
+            elif pnl_pct[i] < 0:
+                action = 'hold'
+                reason = 'losing' if self.never_close_losing else 'not_profitable'
+            elif pnl_pct[i] >= self.min_profit_pct:
+                action, reason = 'hold', 'waiting_for_target'
             else:
-                logger.info(f"   ⏳ Not profitable enough ({pnl_pct:.2f}% < {self.min_profit_pct}%)")
-                return
-            
-            # Close the position
-            if should_close:
-                logger.info(f"   🎯 CLOSING: {close_reason}")
-                await self._close_position(position, close_reason, pnl, pnl_pct)
+                action, reason = 'hold', 'not_profitable'
             
-        except Exception as e:
-            logger.error(f"❌ Error processing position: {e}")
+            evaluations.append({
+                'position': position,
+                'price': float(price[i]),
+                'price_source': 'websocket_mid' if use_mid[i] else 'curPrice',
+                'fill_price': float(fill_price[i]),
+                'shares': float(shares[i]),
+                'sell_shares': float(sell_shares[i]),
+                'avg_price': float(avg_price[i]),
+                'pnl': float(pnl[i]),
+                'pnl_pct': float(pnl_pct[i]),
+                'action': action,
+                'reason': reason,
+            })
+        
+        return evaluations
     
-    async def _close_position(self, position: Dict, reason: str, pnl: float, pnl_pct: float):
-        """Close a position by placing a sell order"""
-        try:
-            market = position.get('title', 'Unknown')  # Changed from 'market' to 'title'
-            token_id = position.get('asset')  # Changed from 'asset_id' to 'asset'
-            shares = float(position.get('size', 0))
-            current_price = float(position.get('curPrice', 0))  # Changed from 'current_price' to 'curPrice'
-            
-            logger.info(f"\n🔄 Placing SELL order for {market[:50]}")
-            logger.info(f"   Token ID: {token_id}")
-            logger.info(f"   Shares: {shares:.2f}")
-            logger.info(f"   Price: ${current_price:.4f}")
-
-            # Place sell order slightly below current price to ensure fill
-            sell_price = current_price * 0.99  # 1% below to ensure quick fill
-
-            # Create a NEW signing client for this order (same approach as order_manager.py)
-            # This ensures fresh API credentials and proper signature
-            try:
-                # Get private key
-                private_key = os.getenv('WALLET_1_PK') or os.getenv('PRIVATE_KEY')
-                if not private_key:
-                    raise ValueError("WALLET_1_PK or PRIVATE_KEY not found in .env")
-
-                # Remove 0x prefix if present
-                if private_key.startswith('0x'):
-                    private_key = private_key[2:]
-
-                # Create fresh signing client
-                # signature_type=0 is default for EOA wallets (private key from .env)
-                # Do NOT set signature_type=2 (that's for browser wallets)
-                logger.info("🔧 Creating fresh signing client for SELL order...")
-                signing_client = ClobClient(
-                    host="https://clob.polymarket.com",
-                    key=private_key,
-                    chain_id=POLYGON
-                )
-
-                # Set API credentials (required for L2 auth)
-                logger.info("🔑 Setting API credentials...")
-                signing_client.set_api_creds(signing_client.create_or_derive_api_creds())
-                logger.info("✅ API credentials set successfully for SELL order")
-
-            except Exception as e:
-                logger.error(f"❌ Failed to create signing client: {e}")
-                raise
-
-            order_args = OrderArgs(
-                token_id=token_id,
-                price=sell_price,
-                size=shares,
-                side=SELL
+    def _log_evaluation(self, evaluation: Dict):
+        """Log evaluation result of a single position"""
+        market = evaluation['position'].get('title', 'Unknown')
+        pnl_pct = evaluation['pnl_pct']
+        
+        if evaluation['action'] == 'skip':
+            logger.warning(
+                f"⚠️  Skipping position {market[:30]} - invalid data "
+                f"(shares={evaluation['shares']}, avg={evaluation['avg_price']}, current={evaluation['price']})"
             )
+            return
+        
+        logger.info(f"\n📈 Position: {market[:50]}")
+        logger.info(f"   Shares: {evaluation['shares']:.2f} @ ${evaluation['avg_price']:.4f}")
+        logger.info(f"   Current: ${evaluation['price']:.4f} ({evaluation['price_source']})")
+        logger.info(f"   Expected fill: {evaluation['sell_shares']:.2f} shares @ ${evaluation['fill_price']:.4f}")
+        logger.info(f"   P&L: ${evaluation['pnl']:.2f} ({pnl_pct:+.2f}%)")
+        
+        if evaluation['action'] == 'close':
+            logger.info(f"   🎯 CLOSING: {evaluation['reason']}")
+        elif evaluation['reason'] == 'losing':
+            logger.info(f"   ⏸️  Losing position - NOT closing (manual decision required)")
+        elif evaluation['reason'] == 'waiting_for_target':
+            logger.info(f"   💰 Profitable ({pnl_pct:.2f}%), waiting for target ({self.target_profit_pct}%)")
+        else:
+            logger.info(f"   ⏳ Not profitable enough ({pnl_pct:.2f}% < {self.min_profit_pct}%)")
+    
+    async def _close_positions(self, evaluations: List[Dict], wallets: List[Dict]):
+        """Close positions through the liquidation engine (depth-aware slices, wallets in parallel)
 
-            # Create, sign, and post order using the fresh signing client
-            logger.info("📝 Creating and signing SELL order...")
-            signed_order = signing_client.create_order(order_args)
-            logger.info("📤 Posting SELL order to CLOB...")
-            resp = signing_client.post_order(signed_order, OrderType.GTC)
+        Only depth above the slippage floor is sold, and the slices are posted
+        FAK so nothing rests untracked if the book moves before they arrive (fills
+        are not tracked here). Any remainder stays a position and is
+        re-evaluated next cycle.
+        """
+        reports = await self.liquidator.liquidate(
+            [e['position'] for e in evaluations],
+            wallets,
+            max_slippage=self.max_slippage,
+            wait_for_fills=False,
+            rest_residual=False
+        )
+        
+        reports_by_position = {(r['token_id'], r['wallet']): r for r in reports}
+        for evaluation in evaluations:
+            position = evaluation['position']
+            report = reports_by_position.get((position.get('asset'), position.get('_wallet')))
+            await self._handle_sell_report(evaluation, report)
+    
+    async def _handle_sell_report(self, evaluation: Dict, report: Optional[Dict]):
+        """Record result of the SELL orders of one position"""
+        position = evaluation['position']
+        market = position.get('title', 'Unknown')
+        token_id = position.get('asset')
+        shares = evaluation['shares']
+        
+        if report and report['orders']:
+            order_ids = [order['order_id'] for order in report['orders']]
+            logger.info(f"✅ SELL order(s) placed for {market[:50]}")
+            logger.info(f"   Order ID(s): {', '.join(order_ids)}")
+            logger.info(f"   Slices: " + ', '.join(f"{o['size']:.2f} @ ${o['price']:.3f}" for o in report['orders']))
+            logger.info(f"   Expected proceeds: ${report['expected_proceeds']:.2f}")
+            logger.info(f"   Profit: ${evaluation['pnl']:.2f} ({evaluation['pnl_pct']:+.2f}%)")
+            if report['errors']:
+                logger.warning(f"   ⚠️  Some slices failed: {'; '.join(report['errors'])}")
             
-            if resp and resp.get('success'):
-                order_id = resp.get('orderID', 'unknown')
-                logger.info(f"✅ SELL order placed successfully!")
-                logger.info(f"   Order ID: {order_id}")
-                logger.info(f"   Expected proceeds: ${shares * sell_price:.2f}")
-                logger.info(f"   Profit: ${pnl:.2f} ({pnl_pct:+.2f}%)")
-                
-                # Track closed position
-                self.closed_positions[token_id] = {
-                    'market': market,
-                    'closed_at': time.time(),
-                    'reason': reason,
-                    'pnl': pnl,
-                    'pnl_pct': pnl_pct,
-                    'order_id': order_id
-                }
-                
-                # Send alert
-                if self.alert_on_close and self.telegram:
-                    await self._send_close_alert(market, shares, pnl, pnl_pct, reason)
-            else:
-                error_msg = resp.get('error', 'Unknown error') if resp else 'No response'
-                logger.error(f"❌ Failed to place SELL order: {error_msg}")
+            # Track closed position; a partial close keeps accumulating until the rest is sold
+            key = position_key(position.get('_wallet'), token_id)
+            previous = self.closed_positions.get(key)
+            previous = previous if previous and previous.get('retry_at') is not None else {}
+            posted = sum(order['size'] for order in report['orders'])
+            partial = posted < round_size(shares) - 1e-9
+            if partial:
+                logger.info(f"   ⏳ Partial close: {posted:.2f}/{shares:.2f} shares, rest re-evaluated later")
             
-        except Exception as e:
-            logger.error(f"❌ Error closing position: {e}", exc_info=True)
+            self.closed_positions[key] = {
+                'market': market,
+                'wallet': position.get('_wallet'),
+                'closed_at': time.time(),
+                'reason': evaluation['reason'],
+                'pnl': previous.get('pnl', 0.0) + evaluation['pnl'],
+                'pnl_pct': evaluation['pnl_pct'],
+                'shares_sold': previous.get('shares_sold', 0.0) + posted,
+                'retry_at': time.time() + self.partial_retry_after if partial else None,
+                'order_id': order_ids[0],
+                'order_ids': previous.get('order_ids', []) + order_ids
+            }
+            
+            # Send alert
+            if self.alert_on_close and self.telegram:
+                await self._send_close_alert(
+                    market, posted, evaluation['pnl'], evaluation['pnl_pct'], evaluation['reason']
+                )
+        else:
+            error_msg = '; '.join(report['errors']) if report and report['errors'] else 'No response'
+            logger.error(f"❌ Failed to place SELL order for {market[:50]}: {error_msg}")
     
     async def _send_close_alert(self, market: str, shares: float, pnl: float, pnl_pct: float, reason: str):
         """Send Telegram alert for closed position"""
@@ -318,6 +457,18 @@ class ProfitTakingManager:
         except Exception as e:
             logger.error(f"Failed to send close alert: {e}")
     
+    def get_state(self) -> Dict:
+        """Runtime state for StateStore snapshots"""
+        return {'closed_positions': self.closed_positions}
+
+    def restore_state(self, state: Dict):
+        """Restore runtime state from a StateStore snapshot"""
+        self.closed_positions = {
+            # Snapshots from before per-wallet keys were keyed by token only
+            key if ':' in key else position_key(entry.get('wallet'), key): entry
+            for key, entry in state.get('closed_positions', {}).items()
+        }
+
     def get_stats(self) -> Dict:
         """Get profit taking statistics"""
         total_closed = len(self.closed_positions)
@@ -0,0 +1,265 @@
+"""
+Rate Limiter Module
+Token-bucket rate limiting shared by all Polymarket API callers, with adaptive 429 backoff
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Default limits per endpoint class (requests/second, burst size)
+DEFAULT_LIMITS = {
+    'clob_read': {'rate': 50, 'burst': 100},   # /book, /midpoint, /orders
+    'clob_write': {'rate': 10, 'burst': 20},   # /order, /orders, cancels
+    'gamma': {'rate': 10, 'burst': 20},        # gamma-api.polymarket.com
+    'rewards': {'rate': 2, 'burst': 5},        # rewards endpoints / pages
+    'data_api': {'rate': 10, 'burst': 20},     # data-api.polymarket.com
+    'rpc': {'rate': 10, 'burst': 20},          # Polygon JSON-RPC
+}
+
+RATE_LIMIT_PATTERN = re.compile(r'\b429\b|too many requests|rate limit', re.IGNORECASE)
+
+
+class TokenBucket:
+    """Token bucket with burst allowance and AIMD adaptation
+
+    On 429 the refill rate is cut multiplicatively and the bucket is blocked for
+    Retry-After (or one refill period). After a quiet period without throttling
+    the rate climbs back additively towards the configured maximum.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        min_rate: Optional[float] = None,
+        backoff_factor: float = 0.5,
+        recovery_step: Optional[float] = None,
+        recovery_delay: float = 10.0
+    ):
+        """Initialize token bucket
+
+        Args:
+            name: Endpoint class name (for logging)
+            rate: Maximum sustained rate (tokens/second)
+            burst: Bucket capacity
+            min_rate: Floor for adaptive rate (default 5% of rate)
+            backoff_factor: Rate multiplier applied on each 429
+            recovery_step: Rate added back per success after recovery_delay (default 5% of rate)
+            recovery_delay: Seconds without 429 before recovering
+        """
+        self.name = name
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.min_rate = min_rate if min_rate is not None else self.max_rate * 0.05
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step if recovery_step is not None else self.max_rate * 0.05
+        self.recovery_delay = recovery_delay
+
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_throttled = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+        # Statistics
+        self.total_acquired = 0
+        self.total_wait = 0.0
+        self.total_throttled = 0
+
+    def _refill(self, now: float):
+        """Add tokens accrued since last refill"""
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Take tokens without waiting
+
+        Returns:
+            True if tokens were available
+        """
+        tokens = min(tokens, self.burst)
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return False
+
+        self._refill(now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            self.total_acquired += tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """Wait until tokens are available and take them (FIFO across callers)
+
+        A request larger than the burst is capped at it (the bucket can never
+        hold more, so waiting for it would spin forever).
+
+        Returns:
+            Seconds spent waiting
+        """
+        tokens = min(tokens, self.burst)
+        start = time.monotonic()
+
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    break
+
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+        waited = time.monotonic() - start
+        self.total_acquired += tokens
+        self.total_wait += waited
+        return waited
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Lock bound to the running loop (buckets outlive short-lived loops in scripts/tests)"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Back off after a 429 response"""
+        now = time.monotonic()
+        self.total_throttled += 1
+        self.last_throttled = now
+
+        self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, now + (retry_after if retry_after else 1.0 / self.rate))
+
+        logger.warning(
+            f"🚦 Rate limited on '{self.name}' - backing off to {self.rate:.2f} req/s"
+            + (f" (retry after {retry_after:.1f}s)" if retry_after else "")
+        )
+
+    def on_success(self):
+        """Recover rate additively once we have been clear of 429s for a while"""
+        if self.rate >= self.max_rate:
+            return
+
+        if time.monotonic() - self.last_throttled >= self.recovery_delay:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def get_stats(self) -> Dict:
+        """Get bucket statistics"""
+        return {
+            'name': self.name,
+            'rate': self.rate,
+            'max_rate': self.max_rate,
+            'burst': self.burst,
+            'tokens': self.tokens,
+            'total_acquired': self.total_acquired,
+            'total_wait': self.total_wait,
+            'total_throttled': self.total_throttled,
+        }
+
+
+class RateLimiter:
+    """Registry of token buckets keyed by endpoint class"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        """Initialize rate limiter
+
+        Args:
+            config: Optional per-class overrides, e.g. {'clob_write': {'rate': 5, 'burst': 10}}
+        """
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.configure(config or {})
+
+    def configure(self, config: Dict):
+        """(Re)build buckets from defaults merged with config overrides"""
+        limits = {name: dict(limit) for name, limit in DEFAULT_LIMITS.items()}
+        for name, override in config.items():
+            if isinstance(override, dict):
+                limits.setdefault(name, {}).update(override)
+
+        for name, limit in limits.items():
+            self.buckets[name] = TokenBucket(name, **limit)
+
+    def bucket(self, name: str) -> TokenBucket:
+        """Get bucket for an endpoint class (unknown classes get the clob_read default)"""
+        if name not in self.buckets:
+            self.buckets[name] = TokenBucket(name, **DEFAULT_LIMITS['clob_read'])
+        return self.buckets[name]
+
+    async def acquire(self, name: str, tokens: int = 1) -> float:
+        """Wait for capacity on an endpoint class"""
+        return await self.bucket(name).acquire(tokens)
+
+    def record_response(self, name: str, status: int, retry_after: Optional[str] = None):
+        """Feed an HTTP status back into the limiter
+
+        Args:
+            name: Endpoint class
+            status: HTTP status code
+            retry_after: Retry-After header value (seconds), if any
+        """
+        bucket = self.bucket(name)
+        if status == 429:
+            try:
+                delay = float(retry_after) if retry_after else None
+            except ValueError:
+                delay = None
+            bucket.on_throttled(delay)
+        elif status < 400:
+            bucket.on_success()
+
+    def record_exception(self, name: str, error: Exception) -> bool:
+        """Detect a 429 inside a client exception (py_clob_client, web3, requests)
+
+        Returns:
+            True if the exception was a rate-limit error
+        """
+        status = getattr(error, 'status_code', None)
+        if status is None:
+            response = getattr(error, 'response', None)
+            status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+
+        message = str(error)
+        if status == 429 or RATE_LIMIT_PATTERN.search(message):
+            self.bucket(name).on_throttled()
+            return True
+        return False
+
+    def get_stats(self) -> Dict:
+        """Get statistics for all buckets"""
+        return {name: bucket.get_stats() for name, bucket in self.buckets.items()}
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter shared by all API callers"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def configure_rate_limits(config: Optional[Dict]):
+    """Apply `rate_limits` config section to the shared rate limiter"""
+    get_rate_limiter().configure(config or {})
@@ -14,6 +14,9 @@ import aiohttp
 import os
 from dotenv import load_dotenv
 
+from circuit_breaker import get_circuit_breaker
+from rate_limiter import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +32,8 @@ class RewardManager:
         """
         self.config = config
         self.reward_config = config.get('reward_management', {})
+        self.rate_limiter = get_rate_limiter()  # Shared rewards/RPC budgets
+        self.rewards_breaker = get_circuit_breaker('rewards_api')
         
         # Load environment variables
         load_dotenv()
@@ -188,32 +193,40 @@ class RewardManager:
                 f"https://clob.polymarket.com/rewards/{wallet_address}",
             ]
 
+            async def fetch(api_url: str) -> Optional[Dict]:
+                await self.rate_limiter.acquire('rewards')
+                async with self.session.get(api_url, timeout=10) as response:
+                    self.rate_limiter.record_response('rewards', response.status, response.headers.get('Retry-After'))
+                    if response.status >= 500:
+                        # Server errors count against the breaker, 4xx just means "not here"
+                        response.raise_for_status()
+                    if response.status != 200:
+                        logger.debug(f"Rewards API {api_url} returned status {response.status}")
+                        return None
+                    return await response.json()
+
             for api_url in endpoints:
                 try:
-                    async with self.session.get(api_url, timeout=10) as response:
-                        if response.status == 200:
-                            data = await response.json()
-
-                            # Parse reward data (structure may vary)
-                            # Try different possible field names
-                            unclaimed = (
-                                data.get('unclaimed_rewards') or
-                                data.get('unclaimedRewards') or
-                                data.get('unclaimed') or
-                                data.get('pending_rewards') or
-                                data.get('pendingRewards') or
-                                data.get('available') or
-                                0
-                            )
-
-                            if unclaimed > 0:
-                                logger.info(f"✅ API rewards for {wallet_address[:10]}...: ${unclaimed:.2f}")
-                                return float(unclaimed)
-                            else:
-                                logger.debug(f"No unclaimed rewards for {wallet_address[:10]}...")
-                                return 0.0
+                    data = await self.rewards_breaker.call_cached(api_url, fetch, api_url)
+                    if data is not None:
+                        # Parse reward data (structure may vary)
+                        # Try different possible field names
+                        unclaimed = (
+                            data.get('unclaimed_rewards') or
+                            data.get('unclaimedRewards') or
+                            data.get('unclaimed') or
+                            data.get('pending_rewards') or
+                            data.get('pendingRewards') or
+                            data.get('available') or
+                            0
+                        )
+
+                        if unclaimed > 0:
+                            logger.info(f"✅ API rewards for {wallet_address[:10]}...: ${unclaimed:.2f}")
+                            return float(unclaimed)
                         else:
-                            logger.debug(f"Rewards API {api_url} returned status {response.status}")
+                            logger.debug(f"No unclaimed rewards for {wallet_address[:10]}...")
+                            return 0.0
 
                 except Exception as e:
                     logger.debug(f"Could not fetch from {api_url}: {e}")
@@ -388,15 +401,14 @@ class RewardManager:
                     if reward_amount >= self.min_withdrawal_threshold:
                         logger.info(f"💰 Wallet {address[:10]}... has ${reward_amount:.2f} - initiating withdrawal")
                         
+                        # Withdrawal = several RPC calls (balance, nonce, gas, send)
+                        await self.rate_limiter.acquire('rpc', tokens=4)
                         success, result = await self.withdraw_rewards(wallet, reward_amount)
                         
                         if success:
                             logger.info(f"✅ Successfully withdrew ${reward_amount:.2f} from {address[:10]}...")
                         else:
                             logger.warning(f"⚠️  Withdrawal failed for {address[:10]}...: {result}")
-                        
-                        # Add delay between withdrawals to avoid rate limiting
-                        await asyncio.sleep(5)
                     else:
                         logger.debug(f"Wallet {address[:10]}... has ${reward_amount:.2f} (below threshold)")
                 
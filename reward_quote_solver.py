@@ -0,0 +1,213 @@
+"""
+Reward Quote Solver Module
+Vectorised search for YES/NO bid prices and size that maximise liquidity-reward share per unit of fill risk
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from orderbook_codec import BookSide
+
+logger = logging.getLogger(__name__)
+
+
+# Polymarket liquidity-reward scoring constants
+SINGLE_SIDED_SCALE = 3.0  # c: single-sided liquidity scores at 1/c
+TWO_SIDED_BAND = (0.10, 0.90)  # Outside this midpoint band only two-sided liquidity scores
+
+
+def order_score(max_spread, spread, size):
+    """Polymarket order score S(v, s) * size = ((v - s) / v)^2 * size, zero outside the band
+
+    Args:
+        max_spread: v, rewards max spread in price units (0.035 = 3.5¢)
+        spread: s, distance of the order from the midpoint in price units
+        size: Order size in shares
+
+    Returns:
+        Score (array-broadcast)
+    """
+    ratio = np.clip((max_spread - spread) / max_spread, 0.0, None)
+    return np.where(spread < max_spread, ratio * ratio, 0.0) * size
+
+
+def market_q_min(q_one, q_two, midpoint):
+    """Two-sided Q_min: min(Q1, Q2), boosted to max(Q1, Q2) / c inside the midpoint band"""
+    two_sided = np.minimum(q_one, q_two)
+    single_sided = np.maximum(q_one, q_two) / SINGLE_SIDED_SCALE
+    in_band = (midpoint >= TWO_SIDED_BAND[0]) & (midpoint <= TWO_SIDED_BAND[1])
+    return np.where(in_band, np.maximum(two_sided, single_sided), two_sided)
+
+
+class RewardQuoteSolver:
+    """Chooses reward-optimal two-sided quotes for many markets at once
+
+    For every market a grid of tick-aligned YES bid prices, NO bid prices and
+    sizes inside `rewards_max_spread` is evaluated in one numpy pass (shape
+    markets x yes prices x no prices x sizes):
+
+    - our reward share = Q_min(ours) / (Q_min(ours) + Q_min(competing bids)),
+      with competing Q1/Q2 scored from the live YES/NO bid ladders
+    - fill risk = USDC that would be filled, weighted by
+      exp(-distance to best ask / fill_decay) / (1 + size ahead / depth_scale)
+    - objective = daily reward x share / (fill risk + risk_floor)
+
+    Sizes range from `rewards_min_size` to our own size limit; candidates that
+    cross the best ask or make YES + NO >= 1 are masked out, and markets whose
+    minimum size exceeds our limit get no quote.
+    """
+
+    def __init__(self, config: dict):
+        """Initialize solver
+
+        Args:
+            config: `order_management.reward_quote_solver` section
+        """
+        self.enabled = config.get('enabled', True)
+        self.tick_size = config.get('tick_size', 0.001)
+        self.max_price_candidates = config.get('max_price_candidates', 16)  # per side
+        self.size_steps = config.get('size_steps', 5)
+        self.min_edge = config.get('min_edge', 0.001)  # Minimum distance below the best ask
+        self.fill_decay = config.get('fill_decay', 0.01)  # Price distance at which fill risk falls by 1/e
+        self.depth_scale = config.get('depth_scale', 500)  # Shares ahead that halve fill risk
+        self.risk_floor = config.get('risk_floor', 1.0)  # USDC; keeps tiny quotes from dominating
+        self.max_levels = config.get('max_levels', 50)  # Book levels considered per side
+
+    def _ladder(self, books: List, mids: np.ndarray, max_spreads: np.ndarray):
+        """Pad bid ladders into (markets, levels) price/size arrays"""
+        prices = np.zeros((len(books), self.max_levels))
+        sizes = np.zeros((len(books), self.max_levels))
+
+        for i, levels in enumerate(books):
+            side = levels if isinstance(levels, BookSide) else BookSide(list(levels or []))
+            p = np.frombuffer(side.prices, dtype=float) if len(side) else np.zeros(0)
+            s = np.frombuffer(side.sizes, dtype=float) if len(side) else np.zeros(0)
+
+            # Only levels inside the reward band matter; keep the closest ones
+            keep = np.flatnonzero(mids[i] - p < max_spreads[i])[:self.max_levels]
+            prices[i, :len(keep)] = p[keep]
+            sizes[i, :len(keep)] = s[keep]
+
+        return prices, sizes
+
+    def _candidates(self, mids: np.ndarray, best_asks: np.ndarray, max_spreads: np.ndarray, ticks: np.ndarray):
+        """Tick-aligned bid prices walking down from just below min(mid, best ask - edge)
+
+        Returns:
+            (prices, valid) arrays of shape (markets, candidates)
+        """
+        top = np.minimum(mids, best_asks - self.min_edge)
+        top = np.floor(top / ticks + 1e-9) * ticks
+
+        steps = np.ceil(max_spreads / ticks / self.max_price_candidates)
+        step = (np.maximum(steps, 1.0) * ticks)[:, None]
+        prices = top[:, None] - step * np.arange(self.max_price_candidates)[None, :]
+
+        valid = (prices > 0) & (mids[:, None] - prices < max_spreads[:, None]) & (prices < best_asks[:, None])
+        return np.round(prices, 6), valid
+
+    def _fill_probability(self, prices, best_asks, ladder_prices, ladder_sizes):
+        """Relative fill likelihood of a bid at each candidate price"""
+        distance = np.maximum(best_asks[:, None] - prices, 0.0)
+        # Competing size at a better or equal price is filled first
+        ahead = (ladder_sizes[:, None, :] * (ladder_prices[:, None, :] >= prices[:, :, None])).sum(axis=2)
+        return np.exp(-distance / self.fill_decay) / (1.0 + ahead / self.depth_scale)
+
+    def solve(self, markets: List[Dict]) -> List[Optional[Dict]]:
+        """Solve quotes for a batch of markets
+
+        Args:
+            markets: Dicts with yes_bids, no_bids (levels), yes_mid, no_mid,
+                yes_best_ask, no_best_ask, max_spread (price units), min_size,
+                max_size, daily_rate (USDC/day; None = unknown, scored per unit
+                of reward; 0 = no reward, no quote) and optionally
+                yes_tick_size / no_tick_size from the books (default tick_size)
+
+        Returns:
+            Per market: {'yes_price', 'no_price', 'size', 'reward_share',
+            'expected_reward', 'fill_risk', 'score'} or None if no valid quote
+        """
+        if not markets:
+            return []
+
+        yes_mid = np.array([m['yes_mid'] for m in markets], dtype=float)
+        no_mid = np.array([m['no_mid'] for m in markets], dtype=float)
+        yes_ask = np.array([m.get('yes_best_ask', 1.0) for m in markets], dtype=float)
+        no_ask = np.array([m.get('no_best_ask', 1.0) for m in markets], dtype=float)
+        v = np.array([m['max_spread'] for m in markets], dtype=float)
+        min_size = np.array([m['min_size'] for m in markets], dtype=float)
+        max_size = np.array([m.get('max_size', m['min_size']) for m in markets], dtype=float)
+        rates = [m.get('daily_rate') for m in markets]
+        daily_rate = np.array([1.0 if rate is None else rate for rate in rates], dtype=float)
+        yes_tick = np.array([m.get('yes_tick_size') or self.tick_size for m in markets], dtype=float)
+        no_tick = np.array([m.get('no_tick_size') or self.tick_size for m in markets], dtype=float)
+
+        # Competing liquidity from the live bid ladders
+        yes_lp, yes_ls = self._ladder([m['yes_bids'] for m in markets], yes_mid, v)
+        no_lp, no_ls = self._ladder([m['no_bids'] for m in markets], no_mid, v)
+        comp_q1 = order_score(v[:, None], yes_mid[:, None] - yes_lp, yes_ls).sum(axis=1)
+        comp_q2 = order_score(v[:, None], no_mid[:, None] - no_lp, no_ls).sum(axis=1)
+        comp_q_min = market_q_min(comp_q1, comp_q2, yes_mid)
+
+        # Candidate grids: (M, J) prices per side, (M, S) sizes
+        yes_p, yes_ok = self._candidates(yes_mid, yes_ask, v, yes_tick)
+        no_p, no_ok = self._candidates(no_mid, no_ask, v, no_tick)
+        fractions = np.linspace(0.0, 1.0, self.size_steps) if self.size_steps > 1 else np.zeros(1)
+        sizes = np.floor(min_size[:, None] + np.maximum(max_size - min_size, 0.0)[:, None] * fractions[None, :])
+
+        # Per-unit scores and fill probabilities: (M, J)
+        yes_unit = order_score(v[:, None], yes_mid[:, None] - yes_p, 1.0)
+        no_unit = order_score(v[:, None], no_mid[:, None] - no_p, 1.0)
+        yes_fill = self._fill_probability(yes_p, yes_ask, yes_lp, yes_ls)
+        no_fill = self._fill_probability(no_p, no_ask, no_lp, no_ls)
+
+        # Broadcast to (M, Jyes, Jno, S)
+        size = sizes[:, None, None, :]
+        q1 = yes_unit[:, :, None, None] * size
+        q2 = no_unit[:, None, :, None] * size
+        ours = market_q_min(q1, q2, yes_mid[:, None, None, None])
+        share = ours / (ours + comp_q_min[:, None, None, None] + 1e-12)
+        reward = daily_rate[:, None, None, None] * share
+
+        risk = size * (
+            (yes_p * yes_fill)[:, :, None, None] + (no_p * no_fill)[:, None, :, None]
+        )
+        score = reward / (risk + self.risk_floor)
+
+        valid = (
+            yes_ok[:, :, None, None]
+            & no_ok[:, None, :, None]
+            & (yes_p[:, :, None, None] + no_p[:, None, :, None] < 1.0)
+            & (ours > 0)
+            & (min_size <= max_size)[:, None, None, None]  # Cannot qualify within our size limit
+            & (daily_rate > 0)[:, None, None, None]  # Nothing to earn
+        )
+        score = np.where(valid, score, -np.inf)
+
+        flat = score.reshape(len(markets), -1)
+        best = flat.argmax(axis=1)
+
+        results = []
+        for i, index in enumerate(best):
+            if not np.isfinite(flat[i, index]):
+                results.append(None)
+                continue
+
+            j_yes, j_no, k = np.unravel_index(index, score.shape[1:])
+            results.append({
+                'yes_price': float(yes_p[i, j_yes]),
+                'no_price': float(no_p[i, j_no]),
+                'size': int(sizes[i, k]),
+                'reward_share': float(share[i, j_yes, j_no, k]),
+                'expected_reward': float(reward[i, j_yes, j_no, k]),
+                'fill_risk': float(risk[i, j_yes, j_no, k]),
+                'score': float(flat[i, index]),
+            })
+
+        return results
+
+    def solve_one(self, market: Dict) -> Optional[Dict]:
+        """Solve a single market (see solve)"""
+        return self.solve([market])[0]
@@ -0,0 +1,418 @@
+"""
+Reward Tracker Module
+Per-market, per-wallet reward earnings joined with our resting-order exposure, stored as a compact time series
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from py_clob_client.clob_types import RequestArgs
+from py_clob_client.constants import END_CURSOR
+from py_clob_client.headers.headers import create_level_2_headers
+from py_clob_client.http_helpers.helpers import get
+
+from circuit_breaker import get_circuit_breaker
+from rate_limiter import get_rate_limiter
+from structured_logging import log_event
+
+logger = logging.getLogger(__name__)
+
+USER_EARNINGS_PATH = '/rewards/user'
+
+
+class RewardSeries:
+    """Append-only binary time series of reward records
+
+    Each record is 24 bytes: timestamp (uint32), key index (uint32), earnings
+    (USDC), dollar-hours resting, order-hours resting and spread-weighted
+    dollar-hours (float32 each). Keys ("market_id<TAB>wallet") live one per
+    line in `<path>.keys`; a record's key index is the line number. Keys are
+    written before the records that use them, and a torn tail record is
+    ignored on load.
+    """
+
+    RECORD = struct.Struct('<IIffff')
+
+    def __init__(self, path: str):
+        """Initialize series
+
+        Args:
+            path: Records file (created with its directory on first append)
+        """
+        self.path = path
+        self.keys_path = path + '.keys'
+        self.keys: List[Tuple[str, str]] = []
+        self.key_index: Dict[Tuple[str, str], int] = {}
+
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    market_id, _, wallet = line.rstrip('\n').partition('\t')
+                    self.key_index[(market_id, wallet)] = len(self.keys)
+                    self.keys.append((market_id, wallet))
+
+    def append(self, timestamp: float, rows: Dict[Tuple[str, str], Tuple[float, float, float, float]]):
+        """Append one snapshot
+
+        Args:
+            timestamp: Snapshot time (epoch seconds)
+            rows: (market_id, wallet) -> (earnings, dollar_hours, order_hours, spread_dollar_hours)
+        """
+        if not rows:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        new_keys = [key for key in rows if key not in self.key_index]
+        if new_keys:
+            with open(self.keys_path, 'a', encoding='utf-8') as f:
+                for key in new_keys:
+                    self.key_index[key] = len(self.keys)
+                    self.keys.append(key)
+                    f.write(f"{key[0]}\t{key[1]}\n")
+
+        ts = int(timestamp)
+        blob = b''.join(self.RECORD.pack(ts, self.key_index[key], *values) for key, values in rows.items())
+        with open(self.path, 'ab') as f:
+            f.write(blob)
+
+    def read(self, since: float = 0) -> Iterator[Tuple[int, str, str, float, float, float, float]]:
+        """Records with timestamp >= since: (ts, market_id, wallet, earnings, dollar_hours, order_hours, spread_dh)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % self.RECORD.size
+        for ts, key, *values in self.RECORD.iter_unpack(memoryview(data)[:usable]):
+            if ts >= since and key < len(self.keys):
+                yield (ts, *self.keys[key], *values)
+
+    def prune(self, before: float) -> int:
+        """Drop records older than `before` (atomic rewrite); returns records removed"""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % self.RECORD.size
+        kept = [r for r in self.RECORD.iter_unpack(data[:usable]) if r[0] >= before]
+        removed = usable // self.RECORD.size - len(kept)
+        if removed:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(b''.join(self.RECORD.pack(*r) for r in kept))
+            os.replace(tmp_path, self.path)
+        return removed
+
+
+def order_exposure(order: Dict) -> Tuple[float, float]:
+    """Capital resting in a two-sided order and its average distance from mid
+
+    YES and NO midpoints sum to 1, so the combined distance of both bids from
+    their midpoints is 1 - (yes_price + no_price); no book is needed.
+
+    Returns:
+        (capital in USDC, average per-side distance from mid)
+    """
+    yes, no = order.get('yes_order') or {}, order.get('no_order') or {}
+    yes_price, no_price = float(yes.get('price') or 0), float(no.get('price') or 0)
+    capital = yes_price * float(yes.get('size') or 0) + no_price * float(no.get('size') or 0)
+    spread = max(0.0, 1.0 - yes_price - no_price) / 2 if yes_price and no_price else 0.0
+    return capital, spread
+
+
+class RewardTracker:
+    """Attributes liquidity reward earnings to markets and wallets
+
+    - Exposure: every `sample_interval` the active orders of OrderManager are
+      integrated into dollar-hours, order-hours and spread-weighted
+      dollar-hours per (market, wallet).
+    - Earnings: every `snapshot_interval` the CLOB's per-market earnings of
+      the day are fetched for all wallets concurrently. The API reports a
+      running daily total, so the change since the previous snapshot (kept
+      in `<path>.cursor.json` across restarts) is the interval's earnings.
+      Without a recent cursor (first run, new data dir, long downtime) the
+      totals include earnings of unsampled exposure, so they only seed the
+      cursor and the interval books no earnings.
+    - Both are appended to a RewardSeries and the accumulators reset.
+
+    `get_reward_rates()` aggregates the recent window into reward per
+    dollar-hour per market for MarketSelectorAI and DailyOptimizer.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        order_manager=None,
+        get_client: Optional[Callable[[Dict], Awaitable]] = None
+    ):
+        """Initialize tracker
+
+        Args:
+            config: `reward_tracking` config section
+            order_manager: OrderManager whose active_orders are the exposure ledger
+            get_client: Async wallet -> authenticated ClobClient
+                (OrderManager._get_signing_client)
+        """
+        self.enabled = config.get('enabled', True)
+        self.sample_interval = config.get('sample_interval', 60)  # seconds
+        self.snapshot_interval = config.get('snapshot_interval', 3600)  # seconds
+        self.window_hours = config.get('window_hours', 72)  # reward rate look-back
+        self.min_dollar_hours = config.get('min_dollar_hours', 50)  # exposure before a rate is trusted
+        self.retention_days = config.get('retention_days', 90)
+
+        self.order_manager = order_manager
+        self.get_client = get_client
+        self.series = RewardSeries(config.get('path', 'data/rewards/rewards.series'))
+        self.cursor_path = self.series.path + '.cursor.json'
+
+        self.rate_limiter = get_rate_limiter()
+        self.rewards_breaker = get_circuit_breaker('rewards_api')
+
+        # (market_id, wallet) -> [dollar_hours, order_hours, spread_dollar_hours]
+        self.exposure: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+        self.last_sample: Optional[float] = None
+        self.market_categories: Dict[str, str] = {}  # market_id -> category, from sampled orders
+        self.snapshot_listeners: List[Callable[[float, Dict], None]] = []  # Called with each snapshot's rows
+        self.last_earnings: Dict[str, Dict[str, float]] = {}  # day -> "market\twallet" -> total
+        self.cursor_time: Optional[float] = None  # Snapshot that last updated last_earnings
+        self._load_cursor()
+
+        self.records = [r for r in self.series.read(time.time() - self.window_hours * 3600)]
+        self._rates: Optional[Dict[str, Dict]] = None
+
+        self.snapshots = 0
+        self.fetch_errors = 0
+
+    def _load_cursor(self):
+        """Last daily earnings totals seen per day, and when they were seen"""
+        try:
+            with open(self.cursor_path, 'r', encoding='utf-8') as f:
+                cursor = json.load(f)
+        except (OSError, ValueError):
+            return
+        if 'days' in cursor:
+            self.last_earnings, self.cursor_time = cursor['days'], cursor.get('time')
+        else:
+            self.last_earnings = cursor  # Older cursors hold the days only (re-seeded once)
+
+    def _save_cursor(self):
+        """Persist last daily totals atomically"""
+        os.makedirs(os.path.dirname(self.cursor_path) or '.', exist_ok=True)
+        tmp_path = self.cursor_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'time': self.cursor_time, 'days': self.last_earnings}, f)
+        os.replace(tmp_path, self.cursor_path)
+
+    def sample_exposure(self, now: Optional[float] = None):
+        """Integrate resting orders since the previous sample"""
+        now = now or time.time()
+        if self.last_sample is None or self.order_manager is None:
+            self.last_sample = now
+            return
+
+        # Cap the step so a stalled loop or restart gap is not booked as resting time
+        hours = min(now - self.last_sample, 2 * self.sample_interval) / 3600
+        self.last_sample = now
+        if hours <= 0:
+            return
+
+        for market_id, order in self.order_manager.active_orders.items():
+            wallet = order.get('wallet_address')
+            if not wallet or order.get('status') != 'active':
+                continue
+            capital, spread = order_exposure(order)
+            self.market_categories[market_id] = order.get('category') or 'unknown'
+            acc = self.exposure[(market_id, wallet)]
+            acc[0] += capital * hours
+            acc[1] += len(order.get('order_ids') or {}) * hours
+            acc[2] += capital * spread * hours
+
+    def _fetch_user_earnings(self, client, day: str) -> List[Dict]:
+        """All per-market earnings of one wallet for one day (blocking, paginated)"""
+        request_args = RequestArgs(method='GET', request_path=USER_EARNINGS_PATH)
+        results, cursor = [], 'MA=='
+        while cursor != END_CURSOR:
+            headers = create_level_2_headers(client.signer, client.creds, request_args)
+            response = get(
+                f"{client.host}{USER_EARNINGS_PATH}?date={day}&signature_type=0&next_cursor={cursor}",
+                headers=headers
+            )
+            results += response.get('data') or []
+            cursor = response.get('next_cursor') or END_CURSOR
+        return results
+
+    async def fetch_earnings(self, wallets: List[Dict], days: List[str]) -> Dict[str, Dict[str, float]]:
+        """Daily per-market earnings totals of all wallets, fetched concurrently
+
+        Returns:
+            day -> "market_id<TAB>wallet" -> earnings total; wallets that
+            failed are missing (their previous totals are kept)
+        """
+
+        async def fetch(wallet: Dict, day: str) -> List[Dict]:
+            client = await self.get_client(wallet)
+
+            async def call():
+                await self.rate_limiter.acquire('rewards')
+                return await asyncio.to_thread(self._fetch_user_earnings, client, day)
+
+            return await self.rewards_breaker.call(call)
+
+        jobs = [(wallet, day) for wallet in wallets for day in days]
+        results = await asyncio.gather(*(fetch(w, d) for w, d in jobs), return_exceptions=True)
+
+        totals: Dict[str, Dict[str, float]] = {day: {} for day in days}
+        for (wallet, day), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                self.fetch_errors += 1
+                logger.warning(f"⚠️  Could not fetch reward earnings of {wallet['address'][:10]}... for {day}: {result}")
+                continue
+            for entry in result:
+                market_id = entry.get('condition_id') or entry.get('market')
+                if market_id:
+                    key = f"{market_id}\t{wallet['address']}"
+                    totals[day][key] = totals[day].get(key, 0.0) + float(entry.get('earnings') or 0)
+        return totals
+
+    async def snapshot(self, wallets: List[Dict], now: Optional[float] = None) -> Dict[Tuple[str, str], Tuple]:
+        """Fetch earnings, join with exposure and append one series snapshot
+
+        Returns:
+            The appended rows, (market_id, wallet) -> (earnings, dollar_hours,
+            order_hours, spread_dollar_hours)
+        """
+        now = now or time.time()
+        self.sample_exposure(now)
+
+        today = datetime.fromtimestamp(now, timezone.utc).strftime('%Y-%m-%d')
+        days = sorted(set(self.last_earnings) | {today})  # Previous day once more for its final total
+        totals = await self.fetch_earnings(wallets, days)
+
+        # Totals since a missing or stale cursor include earnings of exposure never sampled
+        seed = self.cursor_time is None or now - self.cursor_time > 2 * self.snapshot_interval
+        if seed:
+            logger.info("💎 Seeding reward cursor (no recent snapshot): this interval books no earnings")
+
+        earnings: Dict[Tuple[str, str], float] = defaultdict(float)
+        for day, day_totals in totals.items():
+            previous = self.last_earnings.setdefault(day, {})
+            for key, total in day_totals.items():
+                delta = total - previous.get(key, 0.0)
+                if delta > 0 and not seed:
+                    market_id, _, wallet = key.partition('\t')
+                    earnings[(market_id, wallet)] += delta
+                previous[key] = max(total, previous.get(key, 0.0))
+        self.last_earnings = {day: values for day, values in self.last_earnings.items() if day >= today}
+        self.cursor_time = now
+
+        rows = {}
+        for key in set(earnings) | set(self.exposure):
+            dollar_hours, order_hours, spread_dh = self.exposure.get(key, (0.0, 0.0, 0.0))
+            rows[key] = (earnings.get(key, 0.0), dollar_hours, order_hours, spread_dh)
+        self.exposure.clear()
+
+        self.series.append(now, rows)
+        self._save_cursor()
+        self.records.extend((int(now), *key, *values) for key, values in rows.items())
+        self.records = [r for r in self.records if r[0] >= now - self.window_hours * 3600]
+        self._rates = None
+        self.snapshots += 1
+        for listener in self.snapshot_listeners:
+            listener(now, rows)
+
+        earned = sum(values[0] for values in rows.values())
+        log_event(
+            logger, logging.INFO, 'reward_snapshot',
+            "💎 Reward snapshot: $%(earnings).4f earned on %(markets)d markets over %(dollar_hours).0f dollar-hours",
+            earnings=earned, markets=len({key[0] for key in rows}),
+            dollar_hours=sum(values[1] for values in rows.values()), wallets=len(wallets)
+        )
+        return rows
+
+    def get_reward_rates(self, window_hours: Optional[float] = None) -> Dict[str, Dict]:
+        """Reward per dollar-hour per market over the recent window
+
+        Args:
+            window_hours: Look-back (default window_hours; at most the loaded window)
+
+        Returns:
+            market_id -> {'earnings', 'dollar_hours', 'order_hours', 'avg_spread',
+            'reward_per_dollar_hour', 'confident', 'wallets'}
+        """
+        if window_hours is None and self._rates is not None:
+            return self._rates
+
+        since = time.time() - (window_hours or self.window_hours) * 3600
+        markets: Dict[str, Dict] = {}
+        for ts, market_id, wallet, earned, dollar_hours, order_hours, spread_dh in self.records:
+            if ts < since:
+                continue
+            stats = markets.setdefault(market_id, {
+                'earnings': 0.0, 'dollar_hours': 0.0, 'order_hours': 0.0, 'spread_dollar_hours': 0.0, 'wallets': set()
+            })
+            stats['earnings'] += earned
+            stats['dollar_hours'] += dollar_hours
+            stats['order_hours'] += order_hours
+            stats['spread_dollar_hours'] += spread_dh
+            stats['wallets'].add(wallet)
+
+        for stats in markets.values():
+            dollar_hours = stats['dollar_hours']
+            stats['reward_per_dollar_hour'] = stats['earnings'] / dollar_hours if dollar_hours else None
+            stats['avg_spread'] = stats.pop('spread_dollar_hours') / dollar_hours if dollar_hours else None
+            stats['confident'] = dollar_hours >= self.min_dollar_hours
+            stats['wallets'] = sorted(stats['wallets'])
+
+        if window_hours is None:
+            self._rates = markets
+        return markets
+
+    def get_portfolio_rate(self) -> Optional[float]:
+        """Reward per dollar-hour across all confidently measured markets"""
+        rates = [s for s in self.get_reward_rates().values() if s['confident']]
+        dollar_hours = sum(s['dollar_hours'] for s in rates)
+        return sum(s['earnings'] for s in rates) / dollar_hours if dollar_hours else None
+
+    async def run(self, wallets: List[Dict]):
+        """Sample exposure every sample_interval and snapshot every snapshot_interval"""
+        if not self.enabled:
+            return
+
+        logger.info(f"💎 Reward tracker started (sample {self.sample_interval}s, snapshot {self.snapshot_interval}s)")
+        self.sample_exposure()
+        next_snapshot = time.monotonic() + self.snapshot_interval
+        last_prune = 0.0
+
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            try:
+                self.sample_exposure()
+                if time.monotonic() >= next_snapshot:
+                    next_snapshot = time.monotonic() + self.snapshot_interval
+                    await self.snapshot(wallets)
+
+                    if time.time() - last_prune > 86400:
+                        last_prune = time.time()
+                        removed = await asyncio.to_thread(
+                            self.series.prune, time.time() - self.retention_days * 86400
+                        )
+                        if removed:
+                            logger.info(f"🧹 Pruned {removed} reward records older than {self.retention_days} days")
+            except Exception as e:
+                logger.error(f"Reward tracker error: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get tracker statistics"""
+        return {
+            'snapshots': self.snapshots,
+            'fetch_errors': self.fetch_errors,
+            'records_in_window': len(self.records),
+            'tracked_markets': len(self.get_reward_rates()),
+            'portfolio_reward_per_dollar_hour': self.get_portfolio_rate(),
+        }
@@ -9,14 +9,17 @@ import asyncio
 from decimal import Decimal
 import numpy as np
 
+from capital_allocator import CapitalAllocator
+
 logger = logging.getLogger(__name__)
 
 
 class RiskManager:
     """Manages portfolio risk and capital allocation"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, allocator: Optional[CapitalAllocator] = None):
         self.config = config
+        self.allocator = allocator or CapitalAllocator(config)
         self.total_capital = 10000  # Default capital
         self.allocated_capital = {}
         self.market_exposures = {}
@@ -63,6 +66,10 @@ class RiskManager:
     
     def _calculate_required_capital(self, market: Dict) -> float:
         """Calculate capital required for market"""
+        # Capital chosen by the allocator already fits wallet and portfolio limits
+        if market.get('allocated_capital'):
+            return market['allocated_capital']
+
         # Base on expected order size and price
         avg_price = 0.5  # Assume 50 cents average
         avg_size = (self.config.get('order_management', {}).get('size_min', 200) + 
@@ -86,8 +93,8 @@ class RiskManager:
             if details.get('category') == category
         )
         
-        # Max 3 markets per category
-        if category_count >= 3:
+        # Max 3 markets per category (allocated markets are bounded by category capital instead)
+        if category_count >= 3 and not market.get('allocated_capital'):
             return False
         
         # Check title similarity for same event
@@ -267,11 +274,14 @@ class RiskManager:
                 
                 for market_id in list(self.allocated_capital.keys()):
                     current = self.allocated_capital[market_id]
+
+                    # Allocator targets replace the equal split for markets it sized
+                    target = self.allocator.allocation.get(market_id, {}).get('capital', target_per_market)
                     
-                    if current > target_per_market * 1.5:  # Too concentrated
+                    if current > target * 1.5:  # Too concentrated
                         # Reduce position
-                        self.allocated_capital[market_id] = target_per_market
-                        logger.info(f"Reduced allocation for {market_id}: {current} -> {target_per_market}")
+                        self.allocated_capital[market_id] = target
+                        logger.info(f"Reduced allocation for {market_id}: {current} -> {target}")
             
         except Exception as e:
             logger.error(f"Rebalancing error: {e}")
@@ -330,6 +340,65 @@ class RiskManager:
         
         return summary
     
+    def update_wallet_balances(self, balances: Dict):
+        """Use on-chain wallet balances as the capital base
+
+        Args:
+            balances: WalletManager.check_wallet_balances() output
+        """
+        self.allocator.update_wallets(balances)
+        if self.allocator.wallets:
+            self.total_capital = self.allocator.total_capital
+
+    def _market_candidate(self, market: Dict) -> Dict:
+        """Allocator candidate for a scanned market
+
+        Expected reward is the daily reward pool scaled by a crude share estimate
+        (1 / competition bars) unless the market carries `expected_reward` or a
+        measured `observed_reward_per_dollar_hour` (RewardTracker).
+        Minimum capital is what the rewards minimum size needs on both sides.
+        """
+        market_id = market.get('market_id') or market.get('condition_id') or market.get('id', 'unknown')
+        capital = self._calculate_required_capital({**market, 'allocated_capital': None})
+
+        expected_reward = market.get('expected_reward')
+        observed_rate = market.get('observed_reward_per_dollar_hour')
+        if expected_reward is None and observed_rate is not None:
+            expected_reward = observed_rate * 24 * capital
+        if expected_reward is None:
+            daily_rate = float(
+                market.get('rewardsDailyRate') or market.get('rewards_daily_rate') or market.get('reward') or 0
+            )
+            expected_reward = daily_rate / max(int(market.get('competition_bars') or 1), 1)
+
+        min_size = float(market.get('rewardsMinSize') or market.get('min_shares') or 0)
+        min_capital = min_size * 0.5 * 2 if min_size else None  # ~50 cents per share, YES + NO
+
+        return {
+            'market_id': market_id,
+            'capital': capital,
+            'min_capital': min_capital,
+            'expected_reward': expected_reward,
+            'category': market.get('category') or 'other',
+        }
+
+    def allocate_markets(self, markets: List[Dict], max_markets: Optional[int] = None,
+                         holdings: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+        """Re-solve capital allocation for the current candidate markets
+
+        Args:
+            markets: Scanned candidate markets
+            max_markets: Maximum markets trading at once (including holdings)
+            holdings: Markets already trading {market_id: {'wallet', 'capital'}}
+
+        Returns:
+            market_id -> {'capital', 'wallet', 'expected_reward'} in efficiency order
+        """
+        if holdings is not None:
+            self.allocator.set_holdings(holdings)
+        self.allocator.sync(self._market_candidate(market) for market in markets)
+        return self.allocator.solve(max_markets)
+
     def set_total_capital(self, capital: float):
         """Set total available capital"""
         self.total_capital = capital
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark CategoryClassifier against the legacy substring classifiers
+
+Loads recorded markets (debug_rewards_page.html __NEXT_DATA__, positions_data.json,
+or any JSON file passed on the command line), checks that the compiled classifier
+returns exactly what the old MarketScannerV2._infer_category /
+WebRewardsScraper._infer_category_from_tags returned, and times both.
+
+Usage:
+    python scripts/benchmark_category_classifier.py [recorded.json ...] [--rounds N]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List
+
+# Add parent directory to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from category_classifier import (
+    CategoryClassifier, QUESTION_RULES, SCRAPER_QUESTION_RULES, TAG_RULES
+)
+
+
+def legacy_rules(rules) -> List:
+    """Keyword lists exactly as the old if/elif chain used them (stems were plain substrings)"""
+    return [(category, [k.rstrip('*') for k in keywords]) for category, keywords in rules]
+
+
+LEGACY_QUESTION_RULES = legacy_rules(QUESTION_RULES)
+LEGACY_SCRAPER_RULES = legacy_rules(SCRAPER_QUESTION_RULES)
+
+
+def legacy_infer_category(question: str) -> str:
+    """Old MarketScannerV2._infer_category: linear `in` checks per keyword"""
+    question_lower = question.lower()
+    for category, keywords in LEGACY_QUESTION_RULES:
+        if any(keyword in question_lower for keyword in keywords):
+            return category
+    return 'other'
+
+
+def legacy_infer_category_from_tags(question: str, tags: List[str]) -> str:
+    """Old WebRewardsScraper._infer_category_from_tags"""
+    question_lower = question.lower()
+    tags_lower = [tag.lower() for tag in (tags or [])]
+
+    for category, rule_tags in TAG_RULES:
+        if any(tag in tags_lower for tag in rule_tags):
+            return category
+
+    for category, keywords in LEGACY_SCRAPER_RULES:
+        if any(keyword in question_lower for keyword in keywords):
+            return category
+    return 'other'
+
+
+def collect_markets(obj, markets: List[Dict]):
+    """Recursively collect dicts that look like markets (have a question or title)"""
+    if isinstance(obj, dict):
+        question = obj.get('question') or obj.get('title')
+        if isinstance(question, str):
+            markets.append({
+                'question': question,
+                'condition_id': obj.get('condition_id') or obj.get('conditionId'),
+                'tags': [t for t in (obj.get('tags') or []) if isinstance(t, str)],
+            })
+        for value in obj.values():
+            collect_markets(value, markets)
+    elif isinstance(obj, list):
+        for value in obj:
+            collect_markets(value, markets)
+
+
+def load_recorded_markets(paths: List[str]) -> List[Dict]:
+    """Load markets from recorded JSON / HTML files"""
+    markets = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        if path.endswith('.html'):
+            match = re.search(r'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', content, re.S)
+            if not match:
+                continue
+            content = match.group(1)
+
+        collect_markets(json.loads(content), markets)
+
+    return markets
+
+
+# Tricky cases that stress overlapping keywords across categories
+SYNTHETIC_QUESTIONS = [
+    "Will Team Spirit win the Counter-Strike Major?",  # 'strike' (politics) inside 'counter-strike' (sports)
+    "Will the Fed cut the interest rate whether or not CPI rises?",  # 'eth' inside 'whether'
+    "Will the series finale stream on Netflix?",
+    "Will Serie A champion be Inter?",
+    "Will Taylor Swift tweet about the Super Bowl?",
+    "Will the S&P 500 close above 6000?",
+    "Will humanity land on Mars by 2030?",
+    "Will NVIDIA stock hit a new high?",
+    "Will the NBA Finals go to game 7?",
+    "Will it rain in London tomorrow?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compiled category classifier')
+    parser.add_argument('files', nargs='*', help='Recorded market JSON/HTML files')
+    parser.add_argument('--rounds', type=int, default=200, help='Timing rounds')
+    args = parser.parse_args()
+
+    files = args.files or [
+        os.path.join(ROOT, 'debug_rewards_page.html'),
+        os.path.join(ROOT, 'positions_data.json'),
+    ]
+    markets = load_recorded_markets(files)
+    markets += [{'question': q, 'condition_id': None, 'tags': []} for q in SYNTHETIC_QUESTIONS]
+
+    print("=" * 80)
+    print(f"📊 CATEGORY CLASSIFIER BENCHMARK ({len(markets)} markets)")
+    print("=" * 80)
+
+    scanner = CategoryClassifier(QUESTION_RULES, cache_size=0)
+    scraper = CategoryClassifier(SCRAPER_QUESTION_RULES, tag_rules=TAG_RULES, cache_size=0)
+    word_boundary = CategoryClassifier(QUESTION_RULES, word_boundary=True, cache_size=0)
+
+    # Parity
+    mismatches = []
+    for market in markets:
+        question, tags = market['question'], market['tags']
+
+        expected = legacy_infer_category(question)
+        actual = scanner.classify(question)
+        if expected != actual:
+            mismatches.append(('scanner', question, expected, actual))
+
+        expected = legacy_infer_category_from_tags(question, tags)
+        actual = scraper.classify(question, tags=tags)
+        if expected != actual:
+            mismatches.append(('scraper', question, expected, actual))
+
+    if mismatches:
+        print(f"\n❌ {len(mismatches)} parity mismatches:")
+        for source, question, expected, actual in mismatches:
+            print(f"   [{source}] {question[:60]!r}: legacy={expected} new={actual}")
+    else:
+        print(f"\n✅ Parity: {len(markets)} markets x 2 classifiers identical to legacy output")
+
+    # Word-boundary mode differences (informational - opt-in via category_word_boundary)
+    changed = [
+        (m['question'], legacy_infer_category(m['question']), word_boundary.classify(m['question']))
+        for m in markets
+    ]
+    changed = [c for c in changed if c[1] != c[2]]
+    print(f"\n🔤 Word-boundary mode would reclassify {len(changed)} market(s):")
+    for question, old, new in changed[:20]:
+        print(f"   {question[:60]!r}: {old} -> {new}")
+
+    # Timing
+    questions = [m['question'] for m in markets]
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for question in questions:
+            legacy_infer_category(question)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for question in questions:
+            scanner.classify(question)
+    compiled_time = time.perf_counter() - start
+
+    cached = CategoryClassifier(QUESTION_RULES)
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for market in markets:
+            cached.classify(market['question'], condition_id=market['condition_id'])
+    cached_time = time.perf_counter() - start
+
+    calls = args.rounds * len(questions)
+    print(f"\n⏱️  {calls} classifications:")
+    print(f"   Legacy substring:  {legacy_time * 1e6 / calls:8.2f} µs/call")
+    print(f"   Compiled regex:    {compiled_time * 1e6 / calls:8.2f} µs/call ({legacy_time / compiled_time:.1f}x)")
+    print(f"   Compiled + memo:   {cached_time * 1e6 / calls:8.2f} µs/call ({legacy_time / cached_time:.1f}x)")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
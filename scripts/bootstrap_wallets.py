@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Bootstrap approvals for all wallets (USDC allowance + CTF operators)
+
+Reads every wallet's balances and approvals with one multicall, signs the
+missing approve / setApprovalForAll transactions with per-wallet nonces,
+submits them all concurrently and confirms them through one block watcher.
+Run it once after scripts/generate_wallets.py and funding the wallets.
+
+Usage:
+    python scripts/bootstrap_wallets.py --dry-run
+    python scripts/bootstrap_wallets.py --amount 10000 --yes
+    python scripts/bootstrap_wallets.py --ctf-only
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+import yaml
+
+# Add parent directory to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from approval_bootstrap import ApprovalBootstrap
+from wallet_manager import WalletManager
+
+
+def load_config() -> dict:
+    """config.yaml from the project root"""
+    with open(os.path.join(ROOT, 'config.yaml'), 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def print_plan(report):
+    """Balances and missing approvals per wallet"""
+    print(f"\n{'Wallet':<24} {'MATIC':>9} {'USDC':>11}  Missing")
+    print('-' * 90)
+    for address, entry in report['wallets'].items():
+        matic = f"{entry['matic']:.4f}" if entry['matic'] is not None else '-'
+        usdc = f"{entry['usdc']:,.2f}" if entry['usdc'] is not None else '-'
+        missing = ', '.join(entry['missing']) or 'ready'
+        print(f"{address[:10] + '...' + address[-8:]:<24} {matic:>9} {usdc:>11}  {missing}")
+        if entry['error']:
+            print(f"{'':<24} ⚠️  {entry['error']}")
+    print('-' * 90)
+
+
+def print_update(tx):
+    """Real-time confirmation line"""
+    status = '✅' if tx['status'] == 'confirmed' else '❌'
+    print(f"  {status} {tx['address'][:10]}... {tx['name']:<30} nonce {tx['nonce']:<4} block {tx['block']}")
+    sys.stdout.flush()
+
+
+async def run(args) -> int:
+    config = load_config()
+    wallets = WalletManager(config.get('wallet_management', {})).wallets
+    if not wallets:
+        print("❌ No wallets loaded! Check your .env file")
+        return 1
+
+    bootstrap = ApprovalBootstrap(config)
+    usdc, ctf = not args.ctf_only, not args.usdc_only
+
+    plan = await bootstrap.run(wallets, usdc_amount=args.amount, usdc=usdc, ctf=ctf, dry_run=True)
+    missing = sum(len(entry['missing']) for entry in plan['wallets'].values() if not entry['error'])
+    if args.json and args.dry_run:
+        print(json.dumps(plan, indent=2, default=str))
+        return 0
+
+    print_plan(plan)
+    if args.dry_run:
+        print(f"\n🔍 Dry run - {missing} transaction(s) would be sent")
+        return 0
+    if not missing:
+        print("\n✅ Nothing to approve")
+        return 0 if all(e['ok'] for e in plan['wallets'].values()) else 2
+
+    if not args.yes:
+        confirm = input(f"\nType 'YES' to send {missing} approval transaction(s): ")
+        if confirm.strip().upper() != 'YES':
+            print("❌ Cancelled")
+            return 1
+
+    print()
+    report = await bootstrap.run(wallets, usdc_amount=args.amount, usdc=usdc, ctf=ctf, on_update=print_update)
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+
+    ready = sum(1 for e in report['wallets'].values() if e['ok'])
+    confirmed = sum(1 for tx in report['transactions'] if tx['status'] == 'confirmed')
+    print(f"\n📊 {ready}/{len(wallets)} wallets ready, {confirmed}/{len(report['transactions'])} "
+          f"transactions confirmed in {report['elapsed']:.1f}s")
+    for address, entry in report['wallets'].items():
+        if entry['error']:
+            print(f"   ❌ {address[:10]}...: {entry['error']}")
+    return 0 if ready == len(wallets) else 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bootstrap USDC and CTF approvals for all wallets')
+    parser.add_argument('--amount', type=float, default=10000, help='USDC allowance per wallet (default 10000)')
+    parser.add_argument('--usdc-only', action='store_true', help='Only the USDC allowance')
+    parser.add_argument('--ctf-only', action='store_true', help='Only the CTF operator approvals')
+    parser.add_argument('--dry-run', action='store_true', help='Only show what is missing')
+    parser.add_argument('--yes', action='store_true', help='Do not ask for confirmation')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--verbose', action='store_true', help='Show module logs')
+    args = parser.parse_args()
+
+    if args.usdc_only and args.ctf_only:
+        parser.error('--usdc-only and --ctf-only are mutually exclusive')
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
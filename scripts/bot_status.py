@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Multi-wallet status table
+
+Collects USDC/MATIC balances, CTF Exchange allowance, open orders, positions
+and unclaimed rewards for every configured wallet concurrently (one pooled
+HTTP session, one JSON-RPC batch for all balances) and prints one table.
+
+Usage:
+    python scripts/bot_status.py                 # one snapshot
+    python scripts/bot_status.py --watch 5       # refresh every 5 seconds
+    python scripts/bot_status.py --json --no-rewards
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+import yaml
+
+# Add parent directory to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wallet_manager import WalletManager
+from wallet_status import WalletStatusCollector, format_status_table
+
+
+def load_config() -> dict:
+    """config.yaml from the project root"""
+    with open(os.path.join(ROOT, 'config.yaml'), 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+async def run(args) -> int:
+    config = load_config()
+    wallets = WalletManager(config.get('wallet_management', {})).wallets
+
+    reward_manager = None
+    if not args.no_rewards:
+        from reward_manager import RewardManager
+        reward_manager = RewardManager(config)
+
+    collector = WalletStatusCollector(config, wallets, reward_manager=reward_manager)
+    try:
+        while True:
+            started = time.perf_counter()
+            rows = await collector.collect(orders=not args.no_orders, rewards=not args.no_rewards)
+            elapsed = time.perf_counter() - started
+
+            if args.json:
+                print(json.dumps(rows, indent=2, default=str), flush=True)
+            else:
+                if args.watch:
+                    print('\033[H\033[J', end='')  # Clear screen
+                print(f"Polymarket bot status - {datetime.now():%Y-%m-%d %H:%M:%S} "
+                      f"({len(rows)} wallets, {elapsed:.2f}s)\n")
+                print(format_status_table(rows))
+                for row in rows:
+                    for source, error in row['errors'].items():
+                        print(f"  ⚠️  {row['address'][:10]}... {source}: {error[:100]}")
+                sys.stdout.flush()
+
+            if not args.watch:
+                return 0
+            await asyncio.sleep(max(0.0, args.watch - elapsed))
+    finally:
+        await collector.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent status of all bot wallets')
+    parser.add_argument('--watch', type=float, default=0, metavar='SECONDS', help='Refresh interval')
+    parser.add_argument('--json', action='store_true', help='Print rows as JSON')
+    parser.add_argument('--no-orders', action='store_true', help='Skip open orders (no CLOB auth)')
+    parser.add_argument('--no-rewards', action='store_true', help='Skip reward lookups')
+    parser.add_argument('--verbose', action='store_true', help='Show module logs')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -131,6 +131,9 @@ def main():
         except Exception as e:
             print(f"❌ Error saving file: {e}")
     
+    print()
+    print("Next: fund the wallets with MATIC + USDC.e, then approve them all at once:")
+    print("   python scripts/bootstrap_wallets.py")
     print()
     print("Done! 🎉")
     print()
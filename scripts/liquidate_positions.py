@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Liquidate positions across all wallets
+
+Fetches every configured wallet's positions from the Data API, plans a
+depth-aware sell for each (limit slices walking down the live bid ladder,
+never below best bid * (1 - max slippage)), posts the orders in parallel
+batches per wallet and reports fills as they happen.
+
+Usage:
+    python scripts/liquidate_positions.py --dry-run
+    python scripts/liquidate_positions.py --max-slippage 0.03 --market "election"
+    python scripts/liquidate_positions.py --wallet 0xabc... --yes --no-wait
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+import yaml
+
+# Add parent directory to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from liquidation_engine import LiquidationEngine
+from wallet_manager import WalletManager
+
+
+def load_config() -> dict:
+    """config.yaml from the project root"""
+    with open(os.path.join(ROOT, 'config.yaml'), 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def print_plan(reports):
+    """Planned slices per position"""
+    print(f"\n{'#':>3}  {'Market':<42} {'Shares':>9} {'Best bid':>9} {'Floor':>7}  Slices")
+    print('-' * 100)
+    for i, report in enumerate(reports, 1):
+        best_bid = f"{report['best_bid']:.3f}" if report['best_bid'] is not None else '-'
+        slices = ', '.join(
+            f"{s['size']:.2f}@{s['price']:.3f}{' (rest)' if s['resting'] else ''}" for s in report['slices']
+        ) or 'no executable price'
+        print(f"{i:>3}  {report['title'][:42]:<42} {report['shares']:>9.2f} {best_bid:>9} "
+              f"{report['floor_price']:>7.3f}  {slices}")
+    print('-' * 100)
+    print(f"     Expected proceeds from book depth: ${sum(r['expected_proceeds'] for r in reports):.2f}")
+
+
+def print_update(event):
+    """Real-time progress line"""
+    report = event['report']
+    if event['type'] == 'posted':
+        order = event['order']
+        print(f"  📤 {report['title'][:40]}: SELL {order['size']:.2f} @ ${order['price']:.3f} ({order['order_id'][:12]}...)")
+    elif event['type'] == 'failed':
+        print(f"  ❌ {report['title'][:40]}: {event['error']}")
+    elif event['type'] == 'fill':
+        print(f"  💸 {report['title'][:40]}: sold {event['shares']:.2f} @ ${event['order']['price']:.3f} "
+              f"({report['filled']:.2f}/{report['shares']:.2f})")
+    sys.stdout.flush()
+
+
+async def run(args) -> int:
+    config = load_config()
+    wallets = WalletManager(config.get('wallet_management', {})).wallets
+    if args.wallet:
+        wallets = [w for w in wallets if w['address'].lower() == args.wallet.lower()]
+        if not wallets:
+            print(f"❌ Wallet {args.wallet} is not configured")
+            return 1
+
+    if args.max_slippage is not None:
+        config.setdefault('liquidation', {})['max_slippage'] = args.max_slippage
+    engine = LiquidationEngine(config)
+
+    print(f"📋 Fetching positions for {len(wallets)} wallet(s)...")
+    positions = await engine.fetch_positions(wallets)
+    if args.market:
+        needle = args.market.lower()
+        positions = [p for p in positions if needle in str(p.get('title', '')).lower()]
+    positions = [p for p in positions if float(p.get('currentValue') or 0) >= args.min_value]
+
+    if not positions:
+        print("✅ No positions to sell")
+        return 0
+
+    plans = await engine.liquidate(positions, wallets, dry_run=True)
+    print_plan(plans)
+
+    if args.dry_run:
+        print("\n🔍 Dry run - no orders posted")
+        return 0
+
+    if not args.yes:
+        confirm = input(f"\nType 'YES' to sell {len(plans)} position(s): ")
+        if confirm.strip().upper() != 'YES':
+            print("❌ Cancelled")
+            return 1
+
+    engine.on_update = print_update
+    print()
+    reports = await engine.liquidate(positions, wallets, wait_for_fills=not args.no_wait)
+
+    filled = sum(r['filled'] for r in reports)
+    proceeds = sum(r['proceeds'] for r in reports)
+    orders = sum(len(r['orders']) for r in reports)
+    failed = sum(1 for r in reports if r['errors'])
+    print(f"\n📊 {orders} order(s) posted, {failed} position(s) with errors")
+    if not args.no_wait:
+        print(f"   Filled {filled:.2f} of {sum(r['shares'] for r in reports):.2f} shares for ${proceeds:.2f}")
+    return 0 if failed == 0 else 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Depth-aware bulk liquidation of positions')
+    parser.add_argument('--dry-run', action='store_true', help='Only show the planned orders')
+    parser.add_argument('--max-slippage', type=float, default=None,
+                        help='Max fraction below best bid (default: liquidation.max_slippage)')
+    parser.add_argument('--wallet', default=None, help='Only this wallet address')
+    parser.add_argument('--market', default=None, help='Only positions whose title contains this text')
+    parser.add_argument('--min-value', type=float, default=0.0, help='Skip positions worth less (USDC)')
+    parser.add_argument('--yes', action='store_true', help='Do not ask for confirmation')
+    parser.add_argument('--no-wait', action='store_true', help='Do not wait for fills')
+    parser.add_argument('--verbose', action='store_true', help='Show module logs')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
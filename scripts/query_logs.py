@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Query the bot's structured (JSON-lines) logs
+
+Answers the usual post-incident questions straight from the log files and
+their rotated siblings, using the sidecar block index in logs/.logindex/ so
+only blocks holding the requested events (and time window) are read.
+Structured events are never sampled (logging.sampling only thins free-form
+lines), so the counts are exact.
+
+Usage:
+    python scripts/query_logs.py placements [--since 24h] [--top 20]
+    python scripts/query_logs.py rejects [--since 24h]
+    python scripts/query_logs.py latency [--since 1h]
+    python scripts/query_logs.py count EVENT --by FIELD [--since 7d]
+    python scripts/query_logs.py events [--since 24h]
+
+Common options: --log PATH (default: logging.log_file from config.yaml),
+--until TIME, --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from log_analytics import LogQuery, discover_logs, parse_since
+
+
+def default_log_file() -> str:
+    """logging.log_file from config.yaml (falls back to the default path)"""
+    path = os.path.join(ROOT, 'config.yaml')
+    try:
+        import yaml
+        with open(path, 'r', encoding='utf-8') as f:
+            log_file = (yaml.safe_load(f) or {}).get('logging', {}).get('log_file')
+    except (ImportError, OSError, ValueError):
+        log_file = None
+    log_file = log_file or 'logs/polymarket_bot.log'
+    return log_file if os.path.isabs(log_file) else os.path.join(ROOT, log_file)
+
+
+def print_table(title: str, rows, top: int):
+    """Print (key, value) rows, largest first"""
+    print(f"\n{title}")
+    print("-" * 60)
+    for key, value in rows[:top]:
+        print(f"  {str(key):<48} {value:>9}")
+    if len(rows) > top:
+        print(f"  ... {len(rows) - top} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query structured bot logs')
+    parser.add_argument('--log', default=None, help='Log file (rotated siblings are included)')
+    parser.add_argument('--since', default=None, help='Start: 30m, 24h, 7d or ISO timestamp')
+    parser.add_argument('--until', default=None, help='End: relative or ISO timestamp')
+    parser.add_argument('--top', type=int, default=20, help='Rows to show')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    parser.add_argument('--no-index', action='store_true', help='Do not write sidecar index files')
+
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('placements', help='Orders placed per market')
+    sub.add_parser('rejects', help='Market reject reasons histogram')
+    sub.add_parser('latency', help='Order placement latency percentiles')
+    sub.add_parser('events', help='Record counts per event')
+    count = sub.add_parser('count', help='Count an event by a field')
+    count.add_argument('event')
+    count.add_argument('--by', required=True, help='Field name')
+
+    args = parser.parse_args()
+
+    log_file = args.log or default_log_file()
+    paths = discover_logs(log_file)
+    if not paths:
+        print(f"No log files found at {log_file}", file=sys.stderr)
+        return 1
+
+    now = time.time()
+    started = time.perf_counter()
+    query = LogQuery(paths, since=parse_since(args.since, now), until=parse_since(args.until, now),
+                     use_index=not args.no_index)
+
+    try:
+        if args.command == 'placements':
+            result = query.count_by('order_placed', 'market_id')
+            title = 'Orders placed per market'
+        elif args.command == 'rejects':
+            result = query.count_by('market_rejected', 'reason')
+            result.update(query.sum_counts('filter_summary', 'rejected'))
+            title = 'Market reject reasons'
+        elif args.command == 'latency':
+            result = query.percentiles('order_placed', 'latency_ms', (50, 90, 99))
+            title = 'Order placement latency (ms)'
+        elif args.command == 'events':
+            result = query.event_counts()
+            title = 'Records per event'
+        else:
+            result = query.count_by(args.event, args.by)
+            title = f'{args.event} by {args.by}'
+    finally:
+        query.close()
+
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(dict(result), indent=2))
+    elif args.command == 'latency':
+        print(f"\n{title}")
+        print("-" * 60)
+        for key, value in result.items():
+            print(f"  {key:<10} {value:>12.2f}" if key != 'count' else f"  {key:<10} {value:>12}")
+    else:
+        print_table(title, result.most_common(), args.top)
+        print(f"\n  Total: {sum(result.values())}")
+
+    if not args.json:
+        print(f"\n  {len(paths)} file(s) scanned in {elapsed * 1000:.0f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
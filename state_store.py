@@ -0,0 +1,382 @@
+"""
+State Store Module
+Periodic atomic snapshots of runtime state plus a write-ahead journal of order events for warm restarts
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_MAGIC = b'PMBS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('>4sHQI')  # magic, version, journal seq, crc32 of payload
+
+
+class StateStore:
+    """Snapshot + journal persistence for module runtime state
+
+    Modules are registered with a `get_state()` / `restore_state(state)` pair.
+    Every `snapshot_interval` seconds their state is written to a single
+    zlib-compressed JSON snapshot (header with CRC) via write-to-temp + fsync +
+    rename, so a crash never leaves a half-written file. Order events between
+    snapshots are appended to a JSON-lines journal; on startup the snapshot is
+    loaded and journal entries newer than it are replayed.
+
+    Journal writes are group-committed off the event loop: `journal()` only
+    serialises the entry into a buffer, and a single worker-thread flush writes
+    (and fsyncs) everything buffered so far.
+    """
+
+    def __init__(self, config: dict):
+        """Initialize state store
+
+        Args:
+            config: `state` section of config.yaml
+        """
+        self.enabled = config.get('enabled', True)
+        self.directory = config.get('directory', 'data/state')
+        self.snapshot_interval = config.get('snapshot_interval', 30)  # seconds
+        self.max_age = config.get('max_age', 3600)  # ignore snapshots older than this (seconds)
+        self.journal_fsync = config.get('journal_fsync', True)
+
+        self.snapshot_path = os.path.join(self.directory, 'snapshot.bin')
+        self.journal_path = os.path.join(self.directory, 'journal.log')
+        self.rotated_journal_path = self.journal_path + '.old'
+
+        self.providers: Dict[str, Tuple[Callable[[], Dict], Callable[[Dict], None]]] = {}
+        self.replay_handlers: Dict[str, Callable[[Dict], None]] = {}
+
+        self.seq = 0
+        self._journal_file = None
+        self._pending = deque()  # serialised journal lines not yet written
+        self._journal_lock = threading.Lock()  # one writer at a time (worker thread or rotation)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._snapshot_lock: Optional[asyncio.Lock] = None
+
+        # Statistics
+        self.snapshots_written = 0
+        self.journal_entries = 0
+        self.last_snapshot_time = 0.0
+        self.last_snapshot_bytes = 0
+
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            logger.info(f"✅ State Store initialized ({self.directory}, snapshot every {self.snapshot_interval}s)")
+
+    def register(self, name: str, module, replay: Optional[Dict[str, Callable[[Dict], None]]] = None):
+        """Register a module exposing get_state() / restore_state(state)
+
+        Args:
+            name: Snapshot section name
+            module: Object with get_state and restore_state methods
+            replay: Optional {event_type: handler(data)} for journal replay
+        """
+        self.providers[name] = (module.get_state, module.restore_state)
+        for event_type, handler in (replay or {}).items():
+            self.replay_handlers[event_type] = handler
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    def journal(self, event_type: str, data: Dict):
+        """Append an order event to the write-ahead journal
+
+        The entry is serialised immediately (later mutations of `data` are not
+        recorded) and written by a background flush when an event loop is
+        running, inline otherwise.
+
+        Args:
+            event_type: Event name (e.g. 'order_active', 'order_removed')
+            data: JSON-serialisable event payload
+        """
+        if not self.enabled:
+            return
+
+        self.seq += 1
+        entry = {'seq': self.seq, 'ts': time.time(), 'type': event_type, 'data': data}
+        try:
+            self._pending.append(json.dumps(entry, separators=(',', ':'), default=str) + '\n')
+        except Exception as e:
+            logger.error(f"❌ Failed to serialise state journal entry: {e}")
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_pending()
+            return
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_journal())
+
+    async def _flush_journal(self):
+        """Write buffered entries in a worker thread until the buffer is empty
+
+        Entries journaled while a write is in flight go out together in the next
+        batch, so a burst of order events costs one fsync instead of one each.
+        """
+        while self._pending:
+            await asyncio.to_thread(self._write_pending)
+
+    def _write_pending(self):
+        """Write and fsync all buffered journal lines"""
+        with self._journal_lock:
+            lines = []
+            while self._pending:
+                lines.append(self._pending.popleft())
+            if not lines:
+                return
+
+            try:
+                if self._journal_file is None:
+                    self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+
+                self._journal_file.write(''.join(lines))
+                self._journal_file.flush()
+                if self.journal_fsync:
+                    os.fsync(self._journal_file.fileno())
+                self.journal_entries += len(lines)
+
+            except Exception as e:
+                logger.error(f"❌ Failed to write state journal: {e}")
+
+    def _rotate_journal(self):
+        """Start a new journal; entries in the rotated one are covered by the next snapshot"""
+        # Buffered entries belong to the journal being rotated (waits for an in-flight flush)
+        self._write_pending()
+        with self._journal_lock:
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+
+            if os.path.exists(self.journal_path):
+                # Keep older rotated entries if the previous snapshot never completed
+                if os.path.exists(self.rotated_journal_path):
+                    with open(self.rotated_journal_path, 'a', encoding='utf-8') as old, \
+                            open(self.journal_path, 'r', encoding='utf-8') as current:
+                        old.write(current.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.rotated_journal_path)
+
+    def _read_journal(self) -> List[Dict]:
+        """Read rotated + current journal entries (torn trailing lines are skipped)"""
+        entries = []
+        for path in (self.rotated_journal_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning(f"⚠️  Skipping corrupt journal line in {path}")
+        return entries
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def capture(self) -> Dict:
+        """Collect state from all registered modules"""
+        state = {}
+        for name, (get_state, _) in self.providers.items():
+            try:
+                state[name] = get_state()
+            except Exception as e:
+                logger.error(f"❌ Failed to capture state of {name}: {e}")
+        return state
+
+    def encode(self, state: Dict, seq: int) -> bytes:
+        """Encode state as header + zlib-compressed JSON"""
+        payload = zlib.compress(
+            json.dumps({'saved_at': time.time(), 'modules': state}, separators=(',', ':'), default=str).encode('utf-8'),
+            level=6
+        )
+        return SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, seq, zlib.crc32(payload)) + payload
+
+    @staticmethod
+    def decode(blob: bytes) -> Tuple[int, Dict]:
+        """Decode snapshot bytes
+
+        Returns:
+            (journal seq covered by snapshot, snapshot dict)
+
+        Raises:
+            ValueError: On bad magic, version or checksum
+        """
+        magic, version, seq, crc = SNAPSHOT_HEADER.unpack_from(blob)
+        payload = blob[SNAPSHOT_HEADER.size:]
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot format ({magic!r} v{version})")
+        if zlib.crc32(payload) != crc:
+            raise ValueError("snapshot checksum mismatch")
+        return seq, json.loads(zlib.decompress(payload))
+
+    def _write_atomic(self, blob: bytes):
+        """Write snapshot via temp file + fsync + rename"""
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Persist the rename itself (POSIX only)
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    async def save_snapshot(self) -> bool:
+        """Capture and persist a snapshot, then drop the journal it covers
+
+        State capture and journal rotation happen synchronously (no await in
+        between), so every journal entry is either in the snapshot or in the
+        new journal. File IO runs in a worker thread.
+        """
+        if not self.enabled:
+            return False
+
+        if self._snapshot_lock is None:
+            self._snapshot_lock = asyncio.Lock()
+
+        async with self._snapshot_lock:
+            try:
+                state = self.capture()
+                seq = self.seq
+                self._rotate_journal()
+
+                blob = await asyncio.to_thread(self.encode, state, seq)
+                await asyncio.to_thread(self._write_atomic, blob)
+
+                if os.path.exists(self.rotated_journal_path):
+                    os.remove(self.rotated_journal_path)
+
+                self.snapshots_written += 1
+                self.last_snapshot_time = time.time()
+                self.last_snapshot_bytes = len(blob)
+                logger.debug(f"💾 State snapshot saved ({len(blob)} bytes, seq={seq})")
+                return True
+
+            except Exception as e:
+                logger.error(f"❌ Failed to save state snapshot: {e}")
+                return False
+
+    def load(self) -> bool:
+        """Restore registered modules from snapshot + journal
+
+        Returns:
+            True if any state was restored
+        """
+        if not self.enabled:
+            return False
+
+        snapshot_seq = 0
+        snapshot_loaded = False
+        restored = False
+
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'rb') as f:
+                    snapshot_seq, snapshot = self.decode(f.read())
+
+                age = time.time() - snapshot.get('saved_at', 0)
+                if age > self.max_age:
+                    # Orders in a stale snapshot/journal are not worth reconciling
+                    logger.info(f"⏭️  State snapshot is {age / 60:.0f} min old, starting cold")
+                    self._discard()
+                    return False
+
+                for name, state in snapshot.get('modules', {}).items():
+                    if name not in self.providers:
+                        continue
+                    try:
+                        self.providers[name][1](state)
+                        restored = True
+                    except Exception as e:
+                        logger.error(f"❌ Failed to restore state of {name}: {e}")
+
+                snapshot_loaded = True
+                logger.info(f"♻️  Restored state snapshot from {age:.0f}s ago (seq={snapshot_seq})")
+
+            except Exception as e:
+                logger.error(f"❌ Could not load state snapshot: {e}")
+
+        entries = self._read_journal()
+        if not snapshot_loaded and entries:
+            # Journal-only restore (no usable snapshot): same staleness rule, by the newest entry
+            age = time.time() - max(entry.get('ts', 0) for entry in entries)
+            if age > self.max_age:
+                logger.info(f"⏭️  State journal is {age / 60:.0f} min old, starting cold")
+                self._discard()
+                return False
+
+        # Replay journal entries newer than the snapshot
+        replayed = 0
+        self.seq = snapshot_seq
+        for entry in entries:
+            if entry.get('seq', 0) <= snapshot_seq:
+                continue
+            self.seq = max(self.seq, entry['seq'])
+            handler = self.replay_handlers.get(entry.get('type'))
+            if handler is None:
+                continue
+            try:
+                handler(entry.get('data', {}))
+                replayed += 1
+            except Exception as e:
+                logger.warning(f"⚠️  Failed to replay journal entry {entry.get('seq')}: {e}")
+
+        if replayed:
+            logger.info(f"♻️  Replayed {replayed} journal entries")
+            restored = True
+
+        return restored
+
+    def _discard(self):
+        """Remove persisted snapshot and journals"""
+        for path in (self.snapshot_path, self.rotated_journal_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.seq = 0
+
+    async def run(self):
+        """Periodic snapshot loop"""
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.save_snapshot()
+
+    async def close(self):
+        """Write a final snapshot and close the journal"""
+        await self.save_snapshot()
+        if self._flush_task is not None:
+            await self._flush_task
+        self._write_pending()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def get_stats(self) -> Dict:
+        """Get state store statistics"""
+        return {
+            'snapshots_written': self.snapshots_written,
+            'journal_entries': self.journal_entries,
+            'journal_pending': len(self._pending),
+            'last_snapshot_time': self.last_snapshot_time,
+            'last_snapshot_bytes': self.last_snapshot_bytes,
+            'seq': self.seq,
+        }
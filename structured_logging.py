@@ -0,0 +1,250 @@
+"""
+Structured Logging Module
+Queue-based logging: records are enqueued on the caller's thread and written as JSON lines by a background thread
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Standard LogRecord attributes (anything else on a record is treated as an extra field)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def log_event(logger: logging.Logger, level: int, event: str, message: str, **fields):
+    """Emit a structured event record
+
+    Nothing is built when `level` is disabled for the logger. The message is a
+    %-style template over `fields` (e.g. "Prepared %(market_id)s") and is only
+    formatted when a handler writes the record, on the writer thread.
+
+    Args:
+        logger: Module logger
+        level: Logging level (logging.INFO, ...)
+        event: Event name (e.g. 'order_prepared')
+        message: Human-readable %(field)s template; literal % must be written %%
+        **fields: Typed event fields written as JSON
+    """
+    if not logger.isEnabledFor(level):
+        return
+    args = (fields,) if fields else ()
+    logger.log(level, message, *args, extra={'event': event, 'fields': fields}, stacklevel=2)
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, event, msg, fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': getattr(record, 'event', None),
+            'msg': record.getMessage(),
+        }
+
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry['fields'] = fields
+        else:
+            extra = {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS and k != 'event'}
+            if extra:
+                entry['fields'] = extra
+
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        elif record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N free-form DEBUG/INFO records per call site for noisy modules
+
+    Call sites are keyed by (logger, line number), so a per-market log line is
+    sampled independently of the others. The first record of each call site
+    always passes; WARNING and above are never sampled, and neither are
+    structured events (records from log_event): log analytics counts them, so
+    every one must reach the file.
+    """
+
+    def __init__(self, rates: Dict[str, int]):
+        """Initialize filter
+
+        Args:
+            rates: Logger name (or dotted prefix) -> keep one record in N
+        """
+        super().__init__()
+        self.rates = {name: int(n) for name, n in (rates or {}).items() if int(n) > 1}
+        self._rate_cache: Dict[str, int] = {}
+        self._counts: Dict[tuple, int] = {}
+        self.sampled_out = 0
+
+    def _rate_for(self, name: str) -> int:
+        """Longest configured prefix of the logger name (cached)"""
+        rate = self._rate_cache.get(name)
+        if rate is None:
+            rate = 1
+            parts = name.split('.')
+            for i in range(len(parts), 0, -1):
+                prefix = '.'.join(parts[:i])
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+            self._rate_cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates or getattr(record, 'event', None):
+            return True
+
+        rate = self._rate_for(record.name)
+        if rate == 1:
+            return True
+
+        key = (record.name, record.lineno)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % rate == 0:
+            return True
+
+        self.sampled_out += 1
+        return False
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers message formatting to the writer thread
+
+    The stock handler formats every record on the caller's thread before
+    enqueueing; this one only renders exception tracebacks (frames do not
+    outlive the call) and enqueues without blocking, counting records dropped
+    when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BlockingStopQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop sentinel waits for room in a bounded queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LoggingPipeline:
+    """Root logger -> LazyQueueHandler -> QueueListener thread -> file/console handlers"""
+
+    def __init__(self, config: dict):
+        """Build handlers from the `logging` section of config.yaml
+
+        Args:
+            config: Logging configuration
+        """
+        self.level = getattr(logging, str(config.get('level', 'INFO')).upper(), logging.INFO)
+        self.queue: queue.Queue = queue.Queue(maxsize=config.get('queue_size', 10000))
+
+        self.handler = LazyQueueHandler(self.queue)
+        self.sampler = SamplingFilter(config.get('sampling', {}))
+        self.handler.addFilter(self.sampler)
+
+        self.handlers: List[logging.Handler] = []
+
+        if config.get('log_to_console', True):
+            console = logging.StreamHandler()
+            console.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            self.handlers.append(console)
+
+        if config.get('log_to_file', False):
+            self.handlers.append(self._file_handler(config))
+
+        self.listener = BlockingStopQueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.running = False
+
+    @staticmethod
+    def _file_handler(config: dict) -> logging.Handler:
+        """JSON-lines file handler with size-based (or daily) rotation"""
+        path = config.get('log_file', 'logs/polymarket_bot.log')
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if config.get('log_rotation', 'size') == 'daily':
+            handler = logging.handlers.TimedRotatingFileHandler(
+                path, when='midnight', backupCount=config.get('log_retention_days', 30), encoding='utf-8'
+            )
+        else:
+            handler = logging.handlers.RotatingFileHandler(
+                path,
+                maxBytes=config.get('max_bytes', 50 * 1024 * 1024),
+                backupCount=config.get('backup_count', 10),
+                encoding='utf-8'
+            )
+
+        if config.get('format', 'json') == 'json':
+            handler.setFormatter(JsonLineFormatter())
+        else:
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        return handler
+
+    def start(self, logger: Optional[logging.Logger] = None):
+        """Route the logger's records through the queue (replaces its handlers)
+
+        Args:
+            logger: Logger to install on (default: root)
+        """
+        logger = logger or logging.getLogger()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(self.handler)
+        logger.setLevel(self.level)
+        self.listener.start()
+        self.running = True
+
+    def stop(self):
+        """Flush queued records and stop the writer thread"""
+        if self.running:
+            self.listener.stop()
+            self.running = False
+        for handler in self.handlers:
+            handler.flush()
+
+    def get_stats(self) -> Dict:
+        """Get logging pipeline statistics"""
+        return {
+            'queued': self.queue.qsize(),
+            'dropped': self.handler.dropped,
+            'sampled_out': self.sampler.sampled_out,
+        }
+
+
+def setup_logging(config: dict) -> LoggingPipeline:
+    """Install the queue-based logging pipeline on the root logger
+
+    Args:
+        config: `logging` section of config.yaml
+
+    Returns:
+        Started LoggingPipeline (call stop() on shutdown to flush)
+    """
+    pipeline = LoggingPipeline(config)
+    pipeline.start()
+    return pipeline
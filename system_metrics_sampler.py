@@ -0,0 +1,194 @@
+"""
+System Metrics Sampler Module
+Background sampler for CPU, memory, file descriptors, event-loop lag, task counts and GC pauses
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class SystemMetricsSampler:
+    """Samples process/system metrics on a fixed cadence without blocking the event loop
+
+    psutil.cpu_percent(interval=1) sleeps for a full second. This sampler instead
+    calls the non-blocking variants (interval=None), which report usage since the
+    previous call, so each sample costs microseconds and the latest values are
+    always available instantly.
+    """
+
+    def __init__(self, interval: float = 5.0, history_size: int = 720):
+        """Initialize sampler
+
+        Args:
+            interval: Seconds between samples
+            history_size: Number of samples kept in the ring buffer
+        """
+        self.interval = interval
+        self.samples = deque(maxlen=history_size)
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+        self._process = psutil.Process(os.getpid())
+
+        # GC pause tracking (filled by gc.callbacks hook)
+        self._gc_start: Optional[float] = None
+        self._gc_pause_total = 0.0
+        self._gc_pause_max = 0.0
+        self._gc_collections = 0
+
+        # Prime the non-blocking CPU counters so the first sample is meaningful
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+
+    async def start(self):
+        """Start background sampling task (idempotent)"""
+        if self._task and not self._task.done():
+            return
+
+        self.running = True
+        gc.callbacks.append(self._on_gc)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📈 System metrics sampler started (interval={self.interval}s)")
+
+    async def stop(self):
+        """Stop background sampling task"""
+        self.running = False
+
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        """Sampling loop - event-loop lag is the overshoot of each sleep"""
+        while self.running:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - scheduled - self.interval)
+
+            try:
+                self.samples.append(self.sample(loop_lag=lag))
+            except Exception as e:
+                logger.debug(f"Failed to sample system metrics: {e}")
+
+    def sample(self, loop_lag: float = 0.0) -> Dict:
+        """Collect one sample (non-blocking)
+
+        Args:
+            loop_lag: Measured event-loop lag in seconds
+
+        Returns:
+            Sample dictionary
+        """
+        memory_info = self._process.memory_info()
+
+        try:
+            if hasattr(self._process, 'num_fds'):
+                open_fds = self._process.num_fds()
+            else:
+                # Windows has no file descriptors, use handles instead
+                open_fds = self._process.num_handles()
+        except (psutil.Error, AttributeError):
+            open_fds = 0
+
+        try:
+            tasks = len(asyncio.all_tasks())
+        except RuntimeError:
+            tasks = 0
+
+        gc_pause_total, gc_pause_max, gc_collections = self._drain_gc_stats()
+
+        return {
+            'timestamp': time.time(),
+            'system_cpu_percent': psutil.cpu_percent(interval=None),
+            'system_memory_percent': psutil.virtual_memory().percent,
+            'bot_cpu_percent': self._process.cpu_percent(interval=None),
+            'bot_memory_mb': memory_info.rss / 1024 / 1024,
+            'open_fds': open_fds,
+            'threads': self._process.num_threads(),
+            'asyncio_tasks': tasks,
+            'loop_lag_ms': loop_lag * 1000,
+            'gc_collections': gc_collections,
+            'gc_pause_ms': gc_pause_total * 1000,
+            'gc_pause_max_ms': gc_pause_max * 1000,
+        }
+
+    def _on_gc(self, phase: str, info: Dict):
+        """gc.callbacks hook - measure stop-the-world collection time"""
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif phase == 'stop' and self._gc_start is not None:
+            pause = time.perf_counter() - self._gc_start
+            self._gc_start = None
+            self._gc_pause_total += pause
+            self._gc_pause_max = max(self._gc_pause_max, pause)
+            self._gc_collections += 1
+
+    def _drain_gc_stats(self):
+        """Return GC stats accumulated since previous sample and reset them"""
+        stats = (self._gc_pause_total, self._gc_pause_max, self._gc_collections)
+        self._gc_pause_total = 0.0
+        self._gc_pause_max = 0.0
+        self._gc_collections = 0
+        return stats
+
+    @property
+    def latest(self) -> Optional[Dict]:
+        """Most recent sample or None if nothing sampled yet"""
+        return self.samples[-1] if self.samples else None
+
+    def get_history(self, seconds: Optional[float] = None) -> List[Dict]:
+        """Get samples from the ring buffer
+
+        Args:
+            seconds: Only return samples newer than this many seconds (None = all)
+
+        Returns:
+            List of samples, oldest first
+        """
+        if seconds is None:
+            return list(self.samples)
+
+        cutoff = time.time() - seconds
+        return [s for s in self.samples if s['timestamp'] >= cutoff]
+
+    def get_summary(self, seconds: Optional[float] = None) -> Dict:
+        """Aggregate samples over a window
+
+        Args:
+            seconds: Window size in seconds (None = full buffer)
+
+        Returns:
+            Dict with averages/maxima of key metrics
+        """
+        history = self.get_history(seconds)
+        if not history:
+            return {'samples': 0}
+
+        count = len(history)
+        return {
+            'samples': count,
+            'avg_cpu_percent': sum(s['system_cpu_percent'] for s in history) / count,
+            'max_bot_memory_mb': max(s['bot_memory_mb'] for s in history),
+            'max_open_fds': max(s['open_fds'] for s in history),
+            'avg_loop_lag_ms': sum(s['loop_lag_ms'] for s in history) / count,
+            'max_loop_lag_ms': max(s['loop_lag_ms'] for s in history),
+            'max_asyncio_tasks': max(s['asyncio_tasks'] for s in history),
+            'gc_pause_ms': sum(s['gc_pause_ms'] for s in history),
+            'max_gc_pause_ms': max(s['gc_pause_max_ms'] for s in history),
+        }
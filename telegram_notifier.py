@@ -6,9 +6,12 @@ Gửi thông báo chi tiết về hoạt động của bot qua Telegram
 import asyncio
 import aiohttp
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-from collections import defaultdict
+from collections import defaultdict, deque
+
+from rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +41,7 @@ class TelegramNotifier:
         self.last_notification_time = defaultdict(lambda: datetime.min)
         self.notification_cooldowns = {
             'order_placed': 0,  # Không cooldown cho order placed
-            'order_cancelled': 30,  # 30s cooldown
+            'order_cancelled': 0,  # Không cooldown - digest đã gom các lệnh hủy
             'order_filled': 0,  # Không cooldown cho fills (quan trọng!)
             'market_found': 60,  # 1 phút cooldown
             'market_removed': 60,  # 1 phút cooldown
@@ -52,8 +55,37 @@ class TelegramNotifier:
         self.batch_intervals = {
             'market_found': 60,  # Gửi batch mỗi 60s
             'market_removed': 60,
+            # Order events: gom thành digest trong cửa sổ ngắn
+            'order_placed': alerts_config.get('order_digest_window', 5),
+            'order_cancelled': alerts_config.get('order_digest_window', 5),
+            'order_filled': alerts_config.get('fill_digest_window', 2),
+        }
+        self.batch_deadlines: Dict[str, float] = {}  # type -> monotonic time to flush digest
+        self.digest_formatters = {
+            'order_placed': (self._format_order_placed, self._format_orders_placed_digest),
+            'order_cancelled': (self._format_order_cancelled, self._format_orders_cancelled_digest),
+            'order_filled': (self._format_order_filled, self._format_orders_filled_digest),
         }
         
+        # Background delivery queue - caller chỉ enqueue, worker gửi theo rate limit của Telegram
+        self.max_backlog = alerts_config.get('telegram_max_backlog', 200)
+        self.max_retries = alerts_config.get('telegram_max_retries', 3)
+        self.queue = deque()
+        self.rate_bucket = TokenBucket(
+            'telegram',
+            rate=alerts_config.get('telegram_rate_per_second', 1.0),  # ~1 msg/s mỗi chat
+            burst=alerts_config.get('telegram_burst', 3)
+        )
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Delivery statistics
+        self.sent_count = 0
+        self.failed_count = 0
+        self.dropped_count = 0
+        self.coalesced_count = 0
+        
         if self.enabled and self.bot_token and self.chat_id:
             logger.info(f"✅ Telegram Notifier initialized (Chat ID: {self.chat_id})")
         else:
@@ -61,40 +93,174 @@ class TelegramNotifier:
     
     async def send_message(self, message: str, parse_mode: str = 'HTML') -> bool:
         """
-        Gửi message qua Telegram
+        Đưa message vào hàng đợi gửi (không chờ HTTP)
         
         Args:
             message: Nội dung message
             parse_mode: HTML hoặc Markdown
             
         Returns:
-            True nếu gửi thành công
+            True nếu đã vào hàng đợi
         """
         if not self.enabled or not self.bot_token or not self.chat_id:
             return False
         
-        try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        self._enqueue(message, parse_mode)
+        return True
+    
+    def _enqueue(self, message: str, parse_mode: str = 'HTML'):
+        """Thêm message vào backlog (bỏ message cũ nhất nếu đầy)"""
+        if len(self.queue) >= self.max_backlog:
+            self.queue.popleft()
+            self.dropped_count += 1
+            logger.warning(f"⚠️  Telegram backlog full ({self.max_backlog}), dropped oldest message")
+        
+        self.queue.append((message, parse_mode))
+        self._wake_worker()
+    
+    def _wake_worker(self):
+        """Khởi động worker nếu chưa chạy và đánh thức nó"""
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._delivery_loop())
+        self._wakeup.set()
+    
+    async def _delivery_loop(self):
+        """Worker: flush digest đến hạn và gửi backlog theo rate limit"""
+        while True:
+            self._flush_due_batches()
             
-            data = {
-                'chat_id': self.chat_id,
-                'text': message,
-                'parse_mode': parse_mode
-            }
+            if self.queue:
+                await self.rate_bucket.acquire()
+                message, parse_mode = self.queue.popleft()
+                await self._deliver(message, parse_mode)
+                continue
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=data, timeout=10) as response:
+            # Ngủ đến khi có message mới hoặc digest tiếp theo đến hạn
+            self._wakeup.clear()
+            timeout = None
+            if self.batch_deadlines:
+                timeout = max(0.0, min(self.batch_deadlines.values()) - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _deliver(self, message: str, parse_mode: str) -> bool:
+        """
+        Gửi message qua Telegram (retry khi 429 / lỗi mạng / 5xx)
+        
+        Returns:
+            True nếu gửi thành công
+        """
+        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        data = {
+            'chat_id': self.chat_id,
+            'text': message,
+            'parse_mode': parse_mode
+        }
+        
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._session.post(url, json=data, timeout=10) as response:
                     if response.status == 200:
                         logger.debug("✅ Telegram message sent")
+                        self.sent_count += 1
                         return True
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"❌ Telegram send failed: {response.status} - {error_text}")
-                        return False
-                        
-        except Exception as e:
-            logger.error(f"❌ Telegram error: {e}")
-            return False
+                    
+                    if response.status == 429:
+                        # Telegram trả về parameters.retry_after (giây)
+                        try:
+                            body = await response.json()
+                            retry_after = float(body.get('parameters', {}).get('retry_after', 1))
+                        except Exception:
+                            retry_after = 1.0
+                        self.rate_bucket.on_throttled(retry_after)
+                        logger.warning(f"⚠️  Telegram rate limited, retry after {retry_after:.0f}s")
+                        await self.rate_bucket.acquire()
+                        continue
+                    
+                    error_text = await response.text()
+                    logger.error(f"❌ Telegram send failed: {response.status} - {error_text}")
+                    if response.status < 500:
+                        break  # Lỗi phía request (HTML sai, chat_id sai...) - retry vô ích
+                    
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Telegram error: {e}")
+            
+            if attempt < self.max_retries:
+                await asyncio.sleep(2 ** attempt)
+        
+        self.failed_count += 1
+        return False
+    
+    def _add_to_batch(self, notification_type: str, item: Dict):
+        """Gom event vào digest, flush sau batch_intervals[notification_type] giây"""
+        if not self.enabled or not self.bot_token or not self.chat_id:
+            return
+        
+        self.pending_batches[notification_type].append(item)
+        if notification_type not in self.batch_deadlines:
+            self.batch_deadlines[notification_type] = time.monotonic() + self.batch_intervals[notification_type]
+        self._wake_worker()
+    
+    def _flush_due_batches(self, force: bool = False):
+        """Chuyển các digest đến hạn thành message trong hàng đợi"""
+        now = time.monotonic()
+        for notification_type, deadline in list(self.batch_deadlines.items()):
+            if not force and deadline > now:
+                continue
+            
+            del self.batch_deadlines[notification_type]
+            items = self.pending_batches[notification_type]
+            self.pending_batches[notification_type] = []
+            if not items:
+                continue
+            
+            format_single, format_digest = self.digest_formatters[notification_type]
+            if len(items) == 1:
+                self._enqueue(format_single(items[0]))
+            else:
+                self.coalesced_count += len(items) - 1
+                self._enqueue(format_digest(items))
+    
+    async def close(self):
+        """Gửi nốt digest + backlog (tối đa 10s) rồi dừng worker"""
+        self._flush_due_batches(force=True)
+        
+        deadline = time.monotonic() + 10
+        while self.queue and self._worker and not self._worker.done() and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        
+        if self.queue:
+            logger.warning(f"⚠️  {len(self.queue)} Telegram message(s) not delivered before shutdown")
+        
+        if self._session and not self._session.closed:
+            await self._session.close()
+    
+    def get_delivery_stats(self) -> Dict:
+        """Statistics của hàng đợi gửi"""
+        return {
+            'queued': len(self.queue),
+            'pending_digest': sum(len(self.pending_batches[t]) for t in self.digest_formatters),
+            'sent': self.sent_count,
+            'failed': self.failed_count,
+            'dropped': self.dropped_count,
+            'coalesced': self.coalesced_count,
+        }
     
     def _check_cooldown(self, notification_type: str) -> bool:
         """
@@ -118,7 +284,7 @@ class TelegramNotifier:
     
     async def notify_order_placed(self, order: Dict, market: Dict):
         """
-        Thông báo khi đặt lệnh mới
+        Thông báo khi đặt lệnh mới (gom thành digest nếu đặt nhiều lệnh liên tiếp)
         
         Args:
             order: Order details
@@ -130,6 +296,13 @@ class TelegramNotifier:
         if not self._check_cooldown('order_placed'):
             return
         
+        self._add_to_batch('order_placed', {'order': order, 'market': market, 'time': datetime.now()})
+        self._update_cooldown('order_placed')
+    
+    def _format_order_placed(self, item: Dict) -> str:
+        """Message chi tiết cho 1 lệnh đặt"""
+        order, market = item['order'], item['market']
+        
         # Extract order details
         market_name = market.get('question', 'Unknown')[:60]
         yes_price = order.get('yes_order', {}).get('price', 0)
@@ -152,11 +325,28 @@ class TelegramNotifier:
    • Size: {no_size} shares
 
 📊 Spread: {spread*100:.1f}%
-⏰ {datetime.now().strftime('%H:%M:%S')}
+⏰ {item['time'].strftime('%H:%M:%S')}
         """
-        
-        await self.send_message(message.strip())
-        self._update_cooldown('order_placed')
+        return message.strip()
+    
+    def _format_orders_placed_digest(self, items: List[Dict]) -> str:
+        """Digest cho nhiều lệnh đặt trong cùng cửa sổ"""
+        message = f"""
+📝 <b>{len(items)} Orders Placed</b>
+━━━━━━━━━━━━━━━━━━━━━━
+"""
+        for i, item in enumerate(items[:10], 1):
+            order = item['order']
+            market_name = item['market'].get('question', 'Unknown')[:45]
+            yes_price = order.get('yes_order', {}).get('price', 0)
+            no_price = order.get('no_order', {}).get('price', 0)
+            message += f"{i}. {market_name}\n   YES ${yes_price:.3f} | NO ${no_price:.3f}\n"
+        
+        if len(items) > 10:
+            message += f"... and {len(items) - 10} more\n"
+        
+        message += f"\n⏰ {items[0]['time'].strftime('%H:%M:%S')} - {items[-1]['time'].strftime('%H:%M:%S')}"
+        return message.strip()
     
     async def notify_order_cancelled(self, order_id: str, market_name: str, reason: str):
         """
@@ -170,20 +360,42 @@ class TelegramNotifier:
         if not self.notifications.get('order_cancelled', False):
             return
         
-        if not self._check_cooldown('order_cancelled'):
-            return
-        
+        # Không cooldown: mọi lệnh hủy trong cửa sổ đều vào digest (nhóm theo lý do)
+        self._add_to_batch('order_cancelled', {
+            'order_id': order_id,
+            'market_name': market_name,
+            'reason': reason,
+            'time': datetime.now()
+        })
+        self._update_cooldown('order_cancelled')
+    
+    def _format_order_cancelled(self, item: Dict) -> str:
+        """Message chi tiết cho 1 lệnh hủy"""
         message = f"""
 🚫 <b>Order Cancelled</b>
 ━━━━━━━━━━━━━━━━━━━━━━
-🎯 Market: {market_name[:60]}
-🆔 Order ID: {order_id[:16]}...
-📝 Reason: {reason}
-⏰ {datetime.now().strftime('%H:%M:%S')}
+🎯 Market: {item['market_name'][:60]}
+🆔 Order ID: {item['order_id'][:16]}...
+📝 Reason: {item['reason']}
+⏰ {item['time'].strftime('%H:%M:%S')}
         """
+        return message.strip()
+    
+    def _format_orders_cancelled_digest(self, items: List[Dict]) -> str:
+        """Digest lệnh hủy, nhóm theo lý do"""
+        message = f"""
+🚫 <b>{len(items)} Orders Cancelled</b>
+━━━━━━━━━━━━━━━━━━━━━━
+"""
+        by_reason = defaultdict(list)
+        for item in items:
+            by_reason[item['reason']].append(item['market_name'])
         
-        await self.send_message(message.strip())
-        self._update_cooldown('order_cancelled')
+        for reason, names in by_reason.items():
+            message += f"<b>{reason}:</b> {len(names)} order(s)\n"
+        
+        message += f"\n⏰ {items[-1]['time'].strftime('%H:%M:%S')}"
+        return message.strip()
     
     async def notify_order_filled(self, fill_data: Dict, market: Dict, pnl: Optional[float] = None):
         """
@@ -197,9 +409,15 @@ class TelegramNotifier:
         if not self.notifications.get('order_filled', True):
             return
         
-        # KHÔNG cooldown cho fills - luôn thông báo!
+        # KHÔNG cooldown cho fills - luôn thông báo! (chỉ gom các fill trong cùng vài giây)
+        self._add_to_batch('order_filled', {'fill': fill_data, 'market': market, 'pnl': pnl, 'time': datetime.now()})
+        self._update_cooldown('order_filled')
+    
+    def _format_order_filled(self, item: Dict) -> str:
+        """Message chi tiết cho 1 fill"""
+        fill_data, pnl = item['fill'], item['pnl']
         
-        market_name = market.get('question', 'Unknown')[:60]
+        market_name = item['market'].get('question', 'Unknown')[:60]
         side = fill_data.get('side', 'Unknown')
         fill_price = fill_data.get('fill_price', 0)
         fill_size = fill_data.get('fill_size', 0)
@@ -223,10 +441,37 @@ class TelegramNotifier:
         if pnl is not None:
             message += f"\n{pnl_emoji} <b>P&L: ${pnl:+.2f}</b>"
         
-        message += f"\n\n⏰ {datetime.now().strftime('%H:%M:%S')}"
-        
-        await self.send_message(message.strip())
-        self._update_cooldown('order_filled')
+        message += f"\n\n⏰ {item['time'].strftime('%H:%M:%S')}"
+        return message.strip()
+    
+    def _format_orders_filled_digest(self, items: List[Dict]) -> str:
+        """Digest nhiều fill - vẫn liệt kê từng fill (quan trọng)"""
+        message = f"""
+🚨 <b>{len(items)} ORDERS FILLED!</b> 🚨
+━━━━━━━━━━━━━━━━━━━━━━
+"""
+        total_pnl = 0.0
+        has_pnl = False
+        for i, item in enumerate(items[:20], 1):
+            fill_data = item['fill']
+            market_name = item['market'].get('question', 'Unknown')[:45]
+            side = fill_data.get('side', 'Unknown')
+            message += (
+                f"{i}. {market_name}\n"
+                f"   {side.upper()} {fill_data.get('fill_size', 0)} @ ${fill_data.get('fill_price', 0):.3f}\n"
+            )
+            if item['pnl'] is not None:
+                has_pnl = True
+                total_pnl += item['pnl']
+        
+        if len(items) > 20:
+            message += f"... and {len(items) - 20} more\n"
+        
+        if has_pnl:
+            message += f"\n💰 <b>P&L: ${total_pnl:+.2f}</b>"
+        
+        message += f"\n⏰ {items[-1]['time'].strftime('%H:%M:%S')}"
+        return message.strip()
     
     async def notify_market_found(self, markets: List[Dict]):
         """
@@ -555,6 +800,14 @@ class TelegramNotifier:
    • RAM: {health.get('metrics', {}).get('system_memory_percent', 0):.1f}%
 """
 
+        # Event loop lag + top stall offenders
+        watchdog = health.get('watchdog', {})
+        if watchdog:
+            lag = watchdog.get('lag', {})
+            message += f"   • Loop lag p99: {lag.get('p99_ms', 0):.0f}ms (max {lag.get('max_ms', 0):.0f}ms)\n"
+            for offender in watchdog.get('top_offenders', [])[:3]:
+                message += f"   • 🐢 {offender['module']}: {offender['count']}x, {offender['total_ms']:.0f}ms\n"
+
         # Add issues if any
         issues = health.get('issues', [])
         if issues:
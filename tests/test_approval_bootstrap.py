@@ -0,0 +1,121 @@
+"""
+Tests for the parallel approval bootstrap
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_utils import to_hex
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from approval_bootstrap import (
+    AGGREGATE3, ApprovalBootstrap, approval_targets, decode_state_call, encode_state_call, plan_approvals
+)
+
+KEYS = ['0x' + f'{i:064x}' for i in (1, 2, 3)]
+WALLETS = [{'address': Account.from_key(key).address, 'private_key': key} for key in KEYS]
+
+
+def multicall_result(values):
+    """aggregate3 return data; None marks a failed call"""
+    results = [(False, b'') if v is None else (True, encode(['uint256'], [int(v)])) for v in values]
+    return to_hex(encode(['(bool,bytes)[]'], [results]))
+
+
+class FakeNode:
+    """JSON-RPC batch endpoint with per-wallet state"""
+
+    def __init__(self, values, nonces):
+        self.values = values
+        self.nonces = nonces
+        self.sent = []
+        self.block = 100
+        self.calls = 0
+
+    async def batch(self, batch):
+        self.calls += 1
+        responses = {}
+        for request in batch:
+            method, params = request['method'], request['params']
+            if method == 'eth_call':
+                (calls,) = decode(['(address,bool,bytes)[]'], bytes.fromhex(params[0]['data'][10:]))
+                assert params[0]['data'].startswith(to_hex(AGGREGATE3)) and len(calls) == len(self.values)
+                result = multicall_result(self.values)
+            elif method == 'eth_gasPrice':
+                result = hex(30 * 10 ** 9)
+            elif method == 'eth_getTransactionCount':
+                result = hex(self.nonces[params[0]])
+            elif method == 'eth_sendRawTransaction':
+                self.sent.append(params[0])
+                result = '0x' + '00' * 32
+            elif method == 'eth_blockNumber':
+                self.block += 1
+                result = hex(self.block)
+            elif method == 'eth_getTransactionReceipt':
+                result = {'status': '0x1', 'blockNumber': hex(self.block), 'gasUsed': hex(46000)}
+            responses[request['id']] = {'id': request['id'], 'result': result}
+        return responses
+
+
+class TestStateCall(unittest.TestCase):
+    """Multicall encoding and approval planning"""
+
+    def test_decode_and_plan(self):
+        targets = approval_targets()
+        addresses = [w['address'] for w in WALLETS[:2]]
+        data = encode_state_call(addresses, targets)
+        self.assertTrue(data.startswith(to_hex(AGGREGATE3)))
+
+        # wallet 0: fully approved; wallet 1: low allowance, one operator missing, one unreadable
+        values = [10 ** 18, 50 * 10 ** 6, 20000 * 10 ** 6, 1, 1, 1,
+                  10 ** 17, 0, 5 * 10 ** 6, 1, 0, None]
+        state = decode_state_call(addresses, targets, multicall_result(values))
+        self.assertEqual(state[addresses[0]]['matic'], 1.0)
+        self.assertEqual(state[addresses[0]]['usdc'], 50.0)
+        self.assertIs(state[addresses[1]]['approvals']['CTF -> Neg Risk CTF Exchange'], False)
+        self.assertIsNone(state[addresses[1]]['approvals']['CTF -> Neg Risk Adapter'])
+
+        missing = plan_approvals(state, targets, usdc_amount=10000)
+        self.assertEqual(missing[addresses[0]], [])
+        self.assertEqual([t['name'] for t in missing[addresses[1]]],
+                         ['USDC -> CTF Exchange', 'CTF -> Neg Risk CTF Exchange', 'CTF -> Neg Risk Adapter'])
+
+
+class TestApprovalBootstrap(unittest.TestCase):
+    """Read, sign with per-wallet nonces, submit, confirm"""
+
+    def test_run(self):
+        per_wallet = [
+            [10 ** 18, 0, 0, 0, 1, 1],           # needs USDC + CTF Exchange
+            [10 ** 18, 0, 10 ** 12, 1, 1, 1],    # ready
+            [10 ** 12, 0, 0, 0, 0, 0],           # no MATIC for gas
+        ]
+        node = FakeNode([v for values in per_wallet for v in values],
+                        {WALLETS[0]['address']: 7, WALLETS[1]['address']: 0, WALLETS[2]['address']: 0})
+        bootstrap = ApprovalBootstrap({'approval_bootstrap': {'poll_interval': 0}})
+        bootstrap._rpc_batch = node.batch
+        confirmed = []
+
+        report = asyncio.run(bootstrap.run(WALLETS, usdc_amount=100, on_update=confirmed.append))
+
+        txs = report['transactions']
+        self.assertEqual([(tx['address'], tx['nonce']) for tx in txs],
+                         [(WALLETS[0]['address'], 7), (WALLETS[0]['address'], 8)])
+        self.assertEqual(len(node.sent), 2)
+        self.assertTrue(all(tx['status'] == 'confirmed' for tx in txs))
+        self.assertEqual(len(confirmed), 2)
+        self.assertEqual(node.calls, 4)  # read, submit, block, receipts
+
+        wallets = report['wallets']
+        self.assertTrue(wallets[WALLETS[0]['address']]['ok'])
+        self.assertTrue(wallets[WALLETS[1]['address']]['ok'])
+        self.assertIn('insufficient MATIC', wallets[WALLETS[2]['address']]['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
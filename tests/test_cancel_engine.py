@@ -0,0 +1,153 @@
+"""
+Tests for bulk order cancellation
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cancel_engine import CancelEngine
+from circuit_breaker import CircuitState, get_circuit_breaker
+from order_manager import OrderManager
+
+
+class FakeClient:
+    """CLOB client with an in-memory order list"""
+
+    def __init__(self, orders, sticky=()):
+        self.orders = {o['id']: o for o in orders}
+        self.sticky = set(sticky)  # survive the first cancel
+        self.calls = []
+
+    def get_orders(self, params=None):
+        self.calls.append('get_orders')
+        orders = list(self.orders.values())
+        if params is not None:
+            orders = [o for o in orders if (not params.market or o['market'] == params.market)
+                      and (not params.asset_id or o['asset_id'] == params.asset_id)]
+        return orders
+
+    def _cancel(self, ids):
+        canceled = []
+        for order_id in ids:
+            if order_id in self.sticky:
+                self.sticky.discard(order_id)
+                continue
+            if self.orders.pop(order_id, None):
+                canceled.append(order_id)
+        return {'canceled': canceled, 'not_canceled': {}}
+
+    def cancel_all(self):
+        self.calls.append('cancel_all')
+        return self._cancel(list(self.orders))
+
+    def cancel_market_orders(self, market='', asset_id=''):
+        self.calls.append('cancel_market_orders')
+        return self._cancel([o['id'] for o in self.get_orders(type('P', (), {'market': market, 'asset_id': asset_id}))])
+
+    def cancel_orders(self, order_ids):
+        self.calls.append('cancel_orders')
+        return self._cancel(order_ids)
+
+
+def order(order_id, market='m1', asset_id='t1'):
+    return {'id': order_id, 'market': market, 'asset_id': asset_id}
+
+
+class TestCancelEngine(unittest.TestCase):
+    """Scopes and verification"""
+
+    def _engine(self, clients):
+        async def get_client(wallet):
+            if wallet['address'] == '0xDOWN':
+                raise ConnectionError('auth failed')
+            return clients[wallet['address']]
+        return CancelEngine({'verify_delay': 0, 'max_batch_size': 2}, get_client=get_client)
+
+    def test_cancel_all_wallets_and_verify(self):
+        clients = {
+            '0xA': FakeClient([order('a1'), order('a2'), order('a3')], sticky=['a2']),
+            '0xB': FakeClient([order('b1', market='m2')]),
+        }
+        summary = asyncio.run(self._engine(clients).cancel(
+            [{'address': '0xA'}, {'address': '0xB'}, {'address': '0xDOWN'}]
+        ))
+
+        self.assertEqual(summary['cancelled'], 4)
+        self.assertEqual(summary['remaining'], 0)
+        self.assertEqual(summary['failed_wallets'], ['0xDOWN'])
+        self.assertEqual(summary['wallets']['0xA']['remaining'], 0)
+        # Straggler a2 was batch-cancelled by ID after re-listing
+        self.assertEqual(clients['0xA'].calls[:3], ['cancel_all', 'get_orders', 'cancel_orders'])
+        self.assertFalse(clients['0xA'].orders)
+
+    def test_market_and_order_scopes(self):
+        clients = {'0xA': FakeClient([order('a1'), order('a2', market='m2'), order('a3', market='m2'),
+                                      order('a4', market='m3')])}
+        engine = self._engine(clients)
+
+        summary = asyncio.run(engine.cancel([{'address': '0xA'}], markets=['m2']))
+        self.assertEqual(summary['cancelled'], 2)
+        self.assertEqual(set(clients['0xA'].orders), {'a1', 'a4'})
+
+        summary = asyncio.run(engine.cancel([{'address': '0xA'}, {'address': '0xB'}], order_ids={'0xA': ['a4']}))
+        self.assertEqual(summary['cancelled'], 1)
+        self.assertEqual(list(summary['wallets']), ['0xA'])
+        self.assertEqual(set(clients['0xA'].orders), {'a1'})
+
+
+class TestOrderManagerCancelAll(unittest.TestCase):
+    """OrderManager.cancel_all_orders delegates to the engine"""
+
+    def test_tracked_orders_cancelled_and_forgotten(self):
+        manager = OrderManager({'order_cancellation': {'verify_delay': 0}})
+        client = FakeClient([order('y1'), order('n1'), order('other')])
+        manager.signing_clients['0xA'] = client
+        manager.active_orders = {
+            'm1': {'wallet_address': '0xA', 'order_ids': {'yes': 'y1', 'no': 'n1'}, 'token_ids': []},
+        }
+
+        cancelled = asyncio.run(manager.cancel_all_orders())
+
+        self.assertEqual(cancelled, 2)
+        self.assertEqual(manager.active_orders, {})
+        self.assertEqual(list(client.orders), ['other'])  # Untracked orders are left alone
+
+    def test_warm_restart_cancel_uses_wallet_keys_and_ignores_open_breaker(self):
+        class WalletManager:
+            wallets = [{'address': '0xa', 'private_key': 'pk'}]
+
+        manager = OrderManager({'order_cancellation': {'verify_delay': 0}})
+        manager.wallet_manager = WalletManager()
+        client = FakeClient([order('y1'), order('n1')])
+        seen = []
+
+        async def get_client(wallet):
+            seen.append(wallet)
+            return client
+
+        # Restored from the journal: no cached signing client yet
+        manager.cancel_engine.get_client = get_client
+        manager.active_orders = {
+            'm1': {'wallet_address': '0xA', 'order_ids': {'yes': 'y1', 'no': 'n1'}, 'token_ids': []},
+        }
+
+        # Placements tripped the shared order breaker
+        breaker = get_circuit_breaker('clob_order')
+        breaker.state = CircuitState.OPEN
+        breaker.opened_at = datetime.now()
+        try:
+            cancelled = asyncio.run(manager.cancel_all_orders())
+        finally:
+            breaker.reset()
+
+        self.assertEqual(cancelled, 2)
+        self.assertEqual(seen[0]['private_key'], 'pk')
+
+
+if __name__ == '__main__':
+    unittest.main()
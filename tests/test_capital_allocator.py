@@ -0,0 +1,152 @@
+"""
+Tests for reward-per-dollar capital allocation
+"""
+
+import random
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from capital_allocator import CapitalAllocator
+from execution_engine import ExecutionEngine
+from risk_manager import RiskManager
+
+try:
+    from market_selector import MarketSelectorAI
+except ImportError:  # pandas not installed
+    MarketSelectorAI = None
+
+
+class TestCapitalAllocator(unittest.TestCase):
+    """Greedy knapsack under wallet and exposure limits"""
+
+    def setUp(self):
+        self.allocator = CapitalAllocator({
+            'max_capital_per_market': 0.5,
+            'max_total_exposure': 1.0,
+            'max_category_exposure': 1.0,
+        })
+        self.allocator.update_wallets({'0xA': {'usdc': 100}, '0xB': {'usdc': 60}})
+
+    def test_best_reward_per_dollar_first(self):
+        self.allocator.upsert('cheap', capital=50, expected_reward=10)  # 0.2 / $
+        self.allocator.upsert('pricey', capital=80, expected_reward=8)  # 0.1 / $
+        self.allocator.upsert('poor', capital=50, expected_reward=1)
+
+        allocation = self.allocator.solve()
+        self.assertEqual(allocation['cheap'], {'capital': 50, 'wallet': '0xA', 'expected_reward': 10})
+        # No single wallet has 80 left (A: 50, B: 60), so the all-or-nothing market is skipped
+        self.assertNotIn('pricey', allocation)
+        self.assertEqual(allocation['poor']['wallet'], '0xB')
+        self.assertEqual(list(allocation), ['cheap', 'poor'])
+
+    def test_wallet_balance_bounds_each_market(self):
+        self.allocator.upsert('big', capital=100, expected_reward=20, min_capital=90)
+        self.allocator.upsert('partial', capital=100, expected_reward=10, min_capital=40)
+
+        allocation = self.allocator.solve()
+        # Per-market cap is 80 (< min 90), so 'big' is skipped; 'partial' is trimmed to 80
+        self.assertNotIn('big', allocation)
+        self.assertEqual(allocation['partial']['capital'], 80)
+        self.assertEqual(allocation['partial']['wallet'], '0xA')
+        self.assertAlmostEqual(allocation['partial']['expected_reward'], 8.0)
+
+    def test_category_and_market_count_limits(self):
+        self.allocator.max_category_exposure = 0.25  # $40
+        for i in range(3):
+            self.allocator.upsert(f'sports{i}', capital=30, expected_reward=10 - i, category='sports')
+        self.allocator.upsert('politics', capital=30, expected_reward=1, category='politics')
+
+        allocation = self.allocator.solve()
+        self.assertEqual(set(allocation), {'sports0', 'politics'})
+        self.assertEqual(len(self.allocator.solve(max_markets=1)), 1)
+
+    def test_holdings_reserve_wallet_capital(self):
+        self.allocator.set_holdings({'held': {'wallet': '0xA', 'capital': 90}})
+        self.allocator.upsert('new', capital=50, expected_reward=5)
+
+        allocation = self.allocator.solve()
+        self.assertEqual(allocation['new']['wallet'], '0xB')
+        self.assertEqual(self.allocator.solve(max_markets=1), {})
+
+    def test_incremental_updates(self):
+        self.allocator.sync([
+            {'market_id': 'a', 'capital': 50, 'expected_reward': 5},
+            {'market_id': 'b', 'capital': 50, 'expected_reward': 10},
+        ])
+        self.assertEqual(list(self.allocator.solve()), ['b', 'a'])
+        solves = self.allocator.solves
+
+        # Unchanged inputs reuse the cached allocation
+        self.allocator.sync([
+            {'market_id': 'a', 'capital': 50, 'expected_reward': 5},
+            {'market_id': 'b', 'capital': 50, 'expected_reward': 10},
+        ])
+        self.allocator.solve()
+        self.assertEqual(self.allocator.solves, solves)
+
+        self.allocator.upsert('a', capital=50, expected_reward=20)
+        self.allocator.remove('b')
+        self.assertEqual(list(self.allocator.solve()), ['a'])
+        self.assertEqual(len(self.allocator._order), 1)
+
+    def test_thousands_of_candidates_solve_fast(self):
+        rng = random.Random(7)
+        self.allocator.update_wallets({f'0x{i}': {'usdc': 500} for i in range(20)})
+        self.allocator.max_capital_per_market = 0.01
+        self.allocator.sync(
+            {'market_id': f'm{i}', 'capital': rng.uniform(20, 200), 'expected_reward': rng.uniform(0, 50),
+             'min_capital': 20, 'category': f'c{i % 12}'}
+            for i in range(5000)
+        )
+
+        start = time.perf_counter()
+        allocation = self.allocator.solve()
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.1)
+        self.assertLessEqual(sum(a['capital'] for a in allocation.values()), 10000 + 1e-6)
+        efficiencies = [self.allocator.candidates[m]['efficiency'] for m in allocation]
+        self.assertEqual(efficiencies, sorted(efficiencies, reverse=True))
+
+
+class TestAllocationIntegration(unittest.TestCase):
+    """Selector and execution engine use the allocation"""
+
+    @unittest.skipIf(MarketSelectorAI is None, "market_selector dependencies not installed")
+    def test_selector_drops_correlated_markets_and_reallocates(self):
+        risk = RiskManager({'max_capital_per_market': 1.0, 'max_total_exposure': 1.0, 'max_category_exposure': 1.0})
+        risk.update_wallet_balances({'0xA': {'usdc': 1000, 'matic': 1}})
+        selector = MarketSelectorAI({'market_selection': {'max_concurrent_markets': 2}}, risk_manager=risk)
+
+        markets = [
+            {'id': 'a', 'question': 'Will X win the final', 'event_id': 'e1', 'expected_reward': 30},
+            {'id': 'b', 'question': 'Will Y win the final', 'event_id': 'e1', 'expected_reward': 20},
+            {'id': 'c', 'question': 'Rain in Paris tomorrow', 'expected_reward': 10},
+        ]
+        selected = selector._apply_portfolio_constraints(markets)
+
+        self.assertEqual([m['id'] for m in selected], ['a', 'c'])
+        self.assertEqual(selected[0]['allocated_wallet'], '0xA')
+        self.assertGreater(selected[1]['allocated_capital'], 0)
+        self.assertEqual(risk.total_capital, 1000)
+
+    def test_dispatch_prefers_allocated_wallet(self):
+        class OrderManager:
+            pending_orders = []
+            active_orders = {}
+
+        class WalletManager:
+            wallets = [{'address': '0xA'}, {'address': '0xB'}]
+
+        engine = ExecutionEngine(OrderManager(), WalletManager(), {})
+        order = {'market_id': 'm', 'allocated_wallet': '0xB',
+                 'yes_order': {'price': 0.5, 'size': 10}, 'no_order': {'price': 0.5, 'size': 10}}
+        self.assertEqual(engine.dispatch(order), '0xB')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests for the shared compiled category classifier
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from category_classifier import CategoryClassifier, QUESTION_RULES, SCRAPER_QUESTION_RULES, TAG_RULES
+
+
+def legacy_classify(question, rules):
+    """Reference: the old if/elif chain of substring checks"""
+    question_lower = question.lower()
+    for category, keywords in rules:
+        if any(keyword.rstrip('*') in question_lower for keyword in keywords):
+            return category
+    return 'other'
+
+
+QUESTIONS = [
+    "Will Bitcoin reach $100k by December?",
+    "Will Team Spirit win the Counter-Strike Major?",
+    "Will the Fed cut rates whether or not CPI rises?",
+    "Will Taylor Swift tweet about the Super Bowl?",
+    "Will the S&P 500 close above 6000?",
+    "Will humanity land on Mars by 2030?",
+    "Will Serie A champion be Inter?",
+    "Will the NBA Finals go to game 7?",
+    "Will it rain in London tomorrow?",
+    "",
+]
+
+
+class TestCategoryClassifier(unittest.TestCase):
+    """Parity with legacy substring semantics, word-boundary mode and memoisation"""
+
+    def test_parity_with_legacy(self):
+        scanner = CategoryClassifier(QUESTION_RULES)
+        scraper = CategoryClassifier(SCRAPER_QUESTION_RULES)
+
+        for question in QUESTIONS:
+            self.assertEqual(scanner.classify(question), legacy_classify(question, QUESTION_RULES), question)
+            self.assertEqual(scraper.classify(question), legacy_classify(question, SCRAPER_QUESTION_RULES), question)
+
+    def test_overlapping_keywords(self):
+        classifier = CategoryClassifier(QUESTION_RULES)
+        # 'strike' (politics) inside 'counter-strike' (sports) - legacy picks politics
+        self.assertEqual(classifier.classify("Counter-Strike major winner?"), 'politics')
+
+    def test_word_boundary(self):
+        classifier = CategoryClassifier(QUESTION_RULES, word_boundary=True)
+        self.assertEqual(classifier.classify("Will it rain whether or not?"), 'other')
+        self.assertEqual(classifier.classify("Will ETH flip BTC?"), 'crypto')
+        self.assertEqual(classifier.classify("Will humanity reach Mars?"), 'science')
+        self.assertEqual(classifier.classify("Will Team Spirit win the Counter-Strike Major?"), 'politics')
+
+    def test_tags_take_precedence(self):
+        classifier = CategoryClassifier(SCRAPER_QUESTION_RULES, tag_rules=TAG_RULES)
+        self.assertEqual(classifier.classify("Will Bitcoin hit $100k?", tags=['Politics']), 'politics')
+        self.assertEqual(classifier.classify("Will Bitcoin hit $100k?", tags=['Unknown']), 'crypto')
+        self.assertEqual(classifier.classify("Who wins?", tags=['economy', 'sports']), 'sports')
+
+    def test_memoisation(self):
+        classifier = CategoryClassifier(QUESTION_RULES, cache_size=2)
+        classifier.classify("Will Bitcoin hit $100k?", condition_id='0x1')
+        classifier.classify("Will Bitcoin hit $100k?", condition_id='0x1')
+        self.assertEqual(classifier.get_stats()['cache_hits'], 1)
+
+        # Same condition ID, edited question -> new key
+        self.assertEqual(classifier.classify("Will the NBA Finals go to game 7?", condition_id='0x1'), 'sports')
+        classifier.classify("Will it rain?", condition_id='0x2')
+        self.assertEqual(classifier.get_stats()['cached'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+Tests for circuit breaker sliding window, half-open probing and registry
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from circuit_breaker import (
+    CircuitBreaker, CircuitBreakerOpenError, CircuitBreakerRegistry, CircuitState, is_server_failure
+)
+
+
+async def ok():
+    return 'ok'
+
+
+async def fail():
+    raise RuntimeError('boom')
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Trip conditions and recovery"""
+
+    def test_failure_rate_trips(self):
+        breaker = CircuitBreaker('test', failure_threshold=100, window_size=10, minimum_calls=10,
+                                 failure_rate_threshold=0.5)
+
+        async def run():
+            # Alternating failures never hit 100 consecutive, but 50% rate trips
+            for i in range(10):
+                try:
+                    await breaker.call(fail if i % 2 else ok)
+                except RuntimeError:
+                    pass
+
+        asyncio.run(run())
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertIn('failure rate', breaker.open_reason)
+
+    def test_slow_call_rate_trips(self):
+        breaker = CircuitBreaker('test', window_size=4, minimum_calls=4,
+                                 slow_call_threshold=0.01, slow_call_rate_threshold=0.75)
+
+        async def slow():
+            await asyncio.sleep(0.02)
+
+        async def run():
+            for _ in range(4):
+                await breaker.call(slow)
+
+        asyncio.run(run())
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertIn('slow call rate', breaker.open_reason)
+
+    def test_call_timeout_counts_as_failure(self):
+        breaker = CircuitBreaker('test', failure_threshold=1, call_timeout=0.01)
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        async def run():
+            with self.assertRaises(asyncio.TimeoutError):
+                await breaker.call(hang)
+            with self.assertRaises(CircuitBreakerOpenError):
+                await breaker.call(ok)
+
+        asyncio.run(run())
+
+    def test_client_errors_do_not_trip(self):
+        class ApiError(Exception):
+            def __init__(self, status_code):
+                super().__init__(f'status {status_code}')
+                self.status_code = status_code
+
+        breaker = CircuitBreaker('test', failure_threshold=2, is_failure=is_server_failure)
+
+        async def raise_status(status_code):
+            raise ApiError(status_code)
+
+        async def run():
+            # A wallet without balance / allowance keeps getting 400s
+            for _ in range(5):
+                with self.assertRaises(ApiError):
+                    await breaker.call(raise_status, 400)
+            self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+            for _ in range(2):
+                with self.assertRaises(ApiError):
+                    await breaker.call(raise_status, 503)
+
+        asyncio.run(run())
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        self.assertTrue(is_server_failure(asyncio.TimeoutError()))
+
+    def test_single_half_open_probe(self):
+        breaker = CircuitBreaker('test', failure_threshold=1, timeout_seconds=0, success_threshold=1)
+        probes = []
+
+        async def probe():
+            probes.append(1)
+            await asyncio.sleep(0.02)
+            return 'ok'
+
+        async def run():
+            with self.assertRaises(RuntimeError):
+                await breaker.call(fail)
+            return await asyncio.gather(*(breaker.call(probe) for _ in range(5)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertEqual(len(probes), 1)
+        self.assertEqual(sum(1 for r in results if isinstance(r, CircuitBreakerOpenError)), 4)
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    def test_cached_fallback(self):
+        breaker = CircuitBreaker('test', failure_threshold=1, timeout_seconds=60, cache_ttl=60)
+
+        async def run():
+            first = await breaker.call_cached('key', ok)
+            fallback_on_error = await breaker.call_cached('key', fail)
+            fallback_when_open = await breaker.call_cached('key', ok)
+            with self.assertRaises(CircuitBreakerOpenError):
+                await breaker.call_cached('other', ok)
+            return first, fallback_on_error, fallback_when_open
+
+        self.assertEqual(asyncio.run(run()), ('ok', 'ok', 'ok'))
+        self.assertEqual(breaker.total_fallbacks, 2)
+
+
+class TestCircuitBreakerRegistry(unittest.TestCase):
+    """Per-endpoint registry"""
+
+    def test_registry_shares_and_configures(self):
+        registry = CircuitBreakerRegistry({'clob_book': {'cache_ttl': 5}})
+        breaker = registry.get('clob_book')
+        self.assertIs(registry.get('clob_book'), breaker)
+        self.assertEqual(breaker.cache_ttl, 5)
+
+        registry.configure({'clob_book': {'cache_ttl': 1}})
+        self.assertEqual(breaker.cache_ttl, 1)
+
+    def test_state_change_callback(self):
+        registry = CircuitBreakerRegistry({'svc': {'failure_threshold': 1}})
+        changes = []
+        registry.on_state_change = lambda name, state: changes.append((name, state))
+
+        async def run():
+            with self.assertRaises(RuntimeError):
+                await registry.get('svc').call(fail)
+
+        asyncio.run(run())
+        self.assertEqual(changes, [('svc', 'open')])
+        self.assertEqual(registry.get_open(), ['svc'])
+
+
+if __name__ == '__main__':
+    unittest.main()
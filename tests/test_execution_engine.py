@@ -0,0 +1,145 @@
+"""
+Unit tests for ExecutionEngine
+"""
+
+import unittest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from execution_engine import ExecutionEngine, order_capital
+
+
+class FakeOrderManager:
+    """OrderManager stand-in that records placements"""
+
+    def __init__(self, fail_markets=()):
+        self.pending_orders = []
+        self.active_orders = {}
+        self.placed = []
+        self.fail_markets = set(fail_markets)
+
+    async def place_order(self, order, wallet):
+        await asyncio.sleep(0.01)
+        if order['market_id'] in self.fail_markets:
+            return None
+        self.placed.append((order['market_id'], wallet['address']))
+        self.active_orders[order['market_id']] = order
+        return {'yes': 'y', 'no': 'n'}
+
+
+class FakeWalletManager:
+    """WalletManager stand-in"""
+
+    def __init__(self, num_wallets):
+        self.wallets = [
+            {'index': i, 'address': f'0xwallet{i}', 'private_key': 'pk', 'usage_count': 0, 'last_used': 0}
+            for i in range(num_wallets)
+        ]
+        self.stats = {}
+
+    def update_wallet_stats(self, address, stats):
+        self.stats[address] = self.stats.get(address, 0) + stats['orders']
+
+    async def check_wallet_balances(self):
+        return {w['address']: {'usdc': 1000, 'matic': 1} for w in self.wallets}
+
+
+def make_order(market_id, price=0.5, size=10):
+    return {
+        'market_id': market_id,
+        'yes_order': {'price': price, 'size': size},
+        'no_order': {'price': price, 'size': size},
+    }
+
+
+class TestExecutionEngine(unittest.TestCase):
+    """Test ExecutionEngine dispatch and workers"""
+
+    def test_order_capital(self):
+        """Test capital of both sides"""
+        self.assertAlmostEqual(order_capital(make_order('m', 0.4, 100)), 80.0)
+
+    def test_dispatch_spreads_across_wallets(self):
+        """Test new markets go to least loaded wallets"""
+        engine = ExecutionEngine(FakeOrderManager(), FakeWalletManager(3), {})
+
+        wallets = {engine.dispatch(make_order(f'm{i}')) for i in range(3)}
+
+        self.assertEqual(len(wallets), 3)
+
+    def test_dispatch_inventory_affinity(self):
+        """Test a market stays on the wallet that holds its inventory"""
+        engine = ExecutionEngine(FakeOrderManager(), FakeWalletManager(3), {})
+
+        first = engine.dispatch(make_order('m1'))
+        engine.dispatch(make_order('m2'))
+        again = engine.dispatch(make_order('m1'))
+
+        self.assertEqual(first, again)
+
+    def test_dispatch_respects_balance(self):
+        """Test no dispatch when wallets lack free capital"""
+        engine = ExecutionEngine(FakeOrderManager(), FakeWalletManager(1), {})
+        engine.update_balances({'0xwallet0': {'usdc': 15}})
+
+        self.assertIsNotNone(engine.dispatch(make_order('m1', 0.5, 10)))  # $10
+        self.assertIsNone(engine.dispatch(make_order('m2', 0.5, 10)))     # only $5 left
+
+    def test_workers_place_concurrently(self):
+        """Test workers place orders and failures return to pending"""
+        order_mgr = FakeOrderManager(fail_markets={'bad'})
+        wallet_mgr = FakeWalletManager(2)
+        engine = ExecutionEngine(order_mgr, wallet_mgr, {})
+
+        async def test():
+            await engine.start()
+            for market_id in ('m1', 'm2', 'bad'):
+                engine.dispatch(make_order(market_id))
+            await asyncio.gather(*(w.queue.join() for w in engine.workers.values()))
+            await engine.close()
+
+        asyncio.run(test())
+
+        self.assertEqual(len(order_mgr.placed), 2)
+        self.assertEqual({addr for _, addr in order_mgr.placed}, {'0xwallet0', '0xwallet1'})
+        self.assertEqual([o['market_id'] for o in order_mgr.pending_orders], ['bad'])
+        self.assertEqual(engine.get_stats()['failed'], 1)
+
+    def test_capital_follows_active_orders(self):
+        """Test capital and affinity are released once a market's orders are gone"""
+        order_mgr = FakeOrderManager()
+        engine = ExecutionEngine(order_mgr, FakeWalletManager(1), {})
+        engine.update_balances({'0xwallet0': {'usdc': 25}})
+        worker = engine.workers['0xwallet0']
+
+        async def test():
+            await engine.start()
+            engine.dispatch(make_order('m1'))
+            await worker.queue.join()
+            first = (worker.committed_capital, engine.market_wallet, dict(engine.dispatched))
+
+            # Re-dispatching a resting market does not commit its capital twice
+            engine.dispatch(make_order('m1'))
+            await worker.queue.join()
+            await engine.close()
+            return first, worker.committed_capital
+
+        (capital, market_wallet, dispatched), again = asyncio.run(test())
+        self.assertAlmostEqual(capital, 10.0)
+        self.assertEqual(market_wallet, {'m1': '0xwallet0'})
+        self.assertEqual(dispatched, {})
+        self.assertAlmostEqual(again, 10.0)
+
+        # Cancelled / filled orders leave active_orders and free the wallet
+        del order_mgr.active_orders['m1']
+        self.assertAlmostEqual(worker.committed_capital, 0.0)
+        self.assertEqual(engine.market_wallet, {})
+        self.assertIsNotNone(engine.dispatch(make_order('m2', 0.5, 20)))  # $20
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests for the depth-aware liquidation engine
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from liquidation_engine import LiquidationEngine, plan_slices
+from orderbook_codec import BookSide
+
+
+class TestPlanSlices(unittest.TestCase):
+    """Walking the bid ladder"""
+
+    def test_walks_levels_above_floor(self):
+        slices = plan_slices([0.50, 0.49, 0.48, 0.40], [100, 50, 200, 1000], 300, floor_price=0.47)
+        self.assertEqual([(s['price'], s['size'], s['resting']) for s in slices],
+                         [(0.50, 100, False), (0.49, 50, False), (0.48, 150, False)])
+
+    def test_residual_rests_at_floor(self):
+        slices = plan_slices([0.50, 0.30], [100, 1000], 250, floor_price=0.48)
+        self.assertEqual([(s['price'], s['size'], s['resting']) for s in slices],
+                         [(0.50, 100, False), (0.48, 150, True)])
+
+        no_rest = plan_slices([0.50, 0.30], [100, 1000], 250, floor_price=0.48, rest_residual=False)
+        self.assertEqual(len(no_rest), 1)
+
+    def test_small_levels_merged_and_slices_capped(self):
+        # 2-share levels are below min size: merged until a slice reaches 5 shares
+        slices = plan_slices([0.60, 0.59, 0.58], [2, 2, 2], 6, floor_price=0.50, min_size=5)
+        self.assertEqual([(s['price'], s['size']) for s in slices], [(0.58, 6)])
+
+        slices = plan_slices([0.6, 0.59, 0.58, 0.57], [10, 10, 10, 10], 40, floor_price=0.5, max_slices=2)
+        self.assertEqual([(s['price'], s['size']) for s in slices], [(0.6, 10), (0.57, 30)])
+
+    def test_empty_book(self):
+        slices = plan_slices([], [], 20, floor_price=0.45)
+        self.assertEqual([(s['price'], s['size'], s['resting']) for s in slices], [(0.45, 20, True)])
+
+
+class FakeClient:
+    """Signing client recording posted orders; every order fills on the first poll"""
+
+    def __init__(self):
+        self.posted = []
+        self.order_types = []
+        self.orders = {}
+
+    def create_order(self, args):
+        return args
+
+    def post_orders(self, signed):
+        responses = []
+        for post in signed:
+            order_id = f'order-{len(self.posted)}'
+            self.posted.append(post.order)
+            self.order_types.append(post.orderType)
+            self.orders[order_id] = post.order
+            responses.append({'success': True, 'orderID': order_id, 'status': 'live'})
+        return responses
+
+    def get_order(self, order_id):
+        return {'size_matched': self.orders[order_id].size, 'status': 'MATCHED'}
+
+
+class TestLiquidationEngine(unittest.TestCase):
+    """Planning, batching and fill tracking"""
+
+    def _engine(self, events=None):
+        config = {'liquidation': {'max_slippage': 0.05, 'max_batch_size': 2, 'fill_poll_interval': 0,
+                                  'fill_timeout': 5}}
+        engine = LiquidationEngine(config, on_update=(events.append if events is not None else None))
+
+        async def books(token_ids):
+            return {
+                'yes': {'bids': BookSide([['0.50', '30'], ['0.49', '40'], ['0.40', '500']]), 'tick_size': 0.01},
+                'no': {'bids': BookSide([]), 'tick_size': 0.01},
+            }
+        engine._get_books = books
+        return engine
+
+    def test_plan_floor_from_best_bid(self):
+        engine = self._engine()
+        plans = asyncio.run(engine.liquidate(
+            [{'asset': 'yes', 'size': 100, 'title': 'Yes', '_wallet': '0xA'},
+             {'asset': 'no', 'size': 10, 'curPrice': 0.2, 'title': 'No', '_wallet': '0xA'}],
+            [], dry_run=True
+        ))
+
+        yes, no = plans
+        self.assertEqual(yes['floor_price'], 0.48)  # ceil(0.50 * 0.95) on 0.01 ticks
+        self.assertEqual([(s['price'], s['size']) for s in yes['slices']], [(0.5, 30), (0.49, 40), (0.48, 30)])
+        self.assertAlmostEqual(yes['expected_proceeds'], 30 * 0.5 + 40 * 0.49)
+        self.assertEqual(no['best_bid'], None)
+        self.assertEqual([(s['price'], s['resting']) for s in no['slices']], [(0.19, True)])
+
+    def test_liquidate_batches_and_tracks_fills(self):
+        events = []
+        engine = self._engine(events)
+        clients = {'0xA': FakeClient(), '0xB': FakeClient()}
+
+        async def signing_client(wallet):
+            engine.signing_clients[wallet['address']] = clients[wallet['address']]
+            return clients[wallet['address']]
+        engine.get_signing_client = signing_client
+
+        reports = asyncio.run(engine.liquidate(
+            [{'asset': 'yes', 'size': 100, 'title': 'Yes', '_wallet': '0xA'},
+             {'asset': 'yes', 'size': 20, 'title': 'Yes', '_wallet': '0xB'}],
+            [{'address': '0xA', 'private_key': '1'}, {'address': '0xB', 'private_key': '2'}]
+        ))
+
+        self.assertEqual(len(clients['0xA'].posted), 3)
+        self.assertEqual(len(clients['0xB'].posted), 1)
+        self.assertEqual([r['filled'] for r in reports], [100, 20])
+        self.assertAlmostEqual(reports[1]['proceeds'], 20 * 0.5)
+        self.assertEqual(sum(1 for e in events if e['type'] == 'fill'), 4)
+        self.assertEqual(engine.get_stats()['orders_posted'], 4)
+        self.assertEqual(set(clients['0xA'].order_types), {'GTC'})
+
+    def test_untracked_sells_never_rest(self):
+        engine = self._engine()
+        client = FakeClient()
+
+        async def signing_client(wallet):
+            return client
+        engine.get_signing_client = signing_client
+
+        reports = asyncio.run(engine.liquidate(
+            [{'asset': 'yes', 'size': 100, 'title': 'Yes', '_wallet': '0xA'}],
+            [{'address': '0xA', 'private_key': '1'}], wait_for_fills=False, rest_residual=False
+        ))
+
+        self.assertEqual([o['resting'] for o in reports[0]['orders']], [False, False])
+        self.assertEqual(client.order_types, ['FAK', 'FAK'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests for indexed queries over JSON-lines logs
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from log_analytics import INDEX_DIR, LogQuery, LogSegment, discover_logs, parse_since
+from structured_logging import JsonLineFormatter, LoggingPipeline, log_event
+
+NOW = 1_790_000_000.0
+
+
+def record(created: float, event=None, msg='message', **fields) -> str:
+    """Format one line the way the bot's file handler does"""
+    rec = logging.LogRecord('order_manager', logging.INFO, __file__, 1, msg, (), None)
+    rec.created = created
+    if event:
+        rec.event = event
+        rec.fields = fields
+    return JsonLineFormatter().format(rec) + '\n'
+
+
+class TestLogAnalytics(unittest.TestCase):
+    """Index building, incremental extension and aggregations"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'bot.log')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, lines, mode='w'):
+        with open(path, mode, encoding='utf-8') as f:
+            f.writelines(lines)
+
+    def _query(self, since=None, until=None, block_bytes=256):
+        query = LogQuery(discover_logs(self.path), since=since, until=until, block_bytes=block_bytes)
+        self.addCleanup(query.close)
+        return query
+
+    def test_placements_rejects_and_latency(self):
+        lines = []
+        for i in range(100):
+            lines.append(record(NOW + i, 'order_placed', market_id=f'm{i % 3}', latency_ms=float(i + 1)))
+            lines.append(record(NOW + i, msg='plain line'))
+        lines.append(record(NOW + 100, 'market_rejected', reason='no_orderbook', market_id='m9'))
+        lines.append(record(NOW + 101, 'filter_summary', passed=5, total=20,
+                            rejected={'no_orderbook': 10, 'spread': 5}))
+        self._write(self.path, lines)
+
+        query = self._query()
+        self.assertEqual(query.count_by('order_placed', 'market_id'), {'m0': 34, 'm1': 33, 'm2': 33})
+
+        rejects = query.count_by('market_rejected', 'reason')
+        rejects.update(query.sum_counts('filter_summary', 'rejected'))
+        self.assertEqual(rejects, {'no_orderbook': 11, 'spread': 5})
+
+        latency = query.percentiles('order_placed', 'latency_ms')
+        self.assertEqual(latency['count'], 100)
+        self.assertEqual(latency['p50'], 50.0)
+        self.assertEqual(latency['p99'], 99.0)
+        self.assertEqual(latency['max'], 100.0)
+
+        self.assertEqual(query.event_counts()['order_placed'], 100)
+
+    def test_counts_exact_with_sampling(self):
+        pipeline = LoggingPipeline({'level': 'INFO', 'log_to_console': False, 'log_to_file': True,
+                                    'log_file': self.path, 'sampling': {'order_manager': 5}})
+        log = logging.getLogger('order_manager.sampled')
+        log.propagate = False
+        pipeline.start(log)
+        for i in range(50):
+            log_event(log, logging.INFO, 'order_placed', "Placed %(market_id)s",
+                      market_id=f'm{i % 2}', latency_ms=float(i))
+            log.info("noisy line")
+        pipeline.stop()
+
+        query = self._query()
+        self.assertEqual(query.count_by('order_placed', 'market_id'), {'m0': 25, 'm1': 25})
+        self.assertEqual(query.percentiles('order_placed', 'latency_ms')['count'], 50)
+        self.assertEqual(pipeline.get_stats()['sampled_out'], 40)
+
+    def test_time_window(self):
+        self._write(self.path, [record(NOW + i, 'order_placed', market_id='m', latency_ms=1.0)
+                                for i in range(50)])
+
+        query = self._query(since=NOW + 10, until=NOW + 19.5)
+        self.assertEqual(query.count_by('order_placed', 'market_id'), {'m': 10})
+        self.assertEqual(query.event_counts()['order_placed'], 10)
+
+    def test_index_reused_and_extended(self):
+        self._write(self.path, [record(NOW + i, 'order_placed', market_id='a') for i in range(20)])
+        segment = LogSegment(self.path, block_bytes=256)
+        first_blocks = len(segment.blocks)
+        segment.close()
+
+        index_files = os.listdir(os.path.join(self.tmp.name, INDEX_DIR))
+        self.assertEqual(len(index_files), 1)
+
+        # Appended lines (plus a partial trailing line) are indexed on the next open
+        self._write(self.path, [record(NOW + 20 + i, 'order_placed', market_id='b') for i in range(20)], 'a')
+        self._write(self.path, ['{"ts": "partial'], 'a')
+
+        segment = LogSegment(self.path, block_bytes=256)
+        self.addCleanup(segment.close)
+        self.assertGreater(len(segment.blocks), first_blocks)
+        self.assertEqual(sum(b[4].get('order_placed', 0) for b in segment.blocks), 40)
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, INDEX_DIR)), index_files)
+
+    def test_rotated_files_included(self):
+        rotated = f'{self.path}.1'
+        self._write(rotated, [record(NOW, 'order_placed', market_id='old')])
+        self._write(self.path, [record(NOW + 10, 'order_placed', market_id='new')])
+        os.utime(rotated, (time.time() - 60, time.time() - 60))
+
+        self.assertEqual(discover_logs(self.path), [rotated, self.path])
+        self.assertEqual(self._query().count_by('order_placed', 'market_id'), {'old': 1, 'new': 1})
+
+    def test_parse_since(self):
+        self.assertEqual(parse_since('24h', now=NOW), NOW - 86400)
+        self.assertEqual(parse_since('30m', now=NOW), NOW - 1800)
+        self.assertEqual(parse_since('2026-01-01T00:00:00+00:00'), 1767225600.0)
+        self.assertIsNone(parse_since(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Unit tests for LoopWatchdog
+"""
+
+import unittest
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loop_watchdog import LoopWatchdog
+
+
+def blocking_call(seconds):
+    """Simulate a synchronous call inside a coroutine"""
+    time.sleep(seconds)
+
+
+class TestLoopWatchdog(unittest.TestCase):
+    """Test LoopWatchdog functionality"""
+
+    def test_detects_and_attributes_stall(self):
+        """Test blocking call is captured and attributed to this module"""
+        watchdog = LoopWatchdog(interval=0.02, stall_threshold=0.1)
+
+        async def slow_coroutine():
+            blocking_call(0.4)
+
+        async def test():
+            await watchdog.start()
+            await asyncio.sleep(0.1)
+            await slow_coroutine()
+            await asyncio.sleep(0.1)
+            await watchdog.stop()
+
+        asyncio.run(test())
+
+        stalls = watchdog.get_recent_stalls(60)
+        self.assertEqual(len(stalls), 1)
+        self.assertGreaterEqual(stalls[0]['duration_ms'], 300)
+        self.assertEqual(stalls[0]['module'], 'tests.test_loop_watchdog')
+        self.assertIn('blocking_call', stalls[0]['location'])
+
+        top = watchdog.get_top_offenders(1)
+        self.assertEqual(top[0]['module'], 'tests.test_loop_watchdog')
+        self.assertEqual(top[0]['count'], 1)
+
+    def test_no_stall_when_idle(self):
+        """Test idle loop records lag samples but no stalls"""
+        watchdog = LoopWatchdog(interval=0.01, stall_threshold=0.2)
+
+        async def test():
+            await watchdog.start()
+            await asyncio.sleep(0.1)
+            await watchdog.stop()
+
+        asyncio.run(test())
+
+        self.assertGreater(watchdog.get_lag_stats()['samples'], 0)
+        self.assertEqual(watchdog.get_stats()['total_stalls'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Tests for the rolled-up metrics store
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics_store import DAY, HOUR, MINUTE, RAW, MetricsStore
+
+T0 = 1_700_006_400  # 2023-11-15 00:00:00 UTC
+
+
+class TestMetricsStore(unittest.TestCase):
+    """Rollups, interval cover, queries and retention"""
+
+    def setUp(self):
+        self.store = MetricsStore({'path': ':memory:'})
+
+    def test_cover_uses_coarsest_buckets(self):
+        ranges = MetricsStore._cover(T0 - 90, T0 + DAY + HOUR + 150)
+        self.assertEqual(sorted(ranges), sorted([
+            (DAY, T0, T0 + DAY),
+            (MINUTE, T0 - 60, T0),
+            (RAW, T0 - 90, T0 - 60),
+            (HOUR, T0 + DAY, T0 + DAY + HOUR),
+            (MINUTE, T0 + DAY + HOUR, T0 + DAY + HOUR + 120),
+            (RAW, T0 + DAY + HOUR + 120, T0 + DAY + HOUR + 150),
+        ]))
+        self.assertEqual(MetricsStore._cover(T0 + 10, T0 + 50), [(RAW, T0 + 10, T0 + 50)])
+
+    def test_aggregate_and_series(self):
+        self.store.record('pnl', 5.0, 'sports', T0 + 30)
+        self.store.record('pnl', -2.0, 'sports', T0 + HOUR + 30)
+        self.store.record('pnl', 1.0, 'politics', T0 + HOUR + 40)
+        self.store.record('pnl', 100.0, 'sports', T0 + DAY + 10)  # Next day
+
+        day = self.store.aggregate('pnl', T0, T0 + DAY)
+        self.assertEqual(day['count'], 3)
+        self.assertAlmostEqual(day['sum'], 4.0)
+        self.assertEqual((day['min'], day['max']), (-2.0, 5.0))
+
+        by_key = self.store.aggregate('pnl', T0, T0 + DAY, group_by_key=True)
+        self.assertAlmostEqual(by_key['sports']['sum'], 3.0)
+        self.assertAlmostEqual(self.store.aggregate('pnl', T0, T0 + DAY, key='politics')['mean'], 1.0)
+
+        # Sub-minute edges are read from raw points, so partial windows are exact
+        self.assertAlmostEqual(self.store.aggregate('pnl', T0 + HOUR, T0 + HOUR + 35)['sum'], -2.0)
+        self.assertAlmostEqual(self.store.aggregate('pnl', T0 + HOUR + 35, T0 + HOUR + 60)['sum'], 1.0)
+        edge = self.store.aggregate('pnl', T0 + 20, T0 + HOUR + 35, group_by_key=True)
+        self.assertEqual({k: v['count'] for k, v in edge.items()}, {'sports': 2})
+        self.assertAlmostEqual(self.store.aggregate('pnl', T0 + 60, T0 + 2 * HOUR)['sum'], -1.0)
+        self.assertEqual(self.store.aggregate('orders', T0, T0 + DAY)['count'], 0)
+
+        hourly = self.store.series('pnl', HOUR, T0, T0 + DAY)
+        self.assertEqual(list(hourly), [T0, T0 + HOUR])
+        self.assertEqual(hourly[T0 + HOUR]['count'], 2)
+
+        rows = self.store.db.execute('SELECT COUNT(*) FROM rollups WHERE resolution = ?', (DAY,)).fetchone()[0]
+        self.assertEqual(rows, 3)  # (day 1, sports), (day 1, politics), (day 2, sports)
+
+    def test_retention_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.db')
+            store = MetricsStore({'path': path, 'minute_retention_days': 1})
+            store.record('orders_placed', timestamp=T0)
+            store.record('orders_placed', timestamp=T0 + 5 * DAY)
+
+            removed = store.prune(now=T0 + 5 * DAY + 10)
+            self.assertEqual(removed, 2)  # Old raw point and old minute bucket
+            asyncio.run(store.close())
+
+            reopened = MetricsStore({'path': path})
+            self.assertEqual(reopened.aggregate('orders_placed', T0, T0 + 6 * DAY)['count'], 2)
+            asyncio.run(reopened.close())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for the online optimizer building blocks
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from online_optimizer import ArmWindows, DecayedAggregates, DiscountedUCB
+
+
+class TestDecayedAggregates(unittest.TestCase):
+    """Incremental sums with exponential decay"""
+
+    def test_add_and_decay(self):
+        aggregates = DecayedAggregates(half_life=3600)
+        aggregates.add('category', 'sports', 0, orders=1, filled=1, pnl=-2.0)
+        aggregates.add('category', 'sports', 0, orders=1, earnings=4.0, dollar_hours=100)
+        aggregates.add('category', 'politics', 0, orders=1)
+
+        sports = aggregates.get('category', 'sports', 0)
+        self.assertEqual(sports['orders'], 2)
+        self.assertEqual(sports['fill_rate'], 0.5)
+        self.assertAlmostEqual(sports['reward_per_dollar_hour'], 0.02)
+
+        # One half-life later every sum counts half; ratios are unchanged
+        later = aggregates.get('category', 'sports', 3600)
+        self.assertAlmostEqual(later['orders'], 1.0)
+        self.assertAlmostEqual(later['reward_per_dollar_hour'], 0.02)
+        self.assertEqual(set(aggregates.breakdown('category', 3600)), {'sports', 'politics'})
+        self.assertIsNone(aggregates.get('market', 'unknown', 0)['reward_per_dollar_hour'])
+
+        aggregates.prune(3600 * 20)
+        self.assertEqual(aggregates.values, {})
+
+    def test_rate(self):
+        aggregates = DecayedAggregates(half_life=3600)
+        for minute in range(0, 600 * 60, 60):  # $1 per minute for 10 half-lives
+            aggregates.add('portfolio', 'all', minute, earnings=0.5, pnl=0.5)
+        self.assertAlmostEqual(aggregates.rate('portfolio', 'all', 600 * 60, 'earnings', 'pnl') * 60, 1.0, delta=0.02)
+
+
+class TestDiscountedUCB(unittest.TestCase):
+    """Exploration first, then exploitation that follows a drifting optimum"""
+
+    def test_converges_and_tracks_drift(self):
+        rng = random.Random(7)
+        bandit = DiscountedUCB([0.5, 1.0, 1.5], discount=0.9, exploration=0.3)
+
+        def play(means, rounds):
+            pulls = [0, 0, 0]
+            for _ in range(rounds):
+                arm = bandit.select()
+                pulls[arm] += 1
+                bandit.update(arm, means[arm] + rng.gauss(0, 0.05))
+            return pulls
+
+        first = play([0.8, 1.2, 0.9], 3)
+        self.assertEqual(first, [1, 1, 1])  # Every arm tried once
+
+        pulls = play([0.8, 1.2, 0.9], 60)
+        self.assertEqual(bandit.best(), 1.0)
+        self.assertGreater(pulls[1], 30)
+
+        pulls = play([0.8, 0.7, 1.4], 60)  # Optimum moves to the largest size
+        self.assertEqual(bandit.best(), 1.5)
+        self.assertGreater(pulls[2], 30)
+
+        restored = DiscountedUCB([0.5, 1.0, 1.5])
+        restored.restore_state(bandit.get_state())
+        self.assertEqual(restored.best(), 1.5)
+        other_arms = DiscountedUCB([0.5, 1.0])
+        other_arms.restore_state(bandit.get_state())
+        self.assertIsNone(other_arms.best())
+
+    def test_pending_arms_not_pulled_again_as_untried(self):
+        bandit = DiscountedUCB([0.5, 1.0, 1.5])
+        self.assertEqual(bandit.select(), 0)
+        self.assertEqual(bandit.select(pending=[0]), 1)
+        bandit.update(1, 1.0)
+        self.assertEqual(bandit.select(pending=[0, 2]), 1)  # Only a played arm is left
+
+
+class TestArmWindows(unittest.TestCase):
+    """Arms are scored on the earnings of their own exposure"""
+
+    HOUR = 3600
+
+    def test_lagged_credit(self):
+        windows = ArmWindows(play_seconds=2 * self.HOUR, credit_lag=self.HOUR)
+        windows.open(0, 0)
+        windows.add(self.HOUR, earnings=5.0, dollar_hours=100)  # Earned before the arm played
+        self.assertFalse(windows.due(self.HOUR))
+        windows.add(2 * self.HOUR, earnings=1.0, pnl=-0.5, dollar_hours=100)
+        self.assertTrue(windows.due(2 * self.HOUR, min_dollar_hours=150))
+        self.assertFalse(windows.due(2 * self.HOUR, min_dollar_hours=300))
+
+        windows.close(2 * self.HOUR)
+        windows.open(1, 2 * self.HOUR)
+        self.assertEqual(windows.settle(2 * self.HOUR), [])
+        self.assertEqual(windows.pending_arms(), [0])
+
+        # Arm 1's first hour is paid for arm 0's last hour of exposure
+        windows.add(3 * self.HOUR, earnings=2.0, pnl=0.25, dollar_hours=300)
+        [settled] = windows.settle(3 * self.HOUR)
+        self.assertEqual(settled['arm'], 0)
+        self.assertAlmostEqual(settled['earnings'], 3.0)
+        self.assertAlmostEqual(settled['pnl'], -0.5)
+        self.assertAlmostEqual(settled['dollar_hours'], 200)
+
+        current = windows.current
+        self.assertEqual((current['arm'], current['earnings'], current['pnl'], current['dollar_hours']), (1, 0.0, 0.25, 300))
+
+
+if __name__ == '__main__':
+    unittest.main()
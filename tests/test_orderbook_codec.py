@@ -0,0 +1,78 @@
+"""
+Tests for lazy book levels and off-loop WebSocket decoding
+"""
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from orderbook_codec import BookSide, ParserThread, decode_message, level_prices
+
+
+class TestBookSide(unittest.TestCase):
+    """Lazy decoding and legacy access"""
+
+    def test_levels_decoded_on_first_access(self):
+        side = BookSide([{'price': '0.48', 'size': '100'}, {'price': '0.47', 'size': '50'}])
+        self.assertFalse(side.decoded)
+        self.assertEqual(len(side), 2)
+        self.assertFalse(side.decoded)
+
+        self.assertEqual(list(side.prices), [0.48, 0.47])
+        self.assertTrue(side.decoded)
+
+    def test_legacy_dict_access(self):
+        side = BookSide([[0.48, 100], [0.47, 50], [0.46, 10]])
+        self.assertEqual(side[0], {'price': 0.48, 'size': 100.0})
+        self.assertEqual(side[1]['price'], 0.47)
+        self.assertEqual(side[:2], [{'price': 0.48, 'size': 100.0}, {'price': 0.47, 'size': 50.0}])
+        self.assertEqual(max(level['price'] for level in side), 0.48)
+        self.assertEqual(side, [{'price': 0.48, 'size': 100.0}, {'price': 0.47, 'size': 50.0}, {'price': 0.46, 'size': 10.0}])
+
+    def test_malformed_levels_skipped(self):
+        side = BookSide([{'price': 'x', 'size': '1'}, [0.5, 2]])
+        self.assertEqual(list(side.sizes), [2.0])
+
+    def test_level_prices_accepts_plain_lists(self):
+        self.assertEqual(level_prices([{'price': '0.4'}]), [0.4])
+        self.assertEqual(list(level_prices(BookSide([[0.4, 1]]))), [0.4])
+
+
+class TestDecoding(unittest.TestCase):
+    """Message decoding inline and on the parser thread"""
+
+    def test_decode_message_wraps_single_event(self):
+        self.assertEqual(decode_message('{"event_type": "book"}'), [{'event_type': 'book'}])
+        self.assertEqual(decode_message(b'[{"a": 1}, {"b": 2}]'), [{'a': 1}, {'b': 2}])
+
+    def test_parser_thread_preserves_order(self):
+        received = []
+
+        async def on_events(events):
+            received.extend(event['n'] for event in events)
+
+        async def scenario():
+            parser = ParserThread(asyncio.get_running_loop(), on_events)
+            parser.start()
+            for n in range(50):
+                parser.submit(json.dumps({'n': n}))
+            parser.submit('not json')
+
+            for _ in range(200):
+                if len(received) == 50:
+                    break
+                await asyncio.sleep(0.01)
+            await parser.stop()
+            return parser
+
+        parser = asyncio.run(scenario())
+        self.assertEqual(received, list(range(50)))
+        self.assertEqual(parser.errors, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests for shared orderbook subscriptions, freshness contract and REST resnapshots
+"""
+
+import asyncio
+import json
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from orderbook_websocket import OrderBookWebSocket
+from orderbook_subscriptions import OrderBookSubscriptionManager
+
+
+class FakeConnection:
+    """Records messages sent over the socket"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+class TestOrderBookWebSocket(unittest.TestCase):
+    """Queued subscriptions and max-age reads"""
+
+    def test_subscribe_while_disconnected_is_queued(self):
+        ws = OrderBookWebSocket(config={'num_shards': 1})
+        self.assertFalse(asyncio.run(ws.subscribe('t1')))
+        self.assertEqual(ws.pending_subscriptions, {'t1'})
+
+        shard = ws.shards[0]
+        shard.ws_connection = FakeConnection()
+        asyncio.run(shard.sync_subscriptions())
+        self.assertEqual(ws.subscribed_tokens, {'t1'})
+        self.assertEqual(ws.pending_subscriptions, set())
+        self.assertEqual(shard.ws_connection.sent[0]['assets_ids'], ['t1'])
+
+    def test_get_orderbook_enforces_max_age(self):
+        ws = OrderBookWebSocket(max_age=5)
+        ws.subscribed_tokens.add('t1')
+        asyncio.run(ws.apply_book_snapshot({'asset_id': 't1', 'bids': [], 'asks': []}))
+        self.assertIsNotNone(ws.get_orderbook('t1'))
+
+        ws.last_update_time['t1'] = time.time() - 10
+        self.assertIsNone(ws.get_orderbook('t1'))
+        self.assertIsNotNone(ws.get_orderbook('t1', max_age=30))
+        self.assertEqual(ws.stale_reads, 1)
+
+    def test_updates_for_unsubscribed_tokens_ignored(self):
+        ws = OrderBookWebSocket()
+        asyncio.run(ws.apply_book_snapshot({'asset_id': 'gone', 'bids': [], 'asks': []}))
+        self.assertNotIn('gone', ws.orderbook_cache)
+
+
+class TestSubscriptionManager(unittest.TestCase):
+    """Reference counting, idle unsubscription and resnapshots"""
+
+    def setUp(self):
+        self.ws = OrderBookWebSocket()
+        self.manager = OrderBookSubscriptionManager(self.ws, {'idle_unsubscribe_after': 0, 'resnapshot_after': 15})
+        self.fetched = []
+
+        async def fetch_books(token_ids):
+            self.fetched.append(list(token_ids))
+            return [{'asset_id': t, 'bids': [[0.4, 10]], 'asks': [[0.6, 10]]} for t in token_ids]
+
+        self.manager._fetch_books = fetch_books
+
+    def test_shared_token_kept_until_last_owner_releases(self):
+        async def scenario():
+            await self.manager.sync('order_mgr', ['a', 'b'])
+            await self.manager.sync('repositioner', ['a'])
+            await self.manager.sync('order_mgr', [])
+            await self.manager.maintain()
+
+        asyncio.run(scenario())
+        self.assertEqual(self.manager.refcount('a'), 1)
+        self.assertEqual(self.ws.subscribed_tokens, {'a'})
+        self.assertEqual(self.manager.idle_unsubscribes, 1)
+
+    def test_lease_expiry_unsubscribes(self):
+        async def scenario():
+            await self.manager.lease('x', ttl=0)
+            await self.manager.maintain()
+
+        asyncio.run(scenario())
+        self.assertNotIn('x', self.ws.subscribed_tokens)
+
+    def test_stale_books_resnapshotted_in_batches(self):
+        self.manager.resnapshot_batch_size = 2
+
+        async def scenario():
+            await self.manager.sync('order_mgr', ['a', 'b', 'c'])
+            await self.manager.maintain()
+
+        asyncio.run(scenario())
+        self.assertEqual(sorted(len(batch) for batch in self.fetched), [1, 2])
+        self.assertIsNotNone(self.ws.get_orderbook('c'))
+
+        # Fresh books are not refetched
+        self.fetched.clear()
+        asyncio.run(self.manager.maintain())
+        self.assertEqual(self.fetched, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
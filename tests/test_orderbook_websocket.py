@@ -0,0 +1,76 @@
+"""
+Tests for sharded orderbook WebSocket subscriptions
+"""
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from orderbook_websocket import OrderBookWebSocket
+
+
+class FakeConnection:
+    """Records messages sent over the socket"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+class TestShardedOrderBookWebSocket(unittest.TestCase):
+    """Token spreading, bulk messages and the shared book store"""
+
+    def test_tokens_spread_over_shards(self):
+        ws = OrderBookWebSocket(config={'num_shards': 3})
+
+        async def scenario():
+            for i in range(7):
+                await ws.subscribe(f't{i}')
+
+        asyncio.run(scenario())
+        self.assertEqual(sorted(len(shard.tokens) for shard in ws.shards), [2, 2, 3])
+        self.assertEqual(len(ws.subscribed_tokens), 7)
+
+    def test_burst_of_subscriptions_sent_as_bulk_messages(self):
+        ws = OrderBookWebSocket(config={'num_shards': 1, 'subscribe_batch_size': 3})
+        shard = ws.shards[0]
+        shard.ws_connection = FakeConnection()
+
+        async def scenario():
+            for i in range(5):
+                self.assertTrue(await ws.subscribe(f't{i}'))
+            await asyncio.sleep(0)  # Let the coalesced sync run
+            await ws.unsubscribe('t0')
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+        sent = shard.ws_connection.sent
+        self.assertEqual(sent[0], {'assets_ids': ['t0', 't1', 't2'], 'type': 'market'})
+        self.assertEqual(sent[1], {'assets_ids': ['t3', 't4'], 'operation': 'subscribe'})
+        self.assertEqual(sent[2], {'assets_ids': ['t0'], 'operation': 'unsubscribe'})
+
+    def test_batched_book_events_merge_into_shared_store(self):
+        ws = OrderBookWebSocket(config={'num_shards': 2})
+
+        async def scenario():
+            await ws.subscribe('a')
+            await ws.subscribe('b')
+            await ws._process_message(json.dumps([
+                {'event_type': 'book', 'asset_id': 'a', 'bids': [{'price': '0.4', 'size': '5'}], 'asks': []},
+                {'event_type': 'book', 'asset_id': 'b', 'bids': [], 'asks': [{'price': '0.6', 'size': '5'}]},
+            ]))
+
+        asyncio.run(scenario())
+        self.assertEqual(ws.get_orderbook('a')['bids'], [{'price': 0.4, 'size': 5.0}])
+        self.assertEqual(ws.get_orderbook('b')['asks'], [{'price': 0.6, 'size': 5.0}])
+        self.assertNotEqual(ws.token_shard['a'], ws.token_shard['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Unit tests for ProfitTakingManager
+"""
+
+import asyncio
+import unittest
+import time
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from profit_taking_manager import ProfitTakingManager, position_key
+from orderbook_websocket import OrderBookWebSocket
+
+
+class FakeOrderBookWS(OrderBookWebSocket):
+    """OrderBookWebSocket pre-filled with books (no connection)"""
+
+    def __init__(self, books):
+        super().__init__()
+        self.orderbook_cache = books
+        self.last_update_time = {token_id: time.time() for token_id in books}
+        self.subscribed_tokens = set(books)
+
+
+class TestProfitTakingManager(unittest.TestCase):
+    """Test ProfitTakingManager position evaluation"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.config = {
+            'profit_taking': {
+                'min_profit_percentage': 10,
+                'target_profit_percentage': 20,
+                'max_profit_percentage': 100,
+            }
+        }
+
+    def _position(self, asset, size, avg, cur):
+        return {'asset': asset, 'title': asset, 'size': size, 'avgPrice': avg,
+                'curPrice': cur, '_wallet': '0xabc'}
+
+    def test_evaluate_positions_thresholds(self):
+        """Test actions for each profit band"""
+        manager = ProfitTakingManager(self.config)
+        positions = [
+            self._position('max', 10, 0.2, 0.5),      # +150%
+            self._position('target', 10, 0.5, 0.62),  # +22% at the 0.61 slippage floor
+            self._position('wait', 10, 0.5, 0.56),    # +12%
+            self._position('low', 10, 0.5, 0.51),     # +2%
+            self._position('losing', 10, 0.5, 0.4),   # -20%
+            self._position('invalid', 0, 0.5, 0.4),
+        ]
+
+        evaluations = manager._evaluate_positions(positions)
+        actions = [(e['action'], e['reason'].split(' ')[0]) for e in evaluations]
+
+        self.assertEqual(actions, [
+            ('close', 'max_profit_reached'),
+            ('close', 'target_profit_reached'),
+            ('hold', 'waiting_for_target'),
+            ('hold', 'not_profitable'),
+            ('hold', 'losing'),
+            ('skip', 'invalid'),
+        ])
+        # Without a book the close is judged at curPrice less max slippage
+        self.assertAlmostEqual(evaluations[0]['fill_price'], 0.49)
+        self.assertAlmostEqual(evaluations[0]['pnl'], 2.9)
+
+    def test_evaluate_uses_websocket_mid(self):
+        """Test fresh WebSocket mid price overrides stale curPrice"""
+        books = {'tok': {'bids': [{'price': 0.58, 'size': 10}], 'asks': [{'price': 0.62, 'size': 10}]}}
+        manager = ProfitTakingManager(self.config, orderbook_ws=FakeOrderBookWS(books))
+
+        evaluation = manager._evaluate_positions([self._position('tok', 10, 0.5, 0.5)])[0]
+
+        self.assertEqual(evaluation['price_source'], 'websocket_mid')
+        self.assertAlmostEqual(evaluation['price'], 0.60)
+        # +20% at mid, but the sell fills at the 0.58 bid (+16%)
+        self.assertAlmostEqual(evaluation['fill_price'], 0.58)
+        self.assertEqual((evaluation['action'], evaluation['reason']), ('hold', 'waiting_for_target'))
+
+    def test_profitability_at_fill_price_walks_the_book(self):
+        """Test the expected fill averages the bid levels the close would hit"""
+        books = {'tok': {'bids': [{'price': 0.64, 'size': 10}, {'price': 0.63, 'size': 10}, {'price': 0.40, 'size': 100}],
+                         'asks': [{'price': 0.66, 'size': 10}]}}
+        manager = ProfitTakingManager(self.config, orderbook_ws=FakeOrderBookWS(books))
+
+        evaluation = manager._evaluate_positions([self._position('tok', 20, 0.5, 0.5)])[0]
+
+        self.assertAlmostEqual(evaluation['fill_price'], 0.635)  # 0.40 is below the slippage floor
+        self.assertEqual(evaluation['action'], 'close')
+
+    def test_pnl_only_counts_sellable_shares(self):
+        """Test shares the book cannot absorb above the floor add no profit"""
+        books = {'tok': {'bids': [{'price': 0.80, 'size': 30}, {'price': 0.30, 'size': 500}],
+                         'asks': [{'price': 0.82, 'size': 10}]}}
+        manager = ProfitTakingManager(self.config, orderbook_ws=FakeOrderBookWS(books))
+
+        evaluation = manager._evaluate_positions([self._position('tok', 100, 0.5, 0.8)])[0]
+
+        self.assertEqual((evaluation['shares'], evaluation['sell_shares']), (100, 30))
+        self.assertAlmostEqual(evaluation['pnl'], 9.0)  # Not 30 on the whole position
+        self.assertAlmostEqual(evaluation['pnl_pct'], 60.0)
+
+    def test_closed_positions_are_per_wallet(self):
+        """Closing a token in one wallet keeps the same token open in other wallets"""
+        manager = ProfitTakingManager(self.config)
+        evaluation = manager._evaluate_positions([self._position('tok', 10, 0.5, 0.6)])[0]
+        report = {'orders': [{'order_id': 'o1', 'size': 10, 'price': 0.59}], 'errors': [], 'expected_proceeds': 5.9}
+
+        asyncio.run(manager._handle_sell_report(evaluation, report))
+
+        self.assertIn(position_key('0xABC', 'tok'), manager.closed_positions)
+        self.assertNotIn(position_key('0xdef', 'tok'), manager.closed_positions)
+
+        # Snapshots keyed by token only are migrated to per-wallet keys
+        manager.restore_state({'closed_positions': {'tok2': {'wallet': '0xdef', 'pnl': 1.0}}})
+        self.assertEqual(list(manager.closed_positions), [position_key('0xdef', 'tok2')])
+
+    def test_partial_close_comes_back(self):
+        """A close the book only partly absorbs leaves the remainder to a later cycle"""
+        books = {'tok': {'bids': [{'price': 0.80, 'size': 30}, {'price': 0.30, 'size': 500}],
+                         'asks': [{'price': 0.82, 'size': 10}]}}
+        manager = ProfitTakingManager(self.config, orderbook_ws=FakeOrderBookWS(books))
+        evaluation = manager._evaluate_positions([self._position('tok', 100, 0.5, 0.8)])[0]
+        report = {'orders': [{'order_id': 'o1', 'size': 30, 'price': 0.80}], 'errors': [], 'expected_proceeds': 24.0}
+
+        asyncio.run(manager._handle_sell_report(evaluation, report))
+
+        closed = manager.closed_positions[position_key('0xabc', 'tok')]
+        self.assertEqual(closed['shares_sold'], 30)
+        self.assertIsNotNone(closed['retry_at'])
+
+        async def page(key, fetch_page, params):
+            return [self._position('tok', 70, 0.5, 0.8)]
+
+        with patch.object(manager.data_api_breaker, 'call_cached', page):
+            self.assertEqual(asyncio.run(manager._fetch_positions('0xabc', session=None)), [])
+            closed['retry_at'] = time.time() - 1
+            self.assertEqual([p['size'] for p in asyncio.run(manager._fetch_positions('0xabc', session=None))], [70])
+
+        # Selling the rest completes the close and keeps the realized P&L of both
+        rest = manager._evaluate_positions([self._position('tok', 70, 0.5, 0.8)])[0]
+        report = {'orders': [{'order_id': 'o2', 'size': 70, 'price': 0.80}], 'errors': [], 'expected_proceeds': 56.0}
+        asyncio.run(manager._handle_sell_report(rest, report))
+        closed = manager.closed_positions[position_key('0xabc', 'tok')]
+        self.assertEqual((closed['shares_sold'], closed['retry_at'], closed['order_ids']), (100, None, ['o1', 'o2']))
+        self.assertAlmostEqual(closed['pnl'], evaluation['pnl'] + rest['pnl'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the shared token-bucket rate limiter
+"""
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Burst, refill and adaptive backoff"""
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket('test', rate=20, burst=5)
+
+        async def run():
+            start = time.monotonic()
+            for _ in range(7):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        # 5 immediate, 2 more at 20/s -> ~0.1s
+        self.assertGreaterEqual(elapsed, 0.08)
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(bucket.total_acquired, 7)
+
+    def test_request_above_burst_is_capped(self):
+        bucket = TokenBucket('test', rate=10, burst=20)
+
+        async def run():
+            return await asyncio.wait_for(bucket.acquire(25), timeout=1)
+
+        self.assertLess(asyncio.run(run()), 0.1)
+        self.assertEqual(bucket.total_acquired, 20)
+
+    def test_try_acquire(self):
+        bucket = TokenBucket('test', rate=1, burst=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+    def test_throttle_backoff_and_recovery(self):
+        bucket = TokenBucket('test', rate=10, burst=10, recovery_delay=0)
+        bucket.on_throttled(retry_after=0.05)
+
+        self.assertEqual(bucket.rate, 5)
+        self.assertFalse(bucket.try_acquire())
+
+        bucket.on_success()
+        self.assertGreater(bucket.rate, 5)
+
+        for _ in range(100):
+            bucket.on_success()
+        self.assertEqual(bucket.rate, 10)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Registry, config overrides and response feedback"""
+
+    def test_config_override(self):
+        limiter = RateLimiter({'clob_write': {'rate': 3, 'burst': 4}})
+        self.assertEqual(limiter.bucket('clob_write').max_rate, 3)
+        self.assertEqual(limiter.bucket('clob_write').burst, 4)
+        self.assertIn('gamma', limiter.buckets)
+
+    def test_record_response_429(self):
+        limiter = RateLimiter()
+        limiter.record_response('gamma', 429, '2')
+        bucket = limiter.bucket('gamma')
+        self.assertEqual(bucket.total_throttled, 1)
+        self.assertGreater(bucket.blocked_until, time.monotonic() + 1)
+
+    def test_record_exception(self):
+        limiter = RateLimiter()
+        self.assertTrue(limiter.record_exception('clob_write', Exception('429 Too Many Requests')))
+        self.assertFalse(limiter.record_exception('clob_write', Exception('invalid signature')))
+        self.assertEqual(limiter.bucket('clob_write').total_throttled, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
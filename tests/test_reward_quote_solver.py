@@ -0,0 +1,106 @@
+"""
+Tests for reward-optimal quote solving
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from order_manager import OrderManager
+from reward_quote_solver import RewardQuoteSolver, market_q_min, order_score
+
+
+def market(**overrides):
+    """Balanced market around 0.50 with a 3.5¢ reward band"""
+    data = {
+        'yes_bids': [{'price': '0.49', 'size': '200'}, {'price': '0.48', 'size': '500'}],
+        'no_bids': [{'price': '0.49', 'size': '150'}, {'price': '0.47', 'size': '300'}],
+        'yes_mid': 0.50,
+        'no_mid': 0.50,
+        'yes_best_ask': 0.51,
+        'no_best_ask': 0.51,
+        'max_spread': 0.035,
+        'min_size': 20,
+        'max_size': 100,
+        'daily_rate': 50,
+    }
+    data.update(overrides)
+    return data
+
+
+class TestScoring(unittest.TestCase):
+    """Polymarket scoring formula"""
+
+    def test_order_score(self):
+        self.assertAlmostEqual(float(order_score(0.03, 0.01, 100)), (2 / 3) ** 2 * 100)
+        self.assertEqual(float(order_score(0.03, 0.03, 100)), 0.0)
+        self.assertEqual(float(order_score(0.03, 0.05, 100)), 0.0)
+
+    def test_q_min_single_sided_only_inside_band(self):
+        self.assertAlmostEqual(float(market_q_min(90.0, 0.0, 0.5)), 30.0)
+        self.assertAlmostEqual(float(market_q_min(90.0, 0.0, 0.95)), 0.0)
+        self.assertAlmostEqual(float(market_q_min(90.0, 60.0, 0.5)), 60.0)
+
+
+class TestRewardQuoteSolver(unittest.TestCase):
+    """Quote selection"""
+
+    def setUp(self):
+        self.solver = RewardQuoteSolver({})
+
+    def test_quote_inside_band_and_below_ask(self):
+        quote = self.solver.solve_one(market())
+        self.assertIsNotNone(quote)
+        for side in ('yes', 'no'):
+            price = quote[f'{side}_price']
+            self.assertLess(0.50 - price, 0.035)
+            self.assertLess(price, 0.51)
+        self.assertLess(quote['yes_price'] + quote['no_price'], 1.0)
+        self.assertTrue(20 <= quote['size'] <= 100)
+        self.assertGreater(quote['reward_share'], 0)
+
+    def test_min_size_above_limit_has_no_quote(self):
+        self.assertIsNone(self.solver.solve_one(market(min_size=200)))
+
+    def test_batch_matches_individual_solves(self):
+        markets = [market(), market(yes_mid=0.30, no_mid=0.70, yes_best_ask=0.31, no_best_ask=0.72,
+                                    yes_bids=[[0.29, 100]], no_bids=[[0.69, 80]])]
+        self.assertEqual(self.solver.solve(markets), [self.solver.solve_one(m) for m in markets])
+
+    def test_more_competition_lowers_share(self):
+        quiet = self.solver.solve_one(market())
+        crowded = self.solver.solve_one(market(
+            yes_bids=[{'price': '0.49', 'size': '20000'}], no_bids=[{'price': '0.49', 'size': '20000'}]
+        ))
+        self.assertLess(crowded['reward_share'], quiet['reward_share'])
+
+    def test_zero_daily_rate_has_no_quote(self):
+        self.assertIsNone(self.solver.solve_one(market(daily_rate=0)))
+        self.assertIsNotNone(self.solver.solve_one(market(daily_rate=None)))
+
+    def test_book_tick_size(self):
+        quote = self.solver.solve_one(market(yes_tick_size=0.01, no_tick_size=0.01))
+        for side in ('yes', 'no'):
+            self.assertAlmostEqual(round(quote[f'{side}_price'] * 100), quote[f'{side}_price'] * 100)
+
+
+class TestQuoteInput(unittest.TestCase):
+    """Solver input built from live books"""
+
+    def test_own_orders_removed_from_ladder(self):
+        manager = OrderManager({'size_min': 20, 'size_max': 100})
+        book = {'bids': [[0.49, 300], [0.48, 500]], 'asks': [[0.51, 100]], 'tick_size': '0.01'}
+        own = {'yes_order': {'price': 0.49, 'size': 100}, 'no_order': {'price': 0.48, 'size': 500}}
+
+        data = manager.build_quote_input({'max_spread': 0.03, 'min_size': 20, 'daily_rate': 0}, book, book, own)
+
+        self.assertEqual(list(data['yes_bids'].sizes), [200.0, 500.0])
+        self.assertEqual(list(data['no_bids'].prices), [0.49])
+        self.assertEqual(data['yes_tick_size'], 0.01)
+        self.assertEqual(data['daily_rate'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
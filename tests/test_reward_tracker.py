@@ -0,0 +1,113 @@
+"""
+Tests for per-market reward attribution
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from reward_tracker import RewardSeries, RewardTracker, order_exposure
+
+WALLET = {'address': '0xwallet1'}
+
+
+def active_order(yes_price=0.48, no_price=0.48, size=100):
+    return {
+        'wallet_address': WALLET['address'],
+        'status': 'active',
+        'order_ids': {'yes': 'y1', 'no': 'n1'},
+        'yes_order': {'price': yes_price, 'size': size},
+        'no_order': {'price': no_price, 'size': size},
+    }
+
+
+class FakeOrderManager:
+    def __init__(self, orders):
+        self.active_orders = orders
+
+
+class TestRewardSeries(unittest.TestCase):
+    """Binary series round trip, torn tail and pruning"""
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rewards.series')
+            series = RewardSeries(path)
+            series.append(1000, {('m1', 'w1'): (1.5, 96.0, 2.0, 1.92)})
+            series.append(2000, {('m1', 'w1'): (0.5, 96.0, 2.0, 1.92), ('m2', 'w1'): (0.0, 10.0, 2.0, 0.5)})
+            with open(path, 'ab') as f:
+                f.write(b'\x01\x02\x03')  # Torn write
+
+            reopened = RewardSeries(path)
+            records = list(reopened.read())
+            self.assertEqual(len(records), 3)
+            self.assertEqual(records[0][:3], (1000, 'm1', 'w1'))
+            self.assertAlmostEqual(records[0][3], 1.5)
+            self.assertEqual([r[1] for r in reopened.read(since=1500)], ['m1', 'm2'])
+
+            self.assertEqual(reopened.prune(before=1500), 1)
+            self.assertEqual(len(list(RewardSeries(path).read())), 2)
+
+
+class TestRewardTracker(unittest.TestCase):
+    """Exposure integration, earnings deltas and reward rates"""
+
+    def test_order_exposure(self):
+        capital, spread = order_exposure(active_order())
+        self.assertAlmostEqual(capital, 96.0)
+        self.assertAlmostEqual(spread, 0.02)
+
+    def test_snapshot_attributes_earnings_deltas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = {'path': os.path.join(tmp, 'rewards.series'), 'sample_interval': 3600,
+                      'snapshot_interval': 3600, 'min_dollar_hours': 50}
+            tracker = RewardTracker(config, order_manager=FakeOrderManager({'m1': active_order()}))
+
+            day_totals = iter([{'m1\t0xwallet1': 2.0}, {'m1\t0xwallet1': 5.0}, {'m1\t0xwallet1': 9.0}])
+
+            async def fetch_earnings(wallets, days):
+                return {day: next(day_totals) if day == days[-1] else {} for day in days}
+
+            tracker.fetch_earnings = fetch_earnings
+            now = time.time()
+            tracker.sample_exposure(now - 7200)
+            tracker.sample_exposure(now - 3600)
+
+            # Without a cursor the day's running total only seeds it
+            rows = asyncio.run(tracker.snapshot([WALLET], now=now))
+            earnings, dollar_hours, order_hours, spread_dh = rows[('m1', WALLET['address'])]
+            self.assertEqual(earnings, 0.0)
+            self.assertAlmostEqual(dollar_hours, 192.0)  # 96 USDC for 2 hours
+            self.assertAlmostEqual(order_hours, 4.0)
+            self.assertAlmostEqual(spread_dh / dollar_hours, 0.02)
+
+            # Second snapshot books only the increase of the daily total
+            tracker.order_manager.active_orders = {}
+            rows = asyncio.run(tracker.snapshot([WALLET], now=now + 10))
+            self.assertAlmostEqual(rows[('m1', WALLET['address'])][0], 3.0)
+
+            rates = tracker.get_reward_rates()
+            self.assertAlmostEqual(rates['m1']['earnings'], 3.0)
+            self.assertAlmostEqual(rates['m1']['reward_per_dollar_hour'], 3.0 / 192.0, places=5)
+            self.assertTrue(rates['m1']['confident'])
+
+            # Restart: the persisted cursor prevents re-booking the day's total
+            restarted = RewardTracker(config)
+            self.assertEqual(len(restarted.records), 2)
+            self.assertAlmostEqual(restarted.get_portfolio_rate(), 3.0 / 192.0, places=5)
+            self.assertEqual(list(restarted.last_earnings.values())[0], {'m1\t0xwallet1': 5.0})
+
+            # A cursor older than two snapshot intervals re-seeds instead of booking the downtime
+            restarted.fetch_earnings = fetch_earnings
+            rows = asyncio.run(restarted.snapshot([WALLET], now=now + 3 * 3600))
+            self.assertEqual(rows, {})
+            self.assertEqual(list(restarted.last_earnings.values())[0], {'m1\t0xwallet1': 9.0})
+
+if __name__ == '__main__':
+    unittest.main()
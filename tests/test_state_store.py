@@ -0,0 +1,167 @@
+"""
+Tests for state snapshots, journal replay and warm-restart reconciliation
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from state_store import StateStore
+from execution_engine import ExecutionEngine
+
+
+class OrderBook:
+    """Minimal stand-in for OrderManager state handling"""
+
+    def __init__(self):
+        self.active_orders = {}
+
+    def get_state(self):
+        return {'active_orders': self.active_orders}
+
+    def restore_state(self, state):
+        self.active_orders = state['active_orders']
+
+    def handlers(self):
+        return {
+            'order_active': lambda d: self.active_orders.__setitem__(d['market_id'], d['order']),
+            'order_removed': lambda d: self.active_orders.pop(d['market_id'], None),
+        }
+
+
+class TestStateStore(unittest.TestCase):
+    """Snapshot + journal persistence"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = {'directory': self.tmp.name, 'journal_fsync': False}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _store(self, book, **overrides):
+        store = StateStore({**self.config, **overrides})
+        store.register('order_mgr', book, replay=book.handlers())
+        return store
+
+    def test_snapshot_roundtrip_and_journal_replay(self):
+        book = OrderBook()
+        store = self._store(book)
+
+        book.active_orders['m1'] = {'order_ids': {'yes': 'a'}}
+        store.journal('order_active', {'market_id': 'm1', 'order': book.active_orders['m1']})
+        asyncio.run(store.save_snapshot())
+
+        # Events after the snapshot only live in the journal
+        book.active_orders['m2'] = {'order_ids': {'no': 'b'}}
+        store.journal('order_active', {'market_id': 'm2', 'order': book.active_orders['m2']})
+        store.journal('order_removed', {'market_id': 'm1'})
+        store._journal_file.close()
+
+        restored = OrderBook()
+        self.assertTrue(self._store(restored).load())
+        self.assertEqual(restored.active_orders, {'m2': {'order_ids': {'no': 'b'}}})
+
+    def test_journal_entries_covered_by_snapshot_not_replayed(self):
+        book = OrderBook()
+        store = self._store(book)
+        store.journal('order_active', {'market_id': 'm1', 'order': {}})
+        book.active_orders.clear()  # removed without a journal entry
+        asyncio.run(store.save_snapshot())
+
+        restored = OrderBook()
+        self._store(restored).load()
+        self.assertEqual(restored.active_orders, {})
+        self.assertFalse(os.path.exists(store.rotated_journal_path))
+
+    def test_corrupt_snapshot_rejected(self):
+        store = self._store(OrderBook())
+        blob = bytearray(store.encode({'order_mgr': {'active_orders': {}}}, 0))
+        blob[-1] ^= 0xFF
+        with self.assertRaises(ValueError):
+            StateStore.decode(bytes(blob))
+
+    def test_stale_snapshot_starts_cold(self):
+        book = OrderBook()
+        book.active_orders['m1'] = {}
+        store = self._store(book, max_age=60)
+        asyncio.run(store.save_snapshot())
+        store.journal('order_active', {'market_id': 'm2', 'order': {}})
+        store._journal_file.close()
+
+        restored = OrderBook()
+        with patch('state_store.time.time', return_value=time.time() + 3600):
+            self.assertFalse(self._store(restored, max_age=60).load())
+        self.assertEqual(restored.active_orders, {})
+        self.assertFalse(os.path.exists(store.snapshot_path))
+        self.assertFalse(os.path.exists(store.journal_path))
+
+    def test_stale_journal_without_snapshot_starts_cold(self):
+        book = OrderBook()
+        store = self._store(book, max_age=60)
+        store.journal('order_active', {'market_id': 'm1', 'order': {}})
+        store._journal_file.close()
+
+        restored = OrderBook()
+        with patch('state_store.time.time', return_value=time.time() + 3600):
+            self.assertFalse(self._store(restored, max_age=60).load())
+        self.assertEqual(restored.active_orders, {})
+        self.assertFalse(os.path.exists(store.journal_path))
+
+    def test_journal_batched_off_event_loop(self):
+        book = OrderBook()
+        store = self._store(book)
+
+        async def run():
+            for i in range(20):
+                store.journal('order_active', {'market_id': f'm{i}', 'order': {}})
+            # Nothing written on the loop; the background flush writes the batch
+            self.assertEqual(store.journal_entries, 0)
+            await store._flush_task
+
+        asyncio.run(run())
+        self.assertEqual(store.journal_entries, 20)
+        store._journal_file.close()
+
+        restored = OrderBook()
+        self.assertTrue(self._store(restored).load())
+        self.assertEqual(len(restored.active_orders), 20)
+
+
+class TestWarmRestart(unittest.TestCase):
+    """Execution engine rebuilds wallet assignment from restored orders"""
+
+    def test_restore_from_active_orders(self):
+        class OrderManager:
+            pending_orders = []
+            active_orders = {
+                'm1': {
+                    'wallet_address': '0xA',
+                    'yes_order': {'price': 0.5, 'size': 10},
+                    'no_order': {'price': 0.4, 'size': 10},
+                },
+                'm2': {'wallet_address': '0xUnknown'},
+            }
+
+        class WalletManager:
+            wallets = [{'address': '0xA', 'usage_count': 0}]
+
+        engine = ExecutionEngine(OrderManager(), WalletManager(), {})
+        self.assertEqual(engine.restore_from_active_orders(), 1)
+        self.assertEqual(engine.market_wallet, {'m1': '0xA'})
+        self.assertAlmostEqual(engine.workers['0xA'].committed_capital, 9.0)
+
+        # Derived from active orders: repeating the restore does not commit capital twice
+        self.assertEqual(engine.restore_from_active_orders(), 1)
+        self.assertAlmostEqual(engine.workers['0xA'].committed_capital, 9.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
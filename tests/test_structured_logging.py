@@ -0,0 +1,129 @@
+"""
+Tests for the queue-based structured logging pipeline
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from structured_logging import LoggingPipeline, SamplingFilter, log_event
+
+
+class Expensive:
+    """Counts how often it is rendered"""
+
+    renders = 0
+
+    def __str__(self):
+        Expensive.renders += 1
+        return 'expensive'
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    """Queue handler, JSON-lines writer and rotation"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'logs' / 'bot.log'
+        self.logger = logging.getLogger(f'test_structured_logging.{self.id()}')
+        self.logger.propagate = False
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _pipeline(self, **overrides):
+        config = {'level': 'INFO', 'log_to_console': False, 'log_to_file': True, 'log_file': str(self.path)}
+        config.update(overrides)
+        return LoggingPipeline(config)
+
+    def _lines(self, path=None):
+        return [json.loads(line) for line in (path or self.path).read_text(encoding='utf-8').splitlines()]
+
+    def test_events_written_as_json_lines(self):
+        pipeline = self._pipeline()
+        pipeline.start(self.logger)
+        log_event(self.logger, logging.INFO, 'order_prepared', "Prepared %(market_id)s at $%(price).2f",
+                  market_id='m1', price=0.5)
+        self.logger.info("plain %s", 'message')
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            self.logger.exception("failed")
+        pipeline.stop()
+
+        event, plain, error = self._lines()
+        self.assertEqual(event['event'], 'order_prepared')
+        self.assertEqual(event['msg'], 'Prepared m1 at $0.50')
+        self.assertEqual(event['fields'], {'market_id': 'm1', 'price': 0.5})
+        self.assertEqual(plain['msg'], 'plain message')
+        self.assertIsNone(plain['event'])
+        self.assertIn('ValueError: boom', error['exc'])
+
+    def test_formatting_deferred_to_writer(self):
+        pipeline = self._pipeline()
+        pipeline.start(self.logger)
+        pipeline.stop()  # Keep records in the queue
+
+        Expensive.renders = 0
+        self.logger.info("value %s", Expensive())
+        self.logger.debug("disabled %s", Expensive())
+        self.assertEqual(Expensive.renders, 0)
+        self.assertEqual(pipeline.queue.qsize(), 1)
+
+    def test_full_queue_drops_without_blocking(self):
+        pipeline = self._pipeline(queue_size=2)
+        pipeline.start(self.logger)
+        pipeline.stop()
+
+        for i in range(5):
+            self.logger.info("record %d", i)
+        self.assertEqual(pipeline.get_stats()['dropped'], 3)
+
+    def test_size_rotation(self):
+        pipeline = self._pipeline(max_bytes=500, backup_count=2)
+        pipeline.start(self.logger)
+        for i in range(50):
+            self.logger.info("line %d %s", i, 'x' * 40)
+        pipeline.stop()
+
+        self.assertTrue(Path(f'{self.path}.1').exists())
+        self.assertFalse(Path(f'{self.path}.3').exists())
+        self.assertEqual(self._lines()[-1]['msg'], f"line 49 {'x' * 40}")
+
+
+class TestSamplingFilter(unittest.TestCase):
+    """Per call-site sampling"""
+
+    def _record(self, name='order_manager', level=logging.INFO, lineno=10, event=None):
+        record = logging.LogRecord(name, level, __file__, lineno, 'msg', (), None)
+        if event:
+            record.event = event
+        return record
+
+    def test_keeps_one_in_n_per_call_site(self):
+        sampler = SamplingFilter({'order_manager': 3})
+        kept = [sampler.filter(self._record()) for _ in range(7)]
+        self.assertEqual(kept, [True, False, False, True, False, False, True])
+
+        # Another call site starts its own count
+        self.assertTrue(sampler.filter(self._record(lineno=20)))
+
+    def test_structured_events_never_sampled(self):
+        sampler = SamplingFilter({'order_manager': 3})
+        self.assertTrue(all(sampler.filter(self._record(event='order_placed')) for _ in range(7)))
+        self.assertEqual(sampler.sampled_out, 0)
+
+    def test_warnings_and_other_modules_not_sampled(self):
+        sampler = SamplingFilter({'order_manager': 100})
+        self.assertTrue(all(sampler.filter(self._record(level=logging.WARNING)) for _ in range(5)))
+        self.assertTrue(all(sampler.filter(self._record(name='risk_manager')) for _ in range(5)))
+        self.assertEqual(sampler.sampled_out, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
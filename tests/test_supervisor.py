@@ -0,0 +1,119 @@
+"""
+Tests for the deploy.py supervisor and the in-process health endpoint
+"""
+
+import asyncio
+import socket
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from deploy import BotDeployer, backoff_delay, evaluate_health
+from health_server import HealthServer
+
+
+def healthy_snapshot(now):
+    return {
+        'phase': 'running',
+        'started_at': now - 600,
+        'loop': {'samples': 100, 'p99_ms': 20},
+        'websocket': {'connected': True, 'subscribed_tokens': 4, 'last_update_age': 3},
+        'orders': {'first_placed_at': now - 500, 'last_placed_at': now - 60, 'pending': 0},
+    }
+
+
+class TestHealthEvaluation(unittest.TestCase):
+    """Degraded-health rules"""
+
+    settings = {'max_loop_lag_ms': 500, 'max_ws_age': 60, 'max_placement_age': 300}
+
+    def test_healthy(self):
+        now = time.time()
+        self.assertEqual(evaluate_health(healthy_snapshot(now), self.settings, now), [])
+
+    def test_degraded_reasons(self):
+        now = time.time()
+        self.assertEqual(evaluate_health(None, self.settings, now), ['health endpoint unreachable'])
+
+        snapshot = healthy_snapshot(now)
+        snapshot['loop']['p99_ms'] = 900
+        snapshot['websocket']['last_update_age'] = 400
+        snapshot['orders'].update(pending=3, last_placed_at=now - 1000)
+        reasons = evaluate_health(snapshot, self.settings, now)
+        self.assertEqual(len(reasons), 3)
+        self.assertIn('lag', reasons[0])
+        self.assertIn('websocket stale', reasons[1])
+        self.assertIn('3 orders pending', reasons[2])
+
+        # Idle bot (nothing pending) and stopping bot are not degraded
+        snapshot = healthy_snapshot(now)
+        snapshot['orders']['last_placed_at'] = now - 5000
+        self.assertEqual(evaluate_health(snapshot, self.settings, now), [])
+        self.assertEqual(evaluate_health({'phase': 'stopping', 'loop': {'samples': 1, 'p99_ms': 1e6}},
+                                         self.settings, now), [])
+
+    def test_backoff(self):
+        delays = [backoff_delay(i, 5, 60, jitter=0) for i in range(6)]
+        self.assertEqual(delays, [5, 10, 20, 40, 60, 60])
+        self.assertTrue(4 <= backoff_delay(0, 5, 60) <= 6)
+
+
+class TestSupervisor(unittest.TestCase):
+    """Restart decisions and first-order measurement"""
+
+    def _deployer(self, snapshots):
+        deployer = BotDeployer('missing-config.yaml')
+        deployer.settings = {'max_ws_age': 60}
+        deployer.unhealthy_threshold = 2
+        deployer.startup_grace = 0
+        deployer.first_order_target = 30
+        deployer.probe_health = lambda: snapshots.pop(0)
+        deployer.restarts = []
+        deployer.restart_bot = lambda reason, handover: deployer.restarts.append((reason, handover))
+        return deployer
+
+    def test_restart_after_consecutive_degraded_probes(self):
+        now = time.time()
+        stale = healthy_snapshot(now)
+        stale['websocket']['connected'] = False
+        deployer = self._deployer([stale, healthy_snapshot(now), stale, stale])
+        deployer.launched_at = now - 520
+
+        for _ in range(4):
+            deployer.supervise()
+
+        self.assertEqual(deployer.restarts, [('degraded health: websocket disconnected', True)])
+        self.assertAlmostEqual(deployer.first_order_times[0]['first_order'], 20, delta=1)
+        self.assertEqual(len(deployer.first_order_times), 1)  # Measured once per launch
+
+
+class TestHealthServer(unittest.TestCase):
+    """GET /health serves the snapshot"""
+
+    def test_round_trip(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+
+        async def run():
+            server = HealthServer({'health_port': port}, lambda: {'phase': 'running', 'pid': 1})
+            await server.start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f'http://127.0.0.1:{port}/health') as response:
+                        return response.status, await response.json()
+            finally:
+                await server.close()
+
+        status, body = asyncio.run(run())
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {'phase': 'running', 'pid': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
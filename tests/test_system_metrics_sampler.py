@@ -0,0 +1,65 @@
+"""
+Unit tests for SystemMetricsSampler
+"""
+
+import unittest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from system_metrics_sampler import SystemMetricsSampler
+
+
+class TestSystemMetricsSampler(unittest.TestCase):
+    """Test SystemMetricsSampler functionality"""
+
+    def test_sample_fields(self):
+        """Test a single sample contains all metrics"""
+        sampler = SystemMetricsSampler(interval=0.01)
+        sample = sampler.sample(loop_lag=0.25)
+
+        for key in ('system_cpu_percent', 'system_memory_percent', 'bot_memory_mb',
+                    'open_fds', 'asyncio_tasks', 'gc_pause_ms'):
+            self.assertIn(key, sample)
+
+        self.assertAlmostEqual(sample['loop_lag_ms'], 250)
+        self.assertGreater(sample['bot_memory_mb'], 0)
+
+    def test_background_sampling_ring_buffer(self):
+        """Test background task fills a bounded ring buffer"""
+        sampler = SystemMetricsSampler(interval=0.01, history_size=3)
+
+        async def test():
+            await sampler.start()
+            await asyncio.sleep(0.15)
+            await sampler.stop()
+
+        asyncio.run(test())
+
+        self.assertEqual(len(sampler.samples), 3)
+        self.assertIsNotNone(sampler.latest)
+        self.assertGreater(sampler.latest['asyncio_tasks'], 0)
+
+    def test_gc_pause_tracking(self):
+        """Test GC callback accumulates pauses until drained"""
+        sampler = SystemMetricsSampler()
+        sampler._on_gc('start', {})
+        sampler._on_gc('stop', {})
+
+        sample = sampler.sample()
+        self.assertEqual(sample['gc_collections'], 1)
+
+        # Stats reset after each sample
+        self.assertEqual(sampler.sample()['gc_collections'], 0)
+
+    def test_summary_empty(self):
+        """Test summary with no samples"""
+        sampler = SystemMetricsSampler()
+        self.assertEqual(sampler.get_summary(), {'samples': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
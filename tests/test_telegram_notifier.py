@@ -0,0 +1,131 @@
+"""
+Tests for TelegramNotifier background delivery queue
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from telegram_notifier import TelegramNotifier
+
+
+def make_notifier(**alerts):
+    config = {'alerts': {
+        'telegram_enabled': True,
+        'telegram_bot_token': 'token',
+        'telegram_chat_id': 'chat',
+        'order_digest_window': 0.05,
+        'fill_digest_window': 0.05,
+        'telegram_rate_per_second': 100,
+        **alerts
+    }}
+    notifier = TelegramNotifier(config)
+    notifier.delivered = []
+
+    async def fake_deliver(message, parse_mode):
+        notifier.delivered.append(message)
+        return True
+
+    notifier._deliver = fake_deliver
+    return notifier
+
+
+def make_order(i):
+    return {'market_id': f'm{i}', 'yes_order': {'price': 0.45, 'size': 10}, 'no_order': {'price': 0.5, 'size': 10}}
+
+
+class TestTelegramDeliveryQueue(unittest.TestCase):
+    """Enqueue without blocking, coalesce bursts, bounded backlog"""
+
+    def test_burst_coalesced_into_digest(self):
+        notifier = make_notifier()
+
+        async def run():
+            for i in range(40):
+                await notifier.notify_order_placed(make_order(i), {'question': f'Market {i}?'})
+            # Nothing delivered inline
+            self.assertEqual(notifier.delivered, [])
+            await asyncio.sleep(0.2)
+            await notifier.close()
+
+        asyncio.run(run())
+        self.assertEqual(len(notifier.delivered), 1)
+        self.assertIn('40 Orders Placed', notifier.delivered[0])
+        self.assertEqual(notifier.coalesced_count, 39)
+
+    def test_cancels_coalesced_into_digest(self):
+        notifier = make_notifier(notifications={'order_cancelled': True})
+
+        async def run():
+            for i in range(6):
+                reason = 'emergency_stop' if i % 2 else 'reposition'
+                await notifier.notify_order_cancelled(f'order{i}', f'Market {i}?', reason)
+            await asyncio.sleep(0.2)
+            await notifier.close()
+
+        asyncio.run(run())
+        self.assertEqual(len(notifier.delivered), 1)
+        self.assertIn('6 Orders Cancelled', notifier.delivered[0])
+        self.assertIn('<b>reposition:</b> 3 order(s)', notifier.delivered[0])
+        self.assertIn('<b>emergency_stop:</b> 3 order(s)', notifier.delivered[0])
+
+    def test_single_event_keeps_detailed_format(self):
+        notifier = make_notifier()
+
+        async def run():
+            await notifier.notify_order_filled({'side': 'yes', 'fill_price': 0.5, 'fill_size': 10, 'order_id': 'abc'},
+                                               {'question': 'Will it rain?'}, pnl=1.5)
+            await notifier.close()
+
+        asyncio.run(run())
+        self.assertEqual(len(notifier.delivered), 1)
+        self.assertIn('ORDER FILLED!', notifier.delivered[0])
+        self.assertIn('+1.50', notifier.delivered[0])
+
+    def test_bounded_backlog(self):
+        notifier = make_notifier(telegram_max_backlog=5)
+
+        async def run():
+            for i in range(8):
+                notifier._enqueue(f'msg {i}')
+            self.assertEqual(len(notifier.queue), 5)
+            await notifier.close()
+
+        asyncio.run(run())
+        self.assertEqual(notifier.dropped_count, 3)
+        self.assertEqual(notifier.delivered, [f'msg {i}' for i in range(3, 8)])
+
+    def test_rate_limited_delivery(self):
+        notifier = make_notifier(telegram_rate_per_second=20, telegram_burst=1)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for i in range(5):
+                await notifier.send_message(f'msg {i}')
+            while notifier.queue or len(notifier.delivered) < 5:
+                await asyncio.sleep(0.01)
+            elapsed = loop.time() - start
+            await notifier.close()
+            return elapsed
+
+        # 1 immediate + 4 at 20/s
+        self.assertGreaterEqual(asyncio.run(run()), 0.15)
+
+    def test_disabled_does_not_queue(self):
+        notifier = make_notifier(telegram_enabled=False)
+
+        async def run():
+            self.assertFalse(await notifier.send_message('hi'))
+            await notifier.notify_order_placed(make_order(1), {'question': 'Q?'})
+            await notifier.close()
+
+        asyncio.run(run())
+        self.assertEqual(notifier.delivered, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
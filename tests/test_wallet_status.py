@@ -0,0 +1,101 @@
+"""
+Tests for the concurrent wallet status collector
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from wallet_status import (
+    ALLOWANCE, BALANCE_OF, WalletStatusCollector, build_rpc_batch, format_status_table, parse_rpc_batch
+)
+
+WALLET_A = '0x' + 'aa' * 20
+WALLET_B = '0x' + 'bb' * 20
+
+
+class TestRpcBatch(unittest.TestCase):
+    """One JSON-RPC batch for all wallet balances"""
+
+    def test_batch_encoding(self):
+        batch = build_rpc_batch([WALLET_A, WALLET_B])
+        self.assertEqual([r['id'] for r in batch], list(range(6)))
+        self.assertEqual(batch[3]['method'], 'eth_getBalance')
+        self.assertEqual(batch[4]['params'][0]['data'], BALANCE_OF + '0' * 24 + 'bb' * 20)
+        self.assertTrue(batch[5]['params'][0]['data'].startswith(ALLOWANCE + '0' * 24 + 'bb' * 20))
+        self.assertEqual(len(batch[5]['params'][0]['data']), 2 + 8 + 128)
+
+    def test_parse_out_of_order_with_errors(self):
+        responses = [
+            {'id': 4, 'result': hex(25_500_000)},
+            {'id': 0, 'result': hex(2 * 10 ** 18)},
+            {'id': 1, 'result': hex(10_000_000)},
+            {'id': 2, 'error': {'code': -32000, 'message': 'execution reverted'}},
+            {'id': 3, 'result': '0x0'},
+            {'id': 5, 'result': '0x'},
+        ]
+        parsed = parse_rpc_batch([WALLET_A, WALLET_B], responses)
+        self.assertEqual(parsed[WALLET_A], {'matic': 2.0, 'usdc': 10.0, 'allowance': None})
+        self.assertEqual(parsed[WALLET_B], {'matic': 0.0, 'usdc': 25.5, 'allowance': None})
+
+
+class TestCollect(unittest.TestCase):
+    """Per-source failures stay in their own columns"""
+
+    def test_collect_merges_sources(self):
+        collector = WalletStatusCollector(
+            {'rpc_url': 'http://localhost'},
+            [{'index': 0, 'address': WALLET_A, 'private_key': '0x1'},
+             {'index': 1, 'address': WALLET_B, 'private_key': '0x2'}]
+        )
+
+        async def chain_state():
+            return {WALLET_A: {'matic': 1.0, 'usdc': 50.0, 'allowance': 1000.0},
+                    WALLET_B: {'matic': 0.5, 'usdc': 20.0, 'allowance': 0.0}}
+
+        async def positions(address):
+            if address == WALLET_B:
+                raise ConnectionError('data api down')
+            return {'positions': 2, 'position_value': 12.5, 'pnl': -1.0}
+
+        async def open_orders(wallet):
+            return {'open_orders': 3, 'locked': 7.5}
+
+        collector._fetch_chain_state = chain_state
+        collector._fetch_positions = positions
+        collector._fetch_open_orders = open_orders
+
+        async def run():
+            try:
+                return await collector.collect()
+            finally:
+                await collector.close()
+
+        a, b = asyncio.run(run())
+        self.assertEqual((a['usdc'], a['positions'], a['open_orders'], a['errors']), (50.0, 2, 3, {}))
+        self.assertEqual((b['usdc'], b['positions'], b['open_orders']), (20.0, None, 3))
+        self.assertEqual(b['errors'], {'positions': 'data api down'})
+        self.assertIsNone(a['rewards'])
+
+        table = format_status_table([a, b])
+        self.assertIn('TOTAL', table)
+        self.assertIn('70.00', table)
+        self.assertIn('positions', table.splitlines()[3])
+
+    def test_unlimited_allowance_not_summed(self):
+        rows = [
+            {'index': 0, 'address': WALLET_A, 'usdc': 50.0, 'allowance': 2.0 ** 256 / 1e6, 'errors': {}},
+            {'index': 1, 'address': WALLET_B, 'usdc': 20.0, 'allowance': 100.0, 'errors': {}},
+        ]
+        lines = format_status_table(rows).splitlines()
+        self.assertEqual(len({len(line) for line in lines}), 1)  # Columns stay aligned
+        self.assertIn('unlimited', lines[2])
+        self.assertIn('100', lines[3])
+        self.assertEqual(lines[-1].split()[:5], ['-', 'TOTAL', '-', '70.00', '-'])  # No allowance total
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for WebRewardsScraper HTML payload extraction
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from web_rewards_scraper import WebRewardsScraper
+
+
+def build_page(markets, total_count=None):
+    """Minimal /rewards page with a __NEXT_DATA__ payload"""
+    total_count = len(markets) if total_count is None else total_count
+    payload = {
+        'props': {'pageProps': {'dehydratedState': {'queries': [
+            {'state': {'data': {'data': [{'label': 'not a market'}]}}},
+            {'state': {'data': {'user': {'data': [{'condition_id': 'nested', 'question': 'not a reward market'}]}}}},
+            {'state': {'data': {'data': markets, 'count': len(markets), 'total_count': total_count}}},
+        ]}}},
+        'page': '/rewards',
+    }
+    return (
+        '<html><head><script>var x = {"data": [1, 2]};</script></head><body>'
+        f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(payload)}</script>'
+        '</body></html>'
+    )
+
+
+class TestWebRewardsScraperExtraction(unittest.TestCase):
+    """Streaming extraction of markets from embedded JSON"""
+
+    def setUp(self):
+        self.scraper = WebRewardsScraper()
+        self.markets = [
+            {'condition_id': f'0x{i}', 'question': f'Will "{i}" happen? {{tricky}} [braces]', 'tokens': [{'price': 0.5}]}
+            for i in range(50)
+        ]
+
+    def test_streams_markets(self):
+        html = build_page(self.markets)
+        streamed = list(self.scraper.iter_markets_from_html(html))
+        self.assertEqual(streamed, self.markets)
+        self.assertEqual(self.scraper._extract_markets_from_html(html), self.markets)
+
+    def test_warns_when_pagination_needed(self):
+        html = build_page(self.markets, total_count=120)
+        with self.assertLogs('web_rewards_scraper', level='WARNING') as logs:
+            markets = self.scraper._extract_markets_from_html(html)
+        self.assertEqual(markets, self.markets)
+        self.assertTrue(any('50/120' in line for line in logs.output))
+        self.assertTrue(any('Missing 70 markets' in line for line in logs.output))
+
+    def test_missing_payload(self):
+        self.assertEqual(self.scraper._extract_markets_from_html('<html>nothing</html>'), [])
+
+    def test_extract_complete_json(self):
+        text = '{"a": "}{\\"", "b": {"c": [1, 2]}} trailing'
+        self.assertEqual(self.scraper._extract_complete_json(text), '{"a": "}{\\"", "b": {"c": [1, 2]}}')
+        self.assertIsNone(self.scraper._extract_complete_json('[1]'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,10 @@ from eth_account import Account
 from typing import Dict, Optional
 import os
 
+from approval_bootstrap import ApprovalBootstrap
+from circuit_breaker import get_circuit_breaker
+from rate_limiter import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 # Polygon Mainnet Addresses
@@ -54,6 +58,8 @@ class USDCApprover:
     
     def __init__(self, config: dict):
         self.config = config
+        self.rate_limiter = get_rate_limiter()  # Shared RPC budget
+        self.rpc_breaker = get_circuit_breaker('rpc')
         
         # Get RPC URL from config or env
         rpc_url = config.get('rpc_url') or os.getenv('POLYGON_RPC_URL', 'https://polygon-rpc.com')
@@ -120,10 +126,13 @@ class USDCApprover:
             logger.debug(f"Checking allowance for {checksum_address[:10]}...")
             logger.debug(f"Exchange address: {checksum_exchange}")
 
-            allowance = self.usdc_contract.functions.allowance(
-                checksum_address,
-                checksum_exchange
-            ).call()
+            async def fetch_allowance() -> int:
+                await self.rate_limiter.acquire('rpc')
+                return await asyncio.to_thread(
+                    self.usdc_contract.functions.allowance(checksum_address, checksum_exchange).call
+                )
+
+            allowance = await self.rpc_breaker.call(fetch_allowance)
 
             logger.debug(f"Allowance retrieved: {allowance} base units ({allowance/1e6:.2f} USDC)")
 
@@ -156,6 +165,9 @@ class USDCApprover:
             account = Account.from_key(private_key)
             address = Web3.to_checksum_address(account.address)
             
+            # nonce + gas price + send
+            await self.rate_limiter.acquire('rpc', tokens=3)
+            
             # Build approve transaction
             nonce = self.w3.eth.get_transaction_count(address)
             
@@ -208,9 +220,13 @@ class USDCApprover:
             USDC balance as float
         """
         try:
-            balance = self.usdc_contract.functions.balanceOf(
-                Web3.to_checksum_address(address)
-            ).call()
+            async def fetch_balance() -> int:
+                await self.rate_limiter.acquire('rpc')
+                return await asyncio.to_thread(
+                    self.usdc_contract.functions.balanceOf(Web3.to_checksum_address(address)).call
+                )
+
+            balance = await self.rpc_breaker.call_cached(('usdc', address), fetch_balance)
             
             # Convert from base units (6 decimals) to USDC
             return balance / 1e6
@@ -230,7 +246,11 @@ class USDCApprover:
             MATIC balance as float
         """
         try:
-            balance = self.w3.eth.get_balance(Web3.to_checksum_address(address))
+            async def fetch_balance() -> int:
+                await self.rate_limiter.acquire('rpc')
+                return await asyncio.to_thread(self.w3.eth.get_balance, Web3.to_checksum_address(address))
+
+            balance = await self.rpc_breaker.call_cached(('matic', address), fetch_balance)
             
             # Convert from wei to MATIC
             return balance / 1e18
@@ -243,6 +263,9 @@ class USDCApprover:
         """
         Approve USDC for all wallets
         
+        All allowances are read with one multicall and the missing approvals
+        are submitted concurrently (see ApprovalBootstrap).
+        
         Args:
             wallets: List of wallet dicts
             amount_usdc: Amount to approve per wallet
@@ -250,35 +273,25 @@ class USDCApprover:
         Returns:
             Dict mapping wallet address to approval status
         """
+        try:
+            report = await ApprovalBootstrap(self.config).run(wallets, usdc_amount=amount_usdc, ctf=False)
+        except Exception as e:
+            logger.error(f"❌ Approval bootstrap failed: {e}")
+            return {wallet['address']: False for wallet in wallets}
+
         results = {}
-        
-        for wallet in wallets:
-            address = wallet['address']
-            
-            # Check balances first
-            usdc_balance = await self.check_usdc_balance(address)
-            matic_balance = await self.check_matic_balance(address)
-            
+        for address, entry in report['wallets'].items():
             logger.info(f"\n💰 Wallet {address[:10]}...")
-            logger.info(f"   USDC: {usdc_balance:,.2f}")
-            logger.info(f"   MATIC: {matic_balance:.4f}")
-            
+            logger.info(f"   USDC: {entry['usdc'] or 0:,.2f}")
+            logger.info(f"   MATIC: {entry['matic'] or 0:.4f}")
+
             # Check if wallet has enough USDC
-            if usdc_balance < 10:
+            if (entry['usdc'] or 0) < 10:
                 logger.warning(f"⚠️  Low USDC balance! Need at least 100 USDC for trading")
-            
-            # Check if wallet has enough MATIC for gas
-            if matic_balance < 0.1:
-                logger.warning(f"⚠️  Low MATIC balance! Need at least 0.5 MATIC for gas fees")
-                results[address] = False
-                continue
-            
-            # Approve USDC
-            success = await self.check_and_approve_wallet(wallet, amount_usdc)
-            results[address] = success
-            
-            # Small delay between approvals
-            await asyncio.sleep(2)
+            if entry['error']:
+                logger.error(f"❌ {entry['error']}")
+
+            results[address] = entry['ok']
         
         # Summary
         approved = sum(1 for v in results.values() if v)
@@ -12,6 +12,9 @@ from eth_account import Account
 import asyncio
 from web3 import Web3
 
+from circuit_breaker import get_circuit_breaker
+from rate_limiter import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -234,25 +237,41 @@ class WalletManager:
 
         usdc_contract = self.w3.eth.contract(address=USDC_ADDRESS, abi=USDC_ABI)
 
-        for wallet in self.wallets:
-            try:
-                # Check MATIC balance
-                matic_balance = self.w3.eth.get_balance(wallet['address'])
-                matic_balance_eth = self.w3.from_wei(matic_balance, 'ether')
-
-                # Check REAL USDC balance from blockchain
-                usdc_balance_raw = usdc_contract.functions.balanceOf(wallet['address']).call()
-                usdc_balance = usdc_balance_raw / 1e6  # USDC has 6 decimals
-
-                balances[wallet['address']] = {
-                    'matic': float(matic_balance_eth),
-                    'usdc': float(usdc_balance),
-                    'index': wallet['index']
-                }
+        def fetch_balance(wallet: Dict) -> Dict:
+            # Check MATIC balance
+            matic_balance = self.w3.eth.get_balance(wallet['address'])
+            matic_balance_eth = self.w3.from_wei(matic_balance, 'ether')
 
-            except Exception as e:
-                logger.error(f"Error checking wallet {wallet['index']}: {e}")
+            # Check REAL USDC balance from blockchain
+            usdc_balance_raw = usdc_contract.functions.balanceOf(wallet['address']).call()
+            usdc_balance = usdc_balance_raw / 1e6  # USDC has 6 decimals
+
+            return {
+                'matic': float(matic_balance_eth),
+                'usdc': float(usdc_balance),
+                'index': wallet['index']
+            }
+
+        async def fetch_balance_limited(wallet: Dict) -> Dict:
+            await get_rate_limiter().acquire('rpc', tokens=2)
+            return await asyncio.to_thread(fetch_balance, wallet)
+
+        # RPC breaker fails fast when the node is down and falls back to recent balances
+        rpc_breaker = get_circuit_breaker('rpc')
+
+        # Query all wallets concurrently, RPC calls run off the event loop
+        results = await asyncio.gather(
+            *(rpc_breaker.call_cached(('balance', wallet['address']), fetch_balance_limited, wallet)
+              for wallet in self.wallets),
+            return_exceptions=True
+        )
+
+        for wallet, result in zip(self.wallets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error checking wallet {wallet['index']}: {result}")
                 balances[wallet['address']] = {'matic': 0, 'usdc': 0}
+            else:
+                balances[wallet['address']] = result
 
         return balances
     
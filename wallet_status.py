@@ -0,0 +1,302 @@
+"""
+Wallet Status Module
+Concurrent snapshot of balances, allowances, open orders, positions and rewards for every wallet
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+from py_clob_client.client import ClobClient
+from py_clob_client.constants import POLYGON
+
+from circuit_breaker import get_circuit_breaker
+from rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+USDC_ADDRESS = '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'  # USDC.e (Bridged)
+CTF_EXCHANGE = '0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E'  # Polymarket CTF Exchange
+DATA_API_POSITIONS_URL = "https://data-api.polymarket.com/positions"
+CLOB_HOST = "https://clob.polymarket.com"
+
+# ERC-20 function selectors
+BALANCE_OF = '0x70a08231'
+ALLOWANCE = '0xdd62ed3e'
+
+UNLIMITED_ALLOWANCE = 1e12  # USDC; max-uint approvals are shown as unlimited
+
+
+def _address_word(address: str) -> str:
+    """ABI-encode an address as a 32-byte hex word"""
+    return address.lower().replace('0x', '').rjust(64, '0')
+
+
+def build_rpc_batch(addresses: List[str]) -> List[Dict]:
+    """JSON-RPC batch: MATIC balance, USDC balance and CTF allowance per wallet
+
+    Request ids are 3 * wallet position + (0 = MATIC, 1 = USDC, 2 = allowance).
+    """
+    batch = []
+    for i, address in enumerate(addresses):
+        owner = _address_word(address)
+        batch.append({'jsonrpc': '2.0', 'id': 3 * i, 'method': 'eth_getBalance',
+                      'params': [address, 'latest']})
+        batch.append({'jsonrpc': '2.0', 'id': 3 * i + 1, 'method': 'eth_call',
+                      'params': [{'to': USDC_ADDRESS, 'data': BALANCE_OF + owner}, 'latest']})
+        batch.append({'jsonrpc': '2.0', 'id': 3 * i + 2, 'method': 'eth_call',
+                      'params': [{'to': USDC_ADDRESS, 'data': ALLOWANCE + owner + _address_word(CTF_EXCHANGE)},
+                                 'latest']})
+    return batch
+
+
+def parse_rpc_batch(addresses: List[str], responses: List[Dict]) -> Dict[str, Dict]:
+    """Decode a build_rpc_batch response into {address: {'matic', 'usdc', 'allowance'}}
+
+    Calls that returned an error are left as None.
+    """
+    results = {address: {'matic': None, 'usdc': None, 'allowance': None} for address in addresses}
+    fields = ('matic', 'usdc', 'allowance')
+    scale = (1e18, 1e6, 1e6)
+
+    for response in responses:
+        request_id = response.get('id')
+        value = response.get('result')
+        if not isinstance(request_id, int) or not value or value == '0x' or request_id >= 3 * len(addresses):
+            continue
+        wallet, field = divmod(request_id, 3)
+        results[addresses[wallet]][fields[field]] = int(value, 16) / scale[field]
+
+    return results
+
+
+class WalletStatusCollector:
+    """Gathers the state of all wallets in one concurrent pass
+
+    All HTTP goes through one pooled aiohttp session: balances and allowances
+    for every wallet are a single JSON-RPC batch request, Data API position
+    pages and reward lookups run concurrently per wallet. Open orders use
+    py_clob_client (blocking) on worker threads, with one authenticated client
+    per wallet kept across collections so API credentials are derived once.
+    Each source goes through the shared rate limiter and circuit breakers;
+    a failing source only blanks its own columns.
+    """
+
+    def __init__(self, config: dict, wallets: List[Dict], reward_manager=None):
+        """Initialize collector
+
+        Args:
+            config: Full bot configuration (rpc_url)
+            wallets: WalletManager.wallets (address, private_key, index)
+            reward_manager: Optional RewardManager for unclaimed reward lookups
+        """
+        self.rpc_url = config.get('rpc_url') or os.getenv('POLYGON_RPC_URL', 'https://polygon-rpc.com')
+        self.wallets = wallets
+        self.reward_manager = reward_manager
+        self.request_timeout = config.get('monitoring', {}).get('status_request_timeout', 10)
+
+        self.rate_limiter = get_rate_limiter()
+        self.rpc_breaker = get_circuit_breaker('rpc')
+        self.data_api_breaker = get_circuit_breaker('data_api')
+        self.clob_breaker = get_circuit_breaker('clob_read')
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.clob_clients: Dict[str, ClobClient] = {}  # address -> authenticated client
+
+    async def start(self):
+        """Open the pooled HTTP session"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=max(10, 4 * len(self.wallets)), keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            if self.reward_manager is not None and self.reward_manager.session is None:
+                self.reward_manager.session = self.session
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session is not None:
+            if self.reward_manager is not None and self.reward_manager.session is self.session:
+                self.reward_manager.session = None
+            await self.session.close()
+            self.session = None
+
+    async def _fetch_chain_state(self) -> Dict[str, Dict]:
+        """MATIC, USDC and allowance of all wallets in one JSON-RPC batch"""
+        addresses = [wallet['address'] for wallet in self.wallets]
+
+        async def post_batch() -> List[Dict]:
+            await self.rate_limiter.acquire('rpc', tokens=2)
+            async with self.session.post(self.rpc_url, json=build_rpc_batch(addresses)) as response:
+                self.rate_limiter.record_response('rpc', response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        responses = await self.rpc_breaker.call_cached(('status_batch', tuple(addresses)), post_batch)
+        return parse_rpc_batch(addresses, responses if isinstance(responses, list) else [responses])
+
+    async def _fetch_positions(self, address: str) -> Dict:
+        """Position count, current value and P&L from the Data API"""
+
+        async def fetch_page() -> List[Dict]:
+            await self.rate_limiter.acquire('data_api')
+            params = {'user': address, 'sizeThreshold': 0.01, 'limit': 500}
+            async with self.session.get(DATA_API_POSITIONS_URL, params=params) as response:
+                self.rate_limiter.record_response('data_api', response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                return await response.json()
+
+        positions = await self.data_api_breaker.call_cached(('status', address), fetch_page) or []
+        return {
+            'positions': len(positions),
+            'position_value': sum(float(p.get('currentValue') or 0) for p in positions),
+            'pnl': sum(float(p.get('cashPnl') or 0) for p in positions),
+        }
+
+    def _clob_client(self, wallet: Dict) -> ClobClient:
+        """Authenticated CLOB client for a wallet (created once, on a worker thread)"""
+        client = self.clob_clients.get(wallet['address'])
+        if client is None:
+            private_key = wallet['private_key']
+            if private_key.startswith('0x'):
+                private_key = private_key[2:]
+            client = ClobClient(CLOB_HOST, key=private_key, chain_id=POLYGON)
+            client.set_api_creds(client.create_or_derive_api_creds())
+            self.clob_clients[wallet['address']] = client
+        return client
+
+    async def _fetch_open_orders(self, wallet: Dict) -> Dict:
+        """Open order count and USDC locked in BUY orders"""
+
+        async def fetch() -> List[Dict]:
+            await self.rate_limiter.acquire('clob_read')
+            return await asyncio.to_thread(lambda: self._clob_client(wallet).get_orders())
+
+        orders = await self.clob_breaker.call_cached(('status_orders', wallet['address']), fetch) or []
+
+        locked = 0.0
+        for order in orders:
+            if str(order.get('side', '')).upper() == 'BUY':
+                remaining = float(order.get('original_size') or 0) - float(order.get('size_matched') or 0)
+                locked += remaining * float(order.get('price') or 0)
+
+        return {'open_orders': len(orders), 'locked': locked}
+
+    async def _fetch_rewards(self, address: str) -> Dict:
+        """Unclaimed rewards via RewardManager"""
+        return {'rewards': await self.reward_manager.check_polymarket_rewards_api(address)}
+
+    async def collect(self, orders: bool = True, rewards: bool = True) -> List[Dict]:
+        """Snapshot every wallet concurrently
+
+        Args:
+            orders: Include open orders (needs private keys)
+            rewards: Include unclaimed rewards (needs a reward_manager)
+
+        Returns:
+            One row per wallet: index, address, matic, usdc, allowance,
+            open_orders, locked, positions, position_value, pnl, rewards and
+            errors (source -> message); missing values are None
+        """
+        await self.start()
+        started = time.perf_counter()
+
+        per_wallet = []
+        for wallet in self.wallets:
+            sources = {'positions': self._fetch_positions(wallet['address'])}
+            if orders and wallet.get('private_key'):
+                sources['orders'] = self._fetch_open_orders(wallet)
+            if rewards and self.reward_manager is not None:
+                sources['rewards'] = self._fetch_rewards(wallet['address'])
+            per_wallet.append(sources)
+
+        coroutines = [self._fetch_chain_state()] + [c for sources in per_wallet for c in sources.values()]
+        results = await asyncio.gather(*coroutines, return_exceptions=True)
+
+        chain, results = results[0], iter(results[1:])
+        rows = []
+        for wallet, sources in zip(self.wallets, per_wallet):
+            row = {
+                'index': wallet.get('index'),
+                'address': wallet['address'],
+                'matic': None, 'usdc': None, 'allowance': None,
+                'open_orders': None, 'locked': None,
+                'positions': None, 'position_value': None, 'pnl': None,
+                'rewards': None,
+                'errors': {},
+            }
+
+            if isinstance(chain, Exception):
+                row['errors']['chain'] = str(chain) or type(chain).__name__
+            else:
+                row.update(chain.get(wallet['address'], {}))
+
+            for source in sources:
+                result = next(results)
+                if isinstance(result, Exception):
+                    row['errors'][source] = str(result) or type(result).__name__
+                else:
+                    row.update(result)
+
+            rows.append(row)
+
+        logger.debug(f"📋 Collected status of {len(rows)} wallets in {time.perf_counter() - started:.2f}s")
+        return rows
+
+
+def format_status_table(rows: List[Dict]) -> str:
+    """Render collect() rows as a fixed-width table with a totals line
+
+    Allowances above UNLIMITED_ALLOWANCE show as 'unlimited' and are left out
+    of the totals (a sum of per-wallet approvals means nothing).
+    """
+    columns = [
+        ('#', 'index', '{:>2}'),
+        ('Wallet', 'address', '{:<15}'),
+        ('MATIC', 'matic', '{:>8.3f}'),
+        ('USDC', 'usdc', '{:>10.2f}'),
+        ('Allowance', 'allowance', '{:>11.0f}'),
+        ('Orders', 'open_orders', '{:>6}'),
+        ('Locked', 'locked', '{:>9.2f}'),
+        ('Pos', 'positions', '{:>4}'),
+        ('Pos value', 'position_value', '{:>10.2f}'),
+        ('P&L', 'pnl', '{:>9.2f}'),
+        ('Rewards', 'rewards', '{:>8.2f}'),
+    ]
+
+    not_summed = {'allowance'}
+
+    def cell(fmt: str, value, key: Optional[str] = None) -> str:
+        width = int(''.join(ch for ch in fmt.split('.')[0] if ch.isdigit()))
+        if value is None:
+            return '-'.rjust(width)
+        if key == 'allowance' and value >= UNLIMITED_ALLOWANCE:
+            return 'unlimited'.rjust(width)
+        return fmt.format(value)
+
+    widths = [len(cell(fmt, None)) for _, _, fmt in columns]
+    lines = ['  '.join(title.rjust(width) if i > 1 else title.ljust(width)
+                       for i, ((title, _, _), width) in enumerate(zip(columns, widths)))]
+    lines.append('-' * len(lines[0]))
+
+    for row in rows:
+        values = dict(row)
+        values['index'] = (row['index'] + 1) if row.get('index') is not None else None
+        values['address'] = f"{row['address'][:6]}...{row['address'][-6:]}"
+        line = '  '.join(cell(fmt, values.get(key), key) for _, key, fmt in columns)
+        if row.get('errors'):
+            line += '  ⚠️ ' + ', '.join(sorted(row['errors']))
+        lines.append(line)
+
+    totals = {'index': None, 'address': 'TOTAL'.ljust(15)}
+    for _, key, _ in columns[2:]:
+        values = [row[key] for row in rows if row.get(key) is not None and key not in not_summed]
+        totals[key] = sum(values) if values else None
+    lines.append('-' * len(lines[0]))
+    lines.append('  '.join(
+        totals['address'] if key == 'address' else cell(fmt, totals[key]) for _, key, fmt in columns
+    ))
+    return '\n'.join(lines)
@@ -9,15 +9,35 @@ import aiohttp
 import json
 import re
 import logging
-from typing import List, Dict, Optional
+from typing import Any, Generator, Iterator, List, Dict, Optional, Tuple
+
+from category_classifier import CategoryClassifier, SCRAPER_QUESTION_RULES, TAG_RULES
+from rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Streaming extraction helpers for the /rewards page payload
+NEXT_DATA_SCRIPT = re.compile(r'<script id="__NEXT_DATA__"[^>]*>')
+# Only the top-level markets array of a query result (queries[] -> state -> data -> data[]),
+# never a nested "data" array inside a market or another query's payload
+DATA_ARRAY_KEY = re.compile(r'"state"\s*:\s*\{\s*"data"\s*:\s*\{\s*"data"\s*:\s*\[')
+TOTAL_COUNT_KEY = re.compile(r'"total_count"\s*:\s*(\d+)')
+JSON_WHITESPACE = re.compile(r'\s*')
+JSON_STRUCTURE_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+
 
 class WebRewardsScraper:
     """Scrapes rewards markets from Polymarket web page"""
     
-    def __init__(self):
+    def __init__(self, debug_dump_path: Optional[str] = None):
+        """
+        Args:
+            debug_dump_path: Where to save pages whose payload cannot be found (None = don't save)
+        """
+        self.rate_limiter = get_rate_limiter()
+        self.debug_dump_path = debug_dump_path
+        self._json_decoder = json.JSONDecoder()
+        self.category_classifier = CategoryClassifier(SCRAPER_QUESTION_RULES, tag_rules=TAG_RULES)
         self.url = "https://polymarket.com/rewards"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -62,7 +82,9 @@ class WebRewardsScraper:
                     logger.info(f"📄 Fetching page {page}...")
 
                     try:
+                        await self.rate_limiter.acquire('clob_read')
                         async with session.get(api_url, params=params, headers=self.headers, timeout=20) as response:
+                            self.rate_limiter.record_response('clob_read', response.status, response.headers.get('Retry-After'))
                             if response.status != 200:
                                 logger.error(f"❌ Failed to fetch page: HTTP {response.status}")
                                 break
@@ -160,6 +182,9 @@ class WebRewardsScraper:
         """
         Extract complete JSON object by matching braces
 
+        Strings are skipped by a regex token scan (C speed) instead of walking
+        the text character by character.
+
         Args:
             text: Text starting with '{'
 
@@ -170,34 +195,131 @@ class WebRewardsScraper:
             return None
 
         depth = 0
-        in_string = False
-        escape = False
-
-        for i, char in enumerate(text):
-            if escape:
-                escape = False
-                continue
-
-            if char == '\\':
-                escape = True
-                continue
-
-            if char == '"':
-                in_string = not in_string
-                continue
-
-            if in_string:
-                continue
-
+        for token in JSON_STRUCTURE_TOKEN.finditer(text):
+            char = token.group()
             if char == '{':
                 depth += 1
             elif char == '}':
                 depth -= 1
                 if depth == 0:
-                    return text[:i+1]
+                    return text[:token.end()]
 
         return None
 
+    def _locate_payload(self, html: str) -> Optional[Tuple[int, int]]:
+        """
+        Locate the embedded Next.js JSON payload without copying the page
+
+        Args:
+            html: HTML content from /rewards page
+
+        Returns:
+            (start, end) offsets of the JSON payload or None
+        """
+        match = NEXT_DATA_SCRIPT.search(html)
+        if match:
+            end = html.find('</script>', match.end())
+            if end != -1:
+                return match.end(), end
+
+        # Fallback: inline payload without the script tag
+        start = html.find('{"props":{"pageProps":')
+        if start == -1:
+            return None
+
+        end = html.find('</script>', start)
+        return start, (end if end != -1 else len(html))
+
+    def _iter_json_array(self, text: str, pos: int, end: int) -> Generator[Any, None, Tuple[int, int]]:
+        """
+        Iteratively decode elements of a JSON array one at a time
+
+        Args:
+            text: Source text
+            pos: Offset just after the opening '['
+            end: Offset where the payload ends
+
+        Yields:
+            Decoded array elements
+
+        Returns:
+            (offset of the closing ']', number of elements decoded)
+        """
+        decoder = self._json_decoder
+        count = 0
+        while pos < end:
+            pos = JSON_WHITESPACE.match(text, pos).end()
+            if text[pos] == ']':
+                break
+            if text[pos] == ',':
+                pos = JSON_WHITESPACE.match(text, pos + 1).end()
+
+            element, pos = decoder.raw_decode(text, pos)
+            count += 1
+            yield element
+
+        return pos, count
+
+    def iter_markets_from_html(self, html: str) -> Iterator[Dict]:
+        """
+        Stream market objects out of the /rewards page __NEXT_DATA__ payload
+
+        Only the markets array is decoded, one market at a time; the rest of the
+        (multi-megabyte) dehydrated state is never materialised.
+
+        Args:
+            html: HTML content from /rewards page
+
+        Yields:
+            Market dictionaries
+        """
+        bounds = self._locate_payload(html)
+        if not bounds:
+            logger.warning("⚠️  Could not find market data in HTML")
+            if self.debug_dump_path:
+                with open(self.debug_dump_path, 'w', encoding='utf-8') as f:
+                    f.write(html)
+                logger.info(f"💾 Saved HTML to {self.debug_dump_path} for inspection")
+            return
+
+        start, end = bounds
+        dehydrated = html.find('"dehydratedState"', start, end)
+        search_from = dehydrated if dehydrated != -1 else start
+
+        # Structure: props -> pageProps -> dehydratedState -> queries[] -> state -> data -> data[]
+        for array in DATA_ARRAY_KEY.finditer(html, search_from, end):
+            elements = self._iter_json_array(html, array.end(), end)
+            first = next(elements, None)
+            if not isinstance(first, dict) or not ('condition_id' in first or 'question' in first):
+                continue
+
+            yield first
+            array_end, fetched = yield from elements
+            self._check_total_count(html, array_end, end, fetched)
+            return
+
+        logger.warning("⚠️  Could not find markets in expected JSON structure")
+
+    def _check_total_count(self, html: str, pos: int, end: int, fetched: int):
+        """
+        Warn when the page reports more markets than it embedded
+
+        Args:
+            html: HTML content from /rewards page
+            pos: Offset of the closing ']' of the markets array
+            end: Offset where the payload ends
+            fetched: Number of markets decoded from the array
+        """
+        # count / total_count are scalar siblings of the markets array
+        close = html.find('}', pos, end)
+        match = TOTAL_COUNT_KEY.search(html, pos, close if close != -1 else end)
+        total_count = int(match.group(1)) if match else fetched
+        logger.info(f"📊 Count: {fetched}, Total: {total_count}")
+
+        if total_count > fetched:
+            logger.warning(f"⚠️  Only fetched {fetched}/{total_count} markets!")
+            logger.warning(f"⚠️  Missing {total_count - fetched} markets - pagination needed!")
+
     def _extract_markets_from_html(self, html: str) -> List[Dict]:
         """
         Extract markets from HTML by parsing __NEXT_DATA__ JSON
@@ -209,117 +331,32 @@ class WebRewardsScraper:
             List of market dictionaries
         """
         try:
-            # Search for the specific pattern we found in test_web_extract.py
-            # The JSON is embedded in the HTML, look for the props structure
-            pattern = r'{"props":{"pageProps":{"dehydratedState":.+?"data":\[.+?\]'
-            match = re.search(pattern, html, re.DOTALL)
-
-            if not match:
-                logger.warning("⚠️  Could not find market data in HTML")
-                # Save HTML for debugging
-                with open('debug_rewards_page.html', 'w', encoding='utf-8') as f:
-                    f.write(html)
-                logger.info("💾 Saved HTML to debug_rewards_page.html for inspection")
-                return []
-
-            # Extract the full JSON object by finding matching braces
-            json_start = match.start()
-            json_str = self._extract_complete_json(html[json_start:])
-
-            if not json_str:
-                logger.error("❌ Could not extract complete JSON")
-                return []
+            markets = list(self.iter_markets_from_html(html))
+            if markets:
+                logger.info(f"✅ Extracted {len(markets)} markets from JSON")
+            return markets
 
-            data = json.loads(json_str)
-            
-            # Navigate to markets data
-            # Structure: props -> pageProps -> dehydratedState -> queries[0] -> state -> data -> data
-            try:
-                queries = data['props']['pageProps']['dehydratedState']['queries']
-
-                # Find the query with market data
-                for query in queries:
-                    if 'state' in query and 'data' in query['state']:
-                        state_data = query['state']['data']
-                        if 'data' in state_data and isinstance(state_data['data'], list):
-                            markets = state_data['data']
-                            count = state_data.get('count', len(markets))
-                            total_count = state_data.get('total_count', len(markets))
-
-                            logger.info(f"✅ Extracted {len(markets)} markets from JSON")
-                            logger.info(f"📊 Count: {count}, Total: {total_count}")
-
-                            # Check if there are more markets
-                            if total_count > len(markets):
-                                logger.warning(f"⚠️  Only fetched {len(markets)}/{total_count} markets!")
-                                logger.warning(f"⚠️  Missing {total_count - len(markets)} markets - pagination needed!")
-
-                            return markets
-
-                logger.warning("⚠️  Could not find markets in expected JSON structure")
-                return []
-
-            except (KeyError, TypeError, IndexError) as e:
-                logger.error(f"❌ Error navigating JSON structure: {e}")
-                return []
-                
         except json.JSONDecodeError as e:
             logger.error(f"❌ Failed to parse JSON: {e}")
             return []
         except Exception as e:
             logger.error(f"❌ Error extracting markets: {e}")
             return []
-    
-    def _infer_category_from_tags(self, question: str, tags: List[str]) -> str:
+
+    def _infer_category_from_tags(self, question: str, tags: List[str], condition_id: Optional[str] = None) -> str:
         """
         Infer market category from question and tags
 
         Args:
             question: Market question text
             tags: List of tags from CLOB API (can be None)
+            condition_id: Market condition ID (memoisation key)
 
         Returns:
             Category string: crypto, sports, politics, science, entertainment, economics, other
         """
-        question_lower = question.lower()
-        tags_lower = [tag.lower() for tag in (tags or [])]  # Handle None tags
-
-        # Check tags first (more reliable)
-        if any(tag in tags_lower for tag in ['politics', 'elections', 'usa election', 'potus']):
-            return 'politics'
-        if any(tag in tags_lower for tag in ['sports', 'football', 'basketball', 'baseball', 'soccer', 'nfl', 'nba', 'mlb', 'premier league']):
-            return 'sports'
-        if any(tag in tags_lower for tag in ['crypto', 'cryptocurrency', 'bitcoin', 'ethereum']):
-            return 'crypto'
-        if any(tag in tags_lower for tag in ['science', 'technology', 'ai', 'space']):
-            return 'science'
-        if any(tag in tags_lower for tag in ['entertainment', 'movies', 'tv', 'celebrities']):
-            return 'entertainment'
-        if any(tag in tags_lower for tag in ['economics', 'economy', 'markets', 'finance']):
-            return 'economics'
-
-        # Fallback to question keywords
-        crypto_keywords = ['bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol', 'crypto', 'price']
-        science_keywords = ['ai', 'artificial intelligence', 'chatgpt', 'openai', 'technology', 'space', 'nasa']
-        politics_keywords = ['election', 'president', 'senate', 'congress', 'vote', 'democrat', 'republican']
-        entertainment_keywords = ['movie', 'film', 'actor', 'actress', 'celebrity', 'tv show', 'netflix']
-        economics_keywords = ['gdp', 'inflation', 'recession', 'stock market', 'dow jones', 's&p 500']
-        sports_keywords = ['nfl', 'nba', 'mlb', 'nhl', 'soccer', 'football', 'basketball', 'super bowl']
-
-        if any(keyword in question_lower for keyword in crypto_keywords):
-            return 'crypto'
-        elif any(keyword in question_lower for keyword in science_keywords):
-            return 'science'
-        elif any(keyword in question_lower for keyword in politics_keywords):
-            return 'politics'
-        elif any(keyword in question_lower for keyword in entertainment_keywords):
-            return 'entertainment'
-        elif any(keyword in question_lower for keyword in economics_keywords):
-            return 'economics'
-        elif any(keyword in question_lower for keyword in sports_keywords):
-            return 'sports'
-        else:
-            return 'other'
+        # Tags first (more reliable), then question keywords - see category_classifier
+        return self.category_classifier.classify(question, condition_id=condition_id, tags=tags)
 
     def parse_market(self, market_data: Dict) -> Optional[Dict]:
         """
@@ -387,7 +424,7 @@ class WebRewardsScraper:
             market_competitiveness = 0
 
             # Infer category from question and tags
-            category = self._infer_category_from_tags(question, market_data.get('tags', []))
+            category = self._infer_category_from_tags(question, market_data.get('tags', []), market_id)
 
             # Build standardized market dict (CLOB API format)
             parsed = {